@@ -0,0 +1,11 @@
+"""
+Package benchmarks - these are not part of the installed package, and are
+run from the repository root as modules, e.g.
+
+::
+
+    python -m benchmarks.micro
+    python -m benchmarks.startup
+    python -m benchmarks.throughput
+    python -m benchmarks.tracing
+"""
@@ -0,0 +1,424 @@
+__all__ = [
+    'compare_with_baseline',
+    'get_cases',
+    'main',
+    'measure_allocations',
+    'run_microbenchmarks',
+    'time_case'
+]
+
+
+"""
+Microbenchmarks of the utility primitives and schema loaders which are on
+the hot paths of validation, and of the batch sampling of a column of peril
+code sequences, each run in isolation on representative mixes of values -
+numeric strings, free text, nulls, peril code sequences etc.
+The time per operation (ns/op) is measured with ``timeit``, and the memory
+allocated per operation with ``tracemalloc``.
+"""
+
+import argparse
+import gc
+import io
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
+
+
+DEFAULT_MIN_TIME = 0.2
+
+DEFAULT_REPEAT = 5
+
+DEFAULT_BASELINE_FP = os.path.join(os.path.dirname(__file__), 'micro_baseline.json')
+
+# Regressions are times per operation more than this fraction above the
+# baseline
+DEFAULT_TOLERANCE = 0.25
+
+SEED = 1234
+
+
+def get_cases() -> List[Dict]:
+    """
+    Returns the microbenchmark cases - dicts with the keys ``name``,
+    ``func`` (the function benchmarked) and ``inputs`` (a list of argument
+    tuples, i.e. the value mix). An operation is one call of the function
+    with one of the argument tuples, and the functions are called with each
+    of the tuples in turn.
+
+    :return: The cases
+    :rtype: list
+    """
+    from oedtools.schema import (
+        get_column_schema,
+        get_grouped_master_schema,
+        get_schema,
+        sample_column,
+    )
+    from oedtools.utils import (
+        generate_token_sequences,
+        get_value,
+        is_valid_token_sequence,
+        sql_to_python_dtype,
+        within_range,
+    )
+    from oedtools.values import get_values_profile
+
+    perils = get_column_schema('loc', 'LocPerilsCovered')['column_range']
+    currencies = get_column_schema('loc', 'LocCurrency')['column_range']
+
+    value_mixes = {
+        'numbers': [(1,), (-250,), (3.14,), (1e6,), (0,)],
+        'numeric_strings': [('1',), ('-250',), ('3.14',), ('1e6',), (' 42 ',)],
+        'free_text': [('Main Street',), ('abc',), ('N/A',), ('Unit 4b',), ('x',)],
+        'nulls': [(None,), ('',), ('nan',)],
+        'perils': [(seq,) for seq in generate_token_sequences(perils, 5, 4, rng=SEED)]
+    }
+
+    cases = [
+        {'name': 'get_value[{}]'.format(mix), 'func': get_value, 'inputs': inputs}
+        for mix, inputs in value_mixes.items()
+    ]
+
+    cases += [
+        {
+            'name': 'within_range[int_range]',
+            'func': within_range,
+            'inputs': [(range(0, 2 ** 31), v) for v in [0, 1, 250, -1, 2 ** 31]]
+        },
+        {
+            'name': 'within_range[float_bounds]',
+            'func': within_range,
+            'inputs': [((0.0, 1e12), v) for v in [0.0, 0.5, 1e6, -1.0, 1e13]]
+        },
+        {
+            'name': 'within_range[codes]',
+            'func': within_range,
+            'inputs': [(currencies, v) for v in ['USD', 'GBP', 'EUR', 'XYZ', 'usd']]
+        },
+        {
+            'name': 'is_valid_token_sequence[valid]',
+            'func': is_valid_token_sequence,
+            'inputs': [(perils, seq) for seq in generate_token_sequences(perils, 5, 4, rng=SEED)]
+        },
+        {
+            'name': 'is_valid_token_sequence[invalid]',
+            'func': is_valid_token_sequence,
+            'inputs': [(perils, seq) for seq in ['WTC;WTC', 'XYZ', 'WTC;XYZ;WSS', ';;', 'wtc']]
+        },
+        {
+            'name': 'is_valid_token_sequence[nulls]',
+            'func': is_valid_token_sequence,
+            'inputs': [(perils, v) for v in [None, '', 1]]
+        },
+        {
+            'name': 'sql_to_python_dtype',
+            'func': sql_to_python_dtype,
+            'inputs': [(t,) for t in ['bit', 'tinyint', 'int', 'bigint', 'real', 'decimal', 'varchar(40)', 'nvarchar(max)', 'datetime']]
+        },
+        {
+            'name': 'sql_to_python_dtype[numpy]',
+            'func': sql_to_python_dtype,
+            'inputs': [(t, True) for t in ['bit', 'tinyint', 'int', 'bigint', 'real', 'decimal', 'varchar(40)', 'nvarchar(max)', 'datetime']]
+        },
+        {'name': 'get_schema[master]', 'func': get_schema, 'inputs': [('master',)]},
+        {'name': 'get_schema[loc]', 'func': get_schema, 'inputs': [('loc',)]},
+        {'name': 'get_grouped_master_schema', 'func': get_grouped_master_schema, 'inputs': [()]},
+        {
+            'name': 'get_column_schema',
+            'func': get_column_schema,
+            'inputs': [('loc', 'LocPerilsCovered'), ('acc', 'AccCurrency'), ('reinsinfo', 'ReinsNumber')]
+        },
+        {'name': 'get_values_profile', 'func': get_values_profile, 'inputs': [()]},
+        # The batch sampling of a column of peril code sequences, which
+        # should take well under a second for 1M values
+        {
+            'name': 'sample_column[perils_1m]',
+            'func': sample_column,
+            'inputs': [('loc', 'LocPerilsCovered', None, 10 ** 6, None, SEED)]
+        },
+    ]
+
+    return cases
+
+
+def time_case(
+    func: Callable,
+    inputs: List[Tuple],
+    min_time: Optional[float] = DEFAULT_MIN_TIME,
+    repeat: Optional[int] = DEFAULT_REPEAT
+) -> float:
+    """
+    Returns the time (ns) per operation of a function on a value mix - the
+    number of loops over the inputs is increased until a loop takes at
+    least ``min_time`` seconds, and the minimum time of ``repeat`` timings
+    is used.
+
+    :param func: The function
+    :type func: callable
+
+    :param inputs: The argument tuples
+    :type inputs: list
+
+    :param min_time: (Optional) The minimum time (s) of a timing (default is
+                     ``DEFAULT_MIN_TIME``)
+    :type min_time: float
+
+    :param repeat: (Optional) The number of timings (default is
+                   ``DEFAULT_REPEAT``)
+    :type repeat: int
+
+    :return: The time (ns) per operation
+    :rtype: float
+    """
+    def run():
+        for args in inputs:
+            func(*args)
+
+    timer = timeit.Timer(run)
+
+    number = 1
+    while True:
+        if timer.timeit(number) >= min_time:
+            break
+        number *= 10 if number < 1000 else 2
+
+    best = min(timer.repeat(repeat=repeat, number=number))
+
+    return best * 1e9 / (number * len(inputs))
+
+
+def measure_allocations(func: Callable, inputs: List[Tuple], loops: Optional[int] = 10) -> Dict[str, float]:
+    """
+    Measures the memory allocated by a function on a value mix with
+    ``tracemalloc`` - the mean peak memory (bytes) allocated during an
+    operation, and the mean memory (bytes) retained after an operation,
+    which should be zero for functions which do not cache or leak.
+
+    :param func: The function
+    :type func: callable
+
+    :param inputs: The argument tuples
+    :type inputs: list
+
+    :param loops: (Optional) The number of loops over the inputs (default is
+                  ``10``)
+    :type loops: int
+
+    :return: A dict with the keys ``alloc_bytes_per_op`` and
+             ``retained_bytes_per_op``
+    :rtype: dict
+    """
+    # A first call outside the measurement, for any one-off imports or caches
+    for args in inputs:
+        func(*args)
+
+    # ``tracemalloc.reset_peak`` requires Python 3.9 - before that the peak
+    # is reset by clearing the traces, which also resets the memory in use,
+    # so the retained memory is measured in a separate pass
+    reset_peak = getattr(tracemalloc, 'reset_peak', None)
+
+    gc.collect()
+    tracemalloc.start()
+
+    try:
+        peak = 0
+        start, _ = tracemalloc.get_traced_memory()
+        for _ in range(loops):
+            for args in inputs:
+                if reset_peak:
+                    reset_peak()
+                    current, _ = tracemalloc.get_traced_memory()
+                else:
+                    tracemalloc.clear_traces()
+                    current = 0
+                func(*args)
+                peak += tracemalloc.get_traced_memory()[1] - current
+        if not reset_peak:
+            gc.collect()
+            tracemalloc.clear_traces()
+            start, _ = tracemalloc.get_traced_memory()
+            for _ in range(loops):
+                for args in inputs:
+                    func(*args)
+        gc.collect()
+        end, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    num_ops = loops * len(inputs)
+
+    return {
+        'alloc_bytes_per_op': peak / num_ops,
+        'retained_bytes_per_op': max(0, end - start) / num_ops
+    }
+
+
+def run_microbenchmarks(
+    names: Optional[Iterable[str]] = None,
+    min_time: Optional[float] = DEFAULT_MIN_TIME,
+    repeat: Optional[int] = DEFAULT_REPEAT
+) -> List[Dict]:
+    """
+    Runs the microbenchmarks, or those whose names contain one of the given
+    (sub)strings.
+
+    :param names: (Optional) The (sub)strings of the names of the cases to
+                  run (default is all the cases)
+    :type names: list, tuple
+
+    :param min_time: (Optional) The minimum time (s) of a timing (default is
+                     ``DEFAULT_MIN_TIME``)
+    :type min_time: float
+
+    :param repeat: (Optional) The number of timings (default is
+                   ``DEFAULT_REPEAT``)
+    :type repeat: int
+
+    :return: A list of results, one dict per case, with the keys ``name``,
+             ``ns_per_op``, ``alloc_bytes_per_op`` and
+             ``retained_bytes_per_op``
+    :rtype: list
+    """
+    results = []
+
+    for case in get_cases():
+        if names and not any(n in case['name'] for n in names):
+            continue
+        ns_per_op = time_case(case['func'], case['inputs'], min_time=min_time, repeat=repeat)
+        allocs = measure_allocations(case['func'], case['inputs'])
+        results.append({
+            'name': case['name'],
+            'ns_per_op': round(ns_per_op, 1),
+            'alloc_bytes_per_op': round(allocs['alloc_bytes_per_op']),
+            'retained_bytes_per_op': round(allocs['retained_bytes_per_op'])
+        })
+
+    return results
+
+
+def compare_with_baseline(
+    results: Iterable[Dict],
+    baseline: Iterable[Dict],
+    tolerance: Optional[float] = DEFAULT_TOLERANCE
+) -> List[Dict]:
+    """
+    Compares microbenchmark results with baseline results, and adds the keys
+    ``baseline_ns_per_op``, ``change`` (the fractional change in the time
+    per operation) and ``regression`` to each result.
+
+    :param results: The results, as returned by :py:meth:`run_microbenchmarks`
+    :type results: list
+
+    :param baseline: The baseline results
+    :type baseline: list
+
+    :param tolerance: (Optional) The fraction by which a time per operation
+                      can exceed the baseline (default is
+                      ``DEFAULT_TOLERANCE``)
+    :type tolerance: float
+
+    :return: The compared results
+    :rtype: list
+    """
+    baseline = {b['name']: b for b in baseline}
+
+    compared = []
+
+    for r in results:
+        b = baseline.get(r['name'])
+        change = (r['ns_per_op'] / b['ns_per_op'] - 1) if b and b['ns_per_op'] else None
+        compared.append({
+            **r,
+            **{
+                'baseline_ns_per_op': b['ns_per_op'] if b else None,
+                'change': round(change, 4) if change is not None else None,
+                'regression': change is not None and change > tolerance
+            }
+        })
+
+    return compared
+
+
+def _format_ns(ns: float) -> str:
+    for unit, scale in [('s', 1e9), ('ms', 1e6), ('us', 1e3)]:
+        if ns >= scale:
+            return '{:.1f} {}'.format(ns / scale, unit)
+    return '{:.1f} ns'.format(ns)
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='OED utility and schema loader microbenchmarks')
+    parser.add_argument('-k', '--names', default=None, help='Run only the cases whose names contain one of these comma-separated strings')
+    parser.add_argument('-t', '--min-time', type=float, default=DEFAULT_MIN_TIME, help='Minimum time (s) of a timing')
+    parser.add_argument('-n', '--repeat', type=int, default=DEFAULT_REPEAT, help='Number of timings per case')
+    parser.add_argument(
+        '-c', '--baseline', default=DEFAULT_BASELINE_FP,
+        help=(
+            'Baseline results file to compare with (default is benchmarks/micro_baseline.json) - it must exist, unless '
+            'the results are written as a baseline (-o), and an empty string skips the comparison'
+        )
+    )
+    parser.add_argument('-o', '--save-baseline', default=None, help='Write the results as a baseline file')
+    parser.add_argument(
+        '-r', '--tolerance', type=float, default=DEFAULT_TOLERANCE,
+        help='Fraction by which times per operation can exceed the baseline (default is {})'.format(DEFAULT_TOLERANCE)
+    )
+    parser.add_argument('-j', '--json', default=False, action='store_true', help='Print the results as JSON')
+    args = parser.parse_args(argv)
+
+    names = [n.strip() for n in args.names.split(',') if n.strip()] if args.names else None
+
+    # As for the throughput benchmarks, a missing baseline is an error, as a
+    # comparison with no results could never flag a regression
+    if args.baseline and not os.path.exists(args.baseline) and not args.save_baseline:
+        parser.error(
+            'The baseline file "{}" does not exist - record one on this machine with "-o {}", '
+            'or skip the comparison with -c ""'.format(args.baseline, args.baseline)
+        )
+
+    results = run_microbenchmarks(names=names, min_time=args.min_time, repeat=args.repeat)
+
+    baseline = []
+    if args.baseline and os.path.exists(args.baseline):
+        with io.open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    results = compare_with_baseline(results, baseline, tolerance=args.tolerance)
+
+    if args.save_baseline:
+        with io.open(args.save_baseline, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(
+                [{k: v for k, v in r.items() if k not in ['baseline_ns_per_op', 'change', 'regression']} for r in results],
+                indent=4
+            ))
+
+    if args.json:
+        print(json.dumps(results, indent=4))
+    else:
+        for r in results:
+            print('{:<36} {:>10}/op {:>10} B/op allocated {:>8} B/op retained {:>8} {}'.format(
+                r['name'],
+                _format_ns(r['ns_per_op']),
+                r['alloc_bytes_per_op'],
+                r['retained_bytes_per_op'],
+                '{:+.1f}%'.format(100 * r['change']) if r['change'] is not None else '',
+                'REGRESSION' if r['regression'] else 'ok'
+            ))
+
+    return 0 if not any(r['regression'] for r in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
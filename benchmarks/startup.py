@@ -0,0 +1,124 @@
+__all__ = [
+    'BUDGETS',
+    'main',
+    'run_startup_benchmarks',
+    'time_command'
+]
+
+
+"""
+CLI startup time benchmarks - each ``oed`` subcommand is run in a fresh
+Python process a number of times, and the median wall clock time is
+compared with a budget (in milliseconds) for the subcommand.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+from typing import (
+    Dict,
+    Iterable,
+    List,
+    Optional,
+)
+
+
+# Startup time budgets (ms) for subcommands which do not read data files -
+# these should not import Pandas or Numpy
+BUDGETS = {
+    'version': 300,
+    'version -k': 300,
+    'query -m tiv -a': 400,
+    'query -x currency -a': 400,
+    'lookup -v 5 -m locdedcode1building': 400,
+    'validate headers -t loc -e locnumber,accnumber,portnumber': 1500,
+}
+
+ENTRY_POINT = 'import sys; from oedtools.cli import OedToolsCmd; sys.exit(OedToolsCmd().run())'
+
+
+def time_command(cmd: str, repeat: Optional[int] = 5) -> List[float]:
+    """
+    Runs an ``oed`` subcommand (string of arguments) in a new Python process
+    a given number of times and returns the wall clock times (ms).
+
+    :param cmd: The subcommand and arguments, e.g. ``version -k``
+    :type cmd: str
+
+    :param repeat: (Optional) The number of runs (default is ``5``)
+    :type repeat: int
+
+    :return: The run times (ms)
+    :rtype: list
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, '-c', ENTRY_POINT] + cmd.split(),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def run_startup_benchmarks(
+    budgets: Optional[Dict[str, float]] = BUDGETS,
+    repeat: Optional[int] = 5
+) -> List[Dict]:
+    """
+    Runs the startup benchmarks for the given subcommands and budgets.
+
+    :param budgets: (Optional) A dict of subcommands and their startup time
+                    budgets (ms) (default is ``BUDGETS``)
+    :type budgets: dict
+
+    :param repeat: (Optional) The number of runs per subcommand (default is
+                   ``5``)
+    :type repeat: int
+
+    :return: A list of results, one dict per subcommand, with the keys
+             ``command``, ``median_ms``, ``min_ms``, ``budget_ms`` and
+             ``pass``
+    :rtype: list
+    """
+    results = []
+    for cmd, budget in budgets.items():
+        times = time_command(cmd, repeat=repeat)
+        median = statistics.median(times)
+        results.append({
+            'command': 'oed {}'.format(cmd),
+            'median_ms': round(median, 1),
+            'min_ms': round(min(times), 1),
+            'budget_ms': budget,
+            'pass': median <= budget
+        })
+    return results
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='OED CLI startup time benchmarks')
+    parser.add_argument('-n', '--repeat', type=int, default=5, help='Number of runs per subcommand')
+    parser.add_argument('-j', '--json', default=False, action='store_true', help='Print the results as JSON')
+    args = parser.parse_args(argv)
+
+    results = run_startup_benchmarks(repeat=args.repeat)
+
+    if args.json:
+        print(json.dumps(results, indent=4))
+    else:
+        for r in results:
+            print('{:<70} {:>8.1f} ms (budget {:>6} ms) {}'.format(
+                r['command'], r['median_ms'], r['budget_ms'], 'ok' if r['pass'] else 'OVER BUDGET'
+            ))
+
+    return 0 if all(r['pass'] for r in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
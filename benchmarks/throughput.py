@@ -0,0 +1,479 @@
+__all__ = [
+    'BENCHMARKS',
+    'compare_with_baseline',
+    'get_benchmark_file',
+    'main',
+    'run_benchmark',
+    'run_benchmarks',
+    'SIZES',
+    'WIDTHS'
+]
+
+
+"""
+Validation throughput and scaling benchmarks - synthetic loc files of a
+number of sizes (rows) and widths (columns) are generated (once, and cached
+in a data directory), and validated with the main validation entry points
+and the CLI. Each benchmark is run in a new Python process, so that the peak
+resident set size (RSS) of the process is the peak memory use of the
+benchmark, and the times and peak memory use are compared with a baseline.
+"""
+
+import argparse
+import io
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+)
+
+
+# File sizes (numbers of rows) - the larger sizes take minutes to generate
+# and validate, and are only run when requested
+SIZES = {
+    '10k': 10 ** 4,
+    '1m': 10 ** 6,
+    '10m': 10 ** 7
+}
+
+DEFAULT_SIZES = ['10k']
+
+# File widths - the numbers of optional columns added to the key and
+# required columns (``None`` for all the columns)
+WIDTHS = {
+    'narrow': 0,
+    'wide': 50,
+    'full': None
+}
+
+DEFAULT_WIDTHS = ['narrow', 'wide']
+
+SCHEMA_TYPE = 'loc'
+
+SEED = 1234
+
+DEFAULT_DATA_DIR = os.path.join(tempfile.gettempdir(), 'oedtools-benchmarks')
+
+DEFAULT_BASELINE_FP = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+# Regressions are times or peak memory use more than these fractions above
+# the baseline - times are compared only if they exceed the minimum, as
+# shorter times are dominated by noise
+DEFAULT_TIME_TOLERANCE = 0.25
+DEFAULT_MEMORY_TOLERANCE = 0.25
+MIN_COMPARED_SECONDS = 0.05
+
+ENTRY_POINT = 'import sys; from oedtools.cli import OedToolsCmd; sys.exit(OedToolsCmd().run())'
+
+
+def _validate_headers(fp: str) -> Callable[[], None]:
+    from oedtools.validate import OedValidator
+
+    import pandas as pd
+
+    headers = pd.read_csv(fp, nrows=0).columns.tolist()
+    validator = OedValidator()
+
+    def run():
+        # A single call takes microseconds, so the time is for 1000 calls
+        for _ in range(1000):
+            list(validator.validate_headers(SCHEMA_TYPE, headers))
+
+    return run
+
+
+def _validate_column(fp: str) -> Callable[[], None]:
+    from oedtools.validate import OedValidator
+
+    validator = OedValidator()
+    df = next(validator.read_data(SCHEMA_TYPE, fp))
+
+    def run():
+        for header in df.columns:
+            for _ in validator.validate_column(SCHEMA_TYPE, header, df[header].values):
+                pass
+
+    return run
+
+
+def _validate(fp: str) -> Callable[[], None]:
+    from oedtools.validate import OedValidator
+
+    validator = OedValidator()
+
+    def run():
+        validator.validate(SCHEMA_TYPE, fp, columnar=True)
+
+    return run
+
+
+def _report_file(fp: str) -> Callable[[], None]:
+    from oedtools.report import report_file
+
+    def run():
+        for _ in report_file(SCHEMA_TYPE, fp):
+            pass
+
+    return run
+
+
+def _cli(fp: str) -> Callable[[], None]:
+    def run():
+        subprocess.run(
+            [sys.executable, '-c', ENTRY_POINT, 'validate', 'file', '-t', SCHEMA_TYPE, '-f', fp],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            env={**os.environ, **{'OED_SERVER': 'off'}},
+            check=False
+        )
+
+    return run
+
+
+# The benchmarks - each is a function of the file path which does any setup,
+# e.g. importing the package and loading the schemas, and returns the
+# function which is timed. The ``validate_column`` benchmark reads the whole
+# file in the setup, and the ``cli`` benchmark runs ``oed validate file`` in
+# a subprocess (with the local server disabled), so it includes the startup
+# time of the CLI
+BENCHMARKS = {
+    'validate_headers': _validate_headers,
+    'validate_column': _validate_column,
+    'validate': _validate,
+    'report_file': _report_file,
+    'cli': _cli
+}
+
+
+def get_benchmark_file(num_rows: int, width: str, data_dir: Optional[str] = DEFAULT_DATA_DIR) -> str:
+    """
+    Returns the path of a synthetic loc file of a given size and width,
+    generating it (with a fixed seed, in parallel) if it is not already in
+    the data directory.
+
+    :param num_rows: The number of rows
+    :type num_rows: int
+
+    :param width: The width - one of the keys of ``WIDTHS``
+    :type width: str
+
+    :param data_dir: (Optional) The directory of the generated files
+    :type data_dir: str
+
+    :return: The file path
+    :rtype: str
+    """
+    from oedtools.sampling import (
+        get_sample_columns,
+        sample_file,
+    )
+    from oedtools.schema import get_grouped_master_schema
+
+    os.makedirs(data_dir, exist_ok=True)
+
+    fp = os.path.join(data_dir, '{}-{}-{}.csv'.format(SCHEMA_TYPE, num_rows, width))
+
+    if not os.path.exists(fp):
+        num_columns = WIDTHS[width]
+        required = set(c.lower() for c in get_sample_columns(SCHEMA_TYPE))
+        optional = [
+            entry['field_name'] for col, entry in get_grouped_master_schema()[SCHEMA_TYPE].items()
+            if col not in required
+        ]
+        tmp_fp = '{}.tmp'.format(fp)
+        sample_file(
+            SCHEMA_TYPE,
+            tmp_fp,
+            num_rows,
+            columns=(optional[:num_columns] if num_columns is not None else None),
+            all_columns=(num_columns is None),
+            seed=SEED,
+            workers=None
+        )
+        os.rename(tmp_fp, fp)
+
+    return fp
+
+
+def _run_in_process(name: str, fp: str) -> Dict:
+    # Runs a benchmark in the current process, and returns the time and the
+    # peak RSS of the process (or the largest child process, for the CLI)
+    run = BENCHMARKS[name](fp)
+
+    start = time.perf_counter()
+    run()
+    seconds = time.perf_counter() - start
+
+    who = resource.RUSAGE_CHILDREN if name == 'cli' else resource.RUSAGE_SELF
+
+    # ``ru_maxrss`` is in KB on Linux
+    return {'seconds': seconds, 'peak_rss_mb': resource.getrusage(who).ru_maxrss / 1024}
+
+
+def run_benchmark(name: str, fp: str, repeat: Optional[int] = 1) -> Dict:
+    """
+    Runs a benchmark on a file a number of times, each in a new Python
+    process, and returns the median time and the maximum peak RSS.
+
+    :param name: The benchmark name - one of the keys of ``BENCHMARKS``
+    :type name: str
+
+    :param fp: The file path
+    :type fp: str
+
+    :param repeat: (Optional) The number of runs (default is ``1``)
+    :type repeat: int
+
+    :return: A dict with the keys ``seconds`` and ``peak_rss_mb``
+    :rtype: dict
+    """
+    runs = []
+    for _ in range(repeat):
+        res = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.throughput', '--run', name, fp],
+            stdout=subprocess.PIPE,
+            check=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        )
+        runs.append(json.loads(res.stdout.decode('utf-8').strip().splitlines()[-1]))
+
+    return {
+        'seconds': statistics.median(r['seconds'] for r in runs),
+        'peak_rss_mb': max(r['peak_rss_mb'] for r in runs)
+    }
+
+
+def run_benchmarks(
+    sizes: Optional[Iterable[str]] = DEFAULT_SIZES,
+    widths: Optional[Iterable[str]] = DEFAULT_WIDTHS,
+    benchmarks: Optional[Iterable[str]] = None,
+    data_dir: Optional[str] = DEFAULT_DATA_DIR,
+    repeat: Optional[int] = 1
+) -> List[Dict]:
+    """
+    Runs the benchmarks for the given file sizes and widths.
+
+    :param sizes: (Optional) The file sizes - keys of ``SIZES`` (default is
+                  ``DEFAULT_SIZES``)
+    :type sizes: list, tuple
+
+    :param widths: (Optional) The file widths - keys of ``WIDTHS`` (default
+                   is ``DEFAULT_WIDTHS``)
+    :type widths: list, tuple
+
+    :param benchmarks: (Optional) The benchmarks - keys of ``BENCHMARKS``
+                       (default is all of them)
+    :type benchmarks: list, tuple
+
+    :param data_dir: (Optional) The directory of the generated files
+    :type data_dir: str
+
+    :param repeat: (Optional) The number of runs per benchmark (default is
+                   ``1``)
+    :type repeat: int
+
+    :return: A list of results, one dict per benchmark, size and width, with
+             the keys ``benchmark``, ``size``, ``width``, ``rows``,
+             ``columns``, ``seconds``, ``rows_per_sec`` and ``peak_rss_mb``
+    :rtype: list
+    """
+    results = []
+
+    for size in sizes:
+        for width in widths:
+            fp = get_benchmark_file(SIZES[size], width, data_dir=data_dir)
+            with io.open(fp, 'r', encoding='utf-8') as f:
+                num_columns = len(f.readline().split(','))
+            for name in (benchmarks or BENCHMARKS):
+                res = run_benchmark(name, fp, repeat=repeat)
+                results.append({
+                    'benchmark': name,
+                    'size': size,
+                    'width': width,
+                    'rows': SIZES[size],
+                    'columns': num_columns,
+                    'seconds': round(res['seconds'], 4),
+                    'rows_per_sec': round(SIZES[size] / res['seconds']) if name != 'validate_headers' else None,
+                    'peak_rss_mb': round(res['peak_rss_mb'], 1)
+                })
+
+    return results
+
+
+def _key(result: Dict) -> str:
+    return '{}/{}/{}'.format(result['benchmark'], result['size'], result['width'])
+
+
+def compare_with_baseline(
+    results: Iterable[Dict],
+    baseline: Iterable[Dict],
+    time_tolerance: Optional[float] = DEFAULT_TIME_TOLERANCE,
+    memory_tolerance: Optional[float] = DEFAULT_MEMORY_TOLERANCE
+) -> List[Dict]:
+    """
+    Compares benchmark results with baseline results (of the same
+    benchmarks, sizes and widths), and adds the keys ``baseline_seconds``,
+    ``baseline_peak_rss_mb`` and ``regressions`` (a list of ``time`` and/or
+    ``memory``) to each result. Results with no baseline have ``None``
+    baseline values and no regressions.
+
+    :param results: The results, as returned by :py:meth:`run_benchmarks`
+    :type results: list
+
+    :param baseline: The baseline results
+    :type baseline: list
+
+    :param time_tolerance: (Optional) The fraction by which a time can
+                           exceed the baseline time (default is
+                           ``DEFAULT_TIME_TOLERANCE``)
+    :type time_tolerance: float
+
+    :param memory_tolerance: (Optional) The fraction by which a peak RSS can
+                             exceed the baseline peak RSS (default is
+                             ``DEFAULT_MEMORY_TOLERANCE``)
+    :type memory_tolerance: float
+
+    :return: The compared results
+    :rtype: list
+    """
+    baseline = {_key(b): b for b in baseline}
+
+    compared = []
+
+    for r in results:
+        b = baseline.get(_key(r))
+        regressions = []
+        if b:
+            if r['seconds'] > MIN_COMPARED_SECONDS and r['seconds'] > b['seconds'] * (1 + time_tolerance):
+                regressions.append('time')
+            if r['peak_rss_mb'] > b['peak_rss_mb'] * (1 + memory_tolerance):
+                regressions.append('memory')
+        compared.append({
+            **r,
+            **{
+                'baseline_seconds': b['seconds'] if b else None,
+                'baseline_peak_rss_mb': b['peak_rss_mb'] if b else None,
+                'regressions': regressions
+            }
+        })
+
+    return compared
+
+
+def _format_result(r: Dict) -> str:
+    def change(value, base):
+        return '{:+6.1f}%'.format(100 * (value / base - 1)) if base else '       '
+
+    return '{:<18} {:>4} {:<6} {:>4} cols {:>10.3f} s {} {:>12} rows/s {:>8.1f} MB {} {}'.format(
+        r['benchmark'],
+        r['size'],
+        r['width'],
+        r['columns'],
+        r['seconds'],
+        change(r['seconds'], r.get('baseline_seconds')),
+        r['rows_per_sec'] if r['rows_per_sec'] is not None else '-',
+        r['peak_rss_mb'],
+        change(r['peak_rss_mb'], r.get('baseline_peak_rss_mb')),
+        'REGRESSION ({})'.format(', '.join(r['regressions'])) if r.get('regressions') else 'ok'
+    )
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='OED validation throughput and scaling benchmarks')
+    parser.add_argument(
+        '-s', '--sizes', default=','.join(DEFAULT_SIZES),
+        help='File sizes - a comma-separated string of {} (default is "{}")'.format(', '.join(SIZES), ','.join(DEFAULT_SIZES))
+    )
+    parser.add_argument(
+        '-w', '--widths', default=','.join(DEFAULT_WIDTHS),
+        help='File widths - a comma-separated string of {} (default is "{}")'.format(', '.join(WIDTHS), ','.join(DEFAULT_WIDTHS))
+    )
+    parser.add_argument(
+        '-b', '--benchmarks', default=None,
+        help='Benchmarks - a comma-separated string of {} (default is all)'.format(', '.join(BENCHMARKS))
+    )
+    parser.add_argument('-d', '--data-dir', default=DEFAULT_DATA_DIR, help='Directory of the generated files')
+    parser.add_argument('-n', '--repeat', type=int, default=1, help='Number of runs per benchmark')
+    parser.add_argument(
+        '-c', '--baseline', default=DEFAULT_BASELINE_FP,
+        help=(
+            'Baseline results file to compare with (default is benchmarks/baseline.json) - it must exist, unless the '
+            'results are written as a baseline (-o), and an empty string skips the comparison'
+        )
+    )
+    parser.add_argument('-o', '--save-baseline', default=None, help='Write the results as a baseline file')
+    parser.add_argument(
+        '-t', '--time-tolerance', type=float, default=DEFAULT_TIME_TOLERANCE,
+        help='Fraction by which times can exceed the baseline (default is {})'.format(DEFAULT_TIME_TOLERANCE)
+    )
+    parser.add_argument(
+        '-m', '--memory-tolerance', type=float, default=DEFAULT_MEMORY_TOLERANCE,
+        help='Fraction by which peak RSS can exceed the baseline (default is {})'.format(DEFAULT_MEMORY_TOLERANCE)
+    )
+    parser.add_argument('-j', '--json', default=False, action='store_true', help='Print the results as JSON')
+    parser.add_argument('--run', nargs=2, metavar=('BENCHMARK', 'FILE'), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run:
+        print(json.dumps(_run_in_process(*args.run)))
+        return 0
+
+    def split(s):
+        return [v.strip().lower() for v in s.split(',') if v.strip()] if s else None
+
+    sizes, widths, benchmarks = split(args.sizes), split(args.widths), split(args.benchmarks)
+
+    for values, valid, desc in [(sizes, SIZES, 'size'), (widths, WIDTHS, 'width'), (benchmarks or [], BENCHMARKS, 'benchmark')]:
+        invalid = [v for v in values if v not in valid]
+        if invalid:
+            parser.error('"{}" is not a valid {} - one of {} is expected'.format(invalid[0], desc, ', '.join(valid)))
+
+    # Baselines are specific to a machine and are not committed, so a missing
+    # baseline is an error rather than a comparison with no results, which
+    # could never flag a regression
+    if args.baseline and not os.path.exists(args.baseline) and not args.save_baseline:
+        parser.error(
+            'The baseline file "{}" does not exist - record one on this machine with "-o {}", '
+            'or skip the comparison with -c ""'.format(args.baseline, args.baseline)
+        )
+
+    results = run_benchmarks(sizes=sizes, widths=widths, benchmarks=benchmarks, data_dir=args.data_dir, repeat=args.repeat)
+
+    baseline = []
+    if args.baseline and os.path.exists(args.baseline):
+        with io.open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    results = compare_with_baseline(
+        results, baseline, time_tolerance=args.time_tolerance, memory_tolerance=args.memory_tolerance
+    )
+
+    if args.save_baseline:
+        with io.open(args.save_baseline, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(
+                [{k: v for k, v in r.items() if not k.startswith('baseline') and k != 'regressions'} for r in results],
+                indent=4
+            ))
+
+    if args.json:
+        print(json.dumps(results, indent=4))
+    else:
+        for r in results:
+            print(_format_result(r))
+
+    return 0 if not any(r['regressions'] for r in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,223 @@
+__all__ = [
+    'count_spans',
+    'main',
+    'measure_overhead',
+    'time_null_instrumentation',
+    'validate_file'
+]
+
+
+"""
+Tracing hook overhead benchmark - checks that the instrumentation of the
+validation and reporting stages costs almost nothing when no tracing hooks
+are registered. The overhead is estimated as the number of instrumentation
+points of a validation (counted with a hook) times the cost of an
+instrumentation point with no hooks registered (measured with ``timeit``),
+as a fraction of the time of the validation, which is more stable than
+comparing timings of the validation with and without the instrumentation.
+The overhead of a no-op hook is also reported, for information.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import timeit
+
+from typing import (
+    Dict,
+    Iterable,
+    Optional,
+)
+
+from oedtools.profiling import NULL_PROFILE
+from oedtools.report import (
+    file_errors,
+    write_report,
+)
+from oedtools.sampling import sample_file
+from oedtools.tracing import (
+    TraceHook,
+    get_profile,
+    hooks,
+    span,
+)
+
+
+SCHEMA_TYPE = 'loc'
+
+DEFAULT_NUM_ROWS = 20000
+
+# A small chunk size, so that there are many instrumentation points per row
+DEFAULT_CHUNKSIZE = 1000
+
+DEFAULT_REPEAT = 3
+
+# The maximum overhead with no hooks registered, as a fraction of the time
+# of the validation
+MAX_OVERHEAD = 0.01
+
+SEED = 1234
+
+
+class _CountingHook(TraceHook):
+
+    def __init__(self):
+        self.spans = 0
+
+    def start(self, name, attrs):
+        self.spans += 1
+
+
+def validate_file(fp: str, chunksize: Optional[int] = DEFAULT_CHUNKSIZE) -> float:
+    """
+    Validates a loc file, writing the report to the null device, and returns
+    the time taken.
+
+    :param fp: The file path
+    :type fp: str
+
+    :param chunksize: (Optional) The chunk size
+    :type chunksize: int
+
+    :return: The time (s)
+    :rtype: float
+    """
+    start = time.perf_counter()
+    write_report(file_errors(SCHEMA_TYPE, fp, chunksize=chunksize), output_fp=os.devnull)
+    return time.perf_counter() - start
+
+
+def count_spans(fp: str, chunksize: Optional[int] = DEFAULT_CHUNKSIZE) -> int:
+    """
+    Returns the number of spans, i.e. instrumentation points, of the
+    validation of a loc file.
+
+    :param fp: The file path
+    :type fp: str
+
+    :param chunksize: (Optional) The chunk size
+    :type chunksize: int
+
+    :return: The number of spans
+    :rtype: int
+    """
+    hook = _CountingHook()
+    with hooks(hook):
+        validate_file(fp, chunksize=chunksize)
+    return hook.spans
+
+
+def time_null_instrumentation(number: Optional[int] = 100000) -> float:
+    """
+    Returns the time of the most expensive kind of instrumentation point
+    with no hooks registered - a span, or a profile stage or column, whose
+    attributes are set.
+
+    :param number: (Optional) The number of operations timed
+    :type number: int
+
+    :return: The time (s) per instrumentation point
+    :rtype: float
+    """
+    def _span():
+        with span('validate', file=None, schema_type=SCHEMA_TYPE) as attrs:
+            attrs['rows'] = 1
+
+    def _stage():
+        with get_profile(None, file=None, schema_type=SCHEMA_TYPE).stage('read', rows=1) as stage:
+            stage['rows'] = 1
+
+    def _column():
+        with NULL_PROFILE.column('LocNumber', rows=1) as col_profile:
+            col_profile['errors'] = 0
+
+    return max(
+        min(timeit.repeat(func, number=number, repeat=3)) / number
+        for func in [_span, _stage, _column]
+    )
+
+
+def measure_overhead(
+    num_rows: Optional[int] = DEFAULT_NUM_ROWS,
+    chunksize: Optional[int] = DEFAULT_CHUNKSIZE,
+    repeat: Optional[int] = DEFAULT_REPEAT,
+    max_overhead: Optional[float] = MAX_OVERHEAD
+) -> Dict:
+    """
+    Measures the overhead of the tracing instrumentation of the validation
+    of a synthetic loc file, with no hooks and with a no-op hook registered.
+
+    :param num_rows: (Optional) The number of rows of the file
+    :type num_rows: int
+
+    :param chunksize: (Optional) The chunk size
+    :type chunksize: int
+
+    :param repeat: (Optional) The number of timings of the validation
+    :type repeat: int
+
+    :param max_overhead: (Optional) The maximum overhead with no hooks
+    :type max_overhead: float
+
+    :return: The results
+    :rtype: dict
+    """
+    with tempfile.TemporaryDirectory() as data_dir:
+        fp = sample_file(SCHEMA_TYPE, os.path.join(data_dir, '{}.csv'.format(SCHEMA_TYPE)), num_rows, seed=SEED)
+
+        validate_file(fp, chunksize=chunksize)
+        seconds = min(validate_file(fp, chunksize=chunksize) for _ in range(repeat))
+
+        spans = count_spans(fp, chunksize=chunksize)
+
+        with hooks(TraceHook()):
+            hook_seconds = min(validate_file(fp, chunksize=chunksize) for _ in range(repeat))
+
+    span_seconds = time_null_instrumentation()
+    overhead = spans * span_seconds / seconds
+
+    return {
+        'num_rows': num_rows,
+        'chunksize': chunksize,
+        'seconds': seconds,
+        'spans': spans,
+        'null_ns_per_span': 1e9 * span_seconds,
+        'overhead': overhead,
+        'max_overhead': max_overhead,
+        'hook_seconds': hook_seconds,
+        'hook_overhead': hook_seconds / seconds - 1,
+        'ok': overhead <= max_overhead
+    }
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='OED tracing hook overhead benchmark')
+    parser.add_argument('-n', '--num-rows', type=int, default=DEFAULT_NUM_ROWS, help='Number of rows of the file validated')
+    parser.add_argument('-c', '--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help='Validation chunk size')
+    parser.add_argument('-r', '--repeat', type=int, default=DEFAULT_REPEAT, help='Number of timings of the validation')
+    parser.add_argument(
+        '-m', '--max-overhead', type=float, default=MAX_OVERHEAD,
+        help='Maximum overhead with no hooks, as a fraction of the validation time (default is {})'.format(MAX_OVERHEAD)
+    )
+    parser.add_argument('-j', '--json', default=False, action='store_true', help='Print the results as JSON')
+    args = parser.parse_args(argv)
+
+    res = measure_overhead(num_rows=args.num_rows, chunksize=args.chunksize, repeat=args.repeat, max_overhead=args.max_overhead)
+
+    if args.json:
+        print(json.dumps(res, indent=4))
+    else:
+        print('validation of {} rows (chunk size {}): {:.3f}s, {} spans'.format(res['num_rows'], res['chunksize'], res['seconds'], res['spans']))
+        print('no hooks: {:.0f} ns/span, overhead {:.4%} (max. {:.2%}) {}'.format(
+            res['null_ns_per_span'], res['overhead'], res['max_overhead'], 'ok' if res['ok'] else 'TOO SLOW'
+        ))
+        print('no-op hook: {:.3f}s, overhead {:+.2%}'.format(res['hook_seconds'], res['hook_overhead']))
+
+    return 0 if res['ok'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,327 @@
+__all__ = [
+    'get_batch_files',
+    'infer_schema_type',
+    'REPORT_FILE_EXTENSIONS',
+    'validate_file',
+    'validate_files'
+]
+
+
+"""
+Batch validation of multiple OED input files
+"""
+
+import glob
+import os
+import re
+import sys
+import time
+
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import (
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
+
+from .exceptions import (
+    OedError,
+    ProcessError,
+)
+from .report import (
+    chunk_errors,
+    write_report,
+)
+from .utils import DEFAULT_CHUNKSIZE
+
+
+SCHEMA_TYPES = ['acc', 'loc', 'reinsinfo', 'reinsscope']
+
+# The tokens which identify the schema types in file names - these are
+# matched, in order, against the whole tokens of the file name (without the
+# extension), split on non-alphanumeric characters, digits and CamelCase
+# boundaries, and against the pairs of adjacent tokens joined, e.g. "ri" and
+# "scope" in "RIScope" or "ri_scope"
+SCHEMA_TYPE_TOKENS = [
+    ('reinsscope', {'reinsscope', 'riscope'}),
+    ('reinsinfo', {'reinsinfo', 'riinfo'}),
+    ('acc', {'acc', 'account', 'accounts'}),
+    ('loc', {'loc', 'location', 'locations'}),
+]
+
+REPORT_FILE_EXTENSIONS = {
+    'text': 'txt',
+    'jsonl': 'jsonl',
+    'csv': 'csv'
+}
+
+
+def infer_schema_type(fp: str) -> str:
+    """
+    Infers the schema type of an OED input file from the file name, e.g.
+    ``SourceLocOEDPiWind.csv`` is inferred to be a ``loc`` file, and
+    ``ri_scope.csv`` a ``reinsscope`` file.
+
+    :param fp: The file path
+    :type fp: str
+
+    :return: The schema type
+    :rtype: str
+    """
+    name = os.path.splitext(os.path.basename(fp))[0]
+
+    tokens = [t.lower() for t in re.findall(r'[A-Z]+(?![a-z])|[A-Z]?[a-z]+|[0-9]+', name)]
+    tokens = set(tokens + [a + b for a, b in zip(tokens[:-1], tokens[1:])])
+
+    for schema_type, type_tokens in SCHEMA_TYPE_TOKENS:
+        if tokens & type_tokens:
+            return schema_type
+
+    raise ProcessError(
+        'The schema type of "{}" could not be inferred from the file name - '
+        'please specify it as "<schema type>:<file path>"'.format(fp)
+    )
+
+
+def get_batch_files(paths: Iterable[str], schema_type: Optional[str] = None) -> List[Tuple[str, str]]:
+    """
+    Expands a list of file paths, directory paths and glob patterns into a
+    sorted list of (schema type, file path) pairs. Directories are expanded
+    to the CSV files they contain. A path or pattern can be prefixed with a
+    schema type, as ``<schema type>:<path>``, e.g. ``loc:/path/to/loc.csv``
+    - otherwise the given default schema type is used, or if there is none,
+    the schema type is inferred from the file name.
+
+    :param paths: The file paths, directory paths or glob patterns
+    :type paths: list, tuple
+
+    :param schema_type: (Optional) The default schema type
+    :type schema_type: str
+
+    :return: A list of (schema type, file path) pairs
+    :rtype: list
+    """
+    files = []
+
+    for path in paths:
+        _schema_type, sep, _path = path.partition(':')
+        if sep and _schema_type.lower() in SCHEMA_TYPES:
+            _schema_type = _schema_type.lower()
+        else:
+            _schema_type, _path = schema_type, path
+
+        if os.path.isdir(_path):
+            fps = glob.glob(os.path.join(_path, '*.csv'))
+        elif os.path.isfile(_path):
+            fps = [_path]
+        else:
+            fps = glob.glob(_path)
+
+        if not fps:
+            raise ProcessError('No files found for "{}"'.format(path))
+
+        for fp in sorted(fps):
+            files.append((_schema_type or infer_schema_type(fp), os.path.abspath(fp)))
+
+    return list(dict.fromkeys(files))
+
+
+def validate_file(
+    schema_type: str,
+    fp: str,
+    chunksize: Optional[int] = DEFAULT_CHUNKSIZE,
+    report_fp: Optional[str] = None,
+    report_format: Optional[str] = 'jsonl'
+) -> Dict:
+    """
+    Validates a single OED input file and returns a summary of the result -
+    a dict with the keys ``file``, ``schema_type``, ``status`` (``pass`` if
+    there are no errors, ``fail`` if there are errors, or ``error`` if the
+    file could not be validated), ``num_rows``, ``num_errors``,
+    ``error_counts`` (by error code), ``report_file``, ``msg`` and
+    ``seconds``. The errors can optionally be written to a report file.
+
+    :param schema_type: The file schema type (``loc``, ``acc``, ``reinsinfo``
+                        or ``reinsscope``).
+    :type schema_type: str
+
+    :param fp: The file path
+    :type fp: str
+
+    :param chunksize: (Optional) The maximum number of rows validated at a
+                      time (default is ``DEFAULT_CHUNKSIZE``)
+    :type chunksize: int
+
+    :param report_fp: (Optional) The report file path
+    :type report_fp: str
+
+    :param report_format: (Optional) The report format - ``text``, ``jsonl``
+                          (default) or ``csv``
+    :type report_format: str
+
+    :return: The file validation summary
+    :rtype: dict
+    """
+    from .validate import OedValidator
+
+    start = time.time()
+
+    summary = {
+        'file': fp,
+        'schema_type': schema_type,
+        'status': None,
+        'num_rows': 0,
+        'num_errors': 0,
+        'error_counts': {},
+        'report_file': report_fp,
+        'msg': None,
+        'seconds': None
+    }
+
+    error_counts = Counter()
+
+    def records():
+        for chunk_res in OedValidator().validate_chunks(schema_type, fp, chunksize=chunksize):
+            summary['num_rows'] += chunk_res.num_rows
+            error_counts.update(chunk_res.counts(by='code'))
+            if report_fp:
+                for record in chunk_errors(chunk_res, fp=fp):
+                    yield record
+
+    try:
+        if report_fp:
+            write_report(records(), output_fp=report_fp, report_format=report_format)
+        else:
+            for _ in records():
+                pass
+    except OedError as e:
+        summary['status'] = 'error'
+        summary['msg'] = str(e)
+    else:
+        summary['num_errors'] = sum(error_counts.values())
+        summary['error_counts'] = dict(sorted(error_counts.items()))
+        summary['status'] = 'fail' if summary['num_errors'] else 'pass'
+
+    summary['seconds'] = round(time.time() - start, 3)
+
+    return summary
+
+
+def _init_worker() -> None:
+    """
+    Worker process initializer - the schemas are loaded when the validator
+    class is defined, so importing it here warms each worker once, before it
+    validates any files. With the ``fork`` start method the workers inherit
+    the schemas already loaded in the parent process.
+    """
+    from .validate import OedValidator  # noqa: F401
+
+
+def _get_report_paths(fps: Iterable[str], report_dir: str, report_format: str) -> List[str]:
+    """
+    Returns the report file paths of a list of files, in a report directory
+    - each report path is the path of the file relative to the common
+    directory of the files, with the report suffix, e.g.
+    ``p1/loc.csv.report.jsonl``, and the subdirectories are created.
+    """
+    abs_fps = [os.path.abspath(fp) for fp in fps]
+
+    try:
+        root = os.path.commonpath([os.path.dirname(fp) for fp in abs_fps]) if abs_fps else ''
+    except ValueError:
+        # Files on different drives have no common directory
+        root = ''
+
+    report_fps = []
+    for fp in abs_fps:
+        rel_fp = os.path.relpath(fp, root) if root else os.path.splitdrive(fp)[1].lstrip(os.sep)
+        report_fp = os.path.join(
+            os.path.abspath(report_dir),
+            '{}.report.{}'.format(rel_fp, REPORT_FILE_EXTENSIONS.get(report_format, report_format))
+        )
+        os.makedirs(os.path.dirname(report_fp), exist_ok=True)
+        report_fps.append(report_fp)
+
+    return report_fps
+
+
+def validate_files(
+    files: Iterable[Tuple[str, str]],
+    workers: Optional[int] = None,
+    chunksize: Optional[int] = DEFAULT_CHUNKSIZE,
+    report_dir: Optional[str] = None,
+    report_format: Optional[str] = 'jsonl'
+) -> Dict:
+    """
+    Validates multiple OED input files in parallel, using a pool of worker
+    processes, and returns a consolidated summary - a dict with the keys
+    ``files`` (the file summaries, as returned by :py:meth:`validate_file`,
+    in the order of the input files), ``num_files``, ``num_pass``,
+    ``num_fail``, ``num_error`` and ``seconds``.
+
+    :param files: A list or tuple of (schema type, file path) pairs, e.g. as
+                  returned by :py:meth:`get_batch_files`
+    :type files: list, tuple
+
+    :param workers: (Optional) The number of worker processes - if ``1``
+                    the files are validated serially in the current process
+                    (default is the number of CPUs)
+    :type workers: int
+
+    :param chunksize: (Optional) The maximum number of rows validated at a
+                      time (default is ``DEFAULT_CHUNKSIZE``)
+    :type chunksize: int
+
+    :param report_dir: (Optional) A directory to write the file reports to
+                       - each report is named after the file, e.g.
+                       ``loc.csv`` -> ``loc.csv.report.jsonl``, and is
+                       written to the subdirectory of the report directory
+                       given by the path of the file's directory relative to
+                       the common directory of all the files, e.g. the
+                       reports of ``p1/loc.csv`` and ``p2/loc.csv`` are
+                       ``p1/loc.csv.report.jsonl`` and
+                       ``p2/loc.csv.report.jsonl``, so that the reports of
+                       files with the same name do not overwrite each other
+    :type report_dir: str
+
+    :param report_format: (Optional) The report format - ``text``, ``jsonl``
+                          (default) or ``csv``
+    :type report_format: str
+
+    :return: The batch validation summary
+    :rtype: dict
+    """
+    start = time.time()
+
+    files = list(files)
+
+    if report_dir:
+        os.makedirs(report_dir, exist_ok=True)
+
+    report_fps = _get_report_paths([fp for _, fp in files], report_dir, report_format) if report_dir else [None] * len(files)
+
+    args = [(schema_type, fp, chunksize, report_fp, report_format) for (schema_type, fp), report_fp in zip(files, report_fps)]
+
+    if workers == 1 or len(files) <= 1:
+        summaries = [validate_file(*a) for a in args]
+    else:
+        _init_worker()
+        # Worker initializers are only supported in Python 3.7+ - in 3.6
+        # each worker loads the schemas when it validates its first file
+        pool_kwargs = {'initializer': _init_worker} if sys.version_info >= (3, 7) else {}
+        with ProcessPoolExecutor(max_workers=workers, **pool_kwargs) as executor:
+            summaries = list(executor.map(validate_file, *zip(*args)))
+
+    status_counts = Counter(s['status'] for s in summaries)
+
+    return {
+        'files': summaries,
+        'num_files': len(summaries),
+        'num_pass': status_counts['pass'],
+        'num_fail': status_counts['fail'],
+        'num_error': status_counts['error'],
+        'seconds': round(time.time() - start, 3)
+    }
@@ -1,10 +1,17 @@
 __all__ = [
+    'GenerateCmd',
+    'GenerateFileCmd',
+    'GeneratePortfolioCmd',
+    'LookupCmd',
     'QueryCmd',
     'OedToolsCmd',
     'SampleCmd',
+    'ServeCmd',
+    'ValidateBatchCmd',
     'ValidateCmd',
     'ValidateFileCmd',
     'ValidateHeadersCmd',
+    'ValidatePortfolioCmd',
     'VersionCmd'
 ]
 
@@ -15,26 +22,84 @@ import sys
 
 from argparse import RawDescriptionHelpFormatter
 from ast import literal_eval
-from itertools import groupby
+from itertools import (
+    chain,
+    groupby,
+)
 
 from argparsetree import BaseCommand
 from future.utils import raise_with_traceback
 
 from .exceptions import (
     CommandError,
+    ProcessError,
     ReportingError,
 )
 from .__init__ import __version__
-from .query import get_columns
-from .report import (
-    report_headers,
-    report_file,
-)
-from .schema import (
-    sample_column,
-    SCHEMA_DIR,
+from .progress import LOG_INTERVAL
+from .report import REPORT_FORMATS
+from .utils import (
+    DEFAULT_CHUNKSIZE,
+    get_value,
 )
-from .utils import get_value
+
+# The command modules (query, report, schema, validate) are imported in the
+# command actions, rather than here, so that each command only imports what
+# it uses - in particular Pandas and Numpy are only imported by commands
+# which read or generate data
+
+
+def _server_call(method, *args, **kwargs):
+    """
+    Calls a method of the client for the running OED server, if there is one
+    (see :py:meth:`oedtools.server.get_client`), and returns the result, or
+    ``None`` if there is no server or it is unavailable, in which case the
+    command runs locally.
+    """
+    from .server import get_client
+
+    client = get_client()
+
+    if not client:
+        return
+
+    try:
+        return getattr(client, method)(*args, **kwargs)
+    except ConnectionError:
+        return
+
+
+class LookupCmd(BaseCommand):
+    formatter_class = RawDescriptionHelpFormatter
+
+    def add_args(self, parser):
+        """
+        Command parser setup
+        """
+        super(self.__class__, self).add_args(parser)
+
+        parser.add_argument(
+            '-v', '--value', required=True,
+            help='Column value, e.g. a code - numeric strings are treated as numbers, and other strings are case insensitive'
+        )
+        parser.add_argument(
+            '-m', '--column-header', required=False,
+            help='Column header'
+        )
+
+    def action(self, args):
+        """
+        Command logic
+        """
+        theargs = vars(args)
+
+        results = _server_call('lookup_value', theargs['value'], header=theargs.get('column_header'))
+
+        if results is None:
+            from .query import lookup_value
+            results = lookup_value(theargs['value'], header=theargs.get('column_header'))
+
+        print(json.dumps(results, indent=4, sort_keys=True))
 
 
 class QueryCmd(BaseCommand):
@@ -86,6 +151,14 @@ class QueryCmd(BaseCommand):
             '-a', '--headers-only', required=False, action='store_true',
             help='Only return the column headers'
         )
+        parser.add_argument(
+            '-x', '--search', required=False,
+            help='Full-text search of the column descriptions - results are ranked by relevance, and can be combined with the other options'
+        )
+        parser.add_argument(
+            '-l', '--limit', required=False, type=int, default=None,
+            help='Maximum number of search results'
+        )
 
     def action(self, args):
         """
@@ -130,7 +203,7 @@ class QueryCmd(BaseCommand):
         if np_dtypes:
             np_dtypes = [v.strip() for v in literal_eval(double_quote(np_dtypes)).split(',')]
 
-        results = get_columns(
+        filters = dict(
             schema_types=schema_types,
             headers=headers,
             descriptions=descriptions,
@@ -142,6 +215,31 @@ class QueryCmd(BaseCommand):
             numpy_dtypes=np_dtypes
         )
 
+        def get_columns(**filters):
+            results = _server_call('get_columns', **filters)
+            if results is None:
+                from .query import get_columns
+                results = get_columns(**filters)
+            return results
+
+        def search_columns(query, schema_types=None):
+            results = _server_call('search_columns', query, schema_types=schema_types)
+            if results is None:
+                from .query import search_columns
+                results = search_columns(query, schema_types=schema_types)
+            return results
+
+        search = theargs.get('search')
+
+        if search:
+            results = search_columns(search, schema_types=schema_types)
+            if any(v for k, v in filters.items() if k != 'schema_types'):
+                keys = set((r['entity'].lower(), r['field_name'].lower()) for r in get_columns(**filters))
+                results = [r for r in results if (r['entity'].lower(), r['field_name'].lower()) in keys]
+            results = results[:theargs.get('limit')]
+        else:
+            results = get_columns(**filters)
+
         headers_only = theargs['headers_only']
 
         if headers_only:
@@ -187,6 +285,10 @@ class SampleCmd(BaseCommand):
             '-n', '--sample-size', required=False, type=int, default=10,
             help='Sample size'
         )
+        parser.add_argument(
+            '-s', '--seed', required=False, type=int,
+            help='Random seed, for reproducible samples'
+        )
 
     def action(self, args):
         """
@@ -200,7 +302,13 @@ class SampleCmd(BaseCommand):
 
         size = theargs['sample_size']
 
-        sample = sample_column(schema_type, header, size=size)
+        seed = theargs.get('seed')
+
+        sample = _server_call('sample_column', schema_type, header, size=size, seed=seed)
+
+        if sample is None:
+            from .schema import sample_column
+            sample = sample_column(schema_type, header, size=size, rng=seed)
 
         print(json.dumps(sample, indent=4, sort_keys=True))
 
@@ -222,25 +330,332 @@ class ValidateFileCmd(BaseCommand):
             '-f', '--input-file-path', required=True,
             help='OED input file path',
         )
+        parser.add_argument(
+            '-c', '--chunksize', required=False, type=int, default=DEFAULT_CHUNKSIZE,
+            help='Maximum number of rows to validate at a time (default is {})'.format(DEFAULT_CHUNKSIZE)
+        )
+        parser.add_argument(
+            '-p', '--progress', default=False, required=False, action='store_true',
+            help=(
+                'Show the progress - the rows and bytes processed, the current chunk and column, the processing rate (rows/s) '
+                'and the estimated time remaining, on a line which is updated in place on a terminal, or as a line every {:.0f}s otherwise'
+                .format(LOG_INTERVAL)
+            )
+        )
+        parser.add_argument(
+            '-a', '--aggregate', default=False, required=False, action='store_true',
+            help='Collapse errors in consecutive rows with the same column and error code into row ranges, with counts and example values'
+        )
+        parser.add_argument(
+            '-w', '--row-order', default=False, required=False, action='store_true',
+            help='Report errors in row order, rather than column by column'
+        )
+        parser.add_argument(
+            '-k', '--check-keys', default=False, required=False, action='store_true',
+            help='Check for duplicate primary keys, e.g. (PortNumber, AccNumber, LocNumber) in a loc file'
+        )
+        parser.add_argument(
+            '-e', '--check-cr', default=False, required=False, action='store_true',
+            help='Check conditionally required (CR) columns, e.g. deductible types are required when deductibles are present'
+        )
+        parser.add_argument(
+            '-x', '--check-rules', default=False, required=False, action='store_true',
+            help='Check cross-column row rules, e.g. minimum deductibles must not exceed maximum deductibles'
+        )
+        parser.add_argument(
+            '-u', '--rules-file-path', required=False,
+            help='Row rules file path, for -x - if not set the rules file in the package schema directory is used'
+        )
+        parser.add_argument(
+            '-s', '--rule-costs', default=False, required=False, action='store_true',
+            help='Show the evaluation cost of each row rule, for -x'
+        )
+        parser.add_argument(
+            '-P', '--profile', required=False, nargs='?', const='-', default=None,
+            help='Profile the validation - the time and number of rows of each stage (read, normalise, headers, columns, rules, aggregate and report) and column are shown, or, if a file path is given, written to the file as JSON'
+        )
+        parser.add_argument(
+            '-m', '--memory-profile', default=False, required=False, action='store_true',
+            help='Profile the memory allocated by each stage and column, with tracemalloc - the peak and retained memory are added to the profile (-P), which is shown if -P is not set'
+        )
+        parser.add_argument(
+            '-M', '--metrics-file-path', required=False,
+            help='Write the validation metrics to a file, in the Prometheus text format, e.g. for the node exporter textfile collector'
+        )
+        parser.add_argument(
+            '-o', '--output-file-path', required=False,
+            help='Report file path - if not set the report is written to standard output'
+        )
+        parser.add_argument(
+            '-r', '--report-format', required=False, default='text', choices=REPORT_FORMATS,
+            help='Report format - "text" (default), "jsonl" (JSON lines) or "csv"'
+        )
+        parser.add_argument(
+            '-z', '--compress', default=False, required=False, action='store_true',
+            help='Gzip compress the report'
+        )
 
     def action(self, args):
         """
         Command logic
         """
+        from .report import (
+            file_errors,
+            format_rule_costs,
+            write_report,
+        )
+
         theargs = vars(args)
 
         input_fp = os.path.abspath(theargs['input_file_path'])
 
         schema_type = theargs['schema_type'].lower()
 
+        if theargs.get('check_keys'):
+            from .integrity import PRIMARY_KEYS
+            if schema_type not in PRIMARY_KEYS:
+                schema_types = ['"{}"'.format(st) for st in PRIMARY_KEYS]
+                raise CommandError(
+                    'Invalid arguments - duplicate keys (-k) can only be checked in '
+                    '{} or {} files, as "{}" files have no primary key'.format(
+                        ', '.join(schema_types[:-1]), schema_types[-1], schema_type
+                    )
+                )
+
+        chunksize = theargs.get('chunksize') or DEFAULT_CHUNKSIZE
+
+        progress = theargs.get('progress') or False
+
+        order = 'row' if theargs.get('row_order') else 'column'
+
+        check_cr = theargs.get('check_cr') or False
+
+        check_rules = theargs.get('check_rules') or False
+
+        rules_fp = theargs.get('rules_file_path')
+
+        rule_costs = {} if check_rules and theargs.get('rule_costs') else None
+
+        memory_profile = theargs.get('memory_profile') or False
+
+        profile_fp = theargs.get('profile') or ('-' if memory_profile else None)
+
+        metrics_fp = theargs.get('metrics_file_path')
+
+        if progress:
+            from .progress import (
+                DEFAULT_INTERVAL,
+                ProgressLine,
+                ValidationProgress,
+            )
+            line = ProgressLine(sys.stderr)
+            progress = ValidationProgress(line, interval=(DEFAULT_INTERVAL if line.isatty() else LOG_INTERVAL))
+
+        profile = None
+        if profile_fp:
+            from .profiling import ValidationProfile
+            profile = ValidationProfile(memory=memory_profile)
+
         try:
-            for line in report_file(theargs['schema_type'], theargs['input_file_path']):
-                print(line)
+            # Progress, rule costs, profiles and metrics are only shown for
+            # local validation
+            records = None if (progress or rule_costs is not None or profile is not None or metrics_fp) else _server_call(
+                'file_errors',
+                theargs['schema_type'],
+                theargs['input_file_path'],
+                chunksize=chunksize,
+                order=order,
+                check_cr=check_cr,
+                check_rules=check_rules,
+                rules_fp=rules_fp
+            )
+            if records is None:
+                records = file_errors(
+                    theargs['schema_type'],
+                    theargs['input_file_path'],
+                    chunksize=chunksize,
+                    progress=progress,
+                    order=order,
+                    check_cr=check_cr,
+                    check_rules=check_rules,
+                    rules_fp=rules_fp,
+                    rule_costs=rule_costs,
+                    profile=profile
+                )
+            if theargs.get('check_keys'):
+                from .integrity import duplicate_key_errors
+                records = chain(records, duplicate_key_errors(schema_type, theargs['input_file_path'], chunksize=chunksize))
+            write_report(
+                records,
+                output_fp=theargs.get('output_file_path'),
+                report_format=theargs.get('report_format') or 'text',
+                compress=theargs.get('compress') or False,
+                aggregate=theargs.get('aggregate') or False,
+                profile=profile
+            )
+            if rule_costs is not None:
+                sys.stderr.write(format_rule_costs(rule_costs))
+            if profile is not None:
+                profile.stop()
+                if profile_fp == '-':
+                    sys.stderr.write(profile.format())
+                else:
+                    with io.open(os.path.abspath(profile_fp), 'w', encoding='utf-8') as f:
+                        f.write(json.dumps(profile.to_dict(), indent=4))
+            if metrics_fp:
+                from .metrics import REGISTRY
+                REGISTRY.write(metrics_fp)
         except ReportingError as e:
             print(e)
             sys.exit(-1)
 
 
+class ServeCmd(BaseCommand):
+    formatter_class = RawDescriptionHelpFormatter
+
+    def add_args(self, parser):
+        """
+        Command parser setup
+        """
+        super(self.__class__, self).add_args(parser)
+
+        parser.add_argument(
+            '-H', '--host', required=False, default='127.0.0.1',
+            help='Host to bind to (default is 127.0.0.1)'
+        )
+        parser.add_argument(
+            '-p', '--port', required=False, type=int, default=0,
+            help='Port to bind to (default is 0, which binds to a free port)'
+        )
+        parser.add_argument(
+            '-n', '--max-concurrent', required=False, type=int, default=None,
+            help='Maximum number of requests processed at a time (default is the number of CPUs)'
+        )
+        parser.add_argument(
+            '-q', '--max-queued', required=False, type=int, default=None,
+            help='Maximum number of requests waiting to be processed - further requests are processed locally by the CLI'
+        )
+        parser.add_argument(
+            '-s', '--status', default=False, required=False, action='store_true',
+            help='Show the status of the running server, rather than starting one'
+        )
+        parser.add_argument(
+            '-m', '--metrics', default=False, required=False, action='store_true',
+            help='Show the metrics of the running server, in the Prometheus text format, rather than starting one'
+        )
+        parser.add_argument(
+            '-V', '--verbose', default=False, required=False, action='store_true',
+            help='Log requests to standard error'
+        )
+
+    def action(self, args):
+        """
+        Command logic
+        """
+        from .server import (
+            DEFAULT_MAX_CONCURRENT,
+            DEFAULT_MAX_QUEUED,
+            get_client,
+            serve,
+        )
+
+        theargs = vars(args)
+
+        if theargs.get('status') or theargs.get('metrics'):
+            client = get_client()
+            try:
+                if not client:
+                    raise ConnectionError('No OED server is running')
+                if theargs.get('status'):
+                    print(json.dumps(client.status(), indent=4, sort_keys=True))
+                else:
+                    sys.stdout.write(client.metrics())
+            except ConnectionError as e:
+                raise_with_traceback(CommandError(e))
+            return
+
+        serve(
+            host=theargs.get('host') or '127.0.0.1',
+            port=theargs.get('port') or 0,
+            max_concurrent=theargs.get('max_concurrent') or DEFAULT_MAX_CONCURRENT,
+            max_queued=(DEFAULT_MAX_QUEUED if theargs.get('max_queued') is None else theargs['max_queued']),
+            quiet=not theargs.get('verbose')
+        )
+
+
+class ValidateBatchCmd(BaseCommand):
+    formatter_class = RawDescriptionHelpFormatter
+
+    def add_args(self, parser):
+        """
+        Command parser setup
+        """
+        super(self.__class__, self).add_args(parser)
+
+        parser.add_argument(
+            '-f', '--input-paths', required=True, nargs='+',
+            help='OED input file paths, directories (of CSV files) or glob patterns - each can be prefixed with a schema type as "<schema type>:<path>", otherwise the schema type is inferred from the file name'
+        )
+        parser.add_argument(
+            '-t', '--schema-type', required=False,
+            help='Default file schema type - "loc", "acc", "reinsinfo", or "reinsscope"'
+        )
+        parser.add_argument(
+            '-j', '--workers', required=False, type=int, default=None,
+            help='Number of worker processes (default is the number of CPUs)'
+        )
+        parser.add_argument(
+            '-c', '--chunksize', required=False, type=int, default=DEFAULT_CHUNKSIZE,
+            help='Maximum number of rows to validate at a time (default is {})'.format(DEFAULT_CHUNKSIZE)
+        )
+        parser.add_argument(
+            '-d', '--report-dir', required=False,
+            help='Directory to write the file reports to - if not set only the summary is written'
+        )
+        parser.add_argument(
+            '-r', '--report-format', required=False, default='jsonl', choices=REPORT_FORMATS,
+            help='File report format - "text", "jsonl" (JSON lines, default) or "csv"'
+        )
+        parser.add_argument(
+            '-o', '--output-file-path', required=False,
+            help='Summary file path - if not set the summary is written to standard output'
+        )
+
+    def action(self, args):
+        """
+        Command logic
+        """
+        from .batch import (
+            get_batch_files,
+            validate_files,
+        )
+
+        theargs = vars(args)
+
+        schema_type = theargs.get('schema_type')
+
+        try:
+            files = get_batch_files(theargs['input_paths'], schema_type=(schema_type.lower() if schema_type else None))
+        except ProcessError as e:
+            raise_with_traceback(CommandError(e))
+
+        summary = validate_files(
+            files,
+            workers=theargs.get('workers'),
+            chunksize=theargs.get('chunksize') or DEFAULT_CHUNKSIZE,
+            report_dir=theargs.get('report_dir'),
+            report_format=theargs.get('report_format') or 'jsonl'
+        )
+
+        output_fp = theargs.get('output_file_path')
+
+        if output_fp:
+            with io.open(os.path.abspath(output_fp), 'w', encoding='utf-8') as f:
+                f.write(json.dumps(summary, indent=4))
+        else:
+            print(json.dumps(summary, indent=4))
+
+
 class ValidateHeadersCmd(BaseCommand):
     formatter_class = RawDescriptionHelpFormatter
 
@@ -262,11 +677,28 @@ class ValidateHeadersCmd(BaseCommand):
             '-e', '--column-headers', required=False,
             help='A single column name, or comma-separated string of multiple column names, without spaces - quotation marks are optional'
         )
+        parser.add_argument(
+            '-o', '--output-file-path', required=False,
+            help='Report file path - if not set the report is written to standard output'
+        )
+        parser.add_argument(
+            '-r', '--report-format', required=False, default='text', choices=REPORT_FORMATS,
+            help='Report format - "text" (default), "jsonl" (JSON lines) or "csv"'
+        )
+        parser.add_argument(
+            '-z', '--compress', default=False, required=False, action='store_true',
+            help='Gzip compress the report'
+        )
 
     def action(self, args):
         """
         Command logic
         """
+        from .report import (
+            header_errors,
+            write_report,
+        )
+
         theargs = vars(args)
         file_or_headers = None
 
@@ -287,8 +719,15 @@ class ValidateHeadersCmd(BaseCommand):
         schema_type = theargs['schema_type'].lower()
 
         try:
-            for line in report_headers(schema_type, file_or_headers):
-                print(line)
+            records = _server_call('header_errors', schema_type, file_or_headers)
+            if records is None:
+                records = header_errors(schema_type, file_or_headers)
+            write_report(
+                records,
+                output_fp=theargs.get('output_file_path'),
+                report_format=theargs.get('report_format') or 'text',
+                compress=theargs.get('compress') or False
+            )
         except ReportingError as e:
             raise_with_traceback(CommandError(e))
             sys.exit(-1)
@@ -318,11 +757,81 @@ class VersionCmd(BaseCommand):
         if pkg_version:
             return __version__
 
+        from .schema import SCHEMA_DIR
+
         schema_ver_fp = os.path.join(SCHEMA_DIR, 'schema_version.txt')
         with io.open(schema_ver_fp, 'r', encoding='utf-8') as f:
             return f.read().strip()
 
 
+class ValidatePortfolioCmd(BaseCommand):
+    formatter_class = RawDescriptionHelpFormatter
+
+    def add_args(self, parser):
+        """
+        Command parser setup
+        """
+        super(self.__class__, self).add_args(parser)
+
+        parser.add_argument(
+            '-a', '--acc-file-path', required=False,
+            help='OED account file path'
+        )
+        parser.add_argument(
+            '-l', '--loc-file-path', required=False,
+            help='OED location file path'
+        )
+        parser.add_argument(
+            '-i', '--reinsinfo-file-path', required=False,
+            help='OED reinsurance info. file path'
+        )
+        parser.add_argument(
+            '-s', '--reinsscope-file-path', required=False,
+            help='OED reinsurance scope file path'
+        )
+        parser.add_argument(
+            '-c', '--chunksize', required=False, type=int, default=DEFAULT_CHUNKSIZE,
+            help='Maximum number of rows to read at a time (default is {})'.format(DEFAULT_CHUNKSIZE)
+        )
+        parser.add_argument(
+            '-o', '--output-file-path', required=False,
+            help='Report file path - if not set the report is written to standard output'
+        )
+        parser.add_argument(
+            '-r', '--report-format', required=False, default='text', choices=REPORT_FORMATS,
+            help='Report format - "text" (default), "jsonl" (JSON lines) or "csv"'
+        )
+        parser.add_argument(
+            '-z', '--compress', default=False, required=False, action='store_true',
+            help='Gzip compress the report'
+        )
+
+    def action(self, args):
+        """
+        Command logic
+        """
+        from .integrity import portfolio_errors
+        from .report import write_report
+
+        theargs = vars(args)
+
+        files = {
+            schema_type: theargs.get('{}_file_path'.format(schema_type))
+            for schema_type in ['acc', 'loc', 'reinsinfo', 'reinsscope']
+            if theargs.get('{}_file_path'.format(schema_type))
+        }
+
+        try:
+            write_report(
+                portfolio_errors(files, chunksize=(theargs.get('chunksize') or DEFAULT_CHUNKSIZE)),
+                output_fp=theargs.get('output_file_path'),
+                report_format=theargs.get('report_format') or 'text',
+                compress=theargs.get('compress') or False
+            )
+        except (ProcessError, ReportingError) as e:
+            raise_with_traceback(CommandError(e))
+
+
 class ValidateCmd(BaseCommand):
     """
     Subcommands
@@ -330,19 +839,182 @@ class ValidateCmd(BaseCommand):
 
         * validating headers of OED input files or dict arrays (lists, tuples) of headers
         * validating OED input files or dict arrays (lists, tuples) of headers
+        * validating multiple OED input files in parallel
+        * validating references between the OED input files of a portfolio
     """
     sub_commands = {
+        'batch': ValidateBatchCmd,
         'headers': ValidateHeadersCmd,
-        'file': ValidateFileCmd
+        'file': ValidateFileCmd,
+        'portfolio': ValidatePortfolioCmd
+    }
+
+
+class GenerateFileCmd(BaseCommand):
+    formatter_class = RawDescriptionHelpFormatter
+
+    def add_args(self, parser):
+        """
+        Command parser setup
+        """
+        super(self.__class__, self).add_args(parser)
+
+        parser.add_argument(
+            '-t', '--schema-type', required=True,
+            help='File schema type - "loc", "acc", "reinsinfo", or "reinsscope"'
+        )
+        parser.add_argument(
+            '-f', '--output-file-path', required=True,
+            help='Output file path'
+        )
+        parser.add_argument(
+            '-n', '--num-rows', required=True, type=int,
+            help='Number of rows'
+        )
+        parser.add_argument(
+            '-m', '--column-headers', required=False,
+            help='Other (non-required) columns to include - a comma-separated string without spaces'
+        )
+        parser.add_argument(
+            '-a', '--all-columns', default=False, required=False, action='store_true',
+            help='Include all the columns of the schema type, rather than only the key and required columns'
+        )
+        parser.add_argument(
+            '-c', '--chunksize', required=False, type=int, default=DEFAULT_CHUNKSIZE,
+            help='Maximum number of rows to generate at a time (default is {})'.format(DEFAULT_CHUNKSIZE)
+        )
+        parser.add_argument(
+            '-s', '--seed', required=False, type=int,
+            help='Random seed, for reproducible files'
+        )
+        parser.add_argument(
+            '-j', '--workers', required=False, type=int, default=1,
+            help='Number of worker processes generating chunks in parallel (default is 1) - the file for a given seed is the same for any number of workers'
+        )
+
+    def action(self, args):
+        """
+        Command logic
+        """
+        from .sampling import sample_file
+
+        theargs = vars(args)
+
+        headers = theargs.get('column_headers')
+        if headers:
+            headers = [h.strip() for h in headers.split(',') if h.strip()]
+
+        try:
+            sample_file(
+                theargs['schema_type'],
+                theargs['output_file_path'],
+                theargs['num_rows'],
+                columns=headers,
+                all_columns=theargs.get('all_columns') or False,
+                chunksize=(theargs.get('chunksize') or DEFAULT_CHUNKSIZE),
+                seed=theargs.get('seed'),
+                workers=theargs.get('workers') or 1
+            )
+        except ProcessError as e:
+            raise_with_traceback(CommandError(e))
+
+
+class GeneratePortfolioCmd(BaseCommand):
+    formatter_class = RawDescriptionHelpFormatter
+
+    def add_args(self, parser):
+        """
+        Command parser setup
+        """
+        super(self.__class__, self).add_args(parser)
+
+        parser.add_argument(
+            '-d', '--target-dir', required=True,
+            help='Directory to write the portfolio files to'
+        )
+        parser.add_argument(
+            '-l', '--num-locations', required=True, type=int,
+            help='Number of locations (loc rows)'
+        )
+        parser.add_argument(
+            '-n', '--num-accounts', required=False, type=int,
+            help='Number of accounts (acc rows) - default is one per 10 locations'
+        )
+        parser.add_argument(
+            '-i', '--num-reinsinfo', required=False, type=int, default=0,
+            help='Number of reins. info rows - if not set no reins. files are written'
+        )
+        parser.add_argument(
+            '-s', '--num-reinsscope', required=False, type=int,
+            help='Number of reins. scope rows - default is the number of reins. info rows'
+        )
+        parser.add_argument(
+            '-a', '--all-columns', default=False, required=False, action='store_true',
+            help='Include all the columns of each schema type, rather than only the key and required columns'
+        )
+        parser.add_argument(
+            '-c', '--chunksize', required=False, type=int, default=DEFAULT_CHUNKSIZE,
+            help='Maximum number of rows to generate at a time (default is {})'.format(DEFAULT_CHUNKSIZE)
+        )
+        parser.add_argument(
+            '-e', '--seed', required=False, type=int,
+            help='Random seed, for reproducible portfolios'
+        )
+        parser.add_argument(
+            '-j', '--workers', required=False, type=int, default=1,
+            help='Number of worker processes generating chunks in parallel (default is 1) - the portfolio for a given seed is the same for any number of workers'
+        )
+
+    def action(self, args):
+        """
+        Command logic
+        """
+        from .sampling import sample_portfolio
+
+        theargs = vars(args)
+
+        try:
+            files = sample_portfolio(
+                theargs['target_dir'],
+                theargs['num_locations'],
+                num_accounts=theargs.get('num_accounts'),
+                num_reinsinfo=theargs.get('num_reinsinfo') or 0,
+                num_reinsscope=theargs.get('num_reinsscope'),
+                all_columns=theargs.get('all_columns') or False,
+                chunksize=(theargs.get('chunksize') or DEFAULT_CHUNKSIZE),
+                seed=theargs.get('seed'),
+                workers=theargs.get('workers') or 1
+            )
+        except ProcessError as e:
+            raise_with_traceback(CommandError(e))
+
+        print(json.dumps(files, indent=4, sort_keys=True))
+
+
+class GenerateCmd(BaseCommand):
+    """
+    Subcommands
+    ::
+
+        * generating a synthetic OED input file
+        * generating a synthetic OED portfolio, with consistent keys across files
+    """
+    sub_commands = {
+        'file': GenerateFileCmd,
+        'portfolio': GeneratePortfolioCmd
     }
 
+
 class OedToolsCmd(BaseCommand):
     """
     Root command
     """
     sub_commands = {
+        'generate': GenerateCmd,
+        'lookup': LookupCmd,
         'query': QueryCmd,
         'sample': SampleCmd,
+        'serve': ServeCmd,
         'validate': ValidateCmd,
         'version': VersionCmd
     }
@@ -1,5 +1,7 @@
 __all__ = [
+    'ConditionallyRequiredDataError',
     'DataOutOfRangeError',
+    'DuplicateKeyError',
     'EmptyFileError',
     'InvalidDataTypeError',
     'MissingRequiredColumnError',
@@ -9,6 +11,12 @@ __all__ = [
     'NonOedSchemaAndColumnError',
     'NonOedSchemaColumnError',
     'NullDataInNonNullColumnError',
+    'OrphanKeyError',
+    'RowRuleError',
+    'UnreferencedKeyError',
+    'DATA_ERROR_MSGS',
+    'get_data_error',
+    'get_error_by_code',
     'get_file_error',
     'OedError',
     'OedException',
@@ -21,6 +29,7 @@ __all__ = [
 import sys
 
 from typing import (
+    Any,
     Optional,
 )
 
@@ -123,6 +132,31 @@ class DataOutOfRangeError(OedError):
     code_desc = 'Out of range data found in column'
 
 
+class OrphanKeyError(OedError):
+    code = 'E381'
+    code_desc = 'Key not found in referenced file'
+
+
+class UnreferencedKeyError(OedError):
+    code = 'E391'
+    code_desc = 'Key not referenced in referencing file'
+
+
+class ConditionallyRequiredDataError(OedError):
+    code = 'E411'
+    code_desc = 'Missing conditionally required data'
+
+
+class DuplicateKeyError(OedError):
+    code = 'E401'
+    code_desc = 'Duplicate key in file'
+
+
+class RowRuleError(OedError):
+    code = 'E421'
+    code_desc = 'Row data fails a cross-column rule'
+
+
 class OedWarning(OedException):
     etype = 'warning'
     code = 'W261'
@@ -134,3 +168,62 @@ def get_file_error(err_shortdesc: str, err_msg: Optional[str] = None) -> OedErro
         ''.join([s.capitalize() for s in err_shortdesc.split()])
     )
     return getattr(sys.modules[__name__], err_classname)(err_msg)
+
+
+_ERRORS_BY_CODE = {err_class.code: err_class for err_class in OedError.__subclasses__()}
+
+
+def get_error_by_code(code: str, err_msg: Optional[str] = None) -> OedError:
+    """
+    Returns an OED error instance given the error code, e.g. ``E351`` for
+    an ``InvalidDataTypeError``.
+
+    :param code: The OED error code
+    :type code: str
+
+    :param err_msg: (Optional) The error message
+    :type err_msg: str
+
+    :return: The OED error
+    :rtype: OedError
+    """
+    try:
+        return _ERRORS_BY_CODE[code](err_msg)
+    except KeyError:
+        raise ProcessError('"{}" is not a valid OED error code'.format(code))
+
+
+DATA_ERROR_MSGS = {
+    NullDataInNonNullColumnError.code: 'Null value in "{header}" - this is a non-null column',
+    InvalidDataTypeError.code: 'Invalid data type for value "{value}" in "{header}" - expected type "{exp_dtype}", found type "{dtype}"',
+    DataOutOfRangeError.code: 'Invalid value "{value}" in "{header}" - check the column or data type range',
+    ConditionallyRequiredDataError.code: 'Missing value in "{header}" - this column is required when {value}',
+    RowRuleError.code: 'Row data in "{header}" fails the rule {value}'
+}
+
+
+def get_data_error(code: str, header: str, value: Any, exp_dtype: type) -> OedError:
+    """
+    Returns the OED error for an invalid column value, given the error code
+    returned by a column value checker (see
+    :py:meth:`oedtools.validate.OedValidator.get_value_checker`).
+
+    :param code: The OED error code
+    :type code: str
+
+    :param header: The column name
+    :type header: str
+
+    :param value: The invalid (parsed) value
+    :type value: int, float, str, None
+
+    :param exp_dtype: The expected Python data type of the column
+    :type exp_dtype: type
+
+    :return: The OED error
+    :rtype: OedError
+    """
+    return get_error_by_code(
+        code,
+        DATA_ERROR_MSGS[code].format(header=header, value=value, exp_dtype=exp_dtype, dtype=type(value))
+    )
@@ -0,0 +1,561 @@
+__all__ = [
+    'DEFAULT_KEY_MEMORY_BUDGET',
+    'duplicate_key_errors',
+    'get_duplicate_keys',
+    'get_key_index',
+    'portfolio_errors',
+    'PRIMARY_KEYS',
+    'REFERENCES'
+]
+
+
+"""
+Key integrity validation of OED input files - duplicate keys within files,
+and (portfolio) references between files
+"""
+
+import csv
+import heapq
+import io
+import os
+import sys
+
+from itertools import product
+from operator import itemgetter
+from tempfile import TemporaryDirectory
+from typing import (
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from .exceptions import (
+    DuplicateKeyError,
+    OrphanKeyError,
+    ProcessError,
+    UnreferencedKeyError,
+)
+from .utils import DEFAULT_CHUNKSIZE
+
+
+# The references between OED input files - each is a key in the referencing
+# file (``schema_type``, ``keys``) which must match a key in the referenced
+# file (``ref_schema_type``, ``ref_keys``). Null key values in the
+# referencing file match any value, e.g. a reins. scope row with only a
+# ``PortNumber`` refers to the whole portfolio, and rows with all null keys
+# are not checked. If ``where`` is set, as a pair of a column and whether it
+# should be non-null, only the matching rows are checked. If
+# ``check_unreferenced`` is set the keys in the referenced file which are
+# not referenced in the referencing file are also reported.
+REFERENCES = [
+    {
+        'schema_type': 'loc',
+        'keys': ('PortNumber', 'AccNumber'),
+        'ref_schema_type': 'acc',
+        'ref_keys': ('PortNumber', 'AccNumber'),
+        'where': None,
+        'check_unreferenced': True
+    },
+    {
+        'schema_type': 'reinsscope',
+        'keys': ('ReinsNumber',),
+        'ref_schema_type': 'reinsinfo',
+        'ref_keys': ('ReinsNumber',),
+        'where': None,
+        'check_unreferenced': True
+    },
+    {
+        'schema_type': 'reinsscope',
+        'keys': ('PortNumber', 'AccNumber', 'PolNumber'),
+        'ref_schema_type': 'acc',
+        'ref_keys': ('PortNumber', 'AccNumber', 'PolNumber'),
+        'where': ('LocNumber', False),
+        'check_unreferenced': False
+    },
+    {
+        'schema_type': 'reinsscope',
+        'keys': ('PortNumber', 'AccNumber', 'LocNumber'),
+        'ref_schema_type': 'loc',
+        'ref_keys': ('PortNumber', 'AccNumber', 'LocNumber'),
+        'where': ('LocNumber', True),
+        'check_unreferenced': False
+    },
+]
+
+# The primary keys of the OED input file types, which should be unique in a
+# file
+PRIMARY_KEYS = {
+    'acc': ('PortNumber', 'AccNumber', 'PolNumber', 'LayerNumber'),
+    'loc': ('PortNumber', 'AccNumber', 'LocNumber'),
+    'reinsinfo': ('ReinsNumber',)
+}
+
+# The default maximum (approximate) memory, in bytes, used by the duplicate
+# key index before it is spilled to disk
+DEFAULT_KEY_MEMORY_BUDGET = 2 ** 28
+
+# Estimates of the memory used by a dict entry (with a list of row numbers)
+# in the duplicate key index, and by a row number in the list
+KEY_INDEX_ENTRY_SIZE = 160
+ROW_NUM_SIZE = 36
+
+# The number of hash partitions the duplicate key index is spilled to, and
+# the maximum number of times a partition is itself partitioned
+SPILL_PARTITIONS = 16
+MAX_SPILL_DEPTH = 3
+
+# The order in which the files are read - each file is read once, and
+# referenced files are read before the files which reference them
+FILE_ORDER = ['acc', 'reinsinfo', 'loc', 'reinsscope']
+
+
+def _read_headers(file_or_data: Union[str, Iterable[Dict]]) -> List[str]:
+    import pandas as pd
+
+    if isinstance(file_or_data, str):
+        try:
+            return pd.read_csv(file_or_data, nrows=0).columns.tolist()
+        except (IOError, FileNotFoundError, ValueError) as e:
+            raise ProcessError(
+                'A Pandas error was encountered trying to read the headers of "{}": {}'
+                .format(file_or_data, e)
+            )
+
+    return list(file_or_data[0]) if file_or_data else []
+
+
+def _header_positions(headers: List[str]) -> Dict[str, Tuple[str, int]]:
+    # The headers and their positions in the header line, i.e. the (1-based)
+    # character offsets, as reported for the header errors, by lower case
+    # header
+    header_str = ','.join(headers)
+    return {h.lower(): (h, header_str.index(h) + 1) for h in headers}
+
+
+def _normalise(value: Optional[str]) -> Optional[str]:
+    if value is None:
+        return
+    value = str(value).strip()
+    return value or None
+
+
+def _keys(df, headers: Iterable[Optional[str]]) -> List[Tuple]:
+    cols = [
+        df[h].tolist() if h is not None else [None] * len(df)
+        for h in headers
+    ]
+    return [tuple(_normalise(v) for v in key) for key in zip(*cols)]
+
+
+def _index_keys(index: Dict[Tuple, int], row_nums: Iterable[int], keys: Iterable[Tuple]) -> None:
+    for row_num, key in zip(row_nums, keys):
+        if key not in index and any(v is not None for v in key):
+            index[key] = row_num
+
+
+def _format_key(keys: Iterable[str], key: Tuple) -> str:
+    return ', '.join(
+        '{}="{}"'.format(k, v) for k, v in zip(keys, key) if v is not None
+    )
+
+
+def get_key_index(
+    schema_type: str,
+    file_or_data: Union[str, Iterable[Dict]],
+    keys: Iterable[str],
+    chunksize: Optional[int] = DEFAULT_CHUNKSIZE
+) -> Dict[Tuple, int]:
+    """
+    Builds a hash index of the (distinct) values of a key, i.e. a tuple of
+    columns, in an OED input file or row dict array - a dict of key values
+    (tuples of strings, with nulls as ``None``) to the row number of the
+    first row with the key. The file is read in chunks, so memory use is
+    proportional to the number of distinct keys, not rows.
+
+    :param schema_type: The file schema type (``loc``, ``acc``, ``reinsinfo``
+                        or ``reinsscope``)
+    :type schema_type: str
+
+    :param file_or_data: An OED input file path or row dict array
+    :type file_or_data: str, list, tuple
+
+    :param keys: The key column headers (case insensitive)
+    :type keys: list, tuple
+
+    :param chunksize: (Optional) The maximum number of rows read at a time
+                      (default is ``DEFAULT_CHUNKSIZE``)
+    :type chunksize: int
+
+    :return: The key index
+    :rtype: dict
+    """
+    from .validate import OedValidator
+
+    keys = tuple(keys)
+    headers = {h.lower(): h for h in _read_headers(file_or_data)}
+    key_headers = [headers.get(k.lower()) for k in keys]
+
+    index = {}
+
+    for df in OedValidator().read_data(schema_type, file_or_data, chunksize=chunksize, columns=keys):
+        _index_keys(index, (df.index + 2).tolist(), _keys(df, key_headers))
+
+    return index
+
+
+def _key_size(key: Tuple) -> int:
+    # An estimate of the memory used by a key in the duplicate key index -
+    # the tuple, its (string) values and a dict entry
+    return sys.getsizeof(key) + sum(sys.getsizeof(v) for v in key if v is not None) + KEY_INDEX_ENTRY_SIZE
+
+
+def _find_duplicates(
+    keys: Iterable[Tuple[int, Tuple]],
+    memory_budget: int,
+    spill_dir: str,
+    depth: int = 0
+) -> List[Tuple[Tuple, List[int]]]:
+    # Finds the duplicate keys in a stream of (row number, key) pairs, in
+    # memory while the index is within the memory budget - after that the
+    # index, and the rest of the stream, are spilled to disk in hash
+    # partitions, which are then processed independently (and partitioned
+    # again, with a different hash, if they exceed the budget)
+    index = {}
+    size = 0
+    keys = iter(keys)
+
+    for row_num, key in keys:
+        rows = index.get(key)
+        if rows is None:
+            index[key] = [row_num]
+            size += _key_size(key)
+        else:
+            rows.append(row_num)
+            size += ROW_NUM_SIZE
+        if size > memory_budget and depth < MAX_SPILL_DEPTH:
+            break
+    else:
+        return [(key, rows) for key, rows in index.items() if len(rows) > 1]
+
+    fps = [os.path.join(spill_dir, '{}-{}.csv'.format(depth, i)) for i in range(SPILL_PARTITIONS)]
+    files = [io.open(fp, 'w', encoding='utf-8', newline='') for fp in fps]
+
+    try:
+        writers = [csv.writer(f) for f in files]
+
+        def spill(row_num, key):
+            writers[hash((depth, key)) % SPILL_PARTITIONS].writerow([row_num] + ['' if v is None else v for v in key])
+
+        for key, rows in index.items():
+            for row_num in rows:
+                spill(row_num, key)
+        index = None
+
+        for row_num, key in keys:
+            spill(row_num, key)
+    finally:
+        for f in files:
+            f.close()
+
+    def read_partition(fp):
+        with io.open(fp, 'r', encoding='utf-8', newline='') as f:
+            for row in csv.reader(f):
+                yield int(row[0]), tuple(v or None for v in row[1:])
+
+    duplicates = []
+
+    for fp in fps:
+        duplicates.extend(_find_duplicates(read_partition(fp), memory_budget, spill_dir, depth=depth + 1))
+        os.remove(fp)
+
+    return duplicates
+
+
+def get_duplicate_keys(
+    schema_type: str,
+    file_or_data: Union[str, Iterable[Dict]],
+    keys: Optional[Iterable[str]] = None,
+    chunksize: Optional[int] = DEFAULT_CHUNKSIZE,
+    memory_budget: Optional[int] = DEFAULT_KEY_MEMORY_BUDGET
+) -> List[Tuple[Tuple, List[int]]]:
+    """
+    Finds the duplicate values of a key, i.e. a tuple of columns, in an OED
+    input file or row dict array, in a single streaming pass. The distinct
+    keys are hashed in memory, up to a memory budget - above the budget the
+    keys are spilled to disk in hash partitions, which are then checked one
+    at a time, so that memory use is bounded by the budget regardless of the
+    number of rows or distinct keys. Rows whose key values are all null are
+    not keyed, and so are not duplicates.
+
+    :param schema_type: The file schema type (``loc``, ``acc``, ``reinsinfo``
+                        or ``reinsscope``)
+    :type schema_type: str
+
+    :param file_or_data: An OED input file path or row dict array
+    :type file_or_data: str, list, tuple
+
+    :param keys: (Optional) The key column headers (case insensitive) -
+                 default is the primary key of the schema type (see
+                 ``PRIMARY_KEYS``)
+    :type keys: list, tuple
+
+    :param chunksize: (Optional) The maximum number of rows read at a time
+                      (default is ``DEFAULT_CHUNKSIZE``)
+    :type chunksize: int
+
+    :param memory_budget: (Optional) The (approximate) maximum memory, in
+                          bytes, used for the key index before spilling to
+                          disk (default is ``DEFAULT_KEY_MEMORY_BUDGET``)
+    :type memory_budget: int
+
+    :return: A list of the duplicate keys, as pairs of key values and row
+             numbers, in order of the first row of each key
+    :rtype: list
+    """
+    from .validate import OedValidator
+
+    keys = tuple(keys or PRIMARY_KEYS.get(schema_type.lower()) or ())
+
+    if not keys:
+        raise ProcessError('No key columns given, and "{}" has no primary key'.format(schema_type))
+
+    headers = {h.lower(): h for h in _read_headers(file_or_data)}
+    key_headers = [headers.get(k.lower()) for k in keys]
+
+    def row_keys():
+        for df in OedValidator().read_data(schema_type, file_or_data, chunksize=chunksize, columns=keys):
+            for row_num, key in zip((df.index + 2).tolist(), _keys(df, key_headers)):
+                if any(v is not None for v in key):
+                    yield row_num, key
+
+    with TemporaryDirectory() as spill_dir:
+        duplicates = _find_duplicates(row_keys(), memory_budget, spill_dir)
+
+    return sorted(((key, sorted(rows)) for key, rows in duplicates), key=lambda d: d[1][0])
+
+
+def duplicate_key_errors(
+    schema_type: str,
+    file_or_data: Union[str, Iterable[Dict]],
+    keys: Optional[Iterable[str]] = None,
+    chunksize: Optional[int] = DEFAULT_CHUNKSIZE,
+    memory_budget: Optional[int] = DEFAULT_KEY_MEMORY_BUDGET
+) -> Generator[Dict, None, None]:
+    """
+    Generates the duplicate key errors (``E401``) in an OED input file or row
+    dict array, as report records (see :py:meth:`portfolio_errors`) - one
+    per duplicate key, with the row number of the first row of the key, and
+    all the row numbers of the key in the message. See
+    :py:meth:`get_duplicate_keys` for the parameters.
+
+    :return: A generator of report records
+    :rtype: generator
+    """
+    keys = tuple(keys or PRIMARY_KEYS.get(schema_type.lower()) or ())
+
+    duplicates = get_duplicate_keys(schema_type, file_or_data, keys=keys, chunksize=chunksize, memory_budget=memory_budget)
+
+    positions = _header_positions(_read_headers(file_or_data))
+    column_pos = next((positions[k.lower()][1] for k in keys if k.lower() in positions), -1)
+
+    for key, rows in duplicates:
+        yield {
+            'file': file_or_data if isinstance(file_or_data, str) else '',
+            'row': rows[0],
+            'column_pos': column_pos,
+            'header': ','.join(keys),
+            'value': list(key),
+            'code': DuplicateKeyError.code,
+            'code_desc': DuplicateKeyError.code_desc,
+            'msg': 'Duplicate {} key ({}) in {} rows: {}'.format(
+                schema_type.lower(), _format_key(keys, key), len(rows), ', '.join(str(r) for r in rows)
+            )
+        }
+
+
+def _masked_keys(index: Dict[Tuple, int]) -> set:
+    # All the keys in the index with any subset of values replaced by
+    # ``None``, for matching referencing keys with null values
+    masked = set()
+    for key in index:
+        for mask in product((False, True), repeat=len(key)):
+            masked.add(tuple(None if m else v for m, v in zip(mask, key)))
+    return masked
+
+
+def portfolio_errors(
+    files: Dict[str, Union[str, Iterable[Dict]]],
+    chunksize: Optional[int] = DEFAULT_CHUNKSIZE
+) -> Generator[Dict, None, None]:
+    """
+    Generates the referential integrity errors between the OED input files
+    of a portfolio (see ``REFERENCES``), as report records - dicts with the
+    keys ``file``, ``row``, ``column_pos``, ``header``, ``value``, ``code``,
+    ``code_desc`` and ``msg``, as generated by
+    :py:meth:`oedtools.report.file_errors`. The ``header`` of a record is
+    the comma-separated key headers, and the ``value`` the list of key
+    values.
+
+    Each file is read once, in chunks. The keys of referenced files are
+    loaded into hash indexes, and the rows of referencing files are checked
+    against them as they are read, so memory use is proportional to the
+    number of distinct keys, not rows. Orphan keys, with no match in the
+    referenced file, are reported with the row numbers of the referencing
+    rows (``E381``), and unreferenced keys with the row number of the first
+    row of the key in the referenced file (``E391``). The orphan keys of a
+    file are reported in row order, followed by the keys in the files it
+    references which it does not reference.
+
+    :param files: A dict of OED input file paths or row dict arrays, keyed by
+                  schema type (``loc``, ``acc``, ``reinsinfo`` or
+                  ``reinsscope``) - at least two are required
+    :type files: dict
+
+    :param chunksize: (Optional) The maximum number of rows read at a time
+                      (default is ``DEFAULT_CHUNKSIZE``)
+    :type chunksize: int
+
+    :return: A generator of report records
+    :rtype: generator
+    """
+    from .validate import OedValidator
+
+    try:
+        files = {schema_type.lower(): file_or_data for schema_type, file_or_data in files.items() if file_or_data is not None}
+    except AttributeError:
+        raise ProcessError('The portfolio files must be given as a dict keyed by schema type')
+
+    invalid = set(files).difference(FILE_ORDER)
+    if invalid:
+        raise ProcessError(
+            '"{}" is not a valid OED schema type - one of "acc", "loc", '
+            '"reinsinfo" or "reinsscope" is expected'.format(sorted(invalid)[0])
+        )
+
+    if len(files) < 2:
+        raise ProcessError('At least two files are required to check references between files')
+
+    refs = [r for r in REFERENCES if r['schema_type'] in files and r['ref_schema_type'] in files]
+
+    def fp(schema_type):
+        file_or_data = files[schema_type]
+        return file_or_data if isinstance(file_or_data, str) else ''
+
+    # Key indexes and masked key sets by (schema type, key headers), and the
+    # sets of referenced keys (with no null values) by reference
+    indexes = {}
+    masked = {}
+    referenced = {i: set() for i, r in enumerate(refs) if r['check_unreferenced']}
+
+    for schema_type in (st for st in FILE_ORDER if st in files):
+        in_keys = list(dict.fromkeys((r['ref_keys'] for r in refs if r['ref_schema_type'] == schema_type)))
+        out_refs = [(i, r) for i, r in enumerate(refs) if r['schema_type'] == schema_type]
+
+        if not (in_keys or out_refs):
+            continue
+
+        headers = _read_headers(files[schema_type])
+        positions = _header_positions(headers)
+
+        def header(k):
+            return positions.get(k.lower(), (None, -1))[0]
+
+        def column_pos(ks):
+            return next((positions[k.lower()][1] for k in ks if k.lower() in positions), -1)
+
+        columns = set(k for ks in in_keys for k in ks)
+        for _, r in out_refs:
+            columns.update(r['keys'])
+            if r['where']:
+                columns.add(r['where'][0])
+
+        for ks in in_keys:
+            indexes[(schema_type, ks)] = {}
+
+        for df in OedValidator().read_data(schema_type, files[schema_type], chunksize=chunksize, columns=columns):
+            row_nums = (df.index + 2).tolist()
+
+            for ks in in_keys:
+                _index_keys(indexes[(schema_type, ks)], row_nums, _keys(df, [header(k) for k in ks]))
+
+            # The orphan keys in the chunk, by reference, merged into row
+            # order
+            orphans = []
+
+            for i, r in out_refs:
+                index = indexes[(r['ref_schema_type'], r['ref_keys'])]
+                hits = referenced.get(i)
+                orphans.append([])
+
+                if r['where']:
+                    where_header = header(r['where'][0])
+                    where = [
+                        (_normalise(v) is not None) is r['where'][1]
+                        for v in (df[where_header].tolist() if where_header else [None] * len(df))
+                    ]
+                else:
+                    where = [True] * len(df)
+
+                for row_num, key, check in zip(row_nums, _keys(df, [header(k) for k in r['keys']]), where):
+                    if not check or all(v is None for v in key):
+                        continue
+
+                    if None in key:
+                        try:
+                            found = key in masked[(r['ref_schema_type'], r['ref_keys'])]
+                        except KeyError:
+                            _masked = masked[(r['ref_schema_type'], r['ref_keys'])] = _masked_keys(index)
+                            found = key in _masked
+                    else:
+                        found = key in index
+                        if found and hits is not None:
+                            hits.add(key)
+
+                    if not found:
+                        msg = '{} key ({}) not found in the OED "{}" file'.format(
+                            schema_type, _format_key(r['keys'], key), r['ref_schema_type']
+                        )
+                        orphans[-1].append({
+                            'file': fp(schema_type),
+                            'row': row_num,
+                            'column_pos': column_pos(r['keys']),
+                            'header': ','.join(r['keys']),
+                            'value': list(key),
+                            'code': OrphanKeyError.code,
+                            'code_desc': OrphanKeyError.code_desc,
+                            'msg': msg
+                        })
+
+            for record in heapq.merge(*orphans, key=itemgetter('row')):
+                yield record
+
+        # Unreferenced keys can be reported once the referencing file has
+        # been read
+        for i, r in out_refs:
+            if i not in referenced:
+                continue
+
+            ref_schema_type = r['ref_schema_type']
+            ref_positions = _header_positions(_read_headers(files[ref_schema_type]))
+            hits = referenced.pop(i)
+
+            for key, row_num in indexes[(ref_schema_type, r['ref_keys'])].items():
+                if key in hits or None in key:
+                    continue
+                msg = '{} key ({}) not referenced in the OED "{}" file'.format(
+                    ref_schema_type, _format_key(r['ref_keys'], key), schema_type
+                )
+                yield {
+                    'file': fp(ref_schema_type),
+                    'row': row_num,
+                    'column_pos': next((ref_positions[k.lower()][1] for k in r['ref_keys'] if k.lower() in ref_positions), -1),
+                    'header': ','.join(r['ref_keys']),
+                    'value': list(key),
+                    'code': UnreferencedKeyError.code,
+                    'code_desc': UnreferencedKeyError.code_desc,
+                    'msg': msg
+                }
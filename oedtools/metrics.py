@@ -0,0 +1,553 @@
+__all__ = [
+    'CONTENT_TYPE',
+    'Counter',
+    'DEFAULT_BUCKETS',
+    'FILES_VALIDATED',
+    'Gauge',
+    'Histogram',
+    'MetricsRegistry',
+    'record_chunk',
+    'record_file',
+    'record_report',
+    'REGISTRY',
+    'REPORT_RECORDS',
+    'REPORT_SECONDS',
+    'ROWS_VALIDATED',
+    'SCHEMA_LOAD_SECONDS',
+    'serve_metrics',
+    'VALIDATION_ERRORS',
+    'VALIDATION_ROWS_PER_SECOND',
+    'VALIDATION_SECONDS'
+]
+
+
+"""
+Operational metrics - counters, gauges and histograms of the files, rows
+and errors validated, and of validation, report and schema load latencies,
+held in a process-wide registry which can be written out in the Prometheus
+text exposition format, to a file or from a local HTTP endpoint
+"""
+
+import collections
+import io
+import math
+import os
+import threading
+
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
+
+from .exceptions import ProcessError
+
+
+# Default histogram buckets (upper bounds, in seconds) - from 1ms up to 10
+# minutes, as schema loads take milliseconds and large files minutes
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+# The content type of the Prometheus text exposition format
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if value == -math.inf:
+        return '-Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def _escape(s: str, quotes: Optional[bool] = True) -> str:
+    s = s.replace('\\', r'\\').replace('\n', r'\n')
+    return s.replace('"', r'\"') if quotes else s
+
+
+def _format_labels(labels: Iterable[Tuple[str, str]]) -> str:
+    labels = list(labels)
+    if not labels:
+        return ''
+    return '{{{}}}'.format(','.join('{}="{}"'.format(name, _escape(str(value))) for name, value in labels))
+
+
+class _Metric(object):
+    # The base metric class - the values of a metric are held by label
+    # values, as tuples in the order of the label names
+
+    type = None
+
+    def __init__(self, name: str, help: str, labelnames: Optional[Iterable[str]] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ProcessError(
+                'Metric "{}" requires the labels {} - got {}'
+                .format(self.name, list(self.labelnames), sorted(labels))
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values = {}
+
+    def samples(self) -> List[Tuple[str, Tuple[Tuple[str, str], ...], float]]:
+        with self._lock:
+            return [
+                (self.name, tuple(zip(self.labelnames, key)), value)
+                for key, value in sorted(self._values.items())
+            ]
+
+    def get(self, **labels) -> float:
+        """
+        Returns the value of the metric for the given label values.
+
+        :return: The value (``0`` if the metric has not been set for the
+                 label values)
+        :rtype: float
+        """
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Counter(_Metric):
+    """
+    A monotonically increasing count, e.g. of the files validated.
+    """
+
+    type = 'counter'
+
+    def inc(self, amount: Optional[float] = 1, **labels) -> None:
+        """
+        Increments the counter for the given label values.
+
+        :param amount: (Optional) The (non-negative) increment (default is
+                       ``1``)
+        :type amount: int, float
+        """
+        if amount < 0:
+            raise ProcessError('Counter "{}" can only be incremented by a non-negative amount'.format(self.name))
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """
+    A value which can go up or down, e.g. the throughput of the last file
+    validated.
+    """
+
+    type = 'gauge'
+
+    def set(self, value: float, **labels) -> None:
+        """
+        Sets the gauge for the given label values.
+
+        :param value: The value
+        :type value: int, float
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """
+    A distribution of observed values, e.g. validation latencies, as
+    cumulative counts in buckets with given upper bounds, and the sum and
+    count of the observations.
+    """
+
+    type = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Optional[Iterable[str]] = (),
+        buckets: Optional[Iterable[float]] = DEFAULT_BUCKETS
+    ):
+        super(self.__class__, self).__init__(name, help, labelnames=labelnames)
+        self.buckets = tuple(sorted(float(b) for b in buckets if b != math.inf)) + (math.inf,)
+
+    def observe(self, value: float, **labels) -> None:
+        """
+        Records an observation for the given label values.
+
+        :param value: The observed value
+        :type value: int, float
+        """
+        key = self._key(labels)
+        with self._lock:
+            try:
+                counts, total = self._values[key]
+            except KeyError:
+                counts, total = [0] * len(self.buckets), 0.0
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            self._values[key] = (counts, total + value)
+
+    def get(self, **labels) -> Dict[str, float]:
+        """
+        Returns the count and sum of the observations for the given label
+        values.
+
+        :return: The count and sum, as a dict with the keys ``count`` and
+                 ``sum``
+        :rtype: dict
+        """
+        with self._lock:
+            counts, total = self._values.get(self._key(labels), ([0], 0.0))
+        return {'count': sum(counts), 'sum': total}
+
+    def samples(self) -> List[Tuple[str, Tuple[Tuple[str, str], ...], float]]:
+        with self._lock:
+            values = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+
+        samples = []
+        for key, (counts, total) in values:
+            labels = tuple(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                samples.append(('{}_bucket'.format(self.name), labels + (('le', _format_value(bound)),), cumulative))
+            samples.append(('{}_sum'.format(self.name), labels, total))
+            samples.append(('{}_count'.format(self.name), labels, cumulative))
+
+        return samples
+
+
+class MetricsRegistry(object):
+    """
+    A registry of named metrics, which can be written out in the
+    Prometheus text exposition format. Metrics are created on first
+    request, and later requests for the same name return the existing
+    metric.
+    """
+
+    def __init__(self):
+        self._metrics = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls: type, name: str, help: str, labelnames: Iterable[str], **kwargs) -> _Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, labelnames=labelnames, **kwargs)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ProcessError(
+                    'Metric "{}" is already registered as a {} with the labels {}'
+                    .format(name, metric.type, list(metric.labelnames))
+                )
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Optional[Iterable[str]] = ()) -> Counter:
+        """
+        Gets or creates a counter.
+
+        :param name: The metric name
+        :type name: str
+
+        :param help: The metric description
+        :type help: str
+
+        :param labelnames: (Optional) The label names
+        :type labelnames: list, tuple
+
+        :return: The counter
+        :rtype: oedtools.metrics.Counter
+        """
+        return self._get_or_create(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str, labelnames: Optional[Iterable[str]] = ()) -> Gauge:
+        """
+        Gets or creates a gauge.
+
+        :param name: The metric name
+        :type name: str
+
+        :param help: The metric description
+        :type help: str
+
+        :param labelnames: (Optional) The label names
+        :type labelnames: list, tuple
+
+        :return: The gauge
+        :rtype: oedtools.metrics.Gauge
+        """
+        return self._get_or_create(Gauge, name, help, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Optional[Iterable[str]] = (),
+        buckets: Optional[Iterable[float]] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """
+        Gets or creates a histogram.
+
+        :param name: The metric name
+        :type name: str
+
+        :param help: The metric description
+        :type help: str
+
+        :param labelnames: (Optional) The label names
+        :type labelnames: list, tuple
+
+        :param buckets: (Optional) The bucket upper bounds - a ``+Inf``
+                        bucket is always added (default is
+                        ``DEFAULT_BUCKETS``)
+        :type buckets: list, tuple
+
+        :return: The histogram
+        :rtype: oedtools.metrics.Histogram
+        """
+        return self._get_or_create(Histogram, name, help, labelnames, buckets=buckets)
+
+    def get(self, name: str) -> _Metric:
+        """
+        Gets a registered metric by name.
+
+        :param name: The metric name
+        :type name: str
+
+        :return: The metric
+        :rtype: oedtools.metrics.Counter, oedtools.metrics.Gauge, oedtools.metrics.Histogram
+        """
+        try:
+            return self._metrics[name]
+        except KeyError:
+            raise ProcessError('"{}" is not a registered metric'.format(name))
+
+    def reset(self) -> None:
+        """
+        Resets the values of all the registered metrics.
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.reset()
+
+    def to_text(self) -> str:
+        """
+        Returns the metrics in the Prometheus text exposition format
+        (version ``0.0.4``).
+
+        :return: The metrics text
+        :rtype: str
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        lines = []
+        for metric in metrics:
+            lines.append('# HELP {} {}\n'.format(metric.name, _escape(metric.help, quotes=False)))
+            lines.append('# TYPE {} {}\n'.format(metric.name, metric.type))
+            for name, labels, value in metric.samples():
+                lines.append('{}{} {}\n'.format(name, _format_labels(labels), _format_value(value)))
+
+        return ''.join(lines)
+
+    def write(self, fp: str) -> None:
+        """
+        Writes the metrics to a file in the Prometheus text exposition
+        format, e.g. for the node exporter textfile collector. The file is
+        written to a temporary file first, which then replaces the target,
+        so that a reader never sees a partially written file.
+
+        :param fp: The target file path
+        :type fp: str
+        """
+        _fp = os.path.abspath(fp)
+        tmp_fp = '{}.{}.tmp'.format(_fp, os.getpid())
+        with io.open(tmp_fp, 'w', encoding='utf-8') as f:
+            f.write(self.to_text())
+        os.replace(tmp_fp, _fp)
+
+
+def serve_metrics(
+    host: Optional[str] = '127.0.0.1',
+    port: Optional[int] = 0,
+    registry: Optional[MetricsRegistry] = None
+) -> Any:
+    """
+    Serves the metrics of a registry as ``GET /metrics``, in the Prometheus
+    text exposition format, from a localhost HTTP server running in a
+    daemon thread of the current process - for a long-running process which
+    validates files, e.g. an ingestion service, to be scraped directly.
+
+    :param host: (Optional) The host to bind to (default is ``127.0.0.1``)
+    :type host: str
+
+    :param port: (Optional) The port to bind to (default is ``0``, which
+                 binds to a free port)
+    :type port: int
+
+    :param registry: (Optional) The registry (default is ``REGISTRY``)
+    :type registry: oedtools.metrics.MetricsRegistry
+
+    :return: The server - its address is ``server.server_address``, and it
+             is stopped with ``server.shutdown()``
+    :rtype: http.server.HTTPServer
+    """
+    # The HTTP server module is imported here, rather than with the module,
+    # as it is slow to import and only needed for serving
+    from http.server import (
+        BaseHTTPRequestHandler,
+        HTTPServer,
+    )
+    from socketserver import ThreadingMixIn
+
+    _registry = registry or REGISTRY
+
+    class _MetricsRequestHandler(BaseHTTPRequestHandler):
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_response(404)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+
+            body = _registry.to_text().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    class _MetricsServer(ThreadingMixIn, HTTPServer):
+        daemon_threads = True
+
+    server = _MetricsServer((host, port), _MetricsRequestHandler)
+
+    thread = threading.Thread(target=server.serve_forever, name='oedtools-metrics', daemon=True)
+    thread.start()
+
+    return server
+
+
+# The process-wide registry, and the metrics which are updated by the
+# validator, the reporters and the schema loaders
+REGISTRY = MetricsRegistry()
+
+FILES_VALIDATED = REGISTRY.counter(
+    'oedtools_files_validated_total',
+    'Number of OED input files (or row dict arrays) validated',
+    ['schema_type']
+)
+
+ROWS_VALIDATED = REGISTRY.counter(
+    'oedtools_rows_validated_total',
+    'Number of data rows validated',
+    ['schema_type']
+)
+
+VALIDATION_ERRORS = REGISTRY.counter(
+    'oedtools_validation_errors_total',
+    'Number of validation errors found, by OED error code',
+    ['schema_type', 'code']
+)
+
+VALIDATION_SECONDS = REGISTRY.histogram(
+    'oedtools_validation_duration_seconds',
+    'File validation latency, excluding the time spent by the caller between chunks',
+    ['schema_type']
+)
+
+VALIDATION_ROWS_PER_SECOND = REGISTRY.gauge(
+    'oedtools_validation_rows_per_second',
+    'Validation throughput of the last file validated',
+    ['schema_type']
+)
+
+SCHEMA_LOAD_SECONDS = REGISTRY.histogram(
+    'oedtools_schema_load_duration_seconds',
+    'Schema (and values profile) load latency',
+    ['schema']
+)
+
+REPORT_RECORDS = REGISTRY.counter(
+    'oedtools_report_records_total',
+    'Number of report records written, by report format',
+    ['format']
+)
+
+REPORT_SECONDS = REGISTRY.histogram(
+    'oedtools_report_duration_seconds',
+    'Report writing latency, including the generation of the records',
+    ['format']
+)
+
+
+def record_chunk(schema_type: str, num_rows: int, codes: Iterable[str]) -> None:
+    """
+    Records the number of rows validated, and the errors found, in a chunk
+    of a file.
+
+    :param schema_type: The file schema type
+    :type schema_type: str
+
+    :param num_rows: The number of rows in the chunk
+    :type num_rows: int
+
+    :param codes: The OED error codes of the errors found
+    :type codes: list, tuple
+    """
+    ROWS_VALIDATED.inc(num_rows, schema_type=schema_type)
+    for code, count in collections.Counter(codes).items():
+        VALIDATION_ERRORS.inc(count, schema_type=schema_type, code=code)
+
+
+def record_file(schema_type: str, num_rows: int, seconds: float) -> None:
+    """
+    Records the validation of a whole file.
+
+    :param schema_type: The file schema type
+    :type schema_type: str
+
+    :param num_rows: The number of rows in the file
+    :type num_rows: int
+
+    :param seconds: The validation time (s)
+    :type seconds: float
+    """
+    FILES_VALIDATED.inc(schema_type=schema_type)
+    VALIDATION_SECONDS.observe(seconds, schema_type=schema_type)
+    if seconds > 0:
+        VALIDATION_ROWS_PER_SECOND.set(num_rows / seconds, schema_type=schema_type)
+
+
+def record_report(report_format: str, num_records: int, seconds: float) -> None:
+    """
+    Records the writing of a report.
+
+    :param report_format: The report format
+    :type report_format: str
+
+    :param num_records: The number of records written
+    :type num_records: int
+
+    :param seconds: The writing time (s)
+    :type seconds: float
+    """
+    REPORT_RECORDS.inc(num_records, format=report_format)
+    REPORT_SECONDS.observe(seconds, format=report_format)
@@ -0,0 +1,427 @@
+__all__ = [
+    'NULL_PROFILE',
+    'STAGES',
+    'ValidationProfile'
+]
+
+
+"""
+Per-stage and per-column timing, and memory profiling, of OED input file
+validation
+"""
+
+import time
+import tracemalloc
+
+from contextlib import contextmanager
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    Optional,
+    Tuple,
+)
+
+
+# The validation stages, in pipeline order - reading (parsing) the CSV,
+# normalising the nulls in the data, validating the headers (and compiling
+# the value checkers and rules), validating the column data, checking the CR
+# and row rules, aggregating the errors into results, and generating and
+# writing the report
+STAGES = ['read', 'normalise', 'headers', 'columns', 'cr_rules', 'row_rules', 'aggregate', 'report']
+
+
+class ValidationProfile(object):
+    """
+    An accumulator of the wall clock times and row counts of the stages of
+    a validation (see ``STAGES``), and of the validation of each column,
+    which can be passed to :py:meth:`oedtools.validate.OedValidator.validate`,
+    :py:meth:`oedtools.validate.OedValidator.validate_chunks` and
+    :py:meth:`oedtools.report.file_errors` etc. Times are accumulated over
+    chunks, so a stage or column which is timed once per chunk has one call
+    per chunk.
+
+    With ``memory=True`` the memory allocated by each stage and column is
+    also traced, with ``tracemalloc`` - the peak memory (bytes) allocated
+    above the memory in use when the stage starts, which is the largest
+    over all the calls of the stage, and the memory retained when the stage
+    ends, which is summed over the calls. Tracing slows allocations down,
+    so the times of a memory profile are inflated, and should not be
+    compared with those of a time-only profile.
+
+    The peaks are traced by resetting the ``tracemalloc`` peak at the start
+    and end of each stage, which requires Python 3.9. Before that the peak
+    is the highest memory in use since tracing started, so a stage which
+    does not raise it is only known to have peaked at the memory in use at
+    its end (or the start of a nested stage), and its peak is a lower
+    bound.
+    """
+
+    def __init__(self, memory: Optional[bool] = False):
+        """
+        :param memory: (Optional) Whether to trace memory allocations
+                       (default is ``False``) - ``tracemalloc`` is started,
+                       if it is not already tracing, and stopped when the
+                       profile is stopped
+        :type memory: bool
+        """
+        self.stages = {}
+        self.columns = {}
+        self.memory = memory
+        self.peak = self._tracing = None
+        if memory:
+            self._tracing = not tracemalloc.is_tracing()
+            if self._tracing:
+                tracemalloc.start()
+            # Each open (traced) section is a pair of the memory in use when
+            # it started, and the highest memory in use since then
+            self._sections = []
+            self._last_peak = 0
+            self._baseline, self.peak = self._get_traced_memory()[0], 0
+        self.started = time.perf_counter()
+        self.stopped = None
+
+    def _get_traced_memory(self) -> Tuple[int, int]:
+        # The memory in use, and the highest memory in use since the last
+        # call - ``tracemalloc.reset_peak`` requires Python 3.9, and before
+        # that a peak is only known if it is a new high since tracing
+        # started, otherwise the memory in use is used
+        current, peak = tracemalloc.get_traced_memory()
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+            return current, peak
+        peak, self._last_peak = (peak if peak > self._last_peak else current), max(peak, self._last_peak)
+        return current, peak
+
+    def _start_section(self) -> None:
+        current, peak = self._get_traced_memory()
+        if self._sections:
+            self._sections[-1][1] = max(self._sections[-1][1], peak)
+        self.peak = max(self.peak, peak - self._baseline)
+        self._sections.append([current, current])
+
+    def _end_section(self) -> Dict[str, int]:
+        current, peak = self._get_traced_memory()
+        start, section_peak = self._sections.pop()
+        section_peak = max(section_peak, peak)
+        if self._sections:
+            self._sections[-1][1] = max(self._sections[-1][1], section_peak)
+        self.peak = max(self.peak, section_peak - self._baseline)
+        return {'peak_bytes': section_peak - start, 'retained_bytes': current - start}
+
+    @staticmethod
+    def _add_memory(d: Dict, mem: Optional[Dict[str, int]]) -> None:
+        if mem is None:
+            return
+        d['peak_bytes'] = max(d.get('peak_bytes', 0), mem['peak_bytes'])
+        d['retained_bytes'] = d.get('retained_bytes', 0) + mem['retained_bytes']
+
+    def add(self, name: str, seconds: float, rows: Optional[int] = 0, memory: Optional[Dict[str, int]] = None) -> None:
+        """
+        Adds a time and row count, and optionally the memory allocated, to a
+        stage.
+
+        :param name: The stage name
+        :type name: str
+
+        :param seconds: The time (s)
+        :type seconds: float
+
+        :param rows: (Optional) The number of rows (default is ``0``)
+        :type rows: int
+
+        :param memory: (Optional) The peak and retained memory (bytes), as a
+                       dict with the keys ``peak_bytes`` and
+                       ``retained_bytes``
+        :type memory: dict
+        """
+        try:
+            stage = self.stages[name]
+        except KeyError:
+            stage = self.stages[name] = {'seconds': 0.0, 'rows': 0, 'calls': 0}
+        stage['seconds'] += seconds
+        stage['rows'] += rows
+        stage['calls'] += 1
+        self._add_memory(stage, memory)
+
+    @contextmanager
+    def stage(self, name: str, rows: Optional[int] = 0) -> Generator[Dict, None, None]:
+        """
+        A context manager which times a stage. It yields a dict in which the
+        number of rows can be set, as ``rows``, if it is only known at the
+        end of the stage.
+
+        :param name: The stage name
+        :type name: str
+
+        :param rows: (Optional) The number of rows (default is ``0``)
+        :type rows: int
+        """
+        res = {'rows': rows}
+        if self.memory:
+            self._start_section()
+        start = time.perf_counter()
+        try:
+            yield res
+        finally:
+            seconds = time.perf_counter() - start
+            self.add(name, seconds, rows=res['rows'], memory=(self._end_section() if self.memory else None))
+
+    @contextmanager
+    def column(self, header: str, rows: Optional[int] = 0) -> Generator[Dict, None, None]:
+        """
+        A context manager which times the validation of a column, which is
+        also added to the ``columns`` stage. It yields a dict in which the
+        number of errors found can be set, as ``errors``.
+
+        :param header: The column header
+        :type header: str
+
+        :param rows: (Optional) The number of rows (default is ``0``)
+        :type rows: int
+        """
+        res = {'errors': 0}
+        if self.memory:
+            self._start_section()
+        start = time.perf_counter()
+        try:
+            yield res
+        finally:
+            seconds = time.perf_counter() - start
+            memory = self._end_section() if self.memory else None
+            try:
+                col = self.columns[header]
+            except KeyError:
+                col = self.columns[header] = {'seconds': 0.0, 'rows': 0, 'errors': 0}
+            col['seconds'] += seconds
+            col['rows'] += rows
+            col['errors'] += res['errors']
+            self._add_memory(col, memory)
+            self.add('columns', seconds, rows=rows, memory=memory)
+
+    def timed(self, name: str, func: Callable) -> Callable:
+        """
+        Wraps a function so that its calls are timed as a stage, with no
+        rows, e.g. for the formatting of report records, whose number is
+        counted where they are generated.
+
+        :param name: The stage name
+        :type name: str
+
+        :param func: The function
+        :type func: callable
+
+        :return: The wrapped function
+        :rtype: callable
+        """
+        if self.memory:
+            def _timed(*args, **kwargs):
+                with self.stage(name):
+                    return func(*args, **kwargs)
+        else:
+            def _timed(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.add(name, time.perf_counter() - start)
+
+        return _timed
+
+    def iter_stage(self, name: str, iterable: Iterable) -> Generator[Any, None, None]:
+        """
+        Times the generation of the items of an iterable, e.g. the reading
+        of the chunks of a file, as a stage - the time for each item
+        excludes the time the item is used by the caller, and the number of
+        rows is the length of the item.
+
+        :param name: The stage name
+        :type name: str
+
+        :param iterable: The iterable
+        :type iterable: list, tuple, generator
+        """
+        it = iter(iterable)
+        while True:
+            if self.memory:
+                self._start_section()
+            start = time.perf_counter()
+            try:
+                item = next(it)
+            except StopIteration:
+                if self.memory:
+                    self._end_section()
+                return
+            seconds = time.perf_counter() - start
+            self.add(name, seconds, rows=len(item), memory=(self._end_section() if self.memory else None))
+            # The item is not referenced by the (suspended) generator once
+            # it is yielded, so that the caller can release it, e.g. when a
+            # chunk is replaced by a normalised copy
+            item = [item]
+            yield item.pop()
+
+    def stop(self) -> None:
+        """
+        Stops the profile clock - the total time of the profile is the time
+        from its creation to the time it is stopped, or to the present if
+        it has not been stopped. If the profile started ``tracemalloc`` it
+        is stopped too.
+        """
+        self.stopped = time.perf_counter()
+        if self.memory and tracemalloc.is_tracing():
+            self.peak = max(self.peak, self._get_traced_memory()[1] - self._baseline)
+            if self._tracing:
+                tracemalloc.stop()
+                self._tracing = False
+
+    def to_dict(self) -> Dict:
+        """
+        Returns the profile as a (JSON serialisable) dict, with the keys
+        ``seconds`` (the total time), ``stages`` (the stages, in pipeline
+        order, as dicts with the keys ``stage``, ``seconds``, ``rows``,
+        ``calls`` and ``rows_per_sec``), ``columns`` (the columns, in
+        descending order of time, as dicts with the keys ``header``,
+        ``seconds``, ``rows``, ``errors`` and ``rows_per_sec``) and
+        ``unaccounted_seconds`` (the total time less the time of the
+        stages).
+
+        For a memory profile the stages and columns also have the keys
+        ``peak_bytes`` and ``retained_bytes``, the columns are in
+        descending order of peak memory, and the overall peak memory
+        (bytes) above the memory in use when the profile was created is
+        added as ``peak_bytes``.
+
+        :return: The profile
+        :rtype: dict
+        """
+        total = (self.stopped or time.perf_counter()) - self.started
+
+        order = {name: i for i, name in enumerate(STAGES)}
+
+        def rate(d):
+            return round(d['rows'] / d['seconds'], 1) if d['seconds'] and d['rows'] else None
+
+        def memory(d):
+            return {'peak_bytes': d.get('peak_bytes', 0), 'retained_bytes': d.get('retained_bytes', 0)} if self.memory else {}
+
+        stages = [
+            {
+                **{'stage': name, 'seconds': round(s['seconds'], 6), 'rows': s['rows'], 'calls': s['calls'], 'rows_per_sec': rate(s)},
+                **memory(s)
+            }
+            for name, s in sorted(self.stages.items(), key=lambda it: order.get(it[0], len(STAGES)))
+        ]
+
+        columns = [
+            {
+                **{'header': header, 'seconds': round(c['seconds'], 6), 'rows': c['rows'], 'errors': c['errors'], 'rows_per_sec': rate(c)},
+                **memory(c)
+            }
+            for header, c in sorted(
+                self.columns.items(),
+                key=lambda it: (-it[1].get('peak_bytes', 0), -it[1]['seconds']) if self.memory else -it[1]['seconds']
+            )
+        ]
+
+        profile = {
+            'seconds': round(total, 6),
+            'stages': stages,
+            'columns': columns,
+            'unaccounted_seconds': round(max(0.0, total - sum(s['seconds'] for s in self.stages.values())), 6)
+        }
+        if self.memory:
+            profile['peak_bytes'] = self.peak
+
+        return profile
+
+    def format(self, num_columns: Optional[int] = 10) -> str:
+        """
+        Formats the profile as text tables of the stages, and of the slowest
+        columns, or, for a memory profile, the columns with the highest peak
+        memory - memory is shown in MiB.
+
+        :param num_columns: (Optional) The number of columns shown - if
+                            ``None`` all the columns are shown (default is
+                            ``10``)
+        :type num_columns: int
+
+        :return: The tables
+        :rtype: str
+        """
+        profile = self.to_dict()
+        total = profile['seconds'] or 1
+
+        def mib(num_bytes):
+            return num_bytes / 2 ** 20
+
+        mem_header = '  {:>10}  {:>12}'.format('peak MiB', 'retained MiB') if self.memory else ''
+
+        def mem_cols(d):
+            return '  {:>10.2f}  {:>12.2f}'.format(mib(d['peak_bytes']), mib(d['retained_bytes'])) if self.memory else ''
+
+        lines = ['{:<12}  {:>10}  {:>6}  {:>10}  {:>8}  {:>12}{}\n'.format('stage', 'seconds', '%', 'rows', 'calls', 'rows/s', mem_header)]
+        for s in profile['stages']:
+            lines.append('{:<12}  {:>10.4f}  {:>6.1f}  {:>10}  {:>8}  {:>12}{}\n'.format(
+                s['stage'], s['seconds'], 100 * s['seconds'] / total, s['rows'], s['calls'], s['rows_per_sec'] or '-', mem_cols(s)
+            ))
+        lines.append('{:<12}  {:>10.4f}  {:>6.1f}\n'.format(
+            'unaccounted', profile['unaccounted_seconds'], 100 * profile['unaccounted_seconds'] / total
+        ))
+        lines.append('{:<12}  {:>10.4f}{}\n'.format(
+            'total', profile['seconds'], '  {:>6}  {:>10}  {:>8}  {:>12}  {:>10.2f}'.format('', '', '', '', mib(profile['peak_bytes'])) if self.memory else ''
+        ))
+
+        if profile['columns']:
+            columns = profile['columns'] if num_columns is None else profile['columns'][:num_columns]
+            width = max([len('column')] + [len(c['header']) for c in columns])
+            lines.append('\n{:<{w}}  {:>10}  {:>10}  {:>10}  {:>12}{}\n'.format('column', 'seconds', 'rows', 'errors', 'rows/s', mem_header, w=width))
+            for c in columns:
+                lines.append('{:<{w}}  {:>10.4f}  {:>10}  {:>10}  {:>12}{}\n'.format(
+                    c['header'], c['seconds'], c['rows'], c['errors'], c['rows_per_sec'] or '-', mem_cols(c), w=width
+                ))
+
+        return ''.join(lines)
+
+
+class _NullProfile(object):
+    # A profile which records nothing, used when profiling is not enabled,
+    # so that the instrumented code does not need to check for a profile
+
+    memory = False
+
+    def add(self, name, seconds, rows=0, memory=None):
+        pass
+
+    def stage(self, name, rows=0):
+        return _NULL_CONTEXT
+
+    def column(self, header, rows=0):
+        return _NULL_COLUMN_CONTEXT
+
+    def timed(self, name, func):
+        return func
+
+    def iter_stage(self, name, iterable):
+        return iterable
+
+
+class _NullContext(object):
+
+    def __init__(self, value=None):
+        self.value = value
+
+    def __enter__(self):
+        return self.value
+
+    def __exit__(self, *exc):
+        return False
+
+
+# The dicts of the null contexts are shared, and never read
+_NULL_CONTEXT = _NullContext({'rows': 0})
+
+_NULL_COLUMN_CONTEXT = _NullContext({'errors': 0})
+
+NULL_PROFILE = _NullProfile()
@@ -0,0 +1,397 @@
+__all__ = [
+    'DEFAULT_INTERVAL',
+    'format_progress',
+    'get_progress',
+    'get_reader_position',
+    'LOG_INTERVAL',
+    'NULL_PROGRESS',
+    'ProgressLine',
+    'ValidationProgress'
+]
+
+
+"""
+Progress reporting for long validations - the rows processed, bytes read,
+current chunk and column, throughput and estimated time remaining, passed
+to a callback at a limited rate
+"""
+
+import os
+import sys
+import time
+
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Optional,
+    TextIO,
+    Union,
+)
+
+
+# The minimum interval (s) between progress callbacks, by default, and for
+# progress written to a log (not a terminal)
+DEFAULT_INTERVAL = 0.5
+
+LOG_INTERVAL = 10.0
+
+
+def get_reader_position(reader: Any) -> Optional[int]:
+    """
+    Returns the position (bytes) in its file of a Pandas CSV chunk reader,
+    i.e. the number of bytes of the file which have been read. The reader
+    reads ahead in blocks, so the position can be ahead of the last chunk by
+    up to a block.
+
+    :param reader: The chunk reader
+    :type reader: pandas.io.parsers.TextFileReader
+
+    :return: The position, or ``None`` if it is not available
+    :rtype: int
+    """
+    try:
+        return reader.handles.handle.tell()
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+class ValidationProgress(object):
+    """
+    A tracker of the progress of a validation, which can be passed as the
+    ``progress`` argument of :py:meth:`oedtools.validate.OedValidator.validate`,
+    :py:meth:`oedtools.validate.OedValidator.validate_chunks`,
+    :py:meth:`oedtools.report.file_errors` and
+    :py:meth:`oedtools.report.report_file`. The validation updates the
+    tracker as each chunk is read and validated, and as each column of a
+    chunk is validated, and the tracker calls a callback with the progress
+    (see :py:meth:`state`) at most once per interval, and when the
+    validation finishes. An update costs a clock read, so the tracking adds
+    negligible time to a validation.
+    """
+
+    def __init__(self, callback: Callable[[Dict], Any], interval: Optional[float] = DEFAULT_INTERVAL):
+        """
+        :param callback: The callback, which is called with the progress
+                         dict
+        :type callback: callable
+
+        :param interval: (Optional) The minimum interval (s) between
+                         callbacks (default is ``DEFAULT_INTERVAL``) - if
+                         ``None`` or ``0`` the callback is called on every
+                         update
+        :type interval: float
+        """
+        self.callback = callback
+        self.interval = interval or 0.0
+        self.start()
+
+    def start(self, schema_type: Optional[str] = None, file_or_data: Optional[Union[str, Iterable[Dict]]] = None) -> None:
+        """
+        Starts (or restarts) tracking the validation of a file or row dict
+        array.
+
+        :param schema_type: (Optional) The file schema type
+        :type schema_type: str
+
+        :param file_or_data: (Optional) An OED input file path or row dict
+                             array
+        :type file_or_data: str, list, tuple
+        """
+        is_file = isinstance(file_or_data, str)
+        self.file = file_or_data if is_file else None
+        self.schema_type = schema_type
+        self.total_bytes = os.path.getsize(file_or_data) if is_file and os.path.isfile(file_or_data) else None
+        self.total_rows = len(file_or_data) if isinstance(file_or_data, (list, tuple)) else None
+        self.rows = 0
+        self.chunk = 0
+        self.chunk_rows = 0
+        self.bytes = 0 if is_file else None
+        self.column_header = None
+        self.column_fraction = 0.0
+        self.done = False
+        self.start_time = time.perf_counter()
+        self.next_time = self.start_time + self.interval
+
+    def read(self, rows: int, nbytes: Optional[int] = None) -> None:
+        """
+        Updates the progress when a chunk has been read.
+
+        :param rows: The number of rows of the chunk
+        :type rows: int
+
+        :param nbytes: (Optional) The number of bytes of the file read, if
+                       known
+        :type nbytes: int
+        """
+        self.chunk += 1
+        self.chunk_rows = rows
+        if nbytes is not None:
+            self.bytes = nbytes
+        self.column_header = None
+        self.column_fraction = 0.0
+        self.update()
+
+    def column(self, header: str, num: int, num_columns: int) -> None:
+        """
+        Updates the progress when the validation of a column of the current
+        chunk starts.
+
+        :param header: The column header
+        :type header: str
+
+        :param num: The number of columns of the chunk already validated
+        :type num: int
+
+        :param num_columns: The number of columns of the chunk to validate
+        :type num_columns: int
+        """
+        self.column_header = header
+        self.column_fraction = num / num_columns
+        now = time.perf_counter()
+        if now >= self.next_time:
+            self.report(now)
+
+    def validated(self, rows: int) -> None:
+        """
+        Updates the progress when a chunk has been validated.
+
+        :param rows: The number of rows of the chunk
+        :type rows: int
+        """
+        self.rows += rows
+        self.chunk_rows = 0
+        self.column_header = None
+        self.column_fraction = 0.0
+        self.update()
+
+    def finish(self) -> None:
+        """
+        Marks the validation as finished, and calls the callback.
+        """
+        self.done = True
+        if self.total_bytes is not None:
+            self.bytes = self.total_bytes
+        self.report(time.perf_counter())
+
+    def update(self) -> None:
+        """
+        Calls the callback if the interval since the last callback has
+        passed.
+        """
+        now = time.perf_counter()
+        if now >= self.next_time:
+            self.report(now)
+
+    def report(self, now: Optional[float] = None) -> None:
+        """
+        Calls the callback with the progress.
+
+        :param now: (Optional) The current ``time.perf_counter()`` time
+        :type now: float
+        """
+        now = now if now is not None else time.perf_counter()
+        self.next_time = now + self.interval
+        self.callback(self.state(now))
+
+    def state(self, now: Optional[float] = None) -> Dict:
+        """
+        Returns the progress, as a dict with the keys:
+
+        * ``file`` - the file path, or ``None`` for a row dict array
+        * ``schema_type`` - the file schema type
+        * ``rows`` - the number of rows validated
+        * ``total_rows`` - the number of rows of a row dict array, or an
+          estimate of the number of rows of a file, from the bytes read and
+          the rows read, which is exact once the file has been read, or
+          ``None`` if not known
+        * ``bytes`` and ``total_bytes`` - the number of bytes of the file read,
+          and the size of the file, or ``None`` for a row dict array
+        * ``chunk`` - the number of the chunk being validated (from ``1``)
+        * ``column`` - the header of the column being validated, or ``None``
+        * ``elapsed`` - the time (s) since the validation started
+        * ``rows_per_sec`` - the throughput (rows/s), including the columns
+          of the current chunk already validated
+        * ``fraction`` - the fraction of the rows validated, including the
+          columns of the current chunk already validated, or ``None`` if not
+          known
+        * ``eta`` - the estimated time (s) remaining, or ``None`` if not
+          known
+        * ``done`` - whether the validation has finished
+
+        :param now: (Optional) The current ``time.perf_counter()`` time
+        :type now: float
+
+        :return: The progress
+        :rtype: dict
+        """
+        now = now if now is not None else time.perf_counter()
+        elapsed = now - self.start_time
+
+        processed = self.rows + self.chunk_rows * self.column_fraction
+
+        total_rows = self.total_rows
+        if self.done:
+            total_rows = self.rows
+        elif total_rows is None and self.total_bytes is not None and self.bytes:
+            rows_read = self.rows + self.chunk_rows
+            total_rows = rows_read if self.bytes >= self.total_bytes else int(round(rows_read * self.total_bytes / self.bytes))
+
+        rows_per_sec = processed / elapsed if elapsed > 0 else 0.0
+
+        fraction = eta = None
+        if self.done:
+            fraction, eta = 1.0, 0.0
+        elif total_rows:
+            fraction = min(processed / total_rows, 1.0)
+            eta = max(total_rows - processed, 0) / rows_per_sec if rows_per_sec > 0 else None
+
+        return {
+            'file': self.file,
+            'schema_type': self.schema_type,
+            'rows': self.rows,
+            'total_rows': total_rows,
+            'bytes': self.bytes,
+            'total_bytes': self.total_bytes,
+            'chunk': self.chunk,
+            'column': self.column_header,
+            'elapsed': elapsed,
+            'rows_per_sec': rows_per_sec,
+            'fraction': fraction,
+            'eta': eta,
+            'done': self.done
+        }
+
+
+class _NullProgress(object):
+    # A tracker which reports nothing, used when progress is not enabled, so
+    # that the instrumented code does not need to check for a tracker
+
+    def start(self, schema_type=None, file_or_data=None):
+        pass
+
+    def read(self, rows, nbytes=None):
+        pass
+
+    def column(self, header, num, num_columns):
+        pass
+
+    def validated(self, rows):
+        pass
+
+    def finish(self):
+        pass
+
+
+NULL_PROGRESS = _NullProgress()
+
+
+def get_progress(progress: Optional[Union[Callable[[Dict], Any], ValidationProgress]] = None) -> Any:
+    """
+    Returns the progress tracker to be used by a validation - the given
+    tracker, a tracker with the default interval for a callback, or
+    ``NULL_PROGRESS`` if no tracker or callback is given.
+
+    :param progress: (Optional) A tracker or callback
+    :type progress: oedtools.progress.ValidationProgress, callable
+
+    :return: The tracker
+    :rtype: oedtools.progress.ValidationProgress
+    """
+    if not progress:
+        return NULL_PROGRESS
+    if isinstance(progress, (ValidationProgress, _NullProgress)):
+        return progress
+    return ValidationProgress(progress)
+
+
+def _format_seconds(seconds: float) -> str:
+    seconds = int(round(seconds))
+    return '{}:{:02d}:{:02d}'.format(seconds // 3600, (seconds % 3600) // 60, seconds % 60)
+
+
+def format_progress(state: Dict) -> str:
+    """
+    Formats a progress dict (see :py:meth:`ValidationProgress.state`) as a
+    line of text, e.g.
+
+    ::
+
+        200,000/~1,000,000 rows (20.0%) | 30.2/151.1 MiB | chunk 3, BuildingTIV | 41,512 rows/s | ETA 0:00:19
+
+    :param state: The progress
+    :type state: dict
+
+    :return: The line
+    :rtype: str
+    """
+    parts = []
+
+    # The rows shown include the columns of the current chunk already
+    # validated, as the fraction does
+    if state['total_rows'] is not None and state['fraction'] is not None:
+        parts.append('{:,}/{}{:,} rows ({:.1%})'.format(
+            int(state['fraction'] * state['total_rows']),
+            '~' if state['file'] and not state['done'] and state['bytes'] != state['total_bytes'] else '',
+            state['total_rows'],
+            state['fraction']
+        ))
+    else:
+        parts.append('{:,} rows'.format(state['rows']))
+
+    if state['bytes'] is not None and state['total_bytes'] is not None:
+        parts.append('{:.1f}/{:.1f} MiB'.format(state['bytes'] / 2 ** 20, state['total_bytes'] / 2 ** 20))
+
+    if state['done']:
+        parts.append('{:,.0f} rows/s'.format(state['rows_per_sec']))
+        parts.append('done in {}'.format(_format_seconds(state['elapsed'])))
+    else:
+        parts.append('chunk {}{}'.format(state['chunk'], ', {}'.format(state['column']) if state['column'] else ''))
+        parts.append('{:,.0f} rows/s'.format(state['rows_per_sec']))
+        parts.append('ETA {}'.format(_format_seconds(state['eta']) if state['eta'] is not None else '--'))
+
+    return ' | '.join(parts)
+
+
+class ProgressLine(object):
+    """
+    A progress callback which writes the progress (see
+    :py:meth:`format_progress`) to a stream - on a terminal as a single line
+    which is overwritten by each update, and ended when the validation
+    finishes, otherwise, e.g. for a log, as a line per update.
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None):
+        """
+        :param stream: (Optional) The stream (default is ``sys.stderr``)
+        :type stream: file
+        """
+        self.stream = stream
+        self.width = 0
+
+    def isatty(self) -> bool:
+        """
+        Returns whether the stream is a terminal.
+
+        :return: Whether the stream is a terminal
+        :rtype: bool
+        """
+        stream = self.stream or sys.stderr
+        try:
+            return stream.isatty()
+        except (AttributeError, ValueError):
+            return False
+
+    def __call__(self, state: Dict) -> None:
+        stream = self.stream or sys.stderr
+        line = format_progress(state)
+        if self.isatty():
+            stream.write('\r{}{}'.format(line, ' ' * (self.width - len(line))))
+            self.width = len(line)
+            if state['done']:
+                stream.write('\n')
+                self.width = 0
+        else:
+            stream.write('{}\n'.format(line))
+        stream.flush()
@@ -1,17 +1,167 @@
 __all__ = [
-    'get_columns'
+    'get_columns',
+    'get_index',
+    'get_text_index',
+    'INDEXED_FIELDS',
+    'lookup_value',
+    'search_columns'
 ]
 
+import math
+import re
 
+from collections import Counter
+from functools import lru_cache
 from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
     Iterable,
+    List,
     Optional,
+    Tuple,
     Union,
 )
 
 from .schema import (
     get_schema,
+    get_schema_version,
 )
+from .values import lookup_value
+
+
+# Schema fields indexed by ``get_index`` - the fields which are queried by
+# (case insensitive) substrings, and the Python data type, are indexed by
+# their lowercase values
+INDEXED_FIELDS = [
+    'entity',
+    'field_name',
+    'desc',
+    'required',
+    'blank',
+    'default',
+    'py_dtype',
+    'sql_dtype',
+    'numpy_dtype'
+]
+
+_LOWERCASE_FIELDS = ['entity', 'field_name', 'desc', 'py_dtype', 'sql_dtype', 'numpy_dtype']
+
+
+@lru_cache(maxsize=None)
+def _build_index(schema_version: str) -> Dict[str, Any]:
+    schema = get_schema()
+
+    postings = {field: {} for field in INDEXED_FIELDS}
+
+    for key, col_schema in schema.items():
+        for field in INDEXED_FIELDS:
+            value = col_schema[field]
+            if field in _LOWERCASE_FIELDS:
+                value = value.lower()
+            postings[field].setdefault(value, set()).add(key)
+
+    return {
+        'version': schema_version,
+        'schema': schema,
+        'postings': {
+            field: {value: frozenset(keys) for value, keys in field_postings.items()}
+            for field, field_postings in postings.items()
+        }
+    }
+
+
+def get_index() -> Dict[str, Any]:
+    """
+    Returns the inverted index of the master schema, which is built once
+    per schema version. The index is a dict with the keys
+
+    * ``version`` - the schema version
+    * ``schema`` - the master schema
+    * ``postings`` - a dict of posting lists for each of the fields in
+      ``INDEXED_FIELDS``, mapping each distinct field value to the set of
+      keys of the columns with that value
+
+    Column queries are resolved by finding the (few) distinct values of a
+    field which match the filter, and taking the union of their posting
+    lists, and then intersecting the results of the individual filters.
+
+    :return: The master schema index
+    :rtype: dict
+    """
+    return _build_index(get_schema_version())
+
+
+def _lookup(index: Dict[str, Any], field: str, match: Callable[[Any], bool]) -> FrozenSet[Tuple[str, str]]:
+    return frozenset().union(*(
+        keys for value, keys in index['postings'][field].items()
+        if match(value)
+    ))
+
+
+@lru_cache(maxsize=1024)
+def _query(
+    schema_types: Optional[Tuple[str, ...]],
+    headers: Optional[Tuple[str, ...]],
+    descriptions: Optional[Tuple[str, ...]],
+    required: Optional[Union[str, Tuple[str, ...]]],
+    nonnull: Optional[bool],
+    defaults: Optional[Tuple[Union[str, bool, int, float], ...]],
+    python_dtypes: Optional[Tuple[str, ...]],
+    sql_dtypes: Optional[Tuple[str, ...]],
+    numpy_dtypes: Optional[Tuple[str, ...]],
+    schema_version: str
+) -> Tuple[Tuple[str, str], ...]:
+    def substrings(values):
+        _values = [v.lower() for v in values]
+        return lambda field_value: any(v in field_value for v in _values)
+
+    filters = []
+
+    if schema_types:
+        filters.append(('entity', substrings(schema_types)))
+
+    if headers:
+        filters.append(('field_name', substrings(headers)))
+
+    if descriptions:
+        filters.append(('desc', substrings(descriptions)))
+
+    if required is not None:
+        filters.append(('required', lambda v: v in required))
+
+    if nonnull is not None:
+        filters.append(('blank', lambda v: not v == nonnull))
+
+    if defaults:
+        filters.append(('default', lambda v: v is not None and v in defaults))
+
+    if python_dtypes:
+        filters.append(('py_dtype', lambda v: v in python_dtypes))
+
+    if sql_dtypes:
+        filters.append(('sql_dtype', substrings(sql_dtypes)))
+
+    if numpy_dtypes:
+        filters.append(('numpy_dtype', substrings(numpy_dtypes)))
+
+    index = _build_index(schema_version)
+    schema = index['schema']
+
+    keys = frozenset(schema)
+    for field, match in filters:
+        keys = keys.intersection(_lookup(index, field, match))
+        if not keys:
+            break
+
+    return tuple(sorted(keys, key=lambda k: (schema[k]['field_name'].lower(), k[0])))
+
+
+def _as_tuple(arg: Any) -> Any:
+    if arg is None or isinstance(arg, (str, bool)):
+        return arg
+    return tuple(arg)
 
 
 def get_columns(
@@ -78,77 +228,191 @@ def get_columns(
                          ``uint16``, ``uint32``, ``uint64``, ``uint8``
     type numpy_dtypes: list, tuple
 
+    The query is resolved against the index built (once per schema version)
+    by :py:meth:`get_index`, and query results are also cached, so repeated
+    queries do not re-read the schema.
+
     :return: (Possibly empty) sorted list of dicts, one per matching column.
-             Sorting is by header
+             Sorting is by header, and then by schema type (entity)
     :rtype: list
     """
-    master_schema = get_schema()
-    results = list(master_schema.values())
-
     if not any([schema_types, headers, descriptions, required, nonnull, python_dtypes, sql_dtypes, numpy_dtypes]):
         return []
 
-    if schema_types:
-        results = [
-            v for v in results
-            for schema_type in schema_types
-            if schema_type.lower() in v['entity'].lower()
-        ]
+    args = [
+        _as_tuple(arg) for arg in
+        [schema_types, headers, descriptions, required, nonnull, defaults, python_dtypes, sql_dtypes, numpy_dtypes]
+    ]
 
-    if headers:
-        results = [
-            v for v in results
-            for header in headers
-            if header.lower() in v['field_name'].lower()
-        ]
+    # The index and the query results are keyed by the schema version, so
+    # that they are rebuilt if the schemas are updated
+    schema_version = get_schema_version()
 
-    if descriptions:
-        results = [
-            v for v in results
-            for desc in descriptions
-            if desc.lower() in v['desc'].lower()
-        ]
+    try:
+        keys = _query(*args, schema_version)
+    except TypeError:
+        keys = _query.__wrapped__(*args, schema_version)
 
-    if required is not None:
-        results = [
-            v for v in results
-            if v['required'] in required
-        ]
+    schema = _build_index(schema_version)['schema']
 
-    if nonnull is not None:
-        results = [
-            v for v in results
-            if not v['blank'] == nonnull
-        ]
+    return [dict(schema[k]) for k in keys]
 
-    if defaults:
-        results = [
-            v for v in results
-            if v['default'] is not None and v['default'] in defaults
-        ]
 
-    if python_dtypes:
-        results = [
-            v for v in results
-            if v['py_dtype'].lower() in python_dtypes
-        ]
+# BM25 ranking parameters, and the minimum (Dice) trigram similarity of a
+# query token and an indexed token for a partial match
+BM25_K1 = 1.2
+BM25_B = 0.75
+MIN_TRIGRAM_SIMILARITY = 0.5
 
-    if sql_dtypes:
-        results = [
-            v for v in results
-            for sql_dtype in sql_dtypes
-            if sql_dtype.lower() in v['sql_dtype'].lower()
-        ]
 
-    if numpy_dtypes:
-        results = [
-            v for v in results
-            for np_dtype in numpy_dtypes
-            if np_dtype.lower() in v['numpy_dtype'].lower()
-        ]
+def _tokens(text: str) -> List[str]:
+    return re.findall(r'[a-z0-9]+', text.lower())
+
+
+def _trigrams(token: str) -> FrozenSet[str]:
+    padded = '${}$'.format(token)
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+@lru_cache(maxsize=None)
+def _build_text_index(schema_version: str) -> Dict[str, Any]:
+    schema = _build_index(schema_version)['schema']
+
+    postings = {}
+    doc_lengths = {}
+
+    for key, col_schema in schema.items():
+        tokens = _tokens(col_schema['desc'])
+        doc_lengths[key] = len(tokens)
+        for token, freq in Counter(tokens).items():
+            postings.setdefault(token, {})[key] = freq
+
+    trigrams = {}
+    for token in postings:
+        for trigram in _trigrams(token):
+            trigrams.setdefault(trigram, set()).add(token)
+
+    return {
+        'version': schema_version,
+        'postings': postings,
+        'trigrams': {trigram: frozenset(tokens) for trigram, tokens in trigrams.items()},
+        'doc_lengths': doc_lengths,
+        'avg_doc_length': (sum(doc_lengths.values()) / len(doc_lengths)) if doc_lengths else 0
+    }
+
+
+def get_text_index() -> Dict[str, Any]:
+    """
+    Returns the full-text index of the column descriptions in the master
+    schema, which is built once per schema version. The index is a dict
+    with the keys
+
+    * ``version`` - the schema version
+    * ``postings`` - a dict mapping each (lowercase alphanumeric) description
+      token to a dict of the keys of the columns whose descriptions contain
+      the token, and the token frequencies
+    * ``trigrams`` - a dict mapping each character trigram of the tokens
+      (padded with ``$``) to the set of tokens containing it, for partial
+      matching of query tokens
+    * ``doc_lengths`` - the number of tokens in each column description
+    * ``avg_doc_length`` - the average number of tokens per description
+
+    :return: The full-text description index
+    :rtype: dict
+    """
+    return _build_text_index(get_schema_version())
 
-    keys = sorted(set([(r['entity'].lower(), r['field_name'].lower()) for r in results]), key=lambda r: r[1])
 
-    results = [master_schema[k] for k in keys]
+def _expand_token(token: str, index: Dict[str, Any]) -> Dict[str, float]:
+    if token in index['postings']:
+        return {token: 1.0}
+
+    query_trigrams = _trigrams(token)
+    candidates = Counter(
+        indexed_token
+        for trigram in query_trigrams
+        for indexed_token in index['trigrams'].get(trigram, ())
+    )
+
+    expansions = {}
+    for indexed_token, shared in candidates.items():
+        similarity = 2 * shared / (len(query_trigrams) + len(_trigrams(indexed_token)))
+        if similarity >= MIN_TRIGRAM_SIMILARITY:
+            expansions[indexed_token] = similarity
+
+    return expansions
+
+
+@lru_cache(maxsize=1024)
+def _search(query: str, schema_version: str) -> Tuple[Tuple[Tuple[str, str], float], ...]:
+    index = _build_text_index(schema_version)
+    schema = _build_index(schema_version)['schema']
+
+    num_docs = len(index['doc_lengths'])
+    avg_doc_length = index['avg_doc_length'] or 1
+
+    scores = Counter()
+
+    for token in set(_tokens(query)):
+        for indexed_token, similarity in _expand_token(token, index).items():
+            token_postings = index['postings'][indexed_token]
+            idf = math.log(1 + (num_docs - len(token_postings) + 0.5) / (len(token_postings) + 0.5))
+            for key, freq in token_postings.items():
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * index['doc_lengths'][key] / avg_doc_length)
+                scores[key] += similarity * idf * freq * (BM25_K1 + 1) / (freq + norm)
+
+    return tuple(sorted(
+        scores.items(),
+        key=lambda it: (-it[1], schema[it[0]]['field_name'].lower(), it[0][0])
+    ))
+
+
+def search_columns(
+    query: str,
+    schema_types: Optional[Iterable[str]] = None,
+    limit: Optional[int] = None
+) -> list:
+    """
+    Searches the column descriptions in the master schema, and returns the
+    matching columns ranked by relevance. The query is split into
+    (lowercase alphanumeric) tokens, and columns are ranked by the BM25
+    scores of their descriptions for the query tokens. Query tokens which
+    do not occur in any description, e.g. partial words or misspellings,
+    are matched to similar description tokens by character trigrams, with
+    the scores weighted by the similarity.
+
+    The search is resolved against the full-text index built by
+    :py:meth:`get_text_index`, and search results are cached.
+
+    :param query: The search query, e.g. ``flood deductible``
+    :type query: str
+
+    :param schema_types: (Optional) List or tuple of schema types - chosen
+                         from ``acc``, ``loc``, ``reinsinfo``, ``reinsscope``
+    :type schema_types: list, tuple
+
+    :param limit: (Optional) The maximum number of results
+    :type limit: int
+
+    :return: (Possibly empty) list of dicts, one per matching column, in
+             order of decreasing relevance. Each dict is the column schema
+             with an additional ``score`` key
+    :rtype: list
+    """
+    schema_version = get_schema_version()
+
+    schema = _build_index(schema_version)['schema']
+
+    results = _search(query, schema_version)
+
+    if schema_types:
+        _schema_types = [schema_type.lower() for schema_type in schema_types]
+        results = [
+            (key, score) for key, score in results
+            if any(schema_type in key[0] for schema_type in _schema_types)
+        ]
 
-    return results
+    return [
+        {**schema[key], **{'score': round(score, 6)}}
+        for key, score in results[:limit]
+    ]
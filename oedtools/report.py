@@ -1,15 +1,42 @@
 __all__ = [
+    'aggregate_errors',
+    'AGGREGATE_REPORT_FIELDS',
+    'chunk_errors',
+    'DEFAULT_BUFFER_SIZE',
+    'DEFAULT_NUM_EXAMPLES',
+    'file_errors',
+    'format_aggregate_text_line',
+    'format_rule_costs',
+    'format_text_line',
+    'header_errors',
+    'REPORT_FIELDS',
+    'REPORT_FORMATS',
     'report_file',
-    'report_headers'
+    'report_headers',
+    'write_report'
 ]
 
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+import time
+
+from contextlib import contextmanager
 from itertools import (
     chain,
     product,
 )
 from typing import (
+    Any,
+    Callable,
+    Dict,
     Generator,
     Iterable,
+    Optional,
+    TextIO,
     Union,
 )
 
@@ -20,13 +47,35 @@ from .exceptions import (
     ProcessError,
     ReportingError,
 )
-from .validate import OedValidator
+from .metrics import record_report
+from .profiling import (
+    NULL_PROFILE,
+    ValidationProfile,
+)
+from .progress import ValidationProgress
+from .tracing import (
+    get_profile,
+    span,
+)
+from .utils import DEFAULT_CHUNKSIZE
 
 
-def report_headers(schema_type: str, file_or_headers: Union[str, Iterable[str]]) -> Union[Generator[str, None, None], None]:
+REPORT_FIELDS = ['file', 'row', 'column_pos', 'header', 'value', 'code', 'code_desc', 'msg']
+
+AGGREGATE_REPORT_FIELDS = ['file', 'start_row', 'end_row', 'count', 'column_pos', 'header', 'code', 'code_desc', 'examples']
+
+REPORT_FORMATS = ['text', 'jsonl', 'csv']
+
+DEFAULT_NUM_EXAMPLES = 3
+
+DEFAULT_BUFFER_SIZE = 2 ** 20
+
+
+def header_errors(schema_type: str, file_or_headers: Union[str, Iterable[str]]) -> Generator[Dict, None, None]:
     """
-    Generates a validation report for the column headers in an OED input file
-    or list or tuple of column headers.
+    Generates the errors for the column headers in an OED input file or list
+    or tuple of column headers, as report records - dicts with the keys
+    defined in ``REPORT_FIELDS``.
 
     :param schema_type: The file schema type (``loc``, ``acc``, ``reinsinfo``
                         or ``reinsscope``).
@@ -36,35 +85,76 @@ def report_headers(schema_type: str, file_or_headers: Union[str, Iterable[str]])
                             headers
     :type file_or_headers: str, list, tuple
     """
-    errors = None
+    from .validate import OedValidator
+
+    fp = '{}'.format(file_or_headers) if isinstance(file_or_headers, str) else ''
     try:
         for col_res, row_num, col_err in chain(
             (col_res, row_num, col_err) for col_res in OedValidator().validate_headers(schema_type, file_or_headers)
             for col_res, (row_num, col_err) in product([col_res], col_res['exceptions'])
             if col_res['pass'] is False
         ):
-            errors = True
-            line = (
-                '{}:{}:{}: {}: {}\n'
-                .format(
-                    '{}'.format(file_or_headers) if isinstance(file_or_headers, str) else '',
-                    row_num,
-                    col_res['column_pos'],
-                    col_err.msg,
-                    col_err
-                )
-            )
-            yield line
-        if not errors:
-            return
+            yield {
+                'file': fp,
+                'row': row_num,
+                'column_pos': col_res['column_pos'],
+                'header': col_res['header'],
+                'value': None,
+                'code': col_err.code,
+                'code_desc': col_err.code_desc,
+                'msg': col_err.msg
+            }
     except ProcessError as e:
         raise_with_traceback(ReportingError('Error while generating header validation report: {}'.format(e)))
 
 
-def report_file(schema_type: str, file_or_data: Union[str, Iterable[dict]]) -> Union[Generator[str, None, None], None]:
+def chunk_errors(chunk_res, fp: Optional[str] = '', order: Optional[str] = 'column') -> Generator[Dict, None, None]:
     """
-    Generates a validation report for the column headers and data in an OED
-    input file or list or tuple of column headers.
+    Generates the errors in the validation results for a file chunk, as
+    yielded by :py:meth:`oedtools.validate.OedValidator.validate_chunks`, as
+    report records - dicts with the keys defined in ``REPORT_FIELDS``.
+
+    :param chunk_res: The chunk validation results
+    :type chunk_res: oedtools.results.ValidationResults
+
+    :param fp: (Optional) The file path for the records (default is ``''``)
+    :type fp: str
+
+    :param order: (Optional) The order of the errors - ``column`` (default)
+                  or ``row``
+    :type order: str
+    """
+    for row_num, col_idx, value, col_err in chunk_res.iter_errors(order=order):
+        yield {
+            'file': fp,
+            'row': row_num,
+            'column_pos': int(chunk_res.column_pos[col_idx]),
+            'header': chunk_res.headers[col_idx],
+            'value': value,
+            'code': col_err.code,
+            'code_desc': col_err.code_desc,
+            'msg': col_err.msg
+        }
+
+
+def file_errors(
+    schema_type: str,
+    file_or_data: Union[str, Iterable[dict]],
+    chunksize: Optional[int] = DEFAULT_CHUNKSIZE,
+    progress: Optional[Union[bool, Callable[[Dict], Any], ValidationProgress]] = False,
+    order: Optional[str] = 'column',
+    check_cr: Optional[bool] = False,
+    check_rules: Optional[bool] = False,
+    rules_fp: Optional[str] = None,
+    rule_costs: Optional[Dict[str, Dict]] = None,
+    profile: Optional[ValidationProfile] = None
+) -> Generator[Dict, None, None]:
+    """
+    Generates the errors for the column headers and data in an OED input
+    file or list or tuple of column headers, as report records - dicts with
+    the keys defined in ``REPORT_FIELDS``. The data is validated in chunks,
+    and the records for each chunk are generated as soon as the chunk has
+    been validated, so only one chunk is held in memory at any time.
 
     :param schema_type: The file schema type (``loc``, ``acc``, ``reinsinfo`` or
                       ``reinsscope``).
@@ -72,27 +162,441 @@ def report_file(schema_type: str, file_or_data: Union[str, Iterable[dict]]) -> U
 
     :param file_or_data: An OED input file path or dict array of rows
     :type file_or_data: str, list, tuple
+
+    :param chunksize: (Optional) The maximum number of rows validated at a
+                      time (default is ``DEFAULT_CHUNKSIZE``)
+    :type chunksize: int
+
+    :param progress: (Optional) Whether to write the number of rows
+                     processed, and the processing rate (rows/s), to
+                     ``stderr`` as each chunk is validated (default is
+                     ``False``), or a progress tracker or callback (see
+                     :py:meth:`oedtools.validate.OedValidator.validate_chunks`),
+                     for the rows and bytes processed, the current chunk
+                     and column, the throughput and the estimated time
+                     remaining
+    :type progress: bool, oedtools.progress.ValidationProgress, callable
+
+    :param order: (Optional) The order of the errors in each chunk -
+                  ``column`` (default), for header errors followed by data
+                  errors column by column, or ``row``, for errors in row
+                  order. As chunks are validated in row order a ``row``
+                  ordered report is row ordered for the whole file.
+    :type order: str
+
+    :param check_cr: (Optional) Whether to check the conditionally required
+                     (``CR``) columns (default is ``False``)
+    :type check_cr: bool
+
+    :param check_rules: (Optional) Whether to check the cross-column row
+                        rules (default is ``False``)
+    :type check_rules: bool
+
+    :param rules_fp: (Optional) The row rules file path (default is
+                     ``oedtools.rules.ROW_RULES_FP``)
+    :type rules_fp: str
+
+    :param rule_costs: (Optional) A dict in which the evaluation costs of the
+                       row rules are accumulated, by rule name
+    :type rule_costs: dict
+
+    :param profile: (Optional) A profile in which the times and row counts
+                    of the validation stages, and of the validation of each
+                    column, are accumulated (see
+                    :py:class:`oedtools.profiling.ValidationProfile`) - the
+                    generation of the records of each chunk is timed as the
+                    ``report`` stage, with the number of records as the
+                    number of rows
+    :type profile: oedtools.profiling.ValidationProfile
     """
-    errors = None
+    if order not in ['column', 'row']:
+        raise ReportingError('"{}" is not a valid report order - "column" or "row" is expected'.format(order))
+
+    from .validate import OedValidator
+
+    fp = '{}'.format(file_or_data) if isinstance(file_or_data, str) else ''
+    profile = get_profile(profile, file=(fp or None), schema_type=schema_type)
+    start = time.time()
+    num_rows = 0
     try:
-        for col_res, row_num, col_err in chain(
-            (col_res, row_num, col_err) for col_res in OedValidator().validate(schema_type, file_or_data)[0]
-            for col_res, (row_num, col_err) in product([col_res], col_res['exceptions'])
-            if col_res['pass'] is False
+        for chunk_res in OedValidator().validate_chunks(
+            schema_type,
+            file_or_data,
+            chunksize=chunksize,
+            check_cr=check_cr,
+            check_rules=check_rules,
+            rules_fp=rules_fp,
+            rule_costs=rule_costs,
+            profile=profile,
+            progress=(progress if not isinstance(progress, bool) else None)
         ):
-            errors = True
-            line = (
-                '{}:{}:{}: {}: {}\n'
-                .format(
-                    '{}'.format(file_or_data) if isinstance(file_or_data, str) else '',
-                    row_num,
-                    col_res['column_pos'],
-                    col_err.msg,
-                    col_err
+            if profile is NULL_PROFILE:
+                for record in chunk_errors(chunk_res, fp=fp, order=order):
+                    yield record
+            else:
+                # The records of the chunk are generated before they are
+                # yielded, so that only their generation is timed
+                with profile.stage('report') as stage:
+                    records = list(chunk_errors(chunk_res, fp=fp, order=order))
+                    stage['rows'] = len(records)
+                for record in records:
+                    yield record
+            num_rows += chunk_res.num_rows
+            if progress is True:
+                elapsed = time.time() - start
+                sys.stderr.write(
+                    '\r{} rows processed ({:.0f} rows/s)'
+                    .format(num_rows, num_rows / elapsed if elapsed else 0)
                 )
-            )
-            yield line
-        if not errors:
-            return
+                sys.stderr.flush()
+        if progress is True:
+            sys.stderr.write('\n')
     except ProcessError as e:
         raise_with_traceback(ReportingError('Error while generating validation report: {}'.format(e)))
+
+
+def format_text_line(record: Dict) -> str:
+    """
+    Formats a report record as a line of text of the form
+    ``<file>:<row>:<column pos.>: <error message>: <OED error>``.
+
+    :param record: The report record
+    :type record: dict
+
+    :return: The report line
+    :rtype: str
+    """
+    return '{}:{}:{}: {}: OED error: {} {}\n'.format(
+        record['file'],
+        record['row'],
+        record['column_pos'],
+        record['msg'],
+        record['code'],
+        record['code_desc']
+    )
+
+
+def aggregate_errors(records: Iterable[Dict], num_examples: Optional[int] = DEFAULT_NUM_EXAMPLES) -> Generator[Dict, None, None]:
+    """
+    Aggregates report records, as generated by :py:meth:`header_errors` or
+    :py:meth:`file_errors`, by collapsing consecutive rows with the same
+    column and error code into row ranges. Each aggregated record has the
+    fields defined in ``AGGREGATE_REPORT_FIELDS`` - the start and end rows
+    of the range, the number of rows, and up to ``num_examples`` distinct
+    example values.
+
+    The aggregation is streamed - only the currently open range for each
+    (column, error code) pair is held in memory, and a range is generated as
+    soon as the next error for that pair is not in the next row. So ranges
+    are generated in the order in which they are closed, rather than by row.
+
+    :param records: The report records
+    :type records: list, tuple, generator
+
+    :param num_examples: (Optional) The maximum number of example values
+                         for each range (default is ``DEFAULT_NUM_EXAMPLES``)
+    :type num_examples: int
+    """
+    runs = {}
+
+    for record in records:
+        key = (record['column_pos'], record['header'], record['code'])
+        run = runs.get(key)
+
+        if run is not None and record['row'] == run['end_row'] + 1:
+            run['end_row'] = record['row']
+            run['count'] += 1
+        else:
+            if run is not None:
+                yield run
+            run = runs[key] = {
+                'file': record['file'],
+                'start_row': record['row'],
+                'end_row': record['row'],
+                'count': 1,
+                'column_pos': record['column_pos'],
+                'header': record['header'],
+                'code': record['code'],
+                'code_desc': record['code_desc'],
+                'examples': []
+            }
+
+        value = record['value']
+        if value is not None and len(run['examples']) < num_examples and value not in run['examples']:
+            run['examples'].append(value)
+
+    for run in runs.values():
+        yield run
+
+
+def format_aggregate_text_line(record: Dict) -> str:
+    """
+    Formats an aggregated report record as a line of text of the form
+    ``<file>:<start row>-<end row>:<column pos.>: <num. rows> row(s) in
+    <header>: <OED error>: e.g. <example values>``.
+
+    :param record: The aggregated report record
+    :type record: dict
+
+    :return: The report line
+    :rtype: str
+    """
+    return '{}:{}-{}:{}: {} row(s) in "{}": OED error: {} {}{}\n'.format(
+        record['file'],
+        record['start_row'],
+        record['end_row'],
+        record['column_pos'],
+        record['count'],
+        record['header'],
+        record['code'],
+        record['code_desc'],
+        ': e.g. {}'.format(', '.join('"{}"'.format(v) for v in record['examples'])) if record['examples'] else ''
+    )
+
+
+def format_rule_costs(costs: Dict[str, Dict]) -> str:
+    """
+    Formats the evaluation costs of the cross-column row rules, as
+    accumulated by :py:meth:`file_errors`, as a table of the rules, in
+    descending order of cost, with the number of rows evaluated, the number
+    of failures, the total time and the time per million rows.
+
+    :param costs: The rule costs, by rule name
+    :type costs: dict
+
+    :return: The table
+    :rtype: str
+    """
+    width = max([len('rule')] + [len(name) for name in costs])
+    lines = ['{:<{w}}  {:>10}  {:>10}  {:>10}  {:>12}\n'.format('rule', 'rows', 'failures', 'seconds', 'ms/1M rows', w=width)]
+
+    for name, cost in sorted(costs.items(), key=lambda c: -c[1]['seconds']):
+        lines.append('{:<{w}}  {:>10}  {:>10}  {:>10.4f}  {:>12.2f}\n'.format(
+            name,
+            cost['rows'],
+            cost['failures'],
+            cost['seconds'],
+            (cost['seconds'] * 1e9 / cost['rows']) if cost['rows'] else 0,
+            w=width
+        ))
+
+    return ''.join(lines)
+
+
+def report_headers(schema_type: str, file_or_headers: Union[str, Iterable[str]]) -> Union[Generator[str, None, None], None]:
+    """
+    Generates a validation report for the column headers in an OED input file
+    or list or tuple of column headers.
+
+    :param schema_type: The file schema type (``loc``, ``acc``, ``reinsinfo``
+                        or ``reinsscope``).
+    :type schema_type: str
+
+    :param file_or_headers: An OED input file path or dict array of column
+                            headers
+    :type file_or_headers: str, list, tuple
+    """
+    for record in header_errors(schema_type, file_or_headers):
+        yield format_text_line(record)
+
+
+def report_file(
+    schema_type: str,
+    file_or_data: Union[str, Iterable[dict]],
+    chunksize: Optional[int] = DEFAULT_CHUNKSIZE,
+    progress: Optional[Union[bool, Callable[[Dict], Any], ValidationProgress]] = False,
+    order: Optional[str] = 'column',
+    aggregate: Optional[bool] = False,
+    profile: Optional[ValidationProfile] = None
+) -> Union[Generator[str, None, None], None]:
+    """
+    Generates a validation report for the column headers and data in an OED
+    input file or list or tuple of column headers. The data is validated in
+    chunks, and the report lines for each chunk are generated as soon as the
+    chunk has been validated, so only one chunk is held in memory at any
+    time.
+
+    :param schema_type: The file schema type (``loc``, ``acc``, ``reinsinfo`` or
+                      ``reinsscope``).
+    :type schema_type: str
+
+    :param file_or_data: An OED input file path or dict array of rows
+    :type file_or_data: str, list, tuple
+
+    :param chunksize: (Optional) The maximum number of rows validated at a
+                      time (default is ``DEFAULT_CHUNKSIZE``)
+    :type chunksize: int
+
+    :param progress: (Optional) Whether to write the number of rows
+                     processed, and the processing rate (rows/s), to
+                     ``stderr`` as each chunk is validated (default is
+                     ``False``), or a progress tracker or callback (see
+                     :py:meth:`file_errors`)
+    :type progress: bool, oedtools.progress.ValidationProgress, callable
+
+    :param order: (Optional) The order of the errors - ``column`` (default)
+                  or ``row`` (see :py:meth:`file_errors`)
+    :type order: str
+
+    :param aggregate: (Optional) Whether to collapse errors in consecutive
+                      rows with the same column and error code into row
+                      ranges (see :py:meth:`aggregate_errors`) (default is
+                      ``False``)
+    :type aggregate: bool
+
+    :param profile: (Optional) A profile in which the times and row counts
+                    of the validation stages are accumulated (see
+                    :py:meth:`file_errors`) - the formatting of the report
+                    lines is also timed as the ``report`` stage
+    :type profile: oedtools.profiling.ValidationProfile
+    """
+    records = file_errors(schema_type, file_or_data, chunksize=chunksize, progress=progress, order=order, profile=profile)
+
+    profile = profile or NULL_PROFILE
+
+    if aggregate:
+        format_line = profile.timed('report', format_aggregate_text_line)
+        for record in aggregate_errors(records):
+            yield format_line(record)
+    else:
+        format_line = profile.timed('report', format_text_line)
+        for record in records:
+            yield format_line(record)
+
+
+@contextmanager
+def _open_report_stream(
+    output_fp: Optional[str] = None,
+    compress: Optional[bool] = False,
+    buffer_size: Optional[int] = DEFAULT_BUFFER_SIZE
+) -> Generator[TextIO, None, None]:
+    """
+    Opens a buffered text stream for writing a report to a file, or to
+    standard output, with optional gzip compression. Standard output streams
+    without an underlying binary buffer (e.g. ``io.StringIO`` replacements)
+    are written to directly, and cannot be compressed.
+    """
+    if output_fp is None:
+        try:
+            raw = sys.stdout.buffer
+        except AttributeError:
+            if compress:
+                raise ReportingError('Compressed reports cannot be written to a non-binary standard output')
+            yield sys.stdout
+            sys.stdout.flush()
+            return
+        sys.stdout.flush()
+    else:
+        try:
+            raw = io.open(os.path.abspath(output_fp), 'wb')
+        except (IOError, OSError) as e:
+            raise_with_traceback(ReportingError('Error opening report file "{}": {}'.format(output_fp, e)))
+
+    try:
+        binary = gzip.GzipFile(fileobj=raw, mode='wb') if compress else raw
+        stream = io.TextIOWrapper(io.BufferedWriter(binary, buffer_size=buffer_size), encoding='utf-8', newline='')
+        try:
+            yield stream
+        finally:
+            stream.flush()
+            stream.detach().detach()
+            if compress:
+                binary.close()
+    finally:
+        if output_fp is None:
+            raw.flush()
+        else:
+            raw.close()
+
+
+def write_report(
+    records: Iterable[Dict],
+    output_fp: Optional[str] = None,
+    report_format: Optional[str] = 'text',
+    compress: Optional[bool] = False,
+    buffer_size: Optional[int] = DEFAULT_BUFFER_SIZE,
+    aggregate: Optional[bool] = False,
+    profile: Optional[ValidationProfile] = None
+) -> int:
+    """
+    Writes report records, as generated by :py:meth:`header_errors` or
+    :py:meth:`file_errors`, to a file or to standard output, as text lines
+    (``text``), JSON lines (``jsonl``) or CSV (``csv``), with optional gzip
+    compression. The output is written through a buffer of a given size
+    rather than line by line. The number of records written, and the
+    writing time, are recorded in the process metrics (see
+    :py:mod:`oedtools.metrics`).
+
+    :param records: The report records
+    :type records: list, tuple, generator
+
+    :param output_fp: (Optional) The target file path - if not set the report
+                      is written to standard output
+    :type output_fp: str
+
+    :param report_format: (Optional) The report format - ``text`` (default),
+                          ``jsonl`` or ``csv``
+    :type report_format: str
+
+    :param compress: (Optional) Whether to gzip compress the output (default
+                     is ``False``)
+    :type compress: bool
+
+    :param buffer_size: (Optional) The output buffer size in bytes (default
+                        is ``DEFAULT_BUFFER_SIZE``)
+    :type buffer_size: int
+
+    :param aggregate: (Optional) Whether to aggregate the records into row
+                      ranges (see :py:meth:`aggregate_errors`) before
+                      writing (default is ``False``)
+    :type aggregate: bool
+
+    :param profile: (Optional) A profile in which the time to format the
+                    records is accumulated, as the ``report`` stage (see :py:class:`oedtools.profiling.ValidationProfile`)
+    :type profile: oedtools.profiling.ValidationProfile
+
+    :return: The number of records written
+    :rtype: int
+    """
+    if report_format not in REPORT_FORMATS:
+        raise ReportingError(
+            '"{}" is not a valid report format - one of "text", "jsonl" or '
+            '"csv" is expected'.format(report_format)
+        )
+
+    if aggregate:
+        records = aggregate_errors(records)
+        fields, format_text = AGGREGATE_REPORT_FIELDS, format_aggregate_text_line
+    else:
+        fields, format_text = REPORT_FIELDS, format_text_line
+
+    profile = profile or NULL_PROFILE
+
+    num_records = 0
+    start = time.perf_counter()
+
+    with span('write_report', format=report_format, output_file=output_fp) as span_attrs:
+        with _open_report_stream(output_fp=output_fp, compress=compress, buffer_size=buffer_size) as stream:
+            if report_format == 'csv':
+                writer = csv.DictWriter(stream, fieldnames=fields, extrasaction='ignore', lineterminator='\n')
+                writer.writeheader()
+                writerow = profile.timed('report', writer.writerow)
+                for record in records:
+                    if aggregate:
+                        record = {**record, **{'examples': json.dumps(record['examples'], default=str)}}
+                    writerow(record)
+                    num_records += 1
+            else:
+                fmt = (
+                    format_text if report_format == 'text'
+                    else (lambda r: json.dumps(r, default=str) + '\n')
+                )
+                fmt = profile.timed('report', fmt)
+                for record in records:
+                    stream.write(fmt(record))
+                    num_records += 1
+        span_attrs['records'] = num_records
+
+    record_report(report_format, num_records, time.perf_counter() - start)
+
+    return num_records
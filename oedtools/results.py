@@ -0,0 +1,377 @@
+__all__ = [
+    'ValidationResults'
+]
+
+import builtins
+import heapq
+
+from typing import (
+    Any,
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import numpy as np
+import pandas as pd
+
+from .exceptions import (
+    DATA_ERROR_MSGS,
+    get_data_error,
+    OedError,
+    ProcessError,
+)
+from .schema import get_column_schema
+
+
+class ValidationResults(object):
+    """
+    A columnar store of the errors found when validating an OED input file,
+    as an alternative to the nested dict array returned by
+    :py:meth:`oedtools.validate.OedValidator.validate`. Errors are stored as
+    parallel Numpy arrays - the (file) row number, the index of the column
+    in the list of validated headers, the OED error code, and the (parsed)
+    value for data errors - so that filtering and aggregation are
+    vectorized.
+
+    Header errors (including missing required columns) are stored with row
+    number ``1``, which is the header line of the file, and a ``None``
+    value.
+    """
+
+    def __init__(
+        self,
+        schema_type: str,
+        header_results: List[Dict],
+        rows: Union[Iterable[int], np.ndarray],
+        columns: Union[Iterable[int], np.ndarray],
+        codes: Union[Iterable[str], np.ndarray],
+        values: Union[Iterable[Any], np.ndarray],
+        num_rows: Optional[int] = None
+    ):
+        """
+        :param schema_type: The file schema type (``loc``, ``acc``,
+                            ``reinsinfo`` or ``reinsscope``)
+        :type schema_type: str
+
+        :param header_results: The header validation results, one dict per
+                               header, as yielded by
+                               :py:meth:`oedtools.validate.OedValidator.validate_headers`
+        :type header_results: list
+
+        :param rows: The row numbers of the errors
+        :type rows: list, tuple, np.ndarray
+
+        :param columns: The indices of the error columns in ``header_results``
+        :type columns: list, tuple, np.ndarray
+
+        :param codes: The OED error codes
+        :type codes: list, tuple, np.ndarray
+
+        :param values: The (parsed) values with errors
+        :type values: list, tuple, np.ndarray
+
+        :param num_rows: (Optional) The number of data rows validated
+        :type num_rows: int
+        """
+        self.schema_type = schema_type
+        self.header_results = header_results
+        self.headers = [r['header'] for r in header_results]
+        self.column_pos = np.array([r['column_pos'] for r in header_results], dtype=np.int64)
+
+        self.rows = np.asarray(rows, dtype=np.int64)
+        self.columns = np.asarray(columns, dtype=np.int32)
+        self.codes = np.asarray(codes, dtype=str)
+        if isinstance(values, np.ndarray) and values.dtype == object:
+            self.values = values
+        else:
+            self.values = np.empty(len(self.rows), dtype=object)
+            self.values[:] = list(values)
+
+        self.num_rows = num_rows
+
+        self._exp_dtypes = {}
+
+    @classmethod
+    def concat(cls, results: Iterable['ValidationResults']) -> 'ValidationResults':
+        """
+        Concatenates a sequence of results for the same file, e.g. the chunk
+        results yielded by
+        :py:meth:`oedtools.validate.OedValidator.validate_chunks`.
+
+        :param results: The results to concatenate
+        :type results: list, tuple, generator
+
+        :return: The concatenated results
+        :rtype: ValidationResults
+        """
+        results = list(results)
+
+        if not results:
+            raise ProcessError('No validation results to concatenate')
+
+        return cls(
+            results[0].schema_type,
+            results[0].header_results,
+            np.concatenate([r.rows for r in results]),
+            np.concatenate([r.columns for r in results]),
+            np.concatenate([r.codes for r in results]),
+            np.concatenate([r.values for r in results]),
+            num_rows=(
+                sum(r.num_rows for r in results) if all(r.num_rows is not None for r in results)
+                else None
+            )
+        )
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __repr__(self) -> str:
+        return '<{} schema_type="{}" columns={} errors={}>'.format(
+            self.__class__.__name__, self.schema_type, len(self.headers), len(self)
+        )
+
+    @property
+    def overall_pass(self) -> bool:
+        """
+        Whether the validation found no errors.
+        """
+        return len(self) == 0
+
+    def _column_indices(self, headers: Iterable[str]) -> List[int]:
+        _headers = set(h.lower() for h in headers)
+        return [i for i, h in enumerate(self.headers) if h.lower() in _headers]
+
+    def _take(self, mask: np.ndarray) -> 'ValidationResults':
+        return self.__class__(
+            self.schema_type,
+            self.header_results,
+            self.rows[mask],
+            self.columns[mask],
+            self.codes[mask],
+            self.values[mask],
+            num_rows=self.num_rows
+        )
+
+    def filter(
+        self,
+        headers: Optional[Iterable[str]] = None,
+        codes: Optional[Iterable[str]] = None,
+        rows: Optional[Tuple[int, int]] = None
+    ) -> 'ValidationResults':
+        """
+        Filters the errors by column headers (case insensitive), error codes,
+        and a row number range - multiple filters are combined into an "AND"
+        query.
+
+        :param headers: (Optional) Column headers
+        :type headers: list, tuple, set
+
+        :param codes: (Optional) OED error codes, e.g. ``E351``
+        :type codes: list, tuple, set
+
+        :param rows: (Optional) A pair ``(start, stop)`` of row numbers - as
+                     with ``range`` the stop row is excluded
+        :type rows: tuple
+
+        :return: The filtered results
+        :rtype: ValidationResults
+        """
+        mask = np.ones(len(self), dtype=bool)
+
+        if headers is not None:
+            mask &= np.isin(self.columns, self._column_indices([headers] if isinstance(headers, str) else headers))
+
+        if codes is not None:
+            mask &= np.isin(self.codes, [codes] if isinstance(codes, str) else list(codes))
+
+        if rows is not None:
+            start, stop = rows
+            mask &= (self.rows >= start) & (self.rows < stop)
+
+        return self._take(mask)
+
+    def by_column(self, *headers: str) -> 'ValidationResults':
+        """
+        Filters the errors by column header(s).
+        """
+        return self.filter(headers=headers)
+
+    def by_code(self, *codes: str) -> 'ValidationResults':
+        """
+        Filters the errors by OED error code(s).
+        """
+        return self.filter(codes=codes)
+
+    def by_rows(self, start: int, stop: int) -> 'ValidationResults':
+        """
+        Filters the errors by row number range (``stop`` is excluded).
+        """
+        return self.filter(rows=(start, stop))
+
+    def counts(self, by: Optional[str] = 'code') -> Dict[Union[str, int], int]:
+        """
+        Error counts by error code (``code``), column header (``header``) or
+        row number (``row``).
+
+        :param by: (Optional) The error attribute to count by (default is
+                   ``code``)
+        :type by: str
+
+        :return: Error counts
+        :rtype: dict
+        """
+        if by == 'code':
+            keys, counts = np.unique(self.codes, return_counts=True)
+            keys = keys.tolist()
+        elif by == 'header':
+            idxs, counts = np.unique(self.columns, return_counts=True)
+            keys = [self.headers[i] for i in idxs]
+        elif by == 'row':
+            keys, counts = np.unique(self.rows, return_counts=True)
+            keys = keys.tolist()
+        else:
+            raise ProcessError('Errors can only be counted by "code", "header" or "row"')
+
+        return dict(zip(keys, counts.tolist()))
+
+    def get_error(self, col_idx: int, code: str, value: Optional[Any] = None) -> OedError:
+        """
+        Returns the OED error (exception) for a stored error, given the column
+        index, error code and value. Header errors are taken from the header
+        results, and data errors are regenerated from the column schema.
+
+        :param col_idx: The column index
+        :type col_idx: int
+
+        :param code: The OED error code
+        :type code: str
+
+        :param value: (Optional) The value - only applicable to data errors
+        :type value: int, float, str, None
+
+        :return: The OED error
+        :rtype: OedError
+        """
+        header = self.headers[col_idx]
+
+        if code not in DATA_ERROR_MSGS:
+            return next(e for _, e in self.header_results[col_idx]['exceptions'] if e.code == code)
+
+        try:
+            exp_dtype = self._exp_dtypes[col_idx]
+        except KeyError:
+            exp_dtype = self._exp_dtypes[col_idx] = getattr(builtins, get_column_schema(self.schema_type, header)['py_dtype'])
+
+        return get_data_error(code, header, value, exp_dtype)
+
+    def _column_slices(self) -> Tuple[np.ndarray, np.ndarray]:
+        # The error indices ordered by column, and by row within a column -
+        # the errors of a column are not necessarily stored in row order,
+        # e.g. the CR and row rule errors of a chunk follow its data errors
+        order = np.lexsort((self.rows, self.columns))
+        bounds = np.searchsorted(self.columns[order], np.arange(len(self.headers) + 1))
+
+        return order, bounds
+
+    def iter_errors(self, order: Optional[str] = 'column') -> Generator[Tuple[int, int, Any, OedError], None, None]:
+        """
+        Generates the errors, as tuples of row number, column index, value and
+        OED error, either in the stored order (``column``) - for a file chunk
+        this is the header errors followed by the data errors column by
+        column - or in row order (``row``). Row order is generated by a k-way
+        heap merge of the error streams of the individual columns, each
+        sorted by row, with errors in the same row in column order, so the
+        heap only ever holds one error per column.
+
+        :param order: (Optional) The error order - ``column`` (default) or
+                      ``row``
+        :type order: str
+
+        :return: A generator of errors
+        :rtype: generator
+        """
+        rows, columns, codes = self.rows.tolist(), self.columns.tolist(), self.codes.tolist()
+
+        if order == 'column':
+            idxs = range(len(self))
+        elif order == 'row':
+            col_order, bounds = self._column_slices()
+            idxs = heapq.merge(
+                *(col_order[bounds[i]:bounds[i + 1]].tolist() for i in range(len(self.headers))),
+                key=rows.__getitem__
+            )
+        else:
+            raise ProcessError('Errors can only be generated in "column" or "row" order')
+
+        for i in idxs:
+            yield rows[i], columns[i], self.values[i], self.get_error(columns[i], codes[i], self.values[i])
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Returns the errors as a Pandas dataframe, with the columns ``row``,
+        ``header``, ``column_pos``, ``code`` and ``value``.
+
+        :return: The errors dataframe
+        :rtype: pd.DataFrame
+        """
+        headers = np.array(self.headers, dtype=object)
+
+        return pd.DataFrame({
+            'row': self.rows,
+            'header': headers[self.columns] if len(headers) else np.array([], dtype=object),
+            'column_pos': self.column_pos[self.columns] if len(headers) else np.array([], dtype=np.int64),
+            'code': self.codes,
+            'value': self.values
+        })
+
+    def to_dicts(self) -> List[Dict]:
+        """
+        Converts the results into the dict array structure returned by
+        :py:meth:`oedtools.validate.OedValidator.validate` - one dict per
+        column, with the column exceptions and the data results. Only values
+        with errors are included in the data results of each column, as valid
+        values are not stored.
+
+        :return: A dict array of results (one per column)
+        :rtype: list
+        """
+        order, bounds = self._column_slices()
+
+        results = []
+
+        for col_idx, header_res in enumerate(self.header_results):
+            header = header_res['header']
+            column_pos = header_res['column_pos']
+            col_order = order[bounds[col_idx]:bounds[col_idx + 1]]
+
+            data_results = []
+
+            for row_num, code, value in zip(self.rows[col_order].tolist(), self.codes[col_order].tolist(), self.values[col_order]):
+                if code not in DATA_ERROR_MSGS:
+                    continue
+                data_results.append({
+                    'header': header,
+                    'value': value,
+                    'row': row_num,
+                    'column_pos': column_pos,
+                    'exceptions': [(row_num, self.get_error(col_idx, code, value))],
+                    'pass': False
+                })
+
+            exceptions = header_res['exceptions'] + [e for r in data_results for e in r['exceptions']]
+
+            results.append({
+                **header_res,
+                **{
+                    'data_results': data_results,
+                    'exceptions': exceptions,
+                    'pass': not exceptions
+                }
+            })
+
+        return results
@@ -0,0 +1,754 @@
+__all__ = [
+    'check_cr_rules',
+    'check_row_rules',
+    'compile_cr_rules',
+    'compile_row_rules',
+    'get_cr_rules',
+    'get_row_rules',
+    'load_row_rules',
+    'ROW_RULES_FP'
+]
+
+
+"""
+Conditional requirement (``CR``) rules and cross-column row rules for OED
+input files, evaluated as vectorized masks over (chunks of) file data
+"""
+
+import ast
+import io
+import json
+import operator
+import os
+import sys
+import time
+
+from functools import lru_cache
+from itertools import product
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
+
+from .exceptions import ProcessError
+
+
+COVERAGES = ['1Building', '2Other', '3Contents', '4BI', '5PD', '6All']
+
+# The prefixes of the financial terms columns - location, account, policy and
+# (special) condition terms
+TERMS_PREFIXES = ['Loc', 'Acc', 'Pol', 'Cond']
+
+# The reins. scope columns required for each reins. risk level
+RISK_LEVEL_COLUMNS = {
+    'LOC': ['PortNumber', 'AccNumber', 'LocNumber'],
+    'ACC': ['PortNumber', 'AccNumber'],
+    'POL': ['PortNumber', 'AccNumber', 'PolNumber'],
+    'LGR': ['LocGroup']
+}
+
+
+def _financial_terms_rules() -> List[Dict]:
+    rules = []
+
+    for prefix in TERMS_PREFIXES:
+        terms = []
+        for cov in COVERAGES:
+            deds = ['{}{}{}'.format(prefix, term, cov) for term in ['Ded', 'MinDed', 'MaxDed']]
+            limit = '{}Limit{}'.format(prefix, cov)
+            rules.append({'columns': ['{}DedType{}'.format(prefix, cov)], 'when': deds, 'values': None})
+            rules.append({'columns': ['{}LimitType{}'.format(prefix, cov)], 'when': [limit], 'values': None})
+            terms += deds + [limit]
+        rules.append({
+            'columns': ['{}Peril'.format(prefix)] + (['CondNumber'] if prefix == 'Cond' else []),
+            'when': terms,
+            'values': None
+        })
+
+    return rules
+
+
+def _risk_level_rules() -> List[Dict]:
+    return [
+        {'columns': columns, 'when': ['RiskLevel'], 'values': [risk_level]}
+        for risk_level, columns in RISK_LEVEL_COLUMNS.items()
+    ]
+
+
+@lru_cache(maxsize=None)
+def _get_cr_rules(schema_type: str) -> Tuple[Dict, ...]:
+    from .schema import get_grouped_master_schema
+
+    try:
+        schema = get_grouped_master_schema()[schema_type]
+    except KeyError:
+        raise ProcessError(
+            '"{}" is not a valid OED schema type - one of "acc", "loc", '
+            '"reinsinfo" or "reinsscope" is expected'.format(schema_type)
+        )
+
+    rules = []
+
+    for rule in _financial_terms_rules() + (_risk_level_rules() if schema_type == 'reinsscope' else []):
+        # Only the columns of the schema type, and of these only the
+        # conditionally required columns, are used
+        columns = [c for c in rule['columns'] if c.lower() in schema and schema[c.lower()]['required'] == 'CR']
+        when = [c for c in rule['when'] if c.lower() in schema]
+        if columns and when:
+            rules.append({**rule, **{'columns': columns, 'when': when}})
+
+    return tuple(rules)
+
+
+def get_cr_rules(schema_type: str) -> List[Dict]:
+    """
+    Returns the conditional requirement rules for the conditionally required
+    (``CR``) columns of a schema type - dicts with the keys ``columns`` (the
+    conditionally required columns), ``when`` (the columns which trigger the
+    requirement) and ``values``. A rule is triggered in a row if any of its
+    ``when`` columns has a value which is not null and, if ``values`` is
+    ``None``, not zero, or otherwise is one of ``values`` (case
+    insensitive). The rules currently cover
+
+    * the deductible and limit type columns, e.g. ``LocDedType1Building``,
+      which are required when the corresponding (min., max.) deductible or
+      limit is present
+    * the peril columns, e.g. ``LocPeril``, which are required when any
+      of the corresponding financial terms are present, as is
+      ``CondNumber`` for condition terms
+    * the reins. scope key columns, e.g. ``LocNumber``, which are required
+      for the corresponding reins. risk level, e.g. ``LOC``
+
+    :param schema_type: The file schema type (``loc``, ``acc``, ``reinsinfo``
+                        or ``reinsscope``)
+    :type schema_type: str
+
+    :return: The rules
+    :rtype: list
+    """
+    return [dict(r) for r in _get_cr_rules(schema_type.lower())]
+
+
+def compile_cr_rules(schema_type: str, headers: Iterable[str]) -> List[Dict]:
+    """
+    Resolves the conditional requirement rules of a schema type against the
+    headers of a file - rules with no ``when`` columns in the file can never
+    be triggered and are dropped, and the rule columns are mapped to the
+    (case sensitive) file headers, or ``None`` if a column is not in the
+    file.
+
+    :param schema_type: The file schema type (``loc``, ``acc``, ``reinsinfo``
+                        or ``reinsscope``)
+    :type schema_type: str
+
+    :param headers: The file headers
+    :type headers: list, tuple
+
+    :return: The compiled rules - dicts with the keys ``columns`` (pairs of
+             column and file header), ``when`` (file headers), ``values``
+             and ``condition`` (a description of the trigger condition)
+    :rtype: list
+    """
+    headers = {h.lower(): h for h in headers}
+
+    compiled = []
+
+    for rule in _get_cr_rules(schema_type.lower()):
+        when = [headers[c.lower()] for c in rule['when'] if c.lower() in headers]
+        if not when:
+            continue
+
+        if rule['values']:
+            condition = '{} is {}'.format(' or '.join(when), ' or '.join(rule['values']))
+        else:
+            condition = '{} is present'.format(', '.join(when[:-1]) + ' or ' + when[-1] if len(when) > 1 else when[0])
+
+        compiled.append({
+            'columns': [(c, headers.get(c.lower())) for c in rule['columns']],
+            'when': when,
+            'values': [v.upper() for v in rule['values']] if rule['values'] else None,
+            'condition': condition
+        })
+
+    return compiled
+
+
+def check_cr_rules(rules: Iterable[Dict], df) -> Generator[Tuple[str, Optional[str], 'np.ndarray', str], None, None]:
+    """
+    Checks a dataframe (chunk) of OED input file data against compiled
+    conditional requirement rules (see :py:meth:`compile_cr_rules`) and
+    generates the violations, one per rule and conditionally required
+    column, as tuples of the column, the file header (``None`` if the column
+    is not in the file), the (zero-based) indices of the rows with null or
+    missing values where the rule is triggered, and the rule condition. The
+    trigger and null masks are computed with vectorized operations, once per
+    column per chunk.
+
+    :param rules: The compiled rules
+    :type rules: list
+
+    :param df: The data
+    :type df: pd.DataFrame
+
+    :return: A generator of violations
+    :rtype: generator
+    """
+    import numpy as np
+    import pandas as pd
+
+    present = {}
+    null = {}
+
+    def is_present(header, values):
+        try:
+            return present[(header, values)]
+        except KeyError:
+            col = df[header]
+            if values is None:
+                mask = col.notna().to_numpy() & ~(pd.to_numeric(col, errors='coerce') == 0).to_numpy()
+            else:
+                mask = col.astype(str).str.strip().str.upper().isin(values).to_numpy() & col.notna().to_numpy()
+            present[(header, values)] = mask
+            return mask
+
+    def is_null(header):
+        try:
+            return null[header]
+        except KeyError:
+            mask = null[header] = df[header].isna().to_numpy()
+            return mask
+
+    for rule in rules:
+        values = tuple(rule['values']) if rule['values'] else None
+
+        triggered = np.zeros(len(df), dtype=bool)
+        for header in rule['when']:
+            triggered |= is_present(header, values)
+
+        if not triggered.any():
+            continue
+
+        for column, header in rule['columns']:
+            mask = triggered & is_null(header) if header is not None else triggered
+            idxs = np.flatnonzero(mask)
+            if len(idxs):
+                yield column, header, idxs, rule['condition']
+
+
+# The default row rules file, alongside the schemas
+ROW_RULES_FP = os.path.join(os.path.dirname(__file__), 'schema', 'rules.json')
+
+_COMPARISON_OPS = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge
+}
+
+_ARITHMETIC_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv
+}
+
+
+def _expand_rule(rule: Dict) -> List[Dict]:
+    # Expands a rule template with a ``foreach`` - either a list of dicts of
+    # placeholder values, or a dict of placeholder value lists, whose product
+    # is taken - into one rule per set of placeholder values
+    foreach = rule.get('foreach')
+
+    if not foreach:
+        return [rule]
+
+    if isinstance(foreach, dict):
+        foreach = [dict(zip(foreach, values)) for values in product(*foreach.values())]
+
+    return [
+        {
+            k: (v.format(**params) if isinstance(v, str) else v)
+            for k, v in rule.items() if k != 'foreach'
+        }
+        for params in foreach
+    ]
+
+
+@lru_cache(maxsize=None)
+def _load_row_rules(fp: str) -> Tuple[Dict, ...]:
+    try:
+        with io.open(fp, 'r', encoding='utf-8') as f:
+            templates = json.load(f)
+    except (IOError, ValueError) as e:
+        raise ProcessError('The row rules file "{}" could not be read: {}'.format(fp, e))
+
+    rules = []
+
+    for template in templates:
+        try:
+            for rule in _expand_rule(template):
+                rules.append({
+                    'name': rule['name'].lower(),
+                    'schema_type': rule['schema_type'].lower(),
+                    'check': rule['check'],
+                    'when': rule.get('when'),
+                    'desc': rule.get('desc')
+                })
+        except (AttributeError, KeyError, IndexError, TypeError) as e:
+            raise ProcessError('Invalid row rule {} in "{}": {}'.format(template, fp, repr(e)))
+
+    names = [(r['schema_type'], r['name']) for r in rules]
+    duplicates = sorted(set(n for n in names if names.count(n) > 1))
+    if duplicates:
+        raise ProcessError('Duplicate row rule names in "{}": {}'.format(fp, ', '.join(n for _, n in duplicates)))
+
+    for rule in rules:
+        for expr in (rule['check'], rule['when']):
+            if expr is not None:
+                _parse(expr, rule['name'])
+
+    return tuple(rules)
+
+
+def load_row_rules(fp: Optional[str] = None) -> List[Dict]:
+    """
+    Loads the cross-column row rules from a rules file (JSON) - a list of
+    dicts with the keys ``name``, ``schema_type``, ``check`` (an expression
+    which must be true in every row), and optionally ``when`` (an expression
+    restricting the rows the rule applies to), ``desc`` and ``foreach``. A
+    ``foreach`` expands the rule into one rule per set of values of the
+    ``{}`` placeholders in the other keys - either a list of dicts of
+    values, or a dict of value lists, of which all combinations are used.
+
+    The expressions are written in a subset of Python syntax - column names
+    (case insensitive), numeric and string constants, the arithmetic
+    operators ``+``, ``-``, ``*`` and ``/``, comparisons, including chained
+    comparisons and ``in``/``not in`` with a list or tuple of constants,
+    ``and``, ``or`` and ``not``, and the functions ``present(column)``,
+    ``absent(column)`` and ``coalesce(expression, constant)``. Null values
+    are unknown - a comparison with a null value is neither true nor false,
+    and only rows where ``when`` is true and ``check`` is (known to be)
+    false fail the rule. String comparisons are case insensitive.
+
+    :param fp: (Optional) The rules file path (default is ``ROW_RULES_FP``,
+               the rules file in the schema directory)
+    :type fp: str
+
+    :return: The rules
+    :rtype: list
+    """
+    return [dict(r) for r in _load_row_rules(os.path.abspath(fp or ROW_RULES_FP))]
+
+
+def get_row_rules(schema_type: str, fp: Optional[str] = None) -> List[Dict]:
+    """
+    Returns the cross-column row rules for a schema type (see
+    :py:meth:`load_row_rules`).
+
+    :param schema_type: The file schema type (``loc``, ``acc``, ``reinsinfo``
+                        or ``reinsscope``)
+    :type schema_type: str
+
+    :param fp: (Optional) The rules file path (default is ``ROW_RULES_FP``)
+    :type fp: str
+
+    :return: The rules
+    :rtype: list
+    """
+    return [r for r in load_row_rules(fp) if r['schema_type'] == schema_type.lower()]
+
+
+def _parse(expr: str, name: str) -> ast.AST:
+    try:
+        return ast.parse(expr, mode='eval').body
+    except SyntaxError as e:
+        raise ProcessError('Invalid expression "{}" in row rule "{}": {}'.format(expr, name, e))
+
+
+class _Chunk(object):
+    """
+    The column arrays of a chunk of data used by compiled row rules -
+    numeric columns as float arrays, with nulls as ``NaN``, and string
+    columns as object arrays of stripped, upper case strings, with nulls as
+    ``None``. Each array is computed once per chunk, however many rules use
+    it.
+    """
+    def __init__(self, df, headers: Dict[str, str]):
+        self.df = df
+        self.headers = headers
+        self.size = len(df)
+        self._arrays = {}
+
+    def column(self, column: str, kind: str):
+        try:
+            return self._arrays[(column, kind)]
+        except KeyError:
+            pass
+
+        import numpy as np
+        import pandas as pd
+
+        header = self.headers.get(column.lower())
+
+        if kind == 'num':
+            array = _to_float(self.df[header]) if header is not None else np.full(self.size, np.nan)
+        else:
+            if header is not None:
+                values = self.df[header].astype(str).str.strip().str.upper()
+                array = values.where(self.df[header].notna() & (values != ''), None).to_numpy(dtype=object)
+            else:
+                array = np.full(self.size, None, dtype=object)
+
+        self._arrays[(column, kind)] = array
+        return array
+
+
+def _to_float(values) -> Any:
+    # The values of a column as a float array, with nulls and invalid values
+    # as ``NaN`` - parsed exactly, as by the value checks, which
+    # ``pd.to_numeric`` does not do (it rounds some values in the last
+    # place)
+    import numpy as np
+
+    try:
+        return values.astype(float).to_numpy()
+    except (TypeError, ValueError):
+        pass
+
+    def _float(value):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return np.nan
+
+    return np.fromiter((_float(v) for v in values.tolist()), dtype=float, count=len(values))
+
+
+def _constant(node: ast.AST) -> Optional[Tuple[Any]]:
+    # The value of a numeric or string constant node, as a 1-tuple, or
+    # ``None`` if the node is not one - Python 3.6 and 3.7 parse constants as
+    # ``ast.Num``, ``ast.Str`` and ``ast.NameConstant`` nodes, rather than
+    # ``ast.Constant``
+    if sys.version_info < (3, 8):
+        if isinstance(node, ast.Num):
+            value = node.n
+        elif isinstance(node, ast.Str):
+            value = node.s
+        else:
+            return
+    elif isinstance(node, ast.Constant):
+        value = node.value
+    else:
+        return
+
+    if isinstance(value, (int, float, str)) and not isinstance(value, bool):
+        return (value,)
+
+
+def _compile_node(node: ast.AST, kinds: Dict[str, str], name: str, expr: str) -> Tuple[str, Callable]:
+    # Compiles an expression node into a pair of its kind - ``num``, ``str``
+    # or ``bool`` - and a function of a chunk which evaluates it. Values are
+    # arrays or scalars, and booleans pairs of (true, false) masks, as
+    # three-valued logic, where rows with unknown values are in neither
+    import numpy as np
+    import pandas as pd
+
+    def error(msg):
+        return ProcessError('Invalid expression "{}" in row rule "{}" (column {}): {}'.format(
+            expr, name, node.col_offset + 1, msg
+        ))
+
+    def compile_value(node, kind=None):
+        _kind, fn = _compile_node(node, kinds, name, expr)
+        if _kind == 'bool' or (kind and _kind != kind):
+            raise error('expected a {} value'.format(kind or 'numeric or string'))
+        return _kind, fn
+
+    def compile_bool(node):
+        kind, fn = _compile_node(node, kinds, name, expr)
+        if kind != 'bool':
+            raise error('expected a comparison or boolean expression')
+        return fn
+
+    def known(kind, value):
+        if kind == 'num':
+            return ~np.isnan(value)
+        return pd.notna(value) if not isinstance(value, str) else True
+
+    if isinstance(node, ast.Name):
+        column = node.id
+        try:
+            kind = kinds[column.lower()]
+        except KeyError:
+            raise error('"{}" is not a column of the schema'.format(column))
+        return kind, lambda chunk: chunk.column(column, kind)
+
+    constant = _constant(node)
+    if constant is not None:
+        value, = constant
+        if isinstance(value, str):
+            value = value.strip().upper()
+            return 'str', lambda chunk: value
+        value = float(value)
+        return 'num', lambda chunk: value
+
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        _, fn = compile_value(node.operand, 'num')
+        sign = -1.0 if isinstance(node.op, ast.USub) else 1.0
+        return 'num', lambda chunk: sign * fn(chunk)
+
+    if isinstance(node, ast.BinOp) and type(node.op) in _ARITHMETIC_OPS:
+        op = _ARITHMETIC_OPS[type(node.op)]
+        _, left = compile_value(node.left, 'num')
+        _, right = compile_value(node.right, 'num')
+
+        def arithmetic(chunk):
+            a, b = left(chunk), right(chunk)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                value = op(a, b)
+            # Division by zero is undefined, i.e. unknown, not infinite
+            return np.where(b == 0, np.nan, value) if op is operator.truediv else value
+
+        return 'num', arithmetic
+
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+        fn = compile_bool(node.operand)
+
+        def negation(chunk):
+            true, false = fn(chunk)
+            return false, true
+
+        return 'bool', negation
+
+    if isinstance(node, ast.BoolOp):
+        fns = [compile_bool(v) for v in node.values]
+        is_and = isinstance(node.op, ast.And)
+
+        def boolean(chunk):
+            true, false = fns[0](chunk)
+            for fn in fns[1:]:
+                _true, _false = fn(chunk)
+                if is_and:
+                    true, false = true & _true, false | _false
+                else:
+                    true, false = true | _true, false & _false
+            return true, false
+
+        return 'bool', boolean
+
+    if isinstance(node, ast.Compare):
+        operands = [node.left] + node.comparators
+        comparisons = []
+
+        for left_node, op, right_node in zip(operands[:-1], node.ops, operands[1:]):
+            kind, left = compile_value(left_node)
+
+            if isinstance(op, (ast.In, ast.NotIn)):
+                if not (isinstance(right_node, (ast.List, ast.Tuple)) and all(_constant(e) is not None for e in right_node.elts)):
+                    raise error('"in" requires a list or tuple of constants')
+                values = [_compile_node(e, kinds, name, expr) for e in right_node.elts]
+                if any(k != kind for k, _ in values):
+                    raise error('the "in" values must be of the same type as the column')
+                values = [fn(None) for _, fn in values]
+                negate = isinstance(op, ast.NotIn)
+
+                def membership(chunk, kind=kind, left=left, values=values, negate=negate):
+                    value = left(chunk)
+                    is_in = pd.Series(value).isin(values).to_numpy() if kind == 'str' else np.isin(value, values)
+                    _known = known(kind, value)
+                    return _known & (is_in ^ negate), _known & ~(is_in ^ negate)
+
+                comparisons.append(membership)
+                continue
+
+            if type(op) not in _COMPARISON_OPS:
+                raise error('unsupported comparison')
+            if kind == 'str' and not isinstance(op, (ast.Eq, ast.NotEq)):
+                raise error('strings can only be compared with "==" and "!="')
+
+            _, right = compile_value(right_node, kind)
+            cmp = _COMPARISON_OPS[type(op)]
+
+            def comparison(chunk, kind=kind, left=left, right=right, cmp=cmp):
+                a, b = left(chunk), right(chunk)
+                _known = known(kind, a) & known(kind, b)
+                if kind == 'num':
+                    with np.errstate(invalid='ignore'):
+                        result = cmp(a, b)
+                else:
+                    result = np.asarray(cmp(np.asarray(a, dtype=object), b), dtype=bool)
+                return _known & result, _known & ~result
+
+            comparisons.append(comparison)
+
+        def comparison_chain(chunk):
+            true, false = comparisons[0](chunk)
+            for fn in comparisons[1:]:
+                _true, _false = fn(chunk)
+                true, false = true & _true, false | _false
+            return np.broadcast_to(true, (chunk.size,)), np.broadcast_to(false, (chunk.size,))
+
+        return 'bool', comparison_chain
+
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+        func = node.func.id.lower()
+
+        if func in ('present', 'absent'):
+            if len(node.args) != 1 or not isinstance(node.args[0], ast.Name):
+                raise error('"{}" takes a single column'.format(func))
+            kind, fn = compile_value(node.args[0])
+
+            def presence(chunk, kind=kind, fn=fn, is_present=(func == 'present')):
+                _present = known(kind, fn(chunk))
+                return (_present, ~_present) if is_present else (~_present, _present)
+
+            return 'bool', presence
+
+        if func == 'coalesce':
+            if len(node.args) != 2 or _constant(node.args[1]) is None:
+                raise error('"coalesce" takes an expression and a constant')
+            kind, fn = compile_value(node.args[0])
+            _, default = compile_value(node.args[1], kind)
+            default = default(None)
+
+            def coalesce(chunk):
+                value = fn(chunk)
+                if kind == 'num':
+                    return np.where(np.isnan(value), default, value)
+                return np.where(pd.isna(value), default, value)
+
+            return kind, coalesce
+
+    raise error('unsupported syntax')
+
+
+def _columns(node: ast.AST) -> List[str]:
+    # The column names in an expression, excluding function names
+    funcs = set(id(n.func) for n in ast.walk(node) if isinstance(n, ast.Call))
+    return list(dict.fromkeys(
+        n.id for n in ast.walk(node) if isinstance(n, ast.Name) and id(n) not in funcs
+    ))
+
+
+def compile_row_rules(schema_type: str, headers: Iterable[str], fp: Optional[str] = None) -> List[Dict]:
+    """
+    Compiles the cross-column row rules of a schema type (see
+    :py:meth:`load_row_rules`) into vectorized expressions, for the headers
+    of a file. Columns of the schema which are not in the file are treated
+    as null. Rules with none of their columns in the file are dropped.
+
+    :param schema_type: The file schema type (``loc``, ``acc``, ``reinsinfo``
+                        or ``reinsscope``)
+    :type schema_type: str
+
+    :param headers: The file headers
+    :type headers: list, tuple
+
+    :param fp: (Optional) The rules file path (default is ``ROW_RULES_FP``)
+    :type fp: str
+
+    :return: The compiled rules - dicts with the keys ``name``, ``header``
+             (the file header the rule is reported against - the first
+             column of the rule in the file), ``condition`` (the rule as
+             text), ``check`` and ``when`` (functions of a chunk)
+    :rtype: list
+    """
+    from .schema import get_grouped_master_schema
+
+    try:
+        schema = get_grouped_master_schema()[schema_type.lower()]
+    except KeyError:
+        raise ProcessError(
+            '"{}" is not a valid OED schema type - one of "acc", "loc", '
+            '"reinsinfo" or "reinsscope" is expected'.format(schema_type)
+        )
+
+    kinds = {col: ('str' if entry['py_dtype'] == 'str' else 'num') for col, entry in schema.items()}
+    headers = {h.lower(): h for h in headers}
+
+    compiled = []
+
+    for rule in get_row_rules(schema_type, fp=fp):
+        check = _parse(rule['check'], rule['name'])
+        when = _parse(rule['when'], rule['name']) if rule['when'] else None
+
+        check_kind, check_fn = _compile_node(check, kinds, rule['name'], rule['check'])
+        when_kind, when_fn = _compile_node(when, kinds, rule['name'], rule['when']) if when else ('bool', None)
+        if 'bool' not in (check_kind, when_kind) or check_kind != when_kind:
+            raise ProcessError('Row rule "{}" must be a comparison or boolean expression'.format(rule['name']))
+
+        columns = [c for c in _columns(check) + (_columns(when) if when else []) if c.lower() in headers]
+        if not columns:
+            continue
+
+        compiled.append({
+            'name': rule['name'].lower(),
+            'header': headers[columns[0].lower()],
+            'condition': '{}: {}{}'.format(rule['name'], rule['check'], ' when {}'.format(rule['when']) if when else ''),
+            'check': check_fn,
+            'when': when_fn,
+            'headers': headers
+        })
+
+    return compiled
+
+
+def check_row_rules(
+    rules: Iterable[Dict],
+    df,
+    costs: Optional[Dict[str, Dict]] = None
+) -> Generator[Tuple[Dict, 'np.ndarray'], None, None]:
+    """
+    Checks a dataframe (chunk) of OED input file data against compiled
+    cross-column row rules (see :py:meth:`compile_row_rules`) and generates
+    the failures, one per rule, as pairs of the rule and the (zero-based)
+    indices of the rows which fail it.
+
+    :param rules: The compiled rules
+    :type rules: list
+
+    :param df: The data
+    :type df: pd.DataFrame
+
+    :param costs: (Optional) A dict in which the evaluation costs of the
+                  rules are accumulated, keyed by rule name - each a dict
+                  with the keys ``rows``, ``failures`` and ``seconds``. The
+                  time taken to convert the columns used by a rule, which
+                  is done once per chunk, is included in the cost of the
+                  first rule which uses the column.
+    :type costs: dict
+
+    :return: A generator of failures
+    :rtype: generator
+    """
+    import numpy as np
+
+    chunk = None
+
+    for rule in rules:
+        if chunk is None:
+            chunk = _Chunk(df, rule['headers'])
+
+        start = time.perf_counter()
+
+        _, failed = rule['check'](chunk)
+        if rule['when'] is not None:
+            failed = failed & rule['when'](chunk)[0]
+        idxs = np.flatnonzero(failed)
+
+        if costs is not None:
+            cost = costs.setdefault(rule['name'], {'rows': 0, 'failures': 0, 'seconds': 0.0})
+            cost['rows'] += len(df)
+            cost['failures'] += len(idxs)
+            cost['seconds'] += time.perf_counter() - start
+
+        if len(idxs):
+            yield rule, idxs
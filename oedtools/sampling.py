@@ -0,0 +1,486 @@
+__all__ = [
+    'get_sample_columns',
+    'PORTFOLIO_FILE_NAMES',
+    'sample_data',
+    'sample_file',
+    'sample_portfolio'
+]
+
+
+"""
+Generation of synthetic, schema-valid OED input files and portfolios
+"""
+
+import io
+import os
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import (
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Union,
+)
+
+from .exceptions import ProcessError
+from .rules import COVERAGES
+from .utils import (
+    DEFAULT_CHUNKSIZE,
+    get_random_generator,
+    get_seed_sequence,
+)
+
+
+SCHEMA_TYPES = ['acc', 'loc', 'reinsinfo', 'reinsscope']
+
+# The key columns of each schema type, which are generated, rather than
+# sampled, so that the keys are unique within files and consistent across
+# the files of a portfolio - the loc accounts and the reins. scope accounts
+# are accounts in the acc file, and the reins. scope reins. numbers are
+# reins. numbers in the reins. info file
+KEY_COLUMNS = {
+    'acc': ['PortNumber', 'AccNumber', 'PolNumber'],
+    'loc': ['PortNumber', 'AccNumber', 'LocNumber'],
+    'reinsinfo': ['ReinsNumber'],
+    'reinsscope': ['ReinsNumber', 'RiskLevel', 'PortNumber', 'AccNumber']
+}
+
+# The pairs of (lower, upper) columns of each schema type whose sampled
+# values are put in order, so that the rows pass the default row rules (see
+# ``oedtools.rules.ROW_RULES_FP``) - the minimum and maximum deductibles, and
+# the (absolute) deductibles and the TIVs of the loc coverages
+ORDERED_COLUMNS = {
+    'acc': [
+        ('{}MinDed{}'.format(prefix, cov), '{}MaxDed{}'.format(prefix, cov))
+        for prefix in ['Acc', 'Pol', 'Cond'] for cov in COVERAGES
+    ],
+    'loc': [
+        ('LocMinDed{}'.format(cov), 'LocMaxDed{}'.format(cov)) for cov in COVERAGES
+    ] + [
+        ('LocDed1Building', 'BuildingTIV'),
+        ('LocDed2Other', 'OtherTIV'),
+        ('LocDed3Contents', 'ContentsTIV'),
+        ('LocDed4BI', 'BITIV')
+    ]
+}
+
+PORTFOLIO_FILE_NAMES = {
+    'acc': 'acc.csv',
+    'loc': 'loc.csv',
+    'reinsinfo': 'reinsinfo.csv',
+    'reinsscope': 'reinsscope.csv'
+}
+
+
+def _check_schema_type(schema_type: str) -> str:
+    if schema_type.lower() not in SCHEMA_TYPES:
+        raise ProcessError(
+            '"{}" is not a valid OED schema type - one of "acc", "loc", '
+            '"reinsinfo" or "reinsscope" is expected'.format(schema_type)
+        )
+    return schema_type.lower()
+
+
+def get_sample_columns(
+    schema_type: str,
+    columns: Optional[Iterable[str]] = None,
+    all_columns: Optional[bool] = False
+) -> List[str]:
+    """
+    Returns the column headers of a sample OED input file of a given schema
+    type - the key columns (see ``KEY_COLUMNS``), then the required columns
+    of the schema type, and any other given columns, or all the columns of
+    the schema type, in schema order.
+
+    :param schema_type: The file schema type (``loc``, ``acc``, ``reinsinfo``
+                        or ``reinsscope``)
+    :type schema_type: str
+
+    :param columns: (Optional) Other (non-required) columns to include (case
+                    insensitive)
+    :type columns: list, tuple
+
+    :param all_columns: (Optional) Whether to include all the columns of the
+                        schema type (default is ``False``)
+    :type all_columns: bool
+
+    :return: The column headers
+    :rtype: list
+    """
+    from .schema import get_grouped_master_schema
+
+    schema = get_grouped_master_schema()[_check_schema_type(schema_type)]
+
+    columns = set(c.lower() for c in (columns or []))
+
+    invalid = sorted(columns.difference(schema))
+    if invalid:
+        raise ProcessError('"{}" is not a valid column of the OED "{}" schema'.format(invalid[0], schema_type))
+
+    return list(dict.fromkeys(
+        KEY_COLUMNS[schema_type.lower()] + [
+            entry['field_name'] for col, entry in schema.items()
+            if all_columns or entry['required'] == 'R' or col in columns
+        ]
+    ))
+
+
+def _sample_keys(
+    schema_type: str,
+    start: int,
+    size: int,
+    num_accounts: int,
+    num_reinsinfo: int
+) -> Dict[str, list]:
+    # The key column values of rows ``start`` to ``start + size - 1`` of a
+    # file - accounts (with one policy each) and reins. info rows are
+    # numbered from 1, and locations and reins. scope rows are assigned to
+    # accounts and reins. info rows in turn, so that all are referenced.
+    # Reins. scope rows are account level, so their policy and location
+    # numbers, which are only included if the file has the columns, are null
+    rows = range(start, start + size)
+
+    if schema_type == 'acc':
+        return {
+            'PortNumber': ['1'] * size,
+            'AccNumber': ['A{}'.format(i + 1) for i in rows],
+            'PolNumber': ['P{}'.format(i + 1) for i in rows]
+        }
+    elif schema_type == 'loc':
+        return {
+            'PortNumber': ['1'] * size,
+            'AccNumber': ['A{}'.format(i % num_accounts + 1) for i in rows],
+            'LocNumber': ['L{}'.format(i + 1) for i in rows]
+        }
+    elif schema_type == 'reinsinfo':
+        return {'ReinsNumber': [i + 1 for i in rows]}
+
+    return {
+        'ReinsNumber': [i % num_reinsinfo + 1 for i in rows],
+        'RiskLevel': ['ACC'] * size,
+        'PortNumber': ['1'] * size,
+        'AccNumber': ['A{}'.format(i % num_accounts + 1) for i in rows],
+        'PolNumber': [None] * size,
+        'LocNumber': [None] * size
+    }
+
+
+def sample_data(
+    schema_type: str,
+    size: int,
+    columns: Iterable[str],
+    start: Optional[int] = 0,
+    num_accounts: Optional[int] = 1,
+    num_reinsinfo: Optional[int] = 1,
+    rng: Optional[Union[int, 'np.random.Generator']] = None
+):
+    """
+    Samples a block of rows of an OED input file, as a dataframe - the key
+    columns are generated (see ``KEY_COLUMNS``), and the other columns are
+    sampled with :py:meth:`oedtools.schema.sample_column`, one column at a
+    time, with the values of the pairs of columns in ``ORDERED_COLUMNS``
+    put in order.
+
+    :param schema_type: The file schema type (``loc``, ``acc``, ``reinsinfo``
+                        or ``reinsscope``)
+    :type schema_type: str
+
+    :param size: The number of rows
+    :type size: int
+
+    :param columns: The column headers, e.g. as returned by
+                    :py:meth:`get_sample_columns`
+    :type columns: list, tuple
+
+    :param start: (Optional) The (zero-based) index of the first row in the
+                  file, for generating the keys (default is ``0``)
+    :type start: int
+
+    :param num_accounts: (Optional) The number of accounts the loc and reins.
+                         scope rows are assigned to (default is ``1``)
+    :type num_accounts: int
+
+    :param num_reinsinfo: (Optional) The number of reins. info rows the reins.
+                          scope rows are assigned to (default is ``1``)
+    :type num_reinsinfo: int
+
+    :param rng: (Optional) A random generator or seed, for reproducible rows
+                (see :py:meth:`oedtools.utils.get_random_generator`)
+    :type rng: int, numpy.random.Generator
+
+    :return: The rows
+    :rtype: pd.DataFrame
+    """
+    import numpy as np
+    import pandas as pd
+
+    from .schema import (
+        get_grouped_master_schema,
+        sample_column,
+    )
+
+    schema_type = _check_schema_type(schema_type)
+
+    if size <= 0:
+        return pd.DataFrame(columns=list(columns))
+
+    schema = get_grouped_master_schema()[schema_type]
+
+    rng = get_random_generator(rng)
+
+    keys = {k.lower(): v for k, v in _sample_keys(schema_type, start, size, num_accounts, num_reinsinfo).items()}
+
+    data = {
+        col: (
+            keys[col.lower()] if col.lower() in keys
+            else sample_column(schema_type, col, size=size, col_schema=schema[col.lower()], rng=rng)
+        )
+        for col in columns
+    }
+
+    headers = {col.lower(): col for col in columns}
+    for lower, upper in ORDERED_COLUMNS.get(schema_type, []):
+        lower, upper = headers.get(lower.lower()), headers.get(upper.lower())
+        if lower and upper:
+            data[lower], data[upper] = (
+                np.minimum(data[lower], data[upper]).tolist(),
+                np.maximum(data[lower], data[upper]).tolist()
+            )
+
+    return pd.DataFrame(data=data, columns=list(columns))
+
+
+def _child_seed_sequence(seed_seq: 'np.random.SeedSequence', n: int) -> 'np.random.SeedSequence':
+    # The ``n``-th child of a seed sequence, the same as the ``n``-th child
+    # spawned with ``SeedSequence.spawn``, but independent of the order in
+    # which the children are used, e.g. the order in which the chunks of a
+    # file are generated, or by which worker
+    import numpy as np
+
+    return np.random.SeedSequence(
+        entropy=seed_seq.entropy,
+        spawn_key=seed_seq.spawn_key + (n,),
+        pool_size=seed_seq.pool_size
+    )
+
+
+def _sample_chunk(
+    schema_type: str,
+    columns: List[str],
+    start: int,
+    size: int,
+    num_accounts: int,
+    num_reinsinfo: int,
+    seed_seq: 'np.random.SeedSequence'
+) -> str:
+    # Samples a chunk of rows of a file as CSV, with the header if it is the
+    # first chunk - run in the worker processes in the parallel mode
+    return sample_data(
+        schema_type, size, columns, start=start, num_accounts=num_accounts, num_reinsinfo=num_reinsinfo, rng=seed_seq
+    ).to_csv(header=(start == 0), index=False)
+
+
+def sample_file(
+    schema_type: str,
+    fp: str,
+    num_rows: int,
+    columns: Optional[Iterable[str]] = None,
+    all_columns: Optional[bool] = False,
+    num_accounts: Optional[int] = None,
+    num_reinsinfo: Optional[int] = None,
+    chunksize: Optional[int] = DEFAULT_CHUNKSIZE,
+    seed: Optional[Union[int, 'np.random.SeedSequence']] = None,
+    workers: Optional[int] = 1
+) -> str:
+    """
+    Writes a synthetic, schema-valid OED input file of a given schema type
+    and number of rows. The file is generated and written in chunks of rows,
+    so memory use is bounded by the chunk size, not the number of rows.
+
+    Each chunk is sampled with its own random stream, a child of the seed
+    sequence of the file, so for a given seed and chunk size the file is
+    the same bit for bit whether the chunks are generated serially or in
+    parallel, by any number of worker processes. In the parallel mode at
+    most two chunks per worker are generated or held in memory at a time.
+
+    :param schema_type: The file schema type (``loc``, ``acc``, ``reinsinfo``
+                        or ``reinsscope``)
+    :type schema_type: str
+
+    :param fp: The file path
+    :type fp: str
+
+    :param num_rows: The number of rows
+    :type num_rows: int
+
+    :param columns: (Optional) Other (non-required) columns to include (see
+                    :py:meth:`get_sample_columns`)
+    :type columns: list, tuple
+
+    :param all_columns: (Optional) Whether to include all the columns of the
+                        schema type (default is ``False``)
+    :type all_columns: bool
+
+    :param num_accounts: (Optional) The number of accounts the loc and reins.
+                         scope rows are assigned to (default is one account
+                         per 10 locations, or one per reins. scope row)
+    :type num_accounts: int
+
+    :param num_reinsinfo: (Optional) The number of reins. info rows the reins.
+                          scope rows are assigned to (default is ``1``)
+    :type num_reinsinfo: int
+
+    :param chunksize: (Optional) The maximum number of rows generated at a
+                      time (default is ``DEFAULT_CHUNKSIZE``)
+    :type chunksize: int
+
+    :param seed: (Optional) A random seed or seed sequence, for reproducible
+                 files (see :py:meth:`oedtools.utils.get_seed_sequence`)
+    :type seed: int, numpy.random.SeedSequence
+
+    :param workers: (Optional) The number of worker processes - if ``1``
+                    (default) the chunks are generated serially in the
+                    current process, and if ``None`` the number of CPUs
+    :type workers: int
+
+    :return: The file path
+    :rtype: str
+    """
+    schema_type = _check_schema_type(schema_type)
+
+    if num_rows < 0:
+        raise ProcessError('The number of rows must be non-negative')
+
+    header_columns = get_sample_columns(schema_type, columns=columns, all_columns=all_columns)
+
+    num_accounts = max(1, num_accounts or (num_rows // 10 if schema_type == 'loc' else num_rows))
+    num_reinsinfo = max(1, num_reinsinfo or 1)
+    chunksize = chunksize or DEFAULT_CHUNKSIZE
+    workers = workers or os.cpu_count() or 1
+
+    seed_seq = get_seed_sequence(seed)
+
+    chunks = [
+        (schema_type, header_columns, start, min(chunksize, num_rows - start), num_accounts, num_reinsinfo, _child_seed_sequence(seed_seq, i))
+        for i, start in enumerate(range(0, max(num_rows, 1), chunksize))
+    ]
+
+    with io.open(fp, 'w', encoding='utf-8', newline='') as f:
+        if workers == 1 or len(chunks) <= 1:
+            for chunk in chunks:
+                f.write(_sample_chunk(*chunk))
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+                pending = deque()
+                for chunk in chunks:
+                    pending.append(executor.submit(_sample_chunk, *chunk))
+                    if len(pending) >= 2 * workers:
+                        f.write(pending.popleft().result())
+                while pending:
+                    f.write(pending.popleft().result())
+
+    return fp
+
+
+def sample_portfolio(
+    target_dir: str,
+    num_locations: int,
+    num_accounts: Optional[int] = None,
+    num_reinsinfo: Optional[int] = 0,
+    num_reinsscope: Optional[int] = None,
+    all_columns: Optional[bool] = False,
+    chunksize: Optional[int] = DEFAULT_CHUNKSIZE,
+    seed: Optional[Union[int, 'np.random.SeedSequence']] = None,
+    workers: Optional[int] = 1
+) -> Dict[str, str]:
+    """
+    Writes a synthetic, schema-valid OED portfolio - loc and acc files, and
+    optionally reins. info and scope files - to a directory, with the file
+    names given in ``PORTFOLIO_FILE_NAMES``. The keys are consistent across
+    the files - every loc account is in the acc file, and every account is
+    referenced by at least one location, and similarly for reins. scope and
+    info rows - so the portfolio passes the referential integrity checks in
+    :py:meth:`oedtools.integrity.portfolio_errors`, and the files pass the
+    default row rules (see ``ORDERED_COLUMNS``).
+
+    :param target_dir: The directory to write the files to - created if it
+                       does not exist
+    :type target_dir: str
+
+    :param num_locations: The number of locations (loc rows)
+    :type num_locations: int
+
+    :param num_accounts: (Optional) The number of accounts (acc rows) - must
+                         not exceed the number of locations (default is one
+                         per 10 locations)
+    :type num_accounts: int
+
+    :param num_reinsinfo: (Optional) The number of reins. info rows - if
+                          ``0`` (default) no reins. files are written
+    :type num_reinsinfo: int
+
+    :param num_reinsscope: (Optional) The number of reins. scope rows - must
+                           not be less than the number of reins. info rows
+                           (default is the number of reins. info rows)
+    :type num_reinsscope: int
+
+    :param all_columns: (Optional) Whether to include all the columns of each
+                        schema type, rather than only the key and required
+                        columns (default is ``False``)
+    :type all_columns: bool
+
+    :param chunksize: (Optional) The maximum number of rows generated at a
+                      time (default is ``DEFAULT_CHUNKSIZE``)
+    :type chunksize: int
+
+    :param seed: (Optional) A random seed or seed sequence, for reproducible
+                 portfolios - each file is generated with its own child
+                 sequence (see :py:meth:`sample_file`)
+    :type seed: int, numpy.random.SeedSequence
+
+    :param workers: (Optional) The number of worker processes generating the
+                    chunks of each file (see :py:meth:`sample_file`)
+    :type workers: int
+
+    :return: The file paths, by schema type
+    :rtype: dict
+    """
+    num_accounts = max(1, num_accounts or num_locations // 10)
+    num_reinsinfo = num_reinsinfo or 0
+    num_reinsscope = num_reinsinfo if num_reinsscope is None else num_reinsscope
+
+    if num_locations < 1 or num_accounts > num_locations:
+        raise ProcessError(
+            'The number of locations must be positive, and at least the number of '
+            'accounts, so that every account has a location'
+        )
+    if num_reinsinfo < 0 or num_reinsscope < num_reinsinfo:
+        raise ProcessError(
+            'The number of reins. scope rows must be at least the number of reins. info '
+            'rows, so that every reins. info row is in scope'
+        )
+
+    os.makedirs(target_dir, exist_ok=True)
+
+    seed_seq = get_seed_sequence(seed)
+
+    num_rows = {'acc': num_accounts, 'loc': num_locations, 'reinsinfo': num_reinsinfo, 'reinsscope': num_reinsscope}
+
+    files = {}
+
+    for schema_type in (SCHEMA_TYPES if num_reinsinfo else ['acc', 'loc']):
+        files[schema_type] = sample_file(
+            schema_type,
+            os.path.join(target_dir, PORTFOLIO_FILE_NAMES[schema_type]),
+            num_rows[schema_type],
+            all_columns=all_columns,
+            num_accounts=num_accounts,
+            num_reinsinfo=num_reinsinfo,
+            chunksize=chunksize,
+            seed=_child_seed_sequence(seed_seq, SCHEMA_TYPES.index(schema_type)),
+            workers=workers
+        )
+
+    return files
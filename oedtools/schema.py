@@ -1,4 +1,5 @@
 __all__ = [
+    'BATCH_SAMPLING_FUNCS',
     'generate_schema',
     'get_column_schema',
     'get_grouped_master_schema',
@@ -19,6 +20,7 @@ import io
 import json
 import string
 import os
+import time
 
 from ast import literal_eval
 from collections import OrderedDict
@@ -27,17 +29,17 @@ from typing import (
     Dict,
     Optional,
     Tuple,
+    Union,
 )
 
-import pandas as pd
-import numpy as np
-
 from .exceptions import (
     get_file_error,
     OedError,
 )
+from .metrics import SCHEMA_LOAD_SECONDS
 from .utils import (
     get_method,
+    get_random_generator,
     SQL_NUMERIC_DTYPES,
     sql_to_python_dtype,
 )
@@ -52,6 +54,13 @@ from .values import (
 
 SCHEMA_DIR = os.path.join(os.path.dirname(__file__), 'schema')
 
+# Batch versions of column sampling functions - each takes the column range,
+# the sample size, and the other sampling function args, and returns the
+# whole sample at once
+BATCH_SAMPLING_FUNCS = {
+    'oedtools.utils.generate_token_sequence': 'oedtools.utils.generate_token_sequences'
+}
+
 
 def generate_schema(def_fp: str, target_fp: str) -> None:
     """
@@ -66,6 +75,9 @@ def generate_schema(def_fp: str, target_fp: str) -> None:
     :param target_fp: The target file path to write the schema to
     :type target_fp: str
     """
+    import numpy as np
+    import pandas as pd
+
     _def_fp = os.path.abspath(def_fp)
     _target_fp = os.path.abspath(target_fp) if target_fp else None
 
@@ -148,6 +160,7 @@ def get_schema(schema_type: Optional[str] = 'master') -> Dict[Tuple[str, str], D
     :return: The schema dict
     :rtype: dict
     """
+    start = time.perf_counter()
     with io.open(os.path.join(SCHEMA_DIR, '{}_schema.json'.format(schema_type.lower()))) as f:
         schema = OrderedDict({
             literal_eval(k): (
@@ -163,13 +176,15 @@ def get_schema(schema_type: Optional[str] = 'master') -> Dict[Tuple[str, str], D
             )
             for k, v in json.load(f).items()
         })
-    return OrderedDict({
+    schema = OrderedDict({
         k: (
             v if not isinstance(v.get('column_validation'), dict) or ('start' not in v['column_validation'] and 'stop' not in v['column_validation'])
             else {**v, **{'column_validation': v['dtype_range']}}
         )
         for k, v in schema.items()
     })
+    SCHEMA_LOAD_SECONDS.observe(time.perf_counter() - start, schema=schema_type.lower())
+    return schema
 
 
 def get_grouped_master_schema() -> Dict[str, Dict[str, Dict]]:
@@ -274,7 +289,14 @@ def update_schemas() -> None:
         )
 
 
-def sample_column(schema_type: str, header: str, str_width: Optional[int] = None, size: Optional[int] = 10) -> list:
+def sample_column(
+    schema_type: str,
+    header: str,
+    str_width: Optional[int] = None,
+    size: Optional[int] = 10,
+    col_schema: Optional[Dict] = None,
+    rng: Optional[Union[int, 'np.random.Generator']] = None
+) -> list:
     """
     Sampling values in a given column in a given schema (``acc``, ``loc``,
     ``reinsinfo``, ``reinsscope``), consistent with the validation method
@@ -297,13 +319,25 @@ def sample_column(schema_type: str, header: str, str_width: Optional[int] = None
     :param size: Number of values to sample
     :type size: int
 
+    :param col_schema: (Optional) The column schema, if already loaded, e.g.
+                       when sampling many columns, or many blocks of rows
+    :type col_schema: dict
+
+    :param rng: (Optional) A random generator or seed, for reproducible
+                samples (see :py:meth:`oedtools.utils.get_random_generator`)
+    :type rng: int, numpy.random.Generator
+
     :return: Sampled values
     :rtype: list
     """
+    import numpy as np
+
+    rng = get_random_generator(rng)
+
     if size <= 0:
         size = 10
 
-    col_schema = get_column_schema(schema_type, header)
+    col_schema = col_schema or get_column_schema(schema_type, header)
 
     if col_schema['py_dtype'] is None:
         return
@@ -323,26 +357,27 @@ def sample_column(schema_type: str, header: str, str_width: Optional[int] = None
         sampling_func = get_method(sampling_info['func'])
 
     if py_dtype in [int, float, str] and column_range is not None and sampling_func is not None:
+        batch_sampling_func = BATCH_SAMPLING_FUNCS.get(sampling_info['func'])
+        if batch_sampling_func:
+            return get_method(batch_sampling_func)(column_range, size, *sampling_info['args'][1:], rng=rng)
         return [
-            sampling_func(column_range, *sampling_info['args'][1:])
+            sampling_func(column_range, *sampling_info['args'][1:], rng=rng)
             for i in range(size)
         ]
     elif py_dtype is int:
         return (
-            np.random.randint(use_range.start, use_range.stop, size=size).tolist() if isinstance(use_range, range)
-            else np.random.choice(use_range, size=size).tolist()
+            rng.integers(use_range.start, use_range.stop, size=size).tolist() if isinstance(use_range, range)
+            else rng.choice(use_range, size=size).tolist()
         )
     elif py_dtype is float:
         return (
-            np.random.uniform(max(min(use_range), -1.79e+307), min(max(use_range), +1.79e+307), size=size).tolist()
+            rng.uniform(max(min(use_range), -1.79e+307), min(max(use_range), +1.79e+307), size=size).tolist()
         )
     elif py_dtype is str and column_range is not None and sampling_func is None:
-        return [
-            np.random.choice(column_range)
-            for i in range(size)
-        ]
+        return rng.choice(column_range, size=size).tolist()
     elif py_dtype is str and column_range is None:
-        return [
-            ''.join(np.random.choice(list(string.ascii_letters + string.digits), size=(str_width or 20)))
-            for i in range(size)
-        ]
+        # A random character matrix, with each row viewed as a single
+        # fixed-width string
+        str_width = str_width or 20
+        chars = np.array(list(string.ascii_letters + string.digits), dtype='<U1')
+        return chars[rng.integers(0, len(chars), size=(size, str_width))].view('<U{}'.format(str_width)).ravel().tolist()
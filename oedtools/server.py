@@ -0,0 +1,665 @@
+__all__ = [
+    'DEFAULT_MAX_CONCURRENT',
+    'DEFAULT_MAX_QUEUED',
+    'get_client',
+    'get_server_state_fp',
+    'OedClient',
+    'OedServer',
+    'SERVER_ENV_VAR',
+    'SERVER_OPS',
+    'SERVER_TOKEN_ENV_VAR',
+    'serve'
+]
+
+
+"""
+A persistent local validation server, which keeps the schemas, the values
+profile and the query indexes loaded, and a thin HTTP client for it
+"""
+
+import hmac
+import http.client
+import io
+import json
+import os
+import secrets
+import signal
+import sys
+import threading
+
+from http.server import (
+    BaseHTTPRequestHandler,
+    HTTPServer,
+)
+from socketserver import ThreadingMixIn
+from typing import (
+    Any,
+    Dict,
+    Generator,
+    Optional,
+    Tuple,
+)
+
+from . import exceptions
+from .exceptions import (
+    OedError,
+    ProcessError,
+)
+
+# Environment variable for the server address (``<host>:<port>``) - if set to
+# ``off`` the CLI does not use a running server
+SERVER_ENV_VAR = 'OED_SERVER'
+
+# Environment variable for the server access token - if not set the token is
+# taken from the server state file
+SERVER_TOKEN_ENV_VAR = 'OED_SERVER_TOKEN'
+
+# The hosts which are accepted in the ``Host`` header of a request, in
+# addition to the host the server is bound to
+_LOCAL_HOSTS = {'127.0.0.1', 'localhost', '::1'}
+
+DEFAULT_MAX_CONCURRENT = os.cpu_count() or 1
+DEFAULT_MAX_QUEUED = 64
+
+
+def _header_errors(schema_type, file_or_headers):
+    from .report import header_errors
+    return header_errors(schema_type, file_or_headers)
+
+
+def _file_errors(schema_type, file_or_data, chunksize=None, order='column', check_cr=False, check_rules=False, rules_fp=None):
+    from .report import file_errors
+    from .utils import DEFAULT_CHUNKSIZE
+    return file_errors(
+        schema_type,
+        file_or_data,
+        chunksize=(chunksize or DEFAULT_CHUNKSIZE),
+        order=order,
+        check_cr=check_cr,
+        check_rules=check_rules,
+        rules_fp=rules_fp
+    )
+
+
+def _get_columns(**kwargs):
+    from .query import get_columns
+    return get_columns(**kwargs)
+
+
+def _search_columns(query, schema_types=None, limit=None):
+    from .query import search_columns
+    return search_columns(query, schema_types=schema_types, limit=limit)
+
+
+def _lookup_value(value, header=None):
+    from .query import lookup_value
+    return lookup_value(value, header=header)
+
+
+def _sample_column(schema_type, header, size=10, seed=None):
+    from .schema import sample_column
+    return sample_column(schema_type, header, size=size, rng=seed)
+
+
+# The server operations - each is called with the (JSON) request body as
+# keyword arguments, and returns a list or generator of results
+SERVER_OPS = {
+    'columns': _get_columns,
+    'file_errors': _file_errors,
+    'header_errors': _header_errors,
+    'lookup': _lookup_value,
+    'sample': _sample_column,
+    'search': _search_columns
+}
+
+
+_NO_RESULTS = object()
+
+
+def get_server_state_fp() -> str:
+    """
+    Returns the path of the server state file, which holds the address,
+    process ID and access token of the running server.
+
+    :return: The server state file path
+    :rtype: str
+    """
+    return os.path.join(os.path.expanduser('~'), '.oedtools', 'server.json')
+
+
+def _dumps(obj: Any) -> str:
+    return json.dumps(obj, default=str)
+
+
+def _get_host(host_header: Optional[str]) -> str:
+    # The host of a ``Host`` header, without the port, e.g. ``localhost`` for
+    # ``localhost:8000`` and ``::1`` for ``[::1]:8000``
+    host = (host_header or '').strip().lower()
+    if host.startswith('['):
+        return host[1:host.find(']')]
+    return host.rpartition(':')[0] if ':' in host else host
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super(self.__class__, self).log_message(format, *args)
+
+    def _send_error(self, status: int, error: Exception) -> None:
+        body = _dumps({'error': {
+            'type': error.__class__.__name__,
+            'msg': getattr(error, 'msg', str(error))
+        }}).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _check_request(self) -> bool:
+        # Requests must be for the server's own host, which prevents DNS
+        # rebinding (a web page whose domain resolves to this host), and must
+        # have the server's access token
+        if _get_host(self.headers.get('Host')) not in self.server.allowed_hosts:
+            self._send_error(403, ProcessError('Invalid Host header'))
+            return False
+
+        scheme, _, token = (self.headers.get('Authorization') or '').partition(' ')
+        if scheme.lower() != 'bearer' or not hmac.compare_digest(token.strip().encode('utf-8'), self.server.token.encode('utf-8')):
+            self._send_error(401, ProcessError('Missing or invalid access token'))
+            return False
+
+        return True
+
+    def do_GET(self):
+        if not self._check_request():
+            return
+
+        if self.path == '/status':
+            body, content_type = _dumps(self.server.status()).encode('utf-8'), 'application/json'
+        elif self.path == '/metrics':
+            from .metrics import (
+                CONTENT_TYPE,
+                REGISTRY,
+            )
+            body, content_type = REGISTRY.to_text().encode('utf-8'), CONTENT_TYPE
+        else:
+            return self._send_error(404, ProcessError('Unknown path "{}"'.format(self.path)))
+
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if not self._check_request():
+            return
+
+        op = SERVER_OPS.get(self.path.strip('/'))
+
+        if not op:
+            return self._send_error(404, ProcessError('Unknown operation "{}"'.format(self.path)))
+
+        try:
+            kwargs = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or '{}')
+        except ValueError as e:
+            return self._send_error(400, ProcessError('Invalid request body: {}'.format(e)))
+
+        if not self.server.acquire():
+            return self._send_error(503, ProcessError('Server busy - the request queue is full'))
+
+        try:
+            # Errors raised before the first result are returned as error
+            # responses, and errors raised later as a final error line
+            try:
+                results = iter(op(**kwargs))
+                first = next(results, _NO_RESULTS)
+            except (OedError, TypeError, ValueError) as e:
+                return self._send_error(400, e)
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/x-ndjson')
+            self.send_header('Connection', 'close')
+            self.end_headers()
+
+            if first is _NO_RESULTS:
+                return
+
+            out = io.BufferedWriter(self.wfile, buffer_size=2 ** 16)
+            try:
+                out.write((_dumps({'result': first}) + '\n').encode('utf-8'))
+                for result in results:
+                    out.write((_dumps({'result': result}) + '\n').encode('utf-8'))
+            except (OedError, TypeError, ValueError) as e:
+                out.write((_dumps({'error': {'type': e.__class__.__name__, 'msg': getattr(e, 'msg', str(e))}}) + '\n').encode('utf-8'))
+            finally:
+                out.flush()
+                out.detach()
+        finally:
+            self.server.release()
+
+
+class OedServer(ThreadingMixIn, HTTPServer):
+    """
+    A threaded localhost HTTP server for OED validation, query, lookup and
+    sampling requests. The schemas, values profile and query indexes are
+    loaded once, when the server is created, and shared by all requests.
+
+    Every request must have the server's access token, as an
+    ``Authorization: Bearer <token>`` header, and a ``Host`` header for
+    ``127.0.0.1``, ``localhost``, ``::1`` or the host the server is bound
+    to - other requests are rejected with a ``401`` or ``403`` response. As
+    the server reads the files named in requests, and returns their values
+    in error reports, this stops other users, and web pages (by DNS
+    rebinding), from using it to read files.
+
+    At most ``max_concurrent`` requests are processed at a time, and up to
+    ``max_queued`` more wait for a free slot - further requests are rejected
+    with a ``503`` response, which the client treats as the server being
+    unavailable.
+
+    Operations are requested as ``POST /<operation>``, with the keyword
+    arguments of the operation as a JSON object in the request body (see
+    ``SERVER_OPS``), and the results are streamed back as JSON lines, each
+    either ``{"result": ...}`` or, if an error occurred, ``{"error": ...}``.
+    ``GET /status`` returns the server status, and ``GET /metrics`` the
+    metrics of the server process (see :py:mod:`oedtools.metrics`), in the
+    Prometheus text exposition format.
+    """
+    daemon_threads = True
+
+    def __init__(
+        self,
+        host: Optional[str] = '127.0.0.1',
+        port: Optional[int] = 0,
+        max_concurrent: Optional[int] = DEFAULT_MAX_CONCURRENT,
+        max_queued: Optional[int] = DEFAULT_MAX_QUEUED,
+        quiet: Optional[bool] = True,
+        token: Optional[str] = None
+    ):
+        """
+        :param host: (Optional) The host to bind to (default is ``127.0.0.1``)
+        :type host: str
+
+        :param port: (Optional) The port to bind to (default is ``0``, which
+                     binds to a free port)
+        :type port: int
+
+        :param max_concurrent: (Optional) The maximum number of requests
+                               processed at a time (default is the number of
+                               CPUs)
+        :type max_concurrent: int
+
+        :param max_queued: (Optional) The maximum number of requests waiting
+                           to be processed (default is ``DEFAULT_MAX_QUEUED``)
+        :type max_queued: int
+
+        :param quiet: (Optional) Whether to suppress request logging
+        :type quiet: bool
+
+        :param token: (Optional) The access token (default is a random
+                      token)
+        :type token: str
+        """
+        self._warm()
+
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.quiet = quiet
+        self.token = token or secrets.token_urlsafe(32)
+        self.allowed_hosts = _LOCAL_HOSTS.union([host.lower()] if host not in ('', '0.0.0.0', '::') else [])
+
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._num_requests = 0
+
+        super(self.__class__, self).__init__((host, port), _RequestHandler)
+
+    @staticmethod
+    def _warm() -> None:
+        from .query import (
+            get_index,
+            get_text_index,
+        )
+        from .validate import OedValidator  # noqa: F401
+        from .values import get_values_index
+
+        get_index()
+        get_text_index()
+        get_values_index()
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self.server_address[:2]
+
+    def acquire(self) -> bool:
+        """
+        Waits for a free processing slot, unless the request queue is full.
+
+        :return: Whether a slot was acquired
+        :rtype: bool
+        """
+        with self._lock:
+            if self._pending >= self.max_concurrent + self.max_queued:
+                return False
+            self._pending += 1
+            self._num_requests += 1
+
+        self._slots.acquire()
+
+        return True
+
+    def release(self) -> None:
+        """
+        Releases a processing slot.
+        """
+        self._slots.release()
+        with self._lock:
+            self._pending -= 1
+
+    def status(self) -> Dict:
+        """
+        Returns the server status.
+
+        :return: The server status
+        :rtype: dict
+        """
+        from .validate import OedValidator
+
+        with self._lock:
+            pending = self._pending
+
+        return {
+            'pid': os.getpid(),
+            'address': '{}:{}'.format(*self.address),
+            'schema_version': OedValidator.schema_version,
+            'max_concurrent': self.max_concurrent,
+            'max_queued': self.max_queued,
+            'active': min(pending, self.max_concurrent),
+            'queued': max(pending - self.max_concurrent, 0),
+            'num_requests': self._num_requests
+        }
+
+
+def serve(
+    host: Optional[str] = '127.0.0.1',
+    port: Optional[int] = 0,
+    max_concurrent: Optional[int] = DEFAULT_MAX_CONCURRENT,
+    max_queued: Optional[int] = DEFAULT_MAX_QUEUED,
+    state_fp: Optional[str] = None,
+    quiet: Optional[bool] = True
+) -> None:
+    """
+    Runs an OED server until interrupted (or terminated). The server
+    address, process ID and access token are written to the server state
+    file while it is running, which is how the CLI finds it - the file is
+    only readable by the user running the server.
+
+    :param host: (Optional) The host to bind to (default is ``127.0.0.1``)
+    :type host: str
+
+    :param port: (Optional) The port to bind to (default is ``0``, which
+                 binds to a free port)
+    :type port: int
+
+    :param max_concurrent: (Optional) The maximum number of requests
+                           processed at a time (default is the number of CPUs)
+    :type max_concurrent: int
+
+    :param max_queued: (Optional) The maximum number of requests waiting to
+                       be processed (default is ``DEFAULT_MAX_QUEUED``)
+    :type max_queued: int
+
+    :param state_fp: (Optional) The server state file path (default is
+                     given by :py:meth:`get_server_state_fp`)
+    :type state_fp: str
+
+    :param quiet: (Optional) Whether to suppress request logging
+    :type quiet: bool
+    """
+    state_fp = state_fp or get_server_state_fp()
+
+    server = OedServer(host=host, port=port, max_concurrent=max_concurrent, max_queued=max_queued, quiet=quiet)
+
+    os.makedirs(os.path.dirname(state_fp), mode=0o700, exist_ok=True)
+
+    # The file is created, or truncated, with owner only permissions, before
+    # the token is written to it
+    fd = os.open(state_fp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    os.chmod(state_fp, 0o600)
+    with io.open(fd, 'w', encoding='utf-8') as f:
+        f.write(json.dumps({'address': '{}:{}'.format(*server.address), 'pid': os.getpid(), 'token': server.token}))
+
+    def _interrupt(signum, frame):
+        raise KeyboardInterrupt
+
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, _interrupt)
+
+    print('OED server listening on {}:{} (pid {})'.format(*server.address, os.getpid()), file=sys.stderr)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        try:
+            with io.open(state_fp, 'r', encoding='utf-8') as f:
+                if json.load(f).get('pid') == os.getpid():
+                    os.remove(state_fp)
+        except (OSError, ValueError):
+            pass
+
+
+class OedClient(object):
+    """
+    A thin client for a running OED server (see :py:class:`OedServer`). The
+    methods mirror the functions they call on the server, and raise
+    ``ConnectionError`` if the server cannot be reached, is busy, or rejects
+    the access token, so that callers can fall back to local processing.
+    """
+
+    def __init__(self, host: str, port: int, timeout: Optional[float] = None, token: Optional[str] = None):
+        """
+        :param host: The server host
+        :type host: str
+
+        :param port: The server port
+        :type port: int
+
+        :param timeout: (Optional) The socket timeout in seconds
+        :type timeout: float
+
+        :param token: (Optional) The server access token
+        :type token: str
+        """
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.token = token
+
+    def __repr__(self) -> str:
+        return '<{} address="{}:{}">'.format(self.__class__.__name__, self.host, self.port)
+
+    @staticmethod
+    def _raise(error: Dict) -> None:
+        cls = getattr(exceptions, error.get('type') or '', None)
+        if not (isinstance(cls, type) and issubclass(cls, OedError)):
+            cls = ProcessError
+        raise cls(error.get('msg'))
+
+    def _request(self, method: str, path: str, body: Optional[Dict] = None) -> http.client.HTTPResponse:
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            data = json.dumps(body or {}).encode('utf-8') if method == 'POST' else None
+            conn.request(method, path, body=data, headers={
+                'Content-Type': 'application/json',
+                'Authorization': 'Bearer {}'.format(self.token or '')
+            })
+            resp = conn.getresponse()
+        except OSError as e:
+            conn.close()
+            raise ConnectionError('OED server at {}:{} is not available: {}'.format(self.host, self.port, e))
+
+        if resp.status == 503:
+            conn.close()
+            raise ConnectionError('OED server at {}:{} is busy'.format(self.host, self.port))
+        elif resp.status in (401, 403):
+            conn.close()
+            raise ConnectionError('OED server at {}:{} rejected the request - check the access token'.format(self.host, self.port))
+        elif resp.status != 200:
+            try:
+                self._raise(json.loads(resp.read()).get('error') or {})
+            finally:
+                conn.close()
+
+        return resp
+
+    def status(self) -> Dict:
+        """
+        Returns the server status.
+        """
+        resp = self._request('GET', '/status')
+        try:
+            return json.loads(resp.read())
+        finally:
+            resp.close()
+
+    def metrics(self) -> str:
+        """
+        Returns the server metrics, in the Prometheus text exposition format.
+        """
+        resp = self._request('GET', '/metrics')
+        try:
+            return resp.read().decode('utf-8')
+        finally:
+            resp.close()
+
+    def iter_results(self, op: str, **kwargs) -> Generator[Any, None, None]:
+        """
+        Generates the results of a server operation, as they are streamed
+        back by the server. The request is made when this is called, so that
+        an unavailable server is detected before any results are consumed.
+
+        :param op: The operation (see ``SERVER_OPS``)
+        :type op: str
+
+        :return: A generator of results
+        :rtype: generator
+        """
+        resp = self._request('POST', '/{}'.format(op), body=kwargs)
+
+        def results():
+            try:
+                for line in resp:
+                    line = json.loads(line)
+                    if 'error' in line:
+                        self._raise(line['error'])
+                    yield line['result']
+            finally:
+                resp.close()
+
+        return results()
+
+    @staticmethod
+    def _with_file(records: Generator[Dict, None, None], fp: str) -> Generator[Dict, None, None]:
+        for record in records:
+            record['file'] = fp
+            yield record
+
+    def header_errors(self, schema_type, file_or_headers):
+        if not isinstance(file_or_headers, str):
+            return self.iter_results('header_errors', schema_type=schema_type, file_or_headers=list(file_or_headers))
+
+        # File paths are sent as absolute paths, as the server can have a
+        # different working directory, but reported as given
+        records = self.iter_results('header_errors', schema_type=schema_type, file_or_headers=os.path.abspath(file_or_headers))
+
+        return self._with_file(records, file_or_headers)
+
+    def file_errors(self, schema_type, file_or_data, chunksize=None, order='column', check_cr=False, check_rules=False, rules_fp=None):
+        kwargs = {
+            'schema_type': schema_type,
+            'chunksize': chunksize,
+            'order': order,
+            'check_cr': check_cr,
+            'check_rules': check_rules,
+            'rules_fp': os.path.abspath(rules_fp) if rules_fp else None
+        }
+
+        if not isinstance(file_or_data, str):
+            return self.iter_results('file_errors', file_or_data=list(file_or_data), **kwargs)
+
+        records = self.iter_results('file_errors', file_or_data=os.path.abspath(file_or_data), **kwargs)
+
+        return self._with_file(records, file_or_data)
+
+    def get_columns(self, **kwargs):
+        return list(self.iter_results('columns', **kwargs))
+
+    def search_columns(self, query, schema_types=None, limit=None):
+        return list(self.iter_results('search', query=query, schema_types=schema_types, limit=limit))
+
+    def lookup_value(self, value, header=None):
+        return list(self.iter_results('lookup', value=value, header=header))
+
+    def sample_column(self, schema_type, header, size=10, seed=None):
+        return list(self.iter_results('sample', schema_type=schema_type, header=header, size=size, seed=seed))
+
+
+def _pid_exists(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (OSError, TypeError, ValueError):
+        return True
+
+    return True
+
+
+def get_client(state_fp: Optional[str] = None) -> Optional[OedClient]:
+    """
+    Returns a client for the running OED server, if there is one, otherwise
+    ``None``. The server address is taken from the ``OED_SERVER`` environment
+    variable (``<host>:<port>``), if set, otherwise from the server state
+    file, if it exists and the server process is still running. The access
+    token is taken from the ``OED_SERVER_TOKEN`` environment variable, if
+    set, otherwise from the server state file. Setting ``OED_SERVER=off``
+    disables the use of a server. This does not connect to the server.
+
+    :param state_fp: (Optional) The server state file path (default is given
+                     by :py:meth:`get_server_state_fp`)
+    :type state_fp: str
+
+    :return: A client, or ``None``
+    :rtype: OedClient, None
+    """
+    address = os.environ.get(SERVER_ENV_VAR)
+
+    if address and address.lower() in ('0', 'off', 'false', 'no'):
+        return
+
+    try:
+        with io.open(state_fp or get_server_state_fp(), 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        state = None
+
+    if not address:
+        if not state or not _pid_exists(state.get('pid')):
+            return
+        address = state.get('address')
+
+    token = os.environ.get(SERVER_TOKEN_ENV_VAR) or (state.get('token') if isinstance(state, dict) else None)
+
+    host, _, port = (address or '').rpartition(':')
+
+    try:
+        return OedClient(host or '127.0.0.1', int(port), token=token)
+    except ValueError:
+        return
@@ -0,0 +1,297 @@
+__all__ = [
+    'add_hook',
+    'get_hooks',
+    'get_profile',
+    'hooks',
+    'remove_hook',
+    'span',
+    'SPANS',
+    'TraceHook'
+]
+
+
+"""
+Pluggable tracing hooks - callers register hooks which receive start and
+end events, with attributes, for each stage of the validation and
+reporting of a file, e.g. to forward them as spans to a tracing system
+"""
+
+import threading
+
+from contextlib import contextmanager
+from typing import (
+    Any,
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    Optional,
+)
+
+from .profiling import (
+    NULL_PROFILE,
+    ValidationProfile,
+)
+
+
+# The spans, and their attributes - all the spans of a file validation have
+# the ``file`` (the file path, or ``None`` for a row dict array) and
+# ``schema_type`` attributes, and the other attributes are set by the end of
+# the span:
+#
+# ``validate``      - the validation of a file (``rows``, ``errors``)
+# ``read``          - the reading (parsing) of a chunk (``rows``)
+# ``normalise``     - the normalisation of the nulls of a chunk (``rows``)
+# ``headers``       - the validation of the headers (``rows`` is ``0``)
+# ``column``        - the validation of a column of a chunk (``column``,
+#                     ``rows``, ``errors``)
+# ``cr_rules``      - the CR rule checks of a chunk (``rows``)
+# ``row_rules``     - the row rule checks of a chunk (``rows``)
+# ``aggregate``     - the aggregation of the errors of a chunk (``rows``)
+# ``report``        - the generation of the report records of a chunk
+#                     (``rows`` is the number of records)
+# ``write_report``  - the writing of a report (``format``, ``output_file``,
+#                     ``records``), which encloses the spans of the
+#                     validation when the records are generated by
+#                     :py:meth:`oedtools.report.file_errors`
+#
+# Spans are nested - a span ends before the span in which it started - and
+# a span which ends with an exception has the exception as the ``error``
+# attribute
+SPANS = ['validate', 'read', 'normalise', 'headers', 'column', 'cr_rules', 'row_rules', 'aggregate', 'report', 'write_report']
+
+_HOOKS = []
+
+_HOOKS_LOCK = threading.Lock()
+
+
+class TraceHook(object):
+    """
+    The tracing hook interface - a hook is any object with ``start`` and
+    ``end`` methods, and this class can be subclassed to implement only one
+    of them. Hooks are called synchronously, in the thread which validates
+    the file, so they should be fast, and should not raise exceptions.
+    """
+
+    def start(self, name: str, attrs: Dict[str, Any]) -> Any:
+        """
+        Called when a span starts.
+
+        :param name: The span name (see ``SPANS``)
+        :type name: str
+
+        :param attrs: The span attributes - the same dict is passed to
+                      :py:meth:`end`, with the attributes set during the
+                      span, so it should not be modified
+        :type attrs: dict
+
+        :return: A token for the span, e.g. a span object of the tracing
+                 system, which is passed to :py:meth:`end`
+        :rtype: object
+        """
+        return None
+
+    def end(self, token: Any, name: str, attrs: Dict[str, Any]) -> None:
+        """
+        Called when a span ends.
+
+        :param token: The token returned by :py:meth:`start` for the span
+        :type token: object
+
+        :param name: The span name (see ``SPANS``)
+        :type name: str
+
+        :param attrs: The span attributes
+        :type attrs: dict
+        """
+        pass
+
+
+def add_hook(hook: TraceHook) -> None:
+    """
+    Registers a tracing hook, for all validations in the process.
+
+    :param hook: The hook
+    :type hook: oedtools.tracing.TraceHook
+    """
+    global _HOOKS
+
+    # The hook list is replaced rather than modified, so that a validation
+    # which is running in another thread is not affected
+    with _HOOKS_LOCK:
+        _HOOKS = _HOOKS + [hook]
+
+
+def remove_hook(hook: TraceHook) -> None:
+    """
+    Unregisters a tracing hook - unregistering a hook which is not
+    registered has no effect.
+
+    :param hook: The hook
+    :type hook: oedtools.tracing.TraceHook
+    """
+    global _HOOKS
+
+    with _HOOKS_LOCK:
+        _HOOKS = [h for h in _HOOKS if h is not hook]
+
+
+def get_hooks() -> List[TraceHook]:
+    """
+    Returns the registered tracing hooks.
+
+    :return: The hooks
+    :rtype: list
+    """
+    return list(_HOOKS)
+
+
+@contextmanager
+def hooks(*_hooks: TraceHook) -> Generator[None, None, None]:
+    """
+    A context manager which registers tracing hooks for the duration of a
+    block.
+    """
+    for hook in _hooks:
+        add_hook(hook)
+    try:
+        yield
+    finally:
+        for hook in _hooks:
+            remove_hook(hook)
+
+
+class _Span(object):
+
+    __slots__ = ('hooks', 'name', 'attrs', 'tokens')
+
+    def __init__(self, _hooks, name, attrs):
+        self.hooks = _hooks
+        self.name = name
+        self.attrs = attrs
+        self.tokens = None
+
+    def __enter__(self):
+        self.tokens = [hook.start(self.name, self.attrs) for hook in self.hooks]
+        return self.attrs
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None and not isinstance(exc, GeneratorExit):
+            self.attrs['error'] = exc
+        for hook, token in zip(reversed(self.hooks), reversed(self.tokens)):
+            hook.end(token, self.name, self.attrs)
+        return False
+
+
+class _NullSpan(object):
+    # The span used when no hooks are registered - its attributes dict is
+    # shared, and never read
+
+    __slots__ = ('attrs',)
+
+    def __init__(self):
+        self.attrs = {}
+
+    def __enter__(self):
+        return self.attrs
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name: str, **attrs: Any) -> Any:
+    """
+    Returns a context manager for a span, which calls the registered hooks
+    when it starts and ends, and yields the attributes dict, in which
+    attributes can be set during the span. If no hooks are registered a
+    shared no-op context manager is returned, so an untraced span costs a
+    function call and a list check.
+
+    :param name: The span name
+    :type name: str
+
+    :return: The span context manager
+    :rtype: object
+    """
+    _hooks = _HOOKS
+    if not _hooks:
+        return _NULL_SPAN
+    return _Span(_hooks, name, attrs)
+
+
+class _TracingProfile(object):
+    # A profile which calls the hooks for the stages and columns of a
+    # validation, and also passes them to a (possibly null) profile
+
+    def __init__(self, _hooks, profile, attrs):
+        self.hooks = _hooks
+        self.profile = profile
+        self.attrs = attrs
+        self.memory = profile.memory
+
+    def add(self, name, seconds, rows=0, memory=None):
+        self.profile.add(name, seconds, rows=rows, memory=memory)
+
+    @contextmanager
+    def stage(self, name, rows=0):
+        res = {'rows': rows}
+        with _Span(self.hooks, name, {**self.attrs, **{'rows': rows}}) as attrs:
+            with self.profile.stage(name, rows=rows) as stage:
+                yield res
+                stage['rows'] = res['rows']
+            attrs['rows'] = res['rows']
+
+    @contextmanager
+    def column(self, header, rows=0):
+        res = {'errors': 0}
+        with _Span(self.hooks, 'column', {**self.attrs, **{'column': header, 'rows': rows}}) as attrs:
+            with self.profile.column(header, rows=rows) as col_profile:
+                yield res
+                col_profile['errors'] = res['errors']
+            attrs['errors'] = res['errors']
+
+    def timed(self, name, func):
+        # Timed functions are called once per report record, which is too
+        # fine-grained for spans
+        return self.profile.timed(name, func)
+
+    def iter_stage(self, name, iterable):
+        it = iter(self.profile.iter_stage(name, iterable))
+        while True:
+            with _Span(self.hooks, name, dict(self.attrs)) as attrs:
+                try:
+                    item = next(it)
+                except StopIteration:
+                    attrs['rows'] = 0
+                    return
+                attrs['rows'] = len(item)
+            item = [item]
+            yield item.pop()
+
+
+def get_profile(profile: Optional[ValidationProfile] = None, **attrs: Any) -> Any:
+    """
+    Returns the profile to be used by an instrumented validation or report
+    function. If no hooks are registered this is the given profile, or
+    ``oedtools.profiling.NULL_PROFILE``. Otherwise it is a profile which
+    calls the hooks for the stages and columns, with the given attributes,
+    and also passes them to the given profile. A profile which already calls
+    the hooks is returned as it is, so that nested calls, e.g. of
+    :py:meth:`oedtools.validate.OedValidator.read_data` by
+    :py:meth:`oedtools.validate.OedValidator.validate_chunks`, do not call
+    them twice.
+
+    :param profile: (Optional) The profile
+    :type profile: oedtools.profiling.ValidationProfile
+
+    :return: The profile
+    :rtype: oedtools.profiling.ValidationProfile
+    """
+    _hooks = _HOOKS
+    if not _hooks or isinstance(profile, _TracingProfile):
+        return profile or NULL_PROFILE
+    return _TracingProfile(_hooks, profile or NULL_PROFILE, attrs)
+
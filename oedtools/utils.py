@@ -1,6 +1,10 @@
 __all__ = [
+    'DEFAULT_CHUNKSIZE',
     'generate_token_sequence',
+    'generate_token_sequences',
     'get_method',
+    'get_random_generator',
+    'get_seed_sequence',
     'get_value',
     'is_real_number',
     'is_valid_token_sequence',
@@ -23,12 +27,16 @@ from collections import (
 from typing import (
     Callable,
     Iterable,
+    List,
     Optional,
     Union,
 )
 
-import numpy as np
 
+# The default number of rows read and validated at a time from OED input
+# files - defined here, rather than in ``oedtools.validate``, so that it can
+# be used without importing Pandas, e.g. by the CLI
+DEFAULT_CHUNKSIZE = 10 ** 5
 
 SQL_NUMERIC_DTYPES = OrderedDict({
     'bit': {
@@ -120,7 +128,60 @@ def sql_to_python_dtype(sql_dtype: str, as_numpy_dtype: Optional[bool] = False)
     return 'str' if not as_numpy_dtype else 'object'
 
 
-def generate_token_sequence(tokens: Iterable[str], seq_length: Optional[int] = 10, sep: Optional[str] = ';', unique: Optional[bool] = True) -> str:
+def get_seed_sequence(seed: Optional[Union[int, 'np.random.SeedSequence']] = None) -> 'np.random.SeedSequence':
+    """
+    Returns a Numpy seed sequence for a seed, which can be an integer or a
+    ``numpy.random.SeedSequence`` (returned as is). If no seed is given the
+    sequence is seeded from the global Numpy random state, so that
+    ``np.random.seed`` still makes samples reproducible. Independent child
+    sequences, e.g. for parallel workers, can be spawned from the sequence
+    with ``SeedSequence.spawn``.
+
+    :param seed: (Optional) The seed or seed sequence
+    :type seed: int, numpy.random.SeedSequence
+
+    :return: The seed sequence
+    :rtype: numpy.random.SeedSequence
+    """
+    import numpy as np
+
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+
+    if seed is None:
+        seed = np.random.randint(0, 2 ** 32, size=4, dtype=np.uint64).tolist()
+
+    return np.random.SeedSequence(seed)
+
+
+def get_random_generator(seed: Optional[Union[int, 'np.random.SeedSequence', 'np.random.Generator']] = None) -> 'np.random.Generator':
+    """
+    Returns a Numpy random generator for a seed, which can be an integer, a
+    ``numpy.random.SeedSequence`` or a generator (returned as is). If no seed
+    is given the generator is seeded from the global Numpy random state (see
+    :py:meth:`get_seed_sequence`).
+
+    :param seed: (Optional) The seed or generator
+    :type seed: int, numpy.random.SeedSequence, numpy.random.Generator
+
+    :return: The generator
+    :rtype: numpy.random.Generator
+    """
+    import numpy as np
+
+    if isinstance(seed, np.random.Generator):
+        return seed
+
+    return np.random.default_rng(get_seed_sequence(seed))
+
+
+def generate_token_sequence(
+    tokens: Iterable[str],
+    seq_length: Optional[int] = 10,
+    sep: Optional[str] = ';',
+    unique: Optional[bool] = True,
+    rng: Optional[Union[int, 'np.random.Generator']] = None
+) -> str:
     """
     Generates a string containing a sequence of tokens, randomly sampled from
     a given list or tuple of tokens, of a given length and separated by a given
@@ -144,12 +205,16 @@ def generate_token_sequence(tokens: Iterable[str], seq_length: Optional[int] = 1
                    is ``True``)
     :type unique: bool
 
+    :param rng: (Optional) A random generator or seed (see
+                :py:meth:`get_random_generator`)
+    :type rng: int, numpy.random.Generator
+
     :return: The token sequence as a ``sep``-separated string
     :rtype: str
     """
     return '{}'.format(sep).join(
                 sorted(
-                    np.random.choice(
+                    get_random_generator(rng).choice(
                         tokens,
                         size=min(seq_length, len(tokens)) if unique else seq_length,
                         replace=(not unique)
@@ -158,6 +223,135 @@ def generate_token_sequence(tokens: Iterable[str], seq_length: Optional[int] = 1
             )
 
 
+def _comb(n: int, k: int) -> int:
+    # The binomial coefficient ``C(n, k)`` (``math.comb`` requires Python 3.8)
+    if k < 0 or k > n:
+        return 0
+    k = min(k, n - k)
+    c = 1
+    for i in range(1, k + 1):
+        c = c * (n - k + i) // i
+    return c
+
+
+def generate_token_sequences(
+    tokens: Iterable[str],
+    size: int,
+    seq_length: Optional[int] = 10,
+    sep: Optional[str] = ';',
+    unique: Optional[bool] = True,
+    rng: Optional[Union[int, 'np.random.Generator']] = None
+) -> List[str]:
+    """
+    Generates a list of token sequence strings, as generated by
+    :py:meth:`generate_token_sequence`, in a single batch. The token indices
+    of all the sequences are sampled as one integer matrix - for unique
+    tokens using Floyd's algorithm, one position at a time - and each distinct
+    sequence is joined into a string only once. Sets of unique tokens are
+    keyed by their rank in the combinatorial number system, which maps the
+    sets of ``k`` of ``n`` tokens onto the integers ``0`` to ``C(n, k) - 1``,
+    so that the strings can be looked up in a dense table without sorting.
+
+    :param tokens: The list or tuple of tokens to sample from
+    :type tokens: list, tuple
+
+    :param size: The number of token sequences
+    :type size: int
+
+    :param seq_length: The length of each token sequence (see
+                       :py:meth:`generate_token_sequence`, default is ``10``)
+    :type seq_length: int
+
+    :param sep: The token separator (default is ``;``)
+    :type sep: str
+
+    :param unique: Whether the tokens in each sequence must be unique
+                   (default is ``True``)
+    :type unique: bool
+
+    :param rng: (Optional) A random generator or seed (see
+                :py:meth:`get_random_generator`)
+    :type rng: int, numpy.random.Generator
+
+    :return: The token sequences
+    :rtype: list
+    """
+    import numpy as np
+
+    rng = get_random_generator(rng)
+
+    tokens = np.array(sorted(tokens), dtype=object)
+    num_tokens = len(tokens)
+
+    if size <= 0:
+        return []
+
+    # The token indices are held as one row per position in the sequences,
+    # so that each step of the sampling, and of the ranking, works on
+    # contiguous 1D arrays
+    if unique:
+        seq_length = min(seq_length, num_tokens)
+        idxs = np.empty((seq_length, size), dtype=np.int64)
+        dups = np.empty(size, dtype=bool)
+        for i, j in enumerate(range(num_tokens - seq_length, num_tokens)):
+            t = rng.integers(0, j + 1, size=size)
+            dups[:] = False
+            for prev in idxs[:i]:
+                dups |= (prev == t)
+            idxs[i] = np.where(dups, j, t)
+    else:
+        idxs = (
+            rng.integers(0, num_tokens, size=(size, seq_length)) if num_tokens
+            else np.empty((size, 0), dtype=np.int64)
+        ).T
+
+    # Short sequences (the schemas sample sequences of 4 tokens) are sorted
+    # with an odd-even transposition sorting network, which is several
+    # times faster than sorting the columns, but is quadratic in the length
+    if len(idxs) <= 6:
+        idxs = np.ascontiguousarray(idxs)
+        lo = np.empty(size, dtype=idxs.dtype)
+        for r in range(len(idxs)):
+            for i in range(r % 2, len(idxs) - 1, 2):
+                np.minimum(idxs[i], idxs[i + 1], out=lo)
+                np.maximum(idxs[i], idxs[i + 1], out=idxs[i + 1])
+                idxs[i] = lo
+    else:
+        idxs = np.sort(idxs, axis=0)
+
+    def join(rows):
+        return [sep.join(seq) for seq in tokens[idxs[:, rows].T].tolist()]
+
+    num_keys = _comb(num_tokens, seq_length) if unique else None
+
+    if num_keys is not None and num_keys <= max(size, 2 ** 20):
+        # The rank of a set is the sum of ``C(idx, pos)`` over the (sorted)
+        # token indices and their positions (from ``1``). The index at
+        # position ``pos`` is between ``pos - 1`` and
+        # ``num_tokens - seq_length + pos - 1``, so the table only holds
+        # the terms of those indices (by position and index offset), which
+        # are all at most the number of keys
+        table = np.array(
+            [[_comb(j + i, i + 1) for j in range(num_tokens - seq_length + 1)] for i in range(seq_length)],
+            dtype=np.int64
+        )
+        ranks = np.zeros(size, dtype=np.int64)
+        for i in range(seq_length):
+            ranks += table[i].take(idxs[i] - i)
+        first = np.full(num_keys, -1, dtype=np.int64)
+        first[ranks[::-1]] = np.arange(size)[::-1]
+        keys = np.flatnonzero(first >= 0)
+        seqs = np.empty(num_keys, dtype=object)
+        seqs[keys] = join(first[keys])
+        return seqs[ranks].tolist()
+
+    _, first, inverse = np.unique(idxs.T, axis=0, return_index=True, return_inverse=True)
+    seqs = np.empty(len(first), dtype=object)
+    seqs[:] = join(first)
+
+    return seqs[inverse.ravel()].tolist()
+
+
 def is_valid_token_sequence(tokens: Iterable[str], seq: str, sep: Optional[str] = ';') -> Union[None, bool]:
     """
     Checks whether a string consists of a sequence of unique tokens from a
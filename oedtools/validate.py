@@ -1,15 +1,19 @@
 __all__ = [
+    'DEFAULT_CHUNKSIZE',
     'OedValidator'
 ]
 
 import builtins
 import datetime
 import os
+import time
 
 from itertools import (
     starmap,
 )
 from typing import (
+    Any,
+    Callable,
     Dict,
     Generator,
     Iterable,
@@ -24,9 +28,33 @@ import pandas as pd
 from future.utils import raise_with_traceback
 
 from .exceptions import (
+    ConditionallyRequiredDataError,
+    DataOutOfRangeError,
+    get_data_error,
     get_file_error,
+    InvalidDataTypeError,
+    NullDataInNonNullColumnError,
     OedError,
     ProcessError,
+    RowRuleError,
+)
+from .metrics import (
+    record_chunk,
+    record_file,
+)
+from .profiling import ValidationProfile
+from .progress import (
+    NULL_PROGRESS,
+    ValidationProgress,
+    get_progress,
+    get_reader_position,
+)
+from .results import ValidationResults
+from .rules import (
+    check_cr_rules,
+    check_row_rules,
+    compile_cr_rules,
+    compile_row_rules,
 )
 from .schema import (
     get_column_schema,
@@ -35,7 +63,12 @@ from .schema import (
     get_schema_version,
     get_values_profile,
 )
+from .tracing import (
+    get_profile,
+    span,
+)
 from .utils import (
+    DEFAULT_CHUNKSIZE,
     get_method,
     get_value,
     is_real_number,
@@ -197,16 +230,17 @@ class OedValidator(object):
                 }
             yield r
 
-    def validate_column(
+    def get_value_checker(
         self,
         schema_type: str,
-        header: str,
-        data: Union[Iterable[Union[int, float, str]], np.ndarray],
-        column_pos: Optional[int] = None
-    ) -> Union[Dict, Generator[Dict, None, None]]:
+        header: str
+    ) -> Tuple[type, Callable[[Any], Tuple[Any, Optional[str]]]]:
         """
-        Validates column header and data. Results are yielded as a dict array, one
-        per value
+        Returns the expected Python data type of a given column, and a
+        function which checks individual values in the column against the
+        column schema. The checker returns a pair consisting of the parsed
+        value and the code of the error found for the value, or ``None`` if
+        the value is valid.
 
         :param schema_type: The file schema type (``loc``, ``acc``, ``reinsinfo`` or
                           ``reinsscope``).
@@ -215,32 +249,16 @@ class OedValidator(object):
         :param header: The column name
         :type header: str
 
-        :param data: The column data iterable (list, tuple or Numpy 1D-array)
-        :type data: list, tuple, np.ndarray
-
-        :param column_pos: The index of the starting character of the column
-                           name in the column header line (if known or
-                           applicable)
-        :type column_pos: int
+        :return: The expected column data type and the value checker
+        :rtype: tuple
         """
-        _schema_type = schema_type.lower()
-        _header = header.lower()
-
         try:
-            col_schema = get_column_schema(_schema_type, _header)
-        except OedError as e:
-            return {
-                'pass': False,
-                'exceptions': [e]
-            }
+            col_schema = self.grouped_master_schema[schema_type.lower()][header.lower()]
+        except KeyError:
+            col_schema = get_column_schema(schema_type.lower(), header.lower())
 
         exp_dtype = col_schema['py_dtype']
 
-        if not (isinstance(data, list) or isinstance(data, tuple) or isinstance(data, np.ndarray)):
-            raise ProcessError(
-                'The column data/values must be passed as a list or tuple'
-            )
-
         try:
             _exp_dtype = (
                 getattr(builtins, exp_dtype) if not exp_dtype == 'datetime.datetime'
@@ -270,46 +288,73 @@ class OedValidator(object):
 
         is_nonnull_col = not col_schema['blank']
 
-        def _validate_value(row_idx, value):
+        def _check_value(value):
             _value = get_value(value)
             if _exp_dtype == float and isinstance(_value, int):
                 _value = float(_value)
 
-            exceptions = []
-
             if is_nonnull_col and _value in [None, '']:
-                exceptions = [
-                    get_file_error(
-                        'null data in non null column',
-                        'Null value in "{}" - this is a non-null column'.format(header)
-                    )
-                ]
+                return _value, NullDataInNonNullColumnError.code
             elif _value not in [None, ''] and (
                 (_exp_dtype is int and not isinstance(_value, int)) or
                 (_exp_dtype is float and not is_real_number(_value)) or
                 (_exp_dtype is str and not (isinstance(_value, str) or isinstance(_value, int)))
             ):
-                exceptions += [
-                    get_file_error(
-                        'invalid data type',
-                        'Invalid data type for value "{}" in "{}" - expected type "{}", found type "{}"'.format(_value, header, _exp_dtype, type(_value))
-                    )
-                ]
+                return _value, InvalidDataTypeError.code
             elif _value not in [None, ''] and validation_func is None and use_range is not None and not within_range(use_range, _value):
-                exceptions += [
-                    get_file_error(
-                        'data out of range',
-                        'Invalid value "{}" in "{}" - check the column or data type range'.format(_value, header)
-                    )
-                ]
+                return _value, DataOutOfRangeError.code
             elif _value not in [None, ''] and validation_func is not None and not validation_func(use_range, _value):
-                exceptions += [
-                    get_file_error(
-                        'data out of range',
-                        'Invalid value "{}" in "{}" - check the column or data type range'.format(_value, header)
-                    )
-                ]
-            exceptions = [(row_idx + 2, e) for e in exceptions if e is not None]
+                return _value, DataOutOfRangeError.code
+
+            return _value, None
+
+        return _exp_dtype, _check_value
+
+    def validate_column(
+        self,
+        schema_type: str,
+        header: str,
+        data: Union[Iterable[Union[int, float, str]], np.ndarray],
+        column_pos: Optional[int] = None
+    ) -> Union[Dict, Generator[Dict, None, None]]:
+        """
+        Validates column header and data. Results are yielded as a dict array, one
+        per value
+
+        :param schema_type: The file schema type (``loc``, ``acc``, ``reinsinfo`` or
+                          ``reinsscope``).
+        :type schema_type: str
+
+        :param header: The column name
+        :type header: str
+
+        :param data: The column data iterable (list, tuple or Numpy 1D-array)
+        :type data: list, tuple, np.ndarray
+
+        :param column_pos: The index of the starting character of the column
+                           name in the column header line (if known or
+                           applicable)
+        :type column_pos: int
+        """
+        try:
+            _exp_dtype, check_value = self.get_value_checker(schema_type, header)
+        except OedError as e:
+            if isinstance(e, ProcessError):
+                raise
+            return {
+                'pass': False,
+                'exceptions': [e]
+            }
+
+        if not (isinstance(data, list) or isinstance(data, tuple) or isinstance(data, np.ndarray)):
+            raise ProcessError(
+                'The column data/values must be passed as a list or tuple'
+            )
+
+        def _validate_value(row_idx, value):
+            _value, code = check_value(value)
+
+            exceptions = [] if code is None else [(row_idx + 2, get_data_error(code, header, _value, _exp_dtype))]
 
             return {
                 'header': header,
@@ -323,15 +368,21 @@ class OedValidator(object):
         for _, r in zip(data, starmap(_validate_value, enumerate(data))):
             yield r
 
-    def validate(
+    def read_data(
         self,
         schema_type: str,
-        file_or_data: Union[str, Iterable[Dict]]
-    ) -> Tuple[Iterable[Dict], bool, Iterable[str]]:
+        file_or_data: Union[str, Iterable[Dict]],
+        chunksize: Optional[int] = None,
+        columns: Optional[Iterable[str]] = None,
+        profile: Optional[ValidationProfile] = None,
+        progress: Optional[ValidationProgress] = None
+    ) -> Generator[pd.DataFrame, None, None]:
         """
-        Validates an OED input file, or an iterable of row dicts from an OED
-        input file, against the corresponding OED schema for the given file
-        type.
+        Reads an OED input file, or an iterable of row dicts from an OED
+        input file, into a (string) dataframe, or a sequence of dataframes
+        ("chunks") of a given maximum number of rows, with nulls represented
+        by ``None``. A file which is read in chunks is never fully loaded
+        into memory.
 
         :param schema_type: The file schema type (``loc``, ``acc``, ``reinsinfo`` or
                           ``reinsscope``).
@@ -340,10 +391,29 @@ class OedValidator(object):
         :param file_or_data: An OED input file path or row dict array
         :type file_or_data: str, list, tuple
 
-        :return: A dict array of results (one per column), the overall result
-                (``True`` or ``False``), and the iterable of raw headers
-        :rtype: list, str, list
+        :param chunksize: (Optional) The maximum number of rows in a chunk -
+                          if not set the data is read as a single dataframe
+        :type chunksize: int
+
+        :param columns: (Optional) The column headers to read (case
+                        insensitive) - if not set all columns are read
+        :type columns: list, tuple, set
+
+        :param profile: (Optional) A profile in which the times of the
+                        ``read`` and ``normalise`` stages are accumulated
+        :type profile: oedtools.profiling.ValidationProfile
+
+        :param progress: (Optional) A progress tracker which is updated with
+                         the rows of each chunk, and the bytes of the file
+                         read, as each chunk is read
+        :type progress: oedtools.progress.ValidationProgress
+
+        :return: A generator of dataframes
+        :rtype: generator
         """
+        profile = get_profile(profile, file=(file_or_data if isinstance(file_or_data, str) else None), schema_type=schema_type)
+        progress = get_progress(progress)
+
         try:
             _schema_type = schema_type.lower()
             if _schema_type not in self.grouped_master_schema:
@@ -368,16 +438,40 @@ class OedValidator(object):
 
         is_file = isinstance(file_or_data, str)
 
+        _columns = set(c.lower() for c in columns) if columns is not None else None
+
         try:
-            df = (
+            chunks = (
                 pd.read_csv(
                     file_or_data,
                     dtype=object,
                     float_precision='high',
-                    memory_map=True
+                    memory_map=True,
+                    chunksize=chunksize,
+                    usecols=(lambda h: h.lower() in _columns) if _columns is not None else None
                 ) if is_file
                 else pd.DataFrame(file_or_data, dtype=object)
             )
+            if not is_file and _columns is not None:
+                chunks = chunks[[c for c in chunks.columns if c.lower() in _columns]]
+            if not is_file and chunksize:
+                data_df = chunks
+                chunks = (data_df.iloc[i:i + chunksize] for i in range(0, max(len(data_df), 1), chunksize))
+            elif not chunksize:
+                chunks = [chunks]
+
+            for df in profile.iter_stage('read', chunks):
+                if progress is not NULL_PROGRESS:
+                    progress.read(
+                        len(df),
+                        nbytes=(
+                            (get_reader_position(chunks) if chunksize else os.path.getsize(file_or_data))
+                            if is_file else None
+                        )
+                    )
+                with profile.stage('normalise', rows=len(df)):
+                    df = df.where(df.notnull(), None)
+                yield df
         except (IOError, FileNotFoundError, ValueError) as e:
             raise ProcessError(
                 msg=(
@@ -387,36 +481,282 @@ class OedValidator(object):
                 )
             )
 
-        df = df.where(df.notnull(), None)
+    def validate_chunks(
+        self,
+        schema_type: str,
+        file_or_data: Union[str, Iterable[Dict]],
+        chunksize: Optional[int] = DEFAULT_CHUNKSIZE,
+        check_cr: Optional[bool] = False,
+        check_rules: Optional[bool] = False,
+        rules_fp: Optional[str] = None,
+        rule_costs: Optional[Dict[str, Dict]] = None,
+        profile: Optional[ValidationProfile] = None,
+        progress: Optional[Union[Callable[[Dict], Any], ValidationProgress]] = None
+    ) -> Generator[ValidationResults, None, None]:
+        """
+        Validates an OED input file, or an iterable of row dicts from an OED
+        input file, in chunks of a given maximum number of rows - results are
+        yielded as columnar :py:class:`oedtools.results.ValidationResults`
+        objects, one per chunk, as each chunk is validated. The header errors
+        are included in the results for the first chunk. Only one chunk of
+        the data is held in memory at any time. The rows and errors of each
+        chunk, and the file once all its chunks have been validated, are
+        recorded in the process metrics (see :py:mod:`oedtools.metrics`).
 
-        raw_headers = df.columns.tolist()
+        :param schema_type: The file schema type (``loc``, ``acc``, ``reinsinfo`` or
+                          ``reinsscope``).
+        :type schema_type: str
 
-        try:
-            results = [
-                {
-                    **r,
-                    **{
-                        'data_results': [
-                            r for r in self.validate_column(
-                                schema_type, r['header'], df[r['header']].tolist(), r['column_pos']
-                            )
-                        ] if r['pass'] is True and not r['required_but_missing'] else []
-                    }
-                }
-                for r in self.validate_headers(schema_type, raw_headers)
-            ]
-        except ProcessError as e:
-            raise_with_traceback(e)
-
-        overall_pass = True
-
-        for col_res in results:
-            row_errors = [(row['row'], e) for row in col_res['data_results'] for _, e in row['exceptions']]
-            col_res['exceptions'] += row_errors
-            col_res['exceptions'] = list(set(col_res['exceptions']))
-            if col_res['exceptions']:
-                col_res['pass'] = False
-                if overall_pass is True:
-                    overall_pass = False
+        :param file_or_data: An OED input file path or row dict array
+        :type file_or_data: str, list, tuple
+
+        :param chunksize: (Optional) The maximum number of rows in a chunk
+                          (default is ``DEFAULT_CHUNKSIZE``)
+        :type chunksize: int
+
+        :param check_cr: (Optional) Whether to check the conditionally
+                         required (``CR``) columns (see
+                         :py:meth:`oedtools.rules.get_cr_rules`) - rows where
+                         a rule is triggered but the column value is null, or
+                         the column is missing, are reported as ``E411``
+                         errors, with the rule condition as the value.
+                         Conditionally required columns which are missing
+                         from the file are added to the header results, with
+                         a ``column_pos`` of ``-1``.
+        :type check_cr: bool
+
+        :param check_rules: (Optional) Whether to check the cross-column row
+                            rules (see :py:meth:`oedtools.rules.load_row_rules`)
+                            - rows which fail a rule are reported as ``E421``
+                            errors, against the first column of the rule in
+                            the file, with the rule as the value
+        :type check_rules: bool
+
+        :param rules_fp: (Optional) The row rules file path (default is
+                         ``oedtools.rules.ROW_RULES_FP``)
+        :type rules_fp: str
+
+        :param rule_costs: (Optional) A dict in which the evaluation costs of
+                           the row rules are accumulated (see
+                           :py:meth:`oedtools.rules.check_row_rules`)
+        :type rule_costs: dict
+
+        :param profile: (Optional) A profile in which the times and row
+                        counts of the validation stages, and of the
+                        validation of each column, are accumulated
+        :type profile: oedtools.profiling.ValidationProfile
+
+        :param progress: (Optional) A progress tracker, or a callback which
+                         is called with the progress at most every
+                         ``oedtools.progress.DEFAULT_INTERVAL`` seconds, and
+                         when the validation finishes (see
+                         :py:class:`oedtools.progress.ValidationProgress`)
+        :type progress: oedtools.progress.ValidationProgress, callable
+
+        :return: A generator of chunk results
+        :rtype: generator
+        """
+        fp = file_or_data if isinstance(file_or_data, str) else None
+
+        profile = get_profile(profile, file=fp, schema_type=schema_type)
+        progress = get_progress(progress)
+        progress.start(schema_type, file_or_data)
+
+        header_results = checkers = cr_rules = row_rules = None
+        row_offset = 0
+
+        # The validation time, for the metrics, excludes the time the caller
+        # spends between chunks
+        seconds = 0.0
+        start = time.perf_counter()
+
+        with span('validate', file=fp, schema_type=schema_type) as span_attrs:
+            span_attrs['rows'] = span_attrs['errors'] = 0
+
+            for df in self.read_data(schema_type, file_or_data, chunksize=chunksize, profile=profile, progress=progress):
+                rows, columns, codes, values = [], [], [], []
+
+                if header_results is None:
+                    with profile.stage('headers'):
+                        header_results = list(self.validate_headers(schema_type, df.columns.tolist()))
+                        checkers = {
+                            col_idx: self.get_value_checker(schema_type, r['header'])[1]
+                            for col_idx, r in enumerate(header_results)
+                            if r['pass'] is True and not r['required_but_missing']
+                        }
+                        for col_idx, r in enumerate(header_results):
+                            for row_num, e in r['exceptions']:
+                                rows.append(row_num)
+                                columns.append(col_idx)
+                                codes.append(e.code)
+                                values.append(None)
+                        if check_cr:
+                            cr_rules = compile_cr_rules(schema_type, df.columns.tolist())
+                            for column, _ in dict.fromkeys(c for rule in cr_rules for c in rule['columns'] if c[1] is None):
+                                header_results.append({
+                                    'header': column,
+                                    'row': 1,
+                                    'column_pos': -1,
+                                    'exceptions': [],
+                                    'pass': True,
+                                    'required_but_missing': False
+                                })
+                        if check_rules:
+                            row_rules = compile_row_rules(schema_type, df.columns.tolist(), fp=rules_fp)
+                        col_idxs = {r['header'].lower(): col_idx for col_idx, r in enumerate(header_results)}
+
+                for num, (col_idx, check_value) in enumerate(checkers.items()):
+                    header = header_results[col_idx]['header']
+                    progress.column(header, num, len(checkers))
+                    with profile.column(header, rows=len(df)) as col_profile:
+                        num_errors = len(rows)
+                        for row_idx, value in enumerate(df[header].tolist(), start=row_offset + 2):
+                            _value, code = check_value(value)
+                            if code is not None:
+                                rows.append(row_idx)
+                                columns.append(col_idx)
+                                codes.append(code)
+                                values.append(_value)
+                        col_profile['errors'] = len(rows) - num_errors
+
+                if cr_rules:
+                    with profile.stage('cr_rules', rows=len(df)):
+                        for column, _, idxs, condition in check_cr_rules(cr_rules, df):
+                            rows.extend((idxs + row_offset + 2).tolist())
+                            columns.extend([col_idxs[column.lower()]] * len(idxs))
+                            codes.extend([ConditionallyRequiredDataError.code] * len(idxs))
+                            values.extend([condition] * len(idxs))
+
+                if row_rules:
+                    with profile.stage('row_rules', rows=len(df)):
+                        for rule, idxs in check_row_rules(row_rules, df, costs=rule_costs):
+                            rows.extend((idxs + row_offset + 2).tolist())
+                            columns.extend([col_idxs[rule['header'].lower()]] * len(idxs))
+                            codes.extend([RowRuleError.code] * len(idxs))
+                            values.extend([rule['condition']] * len(idxs))
+
+                row_offset += len(df)
+
+                with profile.stage('aggregate', rows=len(df)):
+                    chunk_res = ValidationResults(schema_type, header_results, rows, columns, codes, values, num_rows=len(df))
+
+                record_chunk(schema_type.lower(), len(df), codes)
+                span_attrs['rows'] = row_offset
+                span_attrs['errors'] += len(codes)
+                progress.validated(len(df))
+
+                seconds += time.perf_counter() - start
+                yield chunk_res
+                start = time.perf_counter()
+
+            progress.finish()
+
+        record_file(schema_type.lower(), row_offset, seconds + time.perf_counter() - start)
+
+    def validate(
+        self,
+        schema_type: str,
+        file_or_data: Union[str, Iterable[Dict]],
+        columnar: Optional[bool] = False,
+        profile: Optional[ValidationProfile] = None,
+        progress: Optional[Union[Callable[[Dict], Any], ValidationProgress]] = None
+    ) -> Tuple[Union[Iterable[Dict], ValidationResults], bool, Iterable[str]]:
+        """
+        Validates an OED input file, or an iterable of row dicts from an OED
+        input file, against the corresponding OED schema for the given file
+        type.
+
+        :param schema_type: The file schema type (``loc``, ``acc``, ``reinsinfo`` or
+                          ``reinsscope``).
+        :type schema_type: str
+
+        :param file_or_data: An OED input file path or row dict array
+        :type file_or_data: str, list, tuple
+
+        :param columnar: (Optional) Whether to return the results as a
+                         columnar :py:class:`oedtools.results.ValidationResults`
+                         object, which only stores the errors, instead of a
+                         dict array (default is ``False``)
+        :type columnar: bool
+
+        :param profile: (Optional) A profile in which the times and row
+                        counts of the validation stages, and of the
+                        validation of each column, are accumulated (see
+                        :py:class:`oedtools.profiling.ValidationProfile`)
+        :type profile: oedtools.profiling.ValidationProfile
+
+        :param progress: (Optional) A progress tracker, or a callback (see
+                         :py:meth:`validate_chunks`)
+        :type progress: oedtools.progress.ValidationProgress, callable
+
+        :return: A dict array of results (one per column), or a columnar
+                 results object, the overall result (``True`` or ``False``),
+                 and the iterable of raw headers
+        :rtype: list, str, list
+        """
+        if columnar:
+            # The data is validated as a single chunk, and the generator is
+            # exhausted so that the validation finishes
+            results, = self.validate_chunks(schema_type, file_or_data, chunksize=None, profile=profile, progress=progress)
+            raw_headers = [r['header'] for r in results.header_results if not r['required_but_missing']]
+            return results, results.overall_pass, raw_headers
+
+        fp = file_or_data if isinstance(file_or_data, str) else None
+
+        profile = get_profile(profile, file=fp, schema_type=schema_type)
+        progress = get_progress(progress)
+        progress.start(schema_type, file_or_data)
+
+        start = time.perf_counter()
+
+        with span('validate', file=fp, schema_type=schema_type) as span_attrs:
+            df = next(self.read_data(schema_type, file_or_data, profile=profile, progress=progress))
+
+            raw_headers = df.columns.tolist()
+
+            with profile.stage('headers'):
+                header_results = list(self.validate_headers(schema_type, raw_headers))
+
+            results = []
+
+            num, num_columns = 0, sum(1 for r in header_results if r['pass'] is True and not r['required_but_missing'])
+
+            try:
+                for r in header_results:
+                    data_results = []
+                    if r['pass'] is True and not r['required_but_missing']:
+                        progress.column(r['header'], num, num_columns)
+                        num += 1
+                        with profile.column(r['header'], rows=len(df)) as col_profile:
+                            data_results = [
+                                res for res in self.validate_column(
+                                    schema_type, r['header'], df[r['header']].tolist(), r['column_pos']
+                                )
+                            ]
+                            col_profile['errors'] = sum(1 for res in data_results if res['exceptions'])
+                    results.append({**r, **{'data_results': data_results}})
+            except ProcessError as e:
+                raise_with_traceback(e)
+
+            overall_pass = True
+
+            with profile.stage('aggregate', rows=len(df)):
+                for col_res in results:
+                    row_errors = [(row['row'], e) for row in col_res['data_results'] for _, e in row['exceptions']]
+                    col_res['exceptions'] += row_errors
+                    col_res['exceptions'] = list(set(col_res['exceptions']))
+                    if col_res['exceptions']:
+                        col_res['pass'] = False
+                        if overall_pass is True:
+                            overall_pass = False
+
+            codes = [e.code for col_res in results for _, e in col_res['exceptions']]
+            span_attrs['rows'], span_attrs['errors'] = len(df), len(codes)
+
+        progress.validated(len(df))
+        progress.finish()
+
+        record_chunk(schema_type.lower(), len(df), codes)
+        record_file(schema_type.lower(), len(df), time.perf_counter() - start)
 
         return results, overall_pass, raw_headers
@@ -3,7 +3,9 @@ __all__ = [
     'get_column_range_by_value_group',
     'get_column_sampling_method',
     'get_column_validation_method',
+    'get_values_index',
     'get_values_profile',
+    'lookup_value',
     'SCHEMA_DIR'
 ]
 
@@ -11,17 +13,22 @@ import io
 import json
 import os
 import re
+import time
 
 from ast import literal_eval
 from collections import OrderedDict
+from functools import lru_cache
 from itertools import groupby
 from typing import (
+    Any,
     Dict,
+    List,
     Optional,
+    Tuple,
     Union,
 )
 
-import pandas as pd
+from .metrics import SCHEMA_LOAD_SECONDS
 
 
 SCHEMA_DIR = os.path.join(os.path.dirname(__file__), 'schema')
@@ -46,6 +53,8 @@ def generate_values_profile(target_fp: Optional[str] = None) -> Union[str, Dict[
     :return: A values profile dict if no target file path
     :rtype: str, dict
     """
+    import pandas as pd
+
     _target_fp = os.path.abspath(target_fp) if target_fp else None
 
     def_df = pd.read_csv(os.path.join(SCHEMA_DIR, 'master_def.csv'))
@@ -91,8 +100,141 @@ def get_values_profile() -> Dict[str, Dict[str, Dict]]:
     :return: The values profile dict
     :rtype: dict
     """
+    start = time.perf_counter()
     with io.open(os.path.join(SCHEMA_DIR, 'values.json'), 'r', encoding='utf-8') as f:
-        return json.load(f)
+        values_profile = json.load(f)
+    SCHEMA_LOAD_SECONDS.observe(time.perf_counter() - start, schema='values')
+    return values_profile
+
+
+def _parse_value_id_range(value_id: str) -> Union[None, List[int], Tuple[float, float]]:
+    """
+    Parses a values profile ID which represents a range of values - an
+    integer range ``<start>:<end>`` (both included) is returned as a list
+    ``[start, end]``, and a real number range as a tuple ``(lb, ub)``. Any
+    other ID returns ``None``.
+    """
+    q = re.match(r'(-?\d+):(-?\d+)$', value_id)
+    if q:
+        return [int(q.groups()[0]), int(q.groups()[1])]
+    q = re.match(r'(-|\+){0,1}?(\d+)?(\.)?(\d+)?(e\+\d+|e-\d+)?:(-|\+){0,1}?(\d+)?(\.)?(\d+)?(e\+\d+|e-\d+)?$', value_id)
+    if q:
+        lb = literal_eval(''.join([s for s in q.groups()[:5] if s is not None]))
+        ub = literal_eval(''.join([s for s in q.groups()[5:] if s is not None]))
+        return (min(lb, ub), max(lb, ub))
+
+
+def _value_key(value: Any) -> Any:
+    """
+    Normalises a value for lookups in the values index - numeric strings are
+    converted to numbers, and other strings are stripped and lowercased.
+    """
+    if isinstance(value, str):
+        _value = value.strip()
+        try:
+            return int(_value)
+        except ValueError:
+            try:
+                return float(_value)
+            except ValueError:
+                return _value.lower()
+    return value
+
+
+@lru_cache(maxsize=None)
+def get_values_index() -> Dict[str, Any]:
+    """
+    Builds (once) and returns a reverse index of the values profile, for
+    looking up the value groups and subgroups (keys) of column values. The
+    index is a dict with the keys
+
+    * ``by_value`` - a dict mapping each (normalised) discrete value ID in the
+      profile, e.g. a currency code or deductible code, to a list of value
+      entries
+    * ``by_column_value`` - a dict mapping (lowercase column header, value)
+      pairs to a list of value entries
+    * ``ranges`` - a list of ``(lb, ub, entry, headers)`` tuples for the
+      value IDs which are ranges of values, e.g. construction code ranges,
+      sorted by the lower bound (``lb``) - ``headers`` is the set of
+      (lowercase) headers of the columns the range applies to
+
+    Each value entry is a dict with the keys ``group``, ``key``, ``id``,
+    ``desc`` and ``columns``.
+
+    String values are normalised by stripping and lowercasing, and numeric
+    strings by converting them to numbers.
+
+    :return: The values index
+    :rtype: dict
+    """
+    by_value = {}
+    by_column_value = {}
+    ranges = []
+
+    for group, group_dict in get_values_profile().items():
+        for key, v in group_dict.items():
+            if v['id'] in [None, '']:
+                continue
+
+            entry = {'group': group, 'key': key, 'id': v['id'], 'desc': v['desc'], 'columns': v['columns']}
+
+            bounds = _parse_value_id_range(v['id'])
+            if bounds is not None:
+                ranges.append((bounds[0], bounds[1], entry, frozenset(h.lower() for h in v['columns'])))
+                continue
+
+            value = _value_key(v['id'])
+            by_value.setdefault(value, []).append(entry)
+            for header in v['columns']:
+                by_column_value.setdefault((header.lower(), value), []).append(entry)
+
+    return {
+        'by_value': by_value,
+        'by_column_value': by_column_value,
+        'ranges': sorted(ranges, key=lambda r: r[0])
+    }
+
+
+def lookup_value(value: Union[str, int, float], header: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Looks up a value in the values profile, using the values index, and
+    returns the value groups and subgroups (keys) it belongs to, optionally
+    restricted to a given column, e.g. the deductible code ``5`` in
+    ``LocDedCode1Building`` is the ``cea homeowners`` key of the
+    ``deductible codes`` group.
+
+    :param value: The value - numeric strings are treated as numbers, and
+                  other strings are case insensitive
+    :type value: str, int, float
+
+    :param header: (Optional) Column header (case insensitive)
+    :type header: str
+
+    :return: (Possibly empty) list of value entries - dicts with the keys
+             ``group``, ``key``, ``id``, ``desc`` and ``columns``. Entries
+             for discrete values come before entries for value ranges
+    :rtype: list
+    """
+    index = get_values_index()
+    _value = _value_key(value)
+    _header = header.lower() if header else None
+
+    try:
+        entries = list(
+            index['by_column_value'].get((_header, _value), []) if _header
+            else index['by_value'].get(_value, [])
+        )
+    except TypeError:
+        entries = []
+
+    if isinstance(_value, (int, float)) and not isinstance(_value, bool):
+        for lb, ub, entry, headers in index['ranges']:
+            if lb > _value:
+                break
+            if _value <= ub and (not _header or _header in headers):
+                entries.append(entry)
+
+    return [dict(entry) for entry in entries]
 
 
 def get_column_range_by_value_group(
@@ -123,14 +265,9 @@ def get_column_range_by_value_group(
     ])
 
     def subval_str_to_list(subval_str):
-        q = re.match(r'(-?\d+):(-?\d+)$', subval_str)
-        if q:
-            return list(range(int(q.groups()[0]), int(q.groups()[1]) + 1))
-        q = re.match(r'(-|\+){0,1}?(\d+)?(\.)?(\d+)?(e\+\d+|e-\d+)?:(-|\+){0,1}?(\d+)?(\.)?(\d+)?(e\+\d+|e-\d+)?$', subval_str)
-        if q:
-            lb = literal_eval(''.join([s for s in q.groups()[:5] if s is not None]))
-            ub = literal_eval(''.join([s for s in q.groups()[5:] if s is not None]))
-            return (min(lb, ub), max(lb, ub))
+        bounds = _parse_value_id_range(subval_str)
+        if bounds is not None:
+            return list(range(bounds[0], bounds[1] + 1)) if isinstance(bounds, list) else bounds
         try:
             return [int(subval_str)]
         except (TypeError, ValueError):
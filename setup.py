@@ -101,7 +101,7 @@ class Publish(Command):
 setup(
     name='oedtools',
     version=version,
-    packages=find_packages(exclude=('tests', 'tests.*', 'tests.*.*')),
+    packages=find_packages(exclude=('benchmarks', 'benchmarks.*', 'tests', 'tests.*', 'tests.*.*')),
     include_package_data=True,
     package_data={
         '': [
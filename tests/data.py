@@ -7,6 +7,7 @@ __all__ = [
     'DEFAULTS',
     'DESCRIPTION_WORDS',
     'FLOAT',
+    'get_loc_data',
     'get_method',
     'get_value',
     'GROUPED_SCHEMA',
@@ -49,6 +50,7 @@ import string
 from json import JSONDecodeError
 
 import numpy as np
+import pandas as pd
 
 from hypothesis.strategies import (
     booleans,
@@ -260,6 +262,26 @@ def update_schemas():
         )
 
 
+def get_loc_data(num_rows):
+    """
+    Returns a loc. file data sample of a given number of rows, as a list of
+    row dicts, with unique location numbers, and values for the other
+    required columns which are the same for all rows.
+
+    :param num_rows: The number of rows
+    :type num_rows: int
+
+    :return: The rows
+    :rtype: list
+    """
+    return pd.DataFrame(data={
+        'LocNumber': ['L{}'.format(i) for i in range(num_rows)],
+        'AccNumber': ['A1'] * num_rows,
+        'CountryCode': ['XX'] * num_rows,
+        'BuildingTIV': ['100'] * num_rows,
+    }).to_dict(orient='records')
+
+
 def get_method(pkg_path):
     """
     Returns a method given the full package path of the method, e.g.
@@ -0,0 +1,177 @@
+import io
+import json
+import os
+
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+import pandas as pd
+
+from hypothesis import (
+    given,
+    settings,
+)
+from hypothesis.strategies import (
+    integers,
+    sampled_from,
+)
+
+from oedtools.batch import (
+    get_batch_files,
+    infer_schema_type,
+    validate_file,
+    validate_files,
+)
+from oedtools.exceptions import (
+    ProcessError,
+)
+from oedtools.report import (
+    file_errors,
+)
+
+from .data import (
+    GROUPED_SCHEMA,
+    sample_column,
+    SCHEMA_TYPES_EX_MASTER,
+)
+
+
+FILE_NAMES = {
+    'acc': 'SourceAccOEDPiWind.csv',
+    'loc': 'SourceLocOEDPiWind.csv',
+    'reinsinfo': 'SourceReinsInfoOEDPiWind.csv',
+    'reinsscope': 'SourceReinsScopeOEDPiWind.csv'
+}
+
+
+def write_file(schema_type, fp, num_rows, bad=False):
+    headers = [h for h, v in GROUPED_SCHEMA[schema_type].items() if v['required'] == 'R']
+
+    df = pd.DataFrame(data={header: sample_column(schema_type, header, size=num_rows) for header in headers}, dtype=object)
+    if bad:
+        df.loc[df.index[::2], headers[0]] = None
+
+    df.to_csv(path_or_buf=fp, index=False, encoding='utf-8')
+
+
+class TestBatch(TestCase):
+
+    def test_infer_schema_type__oed_file_names__schema_types_inferred(self):
+        for schema_type, fn in FILE_NAMES.items():
+            self.assertEqual(infer_schema_type(os.path.join('path', 'to', fn)), schema_type)
+
+        self.assertEqual(infer_schema_type('ri_scope.csv'), 'reinsscope')
+        self.assertEqual(infer_schema_type('ri-info.csv'), 'reinsinfo')
+        self.assertEqual(infer_schema_type('account.csv'), 'acc')
+        self.assertEqual(infer_schema_type('Location_2020.csv'), 'loc')
+
+    def test_infer_schema_type__unrecognised_file_name__oed_process_error_raised(self):
+        with self.assertRaises(ProcessError):
+            infer_schema_type('portfolio.csv')
+
+    def test_infer_schema_type__type_names_within_words__oed_process_error_raised(self):
+        for fn in ['allocation.csv', 'clock.csv', 'blocks.csv', 'accumulated_risks.csv', 'Relocated.csv', 'AccrualInfo.csv']:
+            with self.assertRaises(ProcessError):
+                infer_schema_type(fn)
+
+    def test_infer_schema_type__joined_and_camel_case_tokens__schema_types_inferred(self):
+        self.assertEqual(infer_schema_type('reinsscope.csv'), 'reinsscope')
+        self.assertEqual(infer_schema_type('RIInfo2020.csv'), 'reinsinfo')
+        self.assertEqual(infer_schema_type('OEDLoc.csv'), 'loc')
+        self.assertEqual(infer_schema_type('acc-2020-01.csv'), 'acc')
+        self.assertEqual(infer_schema_type('my.locations.csv'), 'loc')
+
+    def test_get_batch_files__dirs_globs_and_prefixed_paths__files_expanded_with_schema_types(self):
+        with TemporaryDirectory() as d:
+            for fn in list(FILE_NAMES.values()) + ['portfolio.csv', 'notes.txt']:
+                io.open(os.path.join(d, fn), 'w').close()
+
+            fps = {schema_type: os.path.join(d, fn) for schema_type, fn in FILE_NAMES.items()}
+
+            self.assertEqual(
+                get_batch_files([os.path.join(d, 'Source*.csv')]),
+                sorted((schema_type, fp) for schema_type, fp in fps.items())
+            )
+            self.assertEqual(
+                get_batch_files(['loc:' + os.path.join(d, 'portfolio.csv'), fps['acc'], fps['acc']]),
+                [('loc', os.path.join(d, 'portfolio.csv')), ('acc', fps['acc'])]
+            )
+            self.assertEqual(
+                get_batch_files([os.path.join(d, 'portfolio.csv')], schema_type='acc'),
+                [('acc', os.path.join(d, 'portfolio.csv'))]
+            )
+
+            with self.assertRaises(ProcessError):
+                get_batch_files([d])
+
+            with self.assertRaises(ProcessError):
+                get_batch_files([os.path.join(d, 'missing*.csv')])
+
+    @given(
+        schema_type=sampled_from(SCHEMA_TYPES_EX_MASTER),
+        num_rows=integers(min_value=1, max_value=20)
+    )
+    @settings(max_examples=5, deadline=None)
+    def test_validate_file__bad_data__summary_counts_same_as_file_errors(self, schema_type, num_rows):
+        with TemporaryDirectory() as d:
+            fp = os.path.join(d, FILE_NAMES[schema_type])
+            write_file(schema_type, fp, num_rows, bad=True)
+
+            records = list(file_errors(schema_type, fp))
+            summary = validate_file(schema_type, fp, chunksize=3)
+
+        self.assertEqual(summary['status'], 'fail')
+        self.assertEqual(summary['num_rows'], num_rows)
+        self.assertEqual(summary['num_errors'], len(records))
+        self.assertEqual(sum(summary['error_counts'].values()), len(records))
+
+    def test_validate_file__unreadable_file__error_status(self):
+        with TemporaryDirectory() as d:
+            fp = os.path.join(d, FILE_NAMES['loc'])
+            io.open(fp, 'w').close()
+
+            summary = validate_file('loc', fp)
+
+        self.assertEqual(summary['status'], 'error')
+        self.assertIsNotNone(summary['msg'])
+
+    def test_validate_files__serial_and_parallel__same_summaries_and_reports(self):
+        with TemporaryDirectory() as d:
+            for i, (schema_type, fn) in enumerate(FILE_NAMES.items()):
+                write_file(schema_type, os.path.join(d, fn), 10, bad=(i % 2 == 0))
+
+            files = get_batch_files([d])
+
+            serial = validate_files(files, workers=1, report_dir=os.path.join(d, 'serial'))
+            parallel = validate_files(files, workers=2, report_dir=os.path.join(d, 'parallel'))
+
+            for s, p in zip(serial['files'], parallel['files']):
+                with io.open(s['report_file'], 'r', encoding='utf-8') as f1, io.open(p['report_file'], 'r', encoding='utf-8') as f2:
+                    s_records, p_records = [json.loads(line) for line in f1], [json.loads(line) for line in f2]
+                self.assertEqual(s_records, p_records)
+                self.assertEqual(len(s_records), s['num_errors'])
+
+        strip = lambda summary: [{k: v for k, v in s.items() if k not in ('report_file', 'seconds')} for s in summary['files']]
+
+        self.assertEqual(strip(serial), strip(parallel))
+        self.assertEqual([s['file'] for s in serial['files']], [fp for _, fp in files])
+        self.assertEqual((serial['num_files'], serial['num_pass'], serial['num_fail'], serial['num_error']), (4, 2, 2, 0))
+
+    def test_validate_files__files_with_same_name_in_different_directories__separate_reports(self):
+        with TemporaryDirectory() as d:
+            fps = [os.path.join(d, p, FILE_NAMES['loc']) for p in ['p1', 'p2']]
+            for i, fp in enumerate(fps):
+                os.makedirs(os.path.dirname(fp))
+                write_file('loc', fp, 5 + i, bad=(i == 0))
+
+            report_dir = os.path.join(d, 'reports')
+            res = validate_files([('loc', fp) for fp in fps], workers=1, report_dir=report_dir)
+
+            report_fps = [s['report_file'] for s in res['files']]
+            self.assertEqual(report_fps, [
+                os.path.join(report_dir, p, '{}.report.jsonl'.format(FILE_NAMES['loc'])) for p in ['p1', 'p2']
+            ])
+            for s in res['files']:
+                with io.open(s['report_file'], 'r', encoding='utf-8') as f:
+                    self.assertEqual(len(f.readlines()), s['num_errors'])
+            self.assertNotEqual(res['files'][0]['num_errors'], res['files'][1]['num_errors'])
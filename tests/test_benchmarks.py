@@ -0,0 +1,158 @@
+import os
+
+from tempfile import TemporaryDirectory
+from unittest import (
+    mock,
+    TestCase,
+)
+
+from hypothesis import (
+    given,
+    settings,
+)
+from hypothesis.strategies import (
+    floats,
+    sampled_from,
+)
+
+from benchmarks import (
+    micro,
+    throughput,
+)
+from benchmarks.throughput import (
+    compare_with_baseline,
+    MIN_COMPARED_SECONDS,
+)
+
+
+def get_result(benchmark='validate', size='10k', width='narrow', seconds=1.0, peak_rss_mb=100.0):
+    return {
+        'benchmark': benchmark,
+        'size': size,
+        'width': width,
+        'rows': 10 ** 4,
+        'columns': 10,
+        'seconds': seconds,
+        'rows_per_sec': round(10 ** 4 / seconds),
+        'peak_rss_mb': peak_rss_mb
+    }
+
+
+class TestThroughput(TestCase):
+
+    @given(
+        time_change=floats(min_value=-0.5, max_value=1.0),
+        memory_change=floats(min_value=-0.5, max_value=1.0),
+        tolerance=floats(min_value=0, max_value=0.5)
+    )
+    @settings(max_examples=50, deadline=None)
+    def test_compare_with_baseline__changes_above_tolerance__regressions_flagged(self, time_change, memory_change, tolerance):
+        baseline = [get_result(seconds=1.0, peak_rss_mb=100.0)]
+        results = [get_result(seconds=1.0 * (1 + time_change), peak_rss_mb=100.0 * (1 + memory_change))]
+
+        compared = compare_with_baseline(results, baseline, time_tolerance=tolerance, memory_tolerance=tolerance)
+
+        self.assertEqual(len(compared), 1)
+        self.assertEqual(compared[0]['baseline_seconds'], 1.0)
+        self.assertEqual(compared[0]['baseline_peak_rss_mb'], 100.0)
+        self.assertEqual({k: v for k, v in compared[0].items() if not k.startswith('baseline') and k != 'regressions'}, results[0])
+
+        expected = []
+        if results[0]['seconds'] > 1.0 * (1 + tolerance):
+            expected.append('time')
+        if results[0]['peak_rss_mb'] > 100.0 * (1 + tolerance):
+            expected.append('memory')
+        self.assertEqual(compared[0]['regressions'], expected)
+
+    def test_compare_with_baseline__times_below_minimum_compared__time_regressions_not_flagged(self):
+        baseline = [get_result(seconds=MIN_COMPARED_SECONDS / 10)]
+
+        compared = compare_with_baseline([get_result(seconds=MIN_COMPARED_SECONDS)], baseline)
+        self.assertEqual(compared[0]['regressions'], [])
+
+        compared = compare_with_baseline([get_result(seconds=MIN_COMPARED_SECONDS * 1.01)], baseline)
+        self.assertEqual(compared[0]['regressions'], ['time'])
+
+    def test_compare_with_baseline__results_not_in_baseline__no_baseline_values_or_regressions(self):
+        baseline = [
+            get_result(benchmark='cli', seconds=0.1, peak_rss_mb=10.0),
+            get_result(size='1m', seconds=0.1, peak_rss_mb=10.0),
+            get_result(width='wide', seconds=0.1, peak_rss_mb=10.0),
+        ]
+        results = [get_result(seconds=10.0, peak_rss_mb=1000.0)]
+
+        for b in [[], baseline]:
+            compared = compare_with_baseline(results, b)
+            self.assertEqual(compared[0]['baseline_seconds'], None)
+            self.assertEqual(compared[0]['baseline_peak_rss_mb'], None)
+            self.assertEqual(compared[0]['regressions'], [])
+
+    def test_main__baseline_file_does_not_exist__error_before_benchmarks_run(self):
+        with TemporaryDirectory() as baseline_dir, mock.patch.object(throughput, 'run_benchmarks') as run_benchmarks:
+            fp = os.path.join(baseline_dir, 'baseline.json')
+
+            with self.assertRaises(SystemExit) as ctx:
+                throughput.main(['-c', fp])
+            self.assertEqual(ctx.exception.code, 2)
+            run_benchmarks.assert_not_called()
+
+            run_benchmarks.return_value = [get_result()]
+            self.assertEqual(throughput.main(['-c', fp, '-o', fp]), 0)
+            self.assertTrue(os.path.exists(fp))
+            self.assertEqual(throughput.main(['-c', '']), 0)
+            self.assertEqual(run_benchmarks.call_count, 2)
+
+
+class TestMicro(TestCase):
+
+    @given(
+        ns_per_op=floats(min_value=1, max_value=1e9),
+        baseline_ns_per_op=floats(min_value=1, max_value=1e9),
+        tolerance=floats(min_value=0, max_value=0.5)
+    )
+    @settings(max_examples=50, deadline=None)
+    def test_compare_with_baseline__changes_above_tolerance__regressions_flagged(self, ns_per_op, baseline_ns_per_op, tolerance):
+        result = {'name': 'case', 'ns_per_op': ns_per_op, 'alloc_bytes_per_op': 0, 'retained_bytes_per_op': 0}
+        baseline = [{**result, **{'ns_per_op': baseline_ns_per_op}}]
+
+        compared = micro.compare_with_baseline([result], baseline, tolerance=tolerance)
+
+        change = ns_per_op / baseline_ns_per_op - 1
+        self.assertEqual(len(compared), 1)
+        self.assertEqual({k: v for k, v in compared[0].items() if k not in ['baseline_ns_per_op', 'change', 'regression']}, result)
+        self.assertEqual(compared[0]['baseline_ns_per_op'], baseline_ns_per_op)
+        self.assertEqual(compared[0]['change'], round(change, 4))
+        self.assertEqual(compared[0]['regression'], change > tolerance)
+
+    @given(baseline_ns_per_op=sampled_from([None, 0.0]))
+    @settings(max_examples=2, deadline=None)
+    def test_compare_with_baseline__results_not_in_baseline_or_zero_baseline__no_change_or_regression(self, baseline_ns_per_op):
+        results = [{'name': 'case', 'ns_per_op': 1e6, 'alloc_bytes_per_op': 0, 'retained_bytes_per_op': 0}]
+        baseline = (
+            [{'name': 'other case', 'ns_per_op': 1.0}] if baseline_ns_per_op is None
+            else [{'name': 'case', 'ns_per_op': baseline_ns_per_op}]
+        )
+
+        compared = micro.compare_with_baseline(results, baseline)
+
+        self.assertEqual(compared[0]['baseline_ns_per_op'], baseline_ns_per_op)
+        self.assertIsNone(compared[0]['change'])
+        self.assertFalse(compared[0]['regression'])
+
+    def test_main__baseline_file_does_not_exist__error_before_microbenchmarks_run(self):
+        result = {'name': 'case', 'ns_per_op': 1.0, 'alloc_bytes_per_op': 0, 'retained_bytes_per_op': 0}
+
+        with TemporaryDirectory() as baseline_dir, mock.patch.object(micro, 'run_microbenchmarks') as run_microbenchmarks:
+            fp = os.path.join(baseline_dir, 'micro_baseline.json')
+
+            with self.assertRaises(SystemExit) as ctx:
+                micro.main(['-c', fp])
+            self.assertEqual(ctx.exception.code, 2)
+            run_microbenchmarks.assert_not_called()
+
+            run_microbenchmarks.return_value = [result]
+            self.assertEqual(micro.main(['-c', fp, '-o', fp]), 0)
+            self.assertTrue(os.path.exists(fp))
+            self.assertEqual(micro.main(['-c', fp]), 0)
+            self.assertEqual(micro.main(['-c', '']), 0)
+            self.assertEqual(run_microbenchmarks.call_count, 3)
@@ -1,11 +1,25 @@
 import argparse
 import io
+import json
 import os
 import string
+import subprocess
+import sys
+import threading
 
+from contextlib import (
+    redirect_stderr,
+    redirect_stdout,
+)
 from random import shuffle
-from tempfile import NamedTemporaryFile
-from unittest import TestCase
+from tempfile import (
+    NamedTemporaryFile,
+    TemporaryDirectory,
+)
+from unittest import (
+    mock,
+    TestCase,
+)
 
 import numpy as np
 import pandas as pd
@@ -31,6 +45,11 @@ from oedtools.exceptions import (
     OedError,
 )
 from oedtools.schema import SCHEMA_DIR
+from oedtools.server import (
+    OedServer,
+    SERVER_ENV_VAR,
+    SERVER_TOKEN_ENV_VAR,
+)
 
 from .data import (
     ALL,
@@ -123,6 +142,49 @@ class TestCli(TestCase):
         ))
         self.assertEqual(exit_code, 0)
 
+    def test_non_data_cmds__pandas_and_numpy_not_imported(self):
+        for cmd in [['version'], ['version', '-k'], ['query', '-m', 'tiv', '-a'], ['lookup', '-v', '5']]:
+            out = subprocess.check_output([
+                sys.executable, '-c',
+                'import io, sys; from contextlib import redirect_stdout; from oedtools.cli import OedToolsCmd; '
+                'redirect_stdout(io.StringIO()).__enter__(); OedToolsCmd().run(); '
+                'sys.__stdout__.write(",".join(m for m in ["pandas", "numpy"] if m in sys.modules))'
+            ] + cmd, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).decode()
+            self.assertEqual(out, '', cmd)
+
+    def test_lookup_cmd__value_and_column__value_entries_printed(self):
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            exit_code = LookupCmd().run(argparse.Namespace(value='5', column_header='LocDedCode1Building'))
+        self.assertEqual(exit_code, 0)
+
+        results = json.loads(stdout.getvalue())
+        self.assertEqual([(r['group'], r['key']) for r in results], [('deductible codes', 'cea homeowners')])
+
+    def test_query_cmd__search__ranked_results_printed(self):
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            exit_code = QueryCmd().run(argparse.Namespace(
+                schema_types='loc',
+                column_headers=None,
+                descriptions=None,
+                required='R,CR,O',
+                nonnull=None,
+                defaults=None,
+                python_dtypes=None,
+                sql_dtypes=None,
+                numpy_dtypes=None,
+                headers_only=False,
+                search='flood zone',
+                limit=3
+            ))
+        self.assertEqual(exit_code, 0)
+
+        results = json.loads(stdout.getvalue())
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[0]['field_name'], 'CustomFloodZone')
+        self.assertEqual([r['score'] for r in results], sorted((r['score'] for r in results), reverse=True))
+
     @given(
         schema_type=sampled_from(SCHEMA_TYPES_EX_MASTER),
         headers=lists(sampled_from([header for schema_type, header in ALL])),
@@ -169,3 +231,318 @@ class TestCli(TestCase):
             }).to_csv(path_or_buf=file.name, index=False, encoding='utf-8')
             exit_code = ValidateFileCmd().run(argparse.Namespace(schema_type=schema_type, input_file_path=file.name))
             self.assertEqual(exit_code, 0)
+
+    @given(
+        schema_type=sampled_from(SCHEMA_TYPES_EX_MASTER),
+        num_rows=integers(min_value=1, max_value=10),
+        report_format=sampled_from(['text', 'jsonl', 'csv']),
+        compress=sampled_from([True, False])
+    )
+    @settings(max_examples=5, deadline=None)
+    def test_validate_file_cmd__report_to_file__cmd_completes_successfully_and_report_file_written(self, schema_type, num_rows, report_format, compress):
+        headers = list(GROUPED_SCHEMA[schema_type])[:5] + ['non oed column']
+
+        with NamedTemporaryFile('w') as file, NamedTemporaryFile('w') as report:
+            pd.DataFrame(data={
+                header: sample_column('loc', 'flexiloczzz', str_width=5, size=num_rows)
+                if header == 'non oed column'
+                else sample_column(schema_type, header, size=num_rows)
+                for header in headers
+            }).to_csv(path_or_buf=file.name, index=False, encoding='utf-8')
+            exit_code = ValidateFileCmd().run(argparse.Namespace(
+                schema_type=schema_type,
+                input_file_path=file.name,
+                output_file_path=report.name,
+                report_format=report_format,
+                compress=compress
+            ))
+            self.assertEqual(exit_code, 0)
+            self.assertGreater(os.path.getsize(report.name), 0)
+
+    def test_validate_batch_cmd__dir_of_files__summary_file_written(self):
+        with TemporaryDirectory() as d:
+            for schema_type, fn in [('loc', 'loc.csv'), ('acc', 'acc.csv')]:
+                headers = [h for h, v in GROUPED_SCHEMA[schema_type].items() if v['required'] == 'R']
+                pd.DataFrame(data={
+                    header: sample_column(schema_type, header, size=5)
+                    for header in headers
+                }).to_csv(path_or_buf=os.path.join(d, fn), index=False, encoding='utf-8')
+
+            summary_fp = os.path.join(d, 'summary.json')
+            exit_code = ValidateBatchCmd().run(argparse.Namespace(
+                input_paths=[d],
+                workers=2,
+                report_dir=os.path.join(d, 'reports'),
+                output_file_path=summary_fp
+            ))
+            self.assertEqual(exit_code, 0)
+
+            with io.open(summary_fp, 'r', encoding='utf-8') as f:
+                summary = json.load(f)
+
+            self.assertEqual(summary['num_files'], 2)
+            self.assertEqual(sorted(s['schema_type'] for s in summary['files']), ['acc', 'loc'])
+            for s in summary['files']:
+                self.assertTrue(os.path.exists(s['report_file']))
+
+    def test_validate_file_cmd__server_running__same_report_as_without_server(self):
+        server = OedServer()
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        headers = list(GROUPED_SCHEMA['loc'])[:5] + ['non oed column']
+
+        try:
+            with TemporaryDirectory() as d:
+                fp = os.path.join(d, 'loc.csv')
+                pd.DataFrame(data={
+                    header: sample_column('loc', 'flexiloczzz', str_width=5, size=5)
+                    if header == 'non oed column'
+                    else sample_column('loc', header, size=5)
+                    for header in headers
+                }).to_csv(path_or_buf=fp, index=False, encoding='utf-8')
+
+                reports = []
+                for address in ['{}:{}'.format(*server.address), 'off']:
+                    report_fp = os.path.join(d, 'report-{}.jsonl'.format(len(reports)))
+                    with mock.patch.dict(os.environ, {SERVER_ENV_VAR: address, SERVER_TOKEN_ENV_VAR: server.token}):
+                        exit_code = ValidateFileCmd().run(argparse.Namespace(
+                            schema_type='loc',
+                            input_file_path=fp,
+                            output_file_path=report_fp,
+                            report_format='jsonl'
+                        ))
+                    self.assertEqual(exit_code, 0)
+                    with io.open(report_fp, 'r', encoding='utf-8') as f:
+                        reports.append(f.read())
+
+            self.assertEqual(server.status()['num_requests'], 1)
+            self.assertEqual(reports[0], reports[1])
+            self.assertTrue(reports[0])
+        finally:
+            server.shutdown()
+            server.server_close()
+            thread.join()
+
+    def test_validate_portfolio_cmd__orphan_loc_keys__report_written(self):
+        with TemporaryDirectory() as d:
+            acc_fp, loc_fp, report_fp = os.path.join(d, 'acc.csv'), os.path.join(d, 'loc.csv'), os.path.join(d, 'report.jsonl')
+            pd.DataFrame(data={'PortNumber': ['1', '1'], 'AccNumber': ['A1', 'A2']}).to_csv(path_or_buf=acc_fp, index=False)
+            pd.DataFrame(data={'PortNumber': ['1', '1'], 'AccNumber': ['A1', 'A3']}).to_csv(path_or_buf=loc_fp, index=False)
+
+            exit_code = ValidatePortfolioCmd().run(argparse.Namespace(
+                acc_file_path=acc_fp,
+                loc_file_path=loc_fp,
+                output_file_path=report_fp,
+                report_format='jsonl'
+            ))
+            self.assertEqual(exit_code, 0)
+
+            with io.open(report_fp, 'r', encoding='utf-8') as f:
+                records = [json.loads(line) for line in f]
+
+        self.assertEqual([(r['file'], r['row'], r['code']) for r in records], [(loc_fp, 3, 'E381'), (acc_fp, 3, 'E391')])
+
+    def test_validate_portfolio_cmd__single_file__raises_oed_error(self):
+        with self.assertRaises(OedError):
+            ValidatePortfolioCmd().run(argparse.Namespace(acc_file_path='acc.csv'))
+
+    def test_validate_file_cmd__check_keys__duplicate_key_errors_reported(self):
+        with TemporaryDirectory() as d:
+            fp, report_fp = os.path.join(d, 'loc.csv'), os.path.join(d, 'report.jsonl')
+            pd.DataFrame(data={'PortNumber': ['1', '1', '1'], 'AccNumber': ['A1', 'A1', 'A1'], 'LocNumber': ['L1', 'L2', 'L1']}).to_csv(path_or_buf=fp, index=False)
+
+            for check_keys in [False, True]:
+                exit_code = ValidateFileCmd().run(argparse.Namespace(
+                    schema_type='loc',
+                    input_file_path=fp,
+                    output_file_path=report_fp,
+                    report_format='jsonl',
+                    check_keys=check_keys
+                ))
+                self.assertEqual(exit_code, 0)
+
+                with io.open(report_fp, 'r', encoding='utf-8') as f:
+                    records = [json.loads(line) for line in f]
+
+                self.assertEqual([(r['row'], r['value']) for r in records if r['code'] == 'E401'], [(2, ['1', 'A1', 'L1'])] if check_keys else [])
+
+    def test_validate_file_cmd__check_keys_of_schema_type_without_primary_key__raises_oed_error_before_report(self):
+        with TemporaryDirectory() as d:
+            fp, report_fp = os.path.join(d, 'reinsscope.csv'), os.path.join(d, 'report.jsonl')
+            pd.DataFrame(data={'ReinsNumber': ['1', '1'], 'PortNumber': ['1', '1']}).to_csv(path_or_buf=fp, index=False)
+
+            with self.assertRaisesRegex(OedError, 'no primary key'):
+                ValidateFileCmd().run(argparse.Namespace(
+                    schema_type='reinsscope',
+                    input_file_path=fp,
+                    output_file_path=report_fp,
+                    report_format='jsonl',
+                    check_keys=True
+                ))
+
+            self.assertFalse(os.path.exists(report_fp))
+
+    def test_validate_file_cmd__check_cr__conditionally_required_data_errors_reported(self):
+        with TemporaryDirectory() as d:
+            fp, report_fp = os.path.join(d, 'loc.csv'), os.path.join(d, 'report.jsonl')
+            pd.DataFrame(data={'LocNumber': ['L1', 'L2', 'L3'], 'LocDed1Building': ['100', '0', '50'], 'LocDedType1Building': ['0', None, None]}).to_csv(path_or_buf=fp, index=False)
+
+            for check_cr in [False, True]:
+                exit_code = ValidateFileCmd().run(argparse.Namespace(
+                    schema_type='loc',
+                    input_file_path=fp,
+                    output_file_path=report_fp,
+                    report_format='jsonl',
+                    check_cr=check_cr
+                ))
+                self.assertEqual(exit_code, 0)
+
+                with io.open(report_fp, 'r', encoding='utf-8') as f:
+                    records = [json.loads(line) for line in f]
+
+                self.assertEqual(
+                    sorted((r['row'], r['header']) for r in records if r['code'] == 'E411'),
+                    [(2, 'LocPeril'), (4, 'LocDedType1Building'), (4, 'LocPeril')] if check_cr else []
+                )
+
+    def test_validate_file_cmd__check_rules__row_rule_errors_and_rule_costs_reported(self):
+        with TemporaryDirectory() as d:
+            fp, report_fp, rules_fp = os.path.join(d, 'loc.csv'), os.path.join(d, 'report.jsonl'), os.path.join(d, 'rules.json')
+            pd.DataFrame(data={'LocNumber': ['L1', 'L2', 'L3'], 'BuildingTIV': ['100', '200', '300'], 'LocDed1Building': ['150', '50', '400']}).to_csv(path_or_buf=fp, index=False)
+            with io.open(rules_fp, 'w', encoding='utf-8') as f:
+                json.dump([{'name': 'ded_lt_quarter_tiv', 'schema_type': 'loc', 'check': 'LocDed1Building < BuildingTIV / 4'}], f)
+
+            for check_rules, rules_file_path, exp_rows in [(False, None, []), (True, None, [2, 4]), (True, rules_fp, [2, 3, 4])]:
+                stderr = io.StringIO()
+                with redirect_stderr(stderr):
+                    exit_code = ValidateFileCmd().run(argparse.Namespace(
+                        schema_type='loc',
+                        input_file_path=fp,
+                        output_file_path=report_fp,
+                        report_format='jsonl',
+                        check_rules=check_rules,
+                        rules_file_path=rules_file_path,
+                        rule_costs=True
+                    ))
+                self.assertEqual(exit_code, 0)
+
+                with io.open(report_fp, 'r', encoding='utf-8') as f:
+                    records = [json.loads(line) for line in f]
+
+                self.assertEqual([r['row'] for r in records if r['code'] == 'E421'], exp_rows)
+                self.assertEqual(stderr.getvalue().startswith('rule '), check_rules)
+                if rules_file_path:
+                    self.assertIn('ded_lt_quarter_tiv ', stderr.getvalue())
+
+    def test_validate_file_cmd__profile__stage_profile_written_to_file_or_stderr(self):
+        with TemporaryDirectory() as d:
+            fp, report_fp, profile_fp = os.path.join(d, 'loc.csv'), os.path.join(d, 'report.txt'), os.path.join(d, 'profile.json')
+            pd.DataFrame(data={'LocNumber': ['L1', 'L2', 'L3'], 'AccNumber': ['A1'] * 3, 'CountryCode': ['XX'] * 3}).to_csv(path_or_buf=fp, index=False)
+
+            exit_code = ValidateFileCmd().run(argparse.Namespace(
+                schema_type='loc',
+                input_file_path=fp,
+                output_file_path=report_fp,
+                profile=profile_fp
+            ))
+            self.assertEqual(exit_code, 0)
+
+            with io.open(profile_fp, 'r', encoding='utf-8') as f:
+                profile = json.load(f)
+
+            self.assertEqual(sorted(profile), ['columns', 'seconds', 'stages', 'unaccounted_seconds'])
+            stages = {s['stage']: s for s in profile['stages']}
+            self.assertEqual(stages['read']['rows'], 3)
+            self.assertIn('report', stages)
+            self.assertEqual({c['header']: c['errors'] for c in profile['columns']}['CountryCode'], 3)
+
+            stderr = io.StringIO()
+            with redirect_stderr(stderr):
+                exit_code = ValidateFileCmd().run(argparse.Namespace(
+                    schema_type='loc',
+                    input_file_path=fp,
+                    output_file_path=report_fp,
+                    profile='-'
+                ))
+            self.assertEqual(exit_code, 0)
+            self.assertTrue(stderr.getvalue().startswith('stage '))
+
+            exit_code = ValidateFileCmd().run(argparse.Namespace(
+                schema_type='loc',
+                input_file_path=fp,
+                output_file_path=report_fp,
+                profile=profile_fp,
+                memory_profile=True
+            ))
+            self.assertEqual(exit_code, 0)
+
+            with io.open(profile_fp, 'r', encoding='utf-8') as f:
+                profile = json.load(f)
+
+            self.assertGreater(profile['peak_bytes'], 0)
+            for d in profile['stages'] + profile['columns']:
+                self.assertIn('peak_bytes', d)
+                self.assertIn('retained_bytes', d)
+
+    def test_validate_file_cmd__metrics_file_path__prometheus_metrics_file_written(self):
+        with TemporaryDirectory() as d:
+            fp, report_fp, metrics_fp = os.path.join(d, 'loc.csv'), os.path.join(d, 'report.txt'), os.path.join(d, 'oedtools.prom')
+            pd.DataFrame(data={'LocNumber': ['L1', 'L2'], 'AccNumber': ['A1'] * 2, 'CountryCode': ['XX'] * 2}).to_csv(path_or_buf=fp, index=False)
+
+            exit_code = ValidateFileCmd().run(argparse.Namespace(
+                schema_type='loc',
+                input_file_path=fp,
+                output_file_path=report_fp,
+                metrics_file_path=metrics_fp
+            ))
+            self.assertEqual(exit_code, 0)
+
+            with io.open(metrics_fp, 'r', encoding='utf-8') as f:
+                metrics = f.read()
+
+            self.assertIn('# TYPE oedtools_files_validated_total counter\n', metrics)
+            self.assertIn('oedtools_validation_errors_total{schema_type="loc",code="E371"} ', metrics)
+            self.assertIn('oedtools_report_records_total{format="text"} ', metrics)
+
+    def test_generate_portfolio_and_file_cmds__valid_portfolio_and_file_written(self):
+        with TemporaryDirectory() as d:
+            stdout = io.StringIO()
+            with redirect_stdout(stdout):
+                exit_code = GeneratePortfolioCmd().run(argparse.Namespace(
+                    target_dir=d,
+                    num_locations=50,
+                    num_accounts=5,
+                    num_reinsinfo=2,
+                    seed=1
+                ))
+            self.assertEqual(exit_code, 0)
+
+            files = json.loads(stdout.getvalue())
+            self.assertEqual(sorted(files), ['acc', 'loc', 'reinsinfo', 'reinsscope'])
+            self.assertEqual(len(pd.read_csv(files['acc'])), 5)
+
+            exit_code = ValidatePortfolioCmd().run(argparse.Namespace(
+                output_file_path=os.path.join(d, 'report.txt'),
+                **{'{}_file_path'.format(schema_type): fp for schema_type, fp in files.items()}
+            ))
+            self.assertEqual(exit_code, 0)
+            with io.open(os.path.join(d, 'report.txt'), 'r', encoding='utf-8') as f:
+                self.assertEqual(f.read(), '')
+
+            fp = os.path.join(d, 'loc.csv')
+            exit_code = GenerateFileCmd().run(argparse.Namespace(
+                schema_type='loc',
+                output_file_path=fp,
+                num_rows=20,
+                column_headers='LocDed1Building, LocPeril',
+                chunksize=7
+            ))
+            self.assertEqual(exit_code, 0)
+
+            df = pd.read_csv(fp)
+            self.assertEqual(len(df), 20)
+            self.assertTrue({'LocDed1Building', 'LocPeril'}.issubset(df.columns))
+
+            with self.assertRaises(CommandError):
+                GenerateFileCmd().run(argparse.Namespace(schema_type='loc', output_file_path=fp, num_rows=1, column_headers='NotAColumn'))
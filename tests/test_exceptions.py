@@ -1,6 +1,8 @@
 from unittest import TestCase
 
 from oedtools.exceptions import (
+    get_data_error,
+    get_error_by_code,
     get_file_error,
     DataOutOfRangeError,
     EmptyFileError,
@@ -59,3 +61,18 @@ class TestExceptions(TestCase):
 
     def test_get_file_error__reporting(self):
         self.assertIsInstance(get_file_error('reporting', 'test'), ReportingError)
+
+    def test_get_error_by_code__data_out_of_range(self):
+        self.assertIsInstance(get_error_by_code('E371', 'test'), DataOutOfRangeError)
+
+    def test_get_error_by_code__missing_required_column(self):
+        self.assertIsInstance(get_error_by_code('E331', 'test'), MissingRequiredColumnError)
+
+    def test_get_error_by_code__invalid_code__oed_process_error_raised(self):
+        with self.assertRaises(ProcessError):
+            get_error_by_code('E999', 'test')
+
+    def test_get_data_error__invalid_data_type(self):
+        e = get_data_error('E351', 'BuildingTIV', 'a', float)
+        self.assertIsInstance(e, InvalidDataTypeError)
+        self.assertEqual(e.msg, 'Invalid data type for value "a" in "BuildingTIV" - expected type "<class \'float\'>", found type "<class \'str\'>"')
@@ -0,0 +1,209 @@
+import os
+
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+import pandas as pd
+
+from hypothesis import (
+    given,
+    settings,
+)
+from hypothesis.strategies import (
+    booleans,
+    integers,
+    lists,
+    sampled_from,
+    tuples,
+)
+
+from oedtools.exceptions import (
+    DuplicateKeyError,
+    OrphanKeyError,
+    ProcessError,
+    UnreferencedKeyError,
+)
+from oedtools.integrity import (
+    duplicate_key_errors,
+    get_duplicate_keys,
+    get_key_index,
+    portfolio_errors,
+)
+
+
+ACC = pd.DataFrame(data={
+    'PortNumber': ['1', '1', '1', '2'],
+    'AccNumber': ['A1', 'A2', 'A2', 'A3'],
+    'PolNumber': ['P1', 'P1', 'P2', 'P1']
+})
+
+LOC = pd.DataFrame(data={
+    'PortNumber': ['1', '1', '2', '3'],
+    'AccNumber': ['A1', 'A1', 'A9', 'A1'],
+    'LocNumber': ['L1', 'L2', 'L1', 'L1']
+})
+
+REINSINFO = pd.DataFrame(data={'ReinsNumber': ['1', '2']})
+
+REINSSCOPE = pd.DataFrame(data={
+    'ReinsNumber': ['1', '1', '3', '1', '1'],
+    'PortNumber': ['1', None, '1', '1', '9'],
+    'AccNumber': ['A2', 'A1', None, 'A1', None],
+    'PolNumber': ['P2', None, None, None, None],
+    'LocNumber': [None, None, None, 'L9', None]
+})
+
+
+def write_portfolio(d):
+    files = {}
+    for schema_type, df in [('acc', ACC), ('loc', LOC), ('reinsinfo', REINSINFO), ('reinsscope', REINSSCOPE)]:
+        files[schema_type] = os.path.join(d, '{}.csv'.format(schema_type))
+        df.to_csv(path_or_buf=files[schema_type], index=False, encoding='utf-8')
+    return files
+
+
+class TestIntegrity(TestCase):
+
+    def test_portfolio_errors__portfolio_files__orphan_and_unreferenced_keys_reported(self):
+        with TemporaryDirectory() as d:
+            files = write_portfolio(d)
+            records = list(portfolio_errors(files))
+
+        self.assertEqual(
+            [(os.path.basename(r['file']), r['row'], r['column_pos'], r['header'], r['value'], r['code']) for r in records],
+            [
+                ('loc.csv', 4, 1, 'PortNumber,AccNumber', ['2', 'A9'], OrphanKeyError.code),
+                ('loc.csv', 5, 1, 'PortNumber,AccNumber', ['3', 'A1'], OrphanKeyError.code),
+                ('acc.csv', 3, 1, 'PortNumber,AccNumber', ['1', 'A2'], UnreferencedKeyError.code),
+                ('acc.csv', 5, 1, 'PortNumber,AccNumber', ['2', 'A3'], UnreferencedKeyError.code),
+                ('reinsscope.csv', 4, 1, 'ReinsNumber', ['3'], OrphanKeyError.code),
+                ('reinsscope.csv', 5, 13, 'PortNumber,AccNumber,LocNumber', ['1', 'A1', 'L9'], OrphanKeyError.code),
+                ('reinsscope.csv', 6, 13, 'PortNumber,AccNumber,PolNumber', ['9', None, None], OrphanKeyError.code),
+                ('reinsinfo.csv', 3, 1, 'ReinsNumber', ['2'], UnreferencedKeyError.code),
+            ]
+        )
+
+    def test_portfolio_errors__files_as_dict_arrays__same_records_as_files(self):
+        data = {
+            'acc': ACC.where(ACC.notnull(), None).to_dict('records'),
+            'loc': LOC.where(LOC.notnull(), None).to_dict('records')
+        }
+
+        with TemporaryDirectory() as d:
+            files = write_portfolio(d)
+            exp_records = [{**r, 'file': ''} for r in portfolio_errors({'acc': files['acc'], 'loc': files['loc']})]
+
+        self.assertEqual(list(portfolio_errors(data)), exp_records)
+
+    def test_portfolio_errors__key_columns_not_first__column_pos_is_header_offset_in_header_line(self):
+        data = {
+            'acc': [{'AccName': 'X', 'PortNumber': '1', 'AccNumber': 'A1'}],
+            'loc': [{'LocNumber': 'L1', 'AccNumber': 'A2', 'PortNumber': '1'}]
+        }
+        records = list(portfolio_errors(data))
+
+        # The positions are the (1-based) offsets of "PortNumber" in the
+        # header lines, as for the header errors
+        self.assertEqual(
+            [(r['row'], r['column_pos'], r['code']) for r in records],
+            [(2, 21, OrphanKeyError.code), (2, 9, UnreferencedKeyError.code)]
+        )
+
+    @given(
+        acc_keys=lists(tuples(sampled_from(['1', '2']), sampled_from(['A1', 'A2', 'A3'])), min_size=1, max_size=20),
+        loc_keys=lists(tuples(sampled_from(['1', '2']), sampled_from(['A1', 'A2', 'A3'])), min_size=1, max_size=20),
+        chunksize=integers(min_value=1, max_value=25)
+    )
+    @settings(max_examples=20, deadline=None)
+    def test_portfolio_errors__random_keys__orphans_and_unreferenced_keys_same_as_set_differences(self, acc_keys, loc_keys, chunksize):
+        with TemporaryDirectory() as d:
+            files = {'acc': os.path.join(d, 'acc.csv'), 'loc': os.path.join(d, 'loc.csv')}
+            pd.DataFrame(data=acc_keys, columns=['PortNumber', 'AccNumber']).to_csv(files['acc'], index=False)
+            pd.DataFrame(data=loc_keys, columns=['PortNumber', 'AccNumber']).to_csv(files['loc'], index=False)
+
+            records = list(portfolio_errors(files, chunksize=chunksize))
+
+        self.assertEqual(
+            [(r['row'], tuple(r['value'])) for r in records if r['code'] == OrphanKeyError.code],
+            [(i + 2, key) for i, key in enumerate(loc_keys) if key not in set(acc_keys)]
+        )
+        self.assertEqual(
+            [(r['row'], tuple(r['value'])) for r in records if r['code'] == UnreferencedKeyError.code],
+            [(acc_keys.index(key) + 2, key) for key in dict.fromkeys(acc_keys) if key not in set(loc_keys)]
+        )
+
+    def test_get_key_index__file__distinct_keys_indexed_with_first_row_numbers(self):
+        with TemporaryDirectory() as d:
+            files = write_portfolio(d)
+            index = get_key_index('acc', files['acc'], ['portnumber', 'ACCNUMBER'], chunksize=1)
+
+        self.assertEqual(index, {('1', 'A1'): 2, ('1', 'A2'): 3, ('2', 'A3'): 5})
+
+    def test_portfolio_errors__invalid_files__oed_process_error_raised(self):
+        with TemporaryDirectory() as d:
+            files = write_portfolio(d)
+
+            with self.assertRaises(ProcessError):
+                list(portfolio_errors({'acc': files['acc']}))
+
+            with self.assertRaises(ProcessError):
+                list(portfolio_errors({'acc': files['acc'], 'xyz': files['loc']}))
+
+            with self.assertRaises(ProcessError):
+                list(portfolio_errors({'acc': files['acc'], 'loc': os.path.join(d, 'missing.csv')}))
+
+    @given(
+        keys=lists(tuples(sampled_from(['1', '2']), sampled_from(['A1', 'A2']), sampled_from(['L1', 'L2', 'L3', None])), min_size=1, max_size=50),
+        chunksize=integers(min_value=1, max_value=60),
+        spill=booleans()
+    )
+    @settings(max_examples=20, deadline=None)
+    def test_get_duplicate_keys__random_keys__duplicate_groups_with_all_row_numbers(self, keys, chunksize, spill):
+        exp_duplicates = {}
+        for i, key in enumerate(keys):
+            exp_duplicates.setdefault(key, []).append(i + 2)
+        exp_duplicates = [(key, rows) for key, rows in exp_duplicates.items() if len(rows) > 1]
+
+        with TemporaryDirectory() as d:
+            fp = os.path.join(d, 'loc.csv')
+            pd.DataFrame(data=keys, columns=['PortNumber', 'AccNumber', 'LocNumber']).to_csv(fp, index=False)
+
+            # A memory budget of 1 byte spills every key to disk
+            duplicates = get_duplicate_keys('loc', fp, chunksize=chunksize, memory_budget=(1 if spill else 2 ** 20))
+
+        self.assertEqual(duplicates, exp_duplicates)
+
+    def test_duplicate_key_errors__acc_file__one_record_per_duplicate_key(self):
+        with TemporaryDirectory() as d:
+            files = write_portfolio(d)
+            records = list(duplicate_key_errors('acc', files['acc'], keys=['PortNumber', 'AccNumber']))
+
+        self.assertEqual(len(records), 1)
+        self.assertEqual(
+            (records[0]['row'], records[0]['column_pos'], records[0]['header'], records[0]['value'], records[0]['code']),
+            (3, 1, 'PortNumber,AccNumber', ['1', 'A2'], DuplicateKeyError.code)
+        )
+        self.assertEqual(records[0]['msg'], 'Duplicate acc key (PortNumber="1", AccNumber="A2") in 2 rows: 3, 4')
+
+    def test_duplicate_key_errors__null_keys_and_key_columns_not_first__null_keys_not_duplicates(self):
+        data = [
+            {'LocName': 'X', 'PortNumber': '1', 'AccNumber': 'A1', 'LocNumber': 'L1'},
+            {'LocName': 'X', 'PortNumber': None, 'AccNumber': None, 'LocNumber': None},
+            {'LocName': 'X', 'PortNumber': None, 'AccNumber': None, 'LocNumber': None},
+            {'LocName': 'X', 'PortNumber': '1', 'AccNumber': 'A1', 'LocNumber': 'L1'},
+            {'LocName': 'X', 'PortNumber': '1', 'AccNumber': 'A1', 'LocNumber': None},
+            {'LocName': 'X', 'PortNumber': '1', 'AccNumber': 'A1', 'LocNumber': None},
+        ]
+
+        self.assertEqual(get_duplicate_keys('loc', data), [(('1', 'A1', 'L1'), [2, 5]), (('1', 'A1', None), [6, 7])])
+
+        # The position is the (1-based) offset of "PortNumber" in the header
+        # line, as for the header errors
+        self.assertEqual([(r['row'], r['column_pos']) for r in duplicate_key_errors('loc', data)], [(2, 9), (6, 9)])
+
+    def test_get_duplicate_keys__no_primary_key__oed_process_error_raised(self):
+        with TemporaryDirectory() as d:
+            files = write_portfolio(d)
+
+            with self.assertRaises(ProcessError):
+                get_duplicate_keys('reinsscope', files['reinsscope'])
@@ -0,0 +1,185 @@
+import io
+import math
+import os
+import urllib.request
+
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from hypothesis import (
+    given,
+    settings,
+)
+from hypothesis.strategies import (
+    floats,
+    integers,
+    lists,
+    sampled_from,
+)
+
+from oedtools.exceptions import ProcessError
+from oedtools.metrics import (
+    FILES_VALIDATED,
+    MetricsRegistry,
+    REPORT_RECORDS,
+    ROWS_VALIDATED,
+    SCHEMA_LOAD_SECONDS,
+    serve_metrics,
+    VALIDATION_ERRORS,
+    VALIDATION_SECONDS,
+)
+from oedtools.report import (
+    file_errors,
+    write_report,
+)
+from oedtools.schema import get_schema
+from oedtools.validate import OedValidator
+
+from .data import get_loc_data
+
+
+class TestMetrics(TestCase):
+
+    def test_metrics_registry__counter_gauge_and_histogram__prometheus_text_exposition(self):
+        registry = MetricsRegistry()
+
+        counter = registry.counter('files_total', 'Files\nvalidated', ['schema_type'])
+        counter.inc(schema_type='loc')
+        counter.inc(2, schema_type='loc')
+        counter.inc(schema_type='a"c\\c')
+
+        registry.gauge('rate', 'Rate').set(1.5)
+
+        histogram = registry.histogram('latency_seconds', 'Latency', buckets=[1, 0.1])
+        for value in [0.05, 0.5, 5]:
+            histogram.observe(value)
+
+        self.assertIs(registry.counter('files_total', 'Files', ['schema_type']), counter)
+        self.assertEqual(counter.get(schema_type='loc'), 3)
+        self.assertEqual(histogram.get(), {'count': 3, 'sum': 5.55})
+
+        self.assertEqual(
+            registry.to_text(),
+            '# HELP files_total Files\\nvalidated\n'
+            '# TYPE files_total counter\n'
+            'files_total{schema_type="a\\"c\\\\c"} 1\n'
+            'files_total{schema_type="loc"} 3\n'
+            '# HELP rate Rate\n'
+            '# TYPE rate gauge\n'
+            'rate 1.5\n'
+            '# HELP latency_seconds Latency\n'
+            '# TYPE latency_seconds histogram\n'
+            'latency_seconds_bucket{le="0.1"} 1\n'
+            'latency_seconds_bucket{le="1"} 2\n'
+            'latency_seconds_bucket{le="+Inf"} 3\n'
+            'latency_seconds_sum 5.55\n'
+            'latency_seconds_count 3\n'
+        )
+
+        registry.reset()
+        self.assertEqual(counter.get(schema_type='loc'), 0)
+        self.assertNotIn('files_total{', registry.to_text())
+
+    def test_metrics_registry__invalid_labels_increments_or_registrations__oed_process_error_raised(self):
+        registry = MetricsRegistry()
+        counter = registry.counter('files_total', 'Files', ['schema_type'])
+
+        with self.assertRaises(ProcessError):
+            counter.inc()
+
+        with self.assertRaises(ProcessError):
+            counter.inc(schema_type='loc', code='E371')
+
+        with self.assertRaises(ProcessError):
+            counter.inc(-1, schema_type='loc')
+
+        with self.assertRaises(ProcessError):
+            registry.gauge('files_total', 'Files', ['schema_type'])
+
+        with self.assertRaises(ProcessError):
+            registry.counter('files_total', 'Files', ['code'])
+
+        with self.assertRaises(ProcessError):
+            registry.get('rows_total')
+
+    @given(values=lists(floats(min_value=0, max_value=1000), max_size=20))
+    @settings(max_examples=20, deadline=None)
+    def test_histogram__observations__cumulative_bucket_counts(self, values):
+        registry = MetricsRegistry()
+        histogram = registry.histogram('latency_seconds', 'Latency')
+
+        for value in values:
+            histogram.observe(value)
+
+        buckets = [(labels[-1][1], count) for name, labels, count in histogram.samples() if name.endswith('_bucket')]
+        if not values:
+            self.assertEqual(buckets, [])
+            return
+
+        for le, count in buckets:
+            bound = math.inf if le == '+Inf' else float(le)
+            self.assertEqual(count, sum(1 for v in values if v <= bound))
+
+    def test_metrics_registry_write_and_serve_metrics__metrics_text_written_to_file_and_served(self):
+        registry = MetricsRegistry()
+        registry.counter('files_total', 'Files').inc()
+
+        with TemporaryDirectory() as d:
+            fp = os.path.join(d, 'oedtools.prom')
+            registry.write(fp)
+            with io.open(fp, 'r', encoding='utf-8') as f:
+                self.assertEqual(f.read(), registry.to_text())
+            self.assertEqual(os.listdir(d), ['oedtools.prom'])
+
+        server = serve_metrics(registry=registry)
+        try:
+            with urllib.request.urlopen('http://{}:{}/metrics'.format(*server.server_address[:2])) as resp:
+                self.assertTrue(resp.headers['Content-Type'].startswith('text/plain; version=0.0.4'))
+                self.assertEqual(resp.read().decode('utf-8'), registry.to_text())
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    @given(
+        num_rows=integers(min_value=1, max_value=30),
+        chunksize=integers(min_value=1, max_value=10),
+        report_format=sampled_from(['text', 'jsonl', 'csv'])
+    )
+    @settings(max_examples=10, deadline=None)
+    def test_file_errors_and_write_report__chunked_file__files_rows_errors_and_records_counted(self, num_rows, chunksize, report_format):
+        data = get_loc_data(num_rows)
+
+        before = (
+            FILES_VALIDATED.get(schema_type='loc'),
+            ROWS_VALIDATED.get(schema_type='loc'),
+            VALIDATION_ERRORS.get(schema_type='loc', code='E371'),
+            VALIDATION_SECONDS.get(schema_type='loc')['count'],
+            REPORT_RECORDS.get(format=report_format)
+        )
+
+        with TemporaryDirectory() as d:
+            num_records = write_report(file_errors('loc', data, chunksize=chunksize), output_fp=os.path.join(d, 'report'), report_format=report_format)
+
+        after = (
+            FILES_VALIDATED.get(schema_type='loc'),
+            ROWS_VALIDATED.get(schema_type='loc'),
+            VALIDATION_ERRORS.get(schema_type='loc', code='E371'),
+            VALIDATION_SECONDS.get(schema_type='loc')['count'],
+            REPORT_RECORDS.get(format=report_format)
+        )
+
+        self.assertEqual([a - b for a, b in zip(after, before)], [1, num_rows, num_rows, 1, num_records])
+
+    def test_validate__not_columnar__file_rows_and_errors_counted(self):
+        data = [{'LocNumber': 'L1', 'AccNumber': 'A1', 'CountryCode': 'XX'}] * 3
+
+        before = (ROWS_VALIDATED.get(schema_type='loc'), VALIDATION_ERRORS.get(schema_type='loc', code='E371'))
+        OedValidator().validate('loc', data)
+        after = (ROWS_VALIDATED.get(schema_type='loc'), VALIDATION_ERRORS.get(schema_type='loc', code='E371'))
+
+        self.assertEqual([a - b for a, b in zip(after, before)], [3, 3])
+
+    def test_get_schema__schema_load_time_observed(self):
+        num_loads = SCHEMA_LOAD_SECONDS.get(schema='acc')['count']
+        get_schema('acc')
+        self.assertEqual(SCHEMA_LOAD_SECONDS.get(schema='acc')['count'], num_loads + 1)
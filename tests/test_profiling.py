@@ -0,0 +1,211 @@
+import json
+import time
+import tracemalloc
+
+from types import SimpleNamespace
+from unittest import (
+    mock,
+    TestCase,
+)
+
+import pandas as pd
+
+from hypothesis import (
+    given,
+    settings,
+)
+from hypothesis.strategies import (
+    booleans,
+    integers,
+)
+
+from oedtools.profiling import (
+    NULL_PROFILE,
+    STAGES,
+    ValidationProfile,
+)
+from oedtools.report import file_errors
+from oedtools.validate import OedValidator
+
+
+class TestProfiling(TestCase):
+
+    def test_validation_profile__stages_columns_and_timed_functions__times_rows_and_calls_accumulated(self):
+        profile = ValidationProfile()
+
+        with profile.stage('report', rows=3):
+            time.sleep(0.001)
+        with profile.stage('read', rows=2):
+            pass
+        for rows in [5, 7]:
+            with profile.column('LocNumber', rows=rows) as col_profile:
+                col_profile['errors'] = 1
+
+        self.assertEqual(profile.timed('report', lambda x: x + 1)(1), 2)
+        self.assertEqual([len(item) for item in profile.iter_stage('read', [[1], [1, 2]])], [1, 2])
+        profile.stop()
+
+        res = profile.to_dict()
+        json.dumps(res)
+
+        self.assertEqual([s['stage'] for s in res['stages']], ['read', 'columns', 'report'])
+        stages = {s['stage']: s for s in res['stages']}
+        self.assertEqual((stages['read']['rows'], stages['read']['calls']), (5, 3))
+        self.assertEqual((stages['columns']['rows'], stages['columns']['calls']), (12, 2))
+        self.assertEqual((stages['report']['rows'], stages['report']['calls']), (3, 2))
+        self.assertGreaterEqual(stages['report']['seconds'], 0.001)
+
+        self.assertEqual(res['columns'], [{'header': 'LocNumber', 'seconds': res['columns'][0]['seconds'], 'rows': 12, 'errors': 2, 'rows_per_sec': res['columns'][0]['rows_per_sec']}])
+        self.assertGreaterEqual(res['seconds'], sum(s['seconds'] for s in res['stages']))
+        self.assertGreaterEqual(res['unaccounted_seconds'], 0)
+
+        text = profile.format()
+        self.assertTrue(text.startswith('stage '))
+        self.assertIn('\nLocNumber ', text)
+        self.assertIn('\ntotal ', text)
+
+    def test_validation_profile__memory__peak_and_retained_memory_of_stages_and_columns(self):
+        self.assertFalse(tracemalloc.is_tracing())
+
+        profile = ValidationProfile(memory=True)
+        self.assertTrue(tracemalloc.is_tracing())
+
+        kept = []
+        with profile.stage('read'):
+            kept.append(bytearray(2 ** 20))
+            with profile.column('LocNumber') as col_profile:
+                bytearray(4 * 2 ** 20)
+                col_profile['errors'] = 0
+        with profile.stage('read'):
+            bytearray(2 ** 20)
+        self.assertEqual(profile.timed('report', lambda n: len(bytearray(n)))(2 ** 20), 2 ** 20)
+        profile.stop()
+
+        self.assertFalse(tracemalloc.is_tracing())
+
+        res = profile.to_dict()
+        stages = {s['stage']: s for s in res['stages']}
+
+        # A nested section's peak is included in the peak of the section in
+        # which it is nested
+        self.assertGreaterEqual(stages['read']['peak_bytes'], 5 * 2 ** 20)
+        self.assertLess(stages['read']['peak_bytes'], 6 * 2 ** 20)
+        self.assertGreaterEqual(stages['read']['retained_bytes'], 2 ** 20)
+        self.assertLess(stages['read']['retained_bytes'], 2 ** 20 + 2 ** 16)
+
+        self.assertGreaterEqual(stages['columns']['peak_bytes'], 4 * 2 ** 20)
+        self.assertEqual(res['columns'][0]['peak_bytes'], stages['columns']['peak_bytes'])
+        self.assertLess(stages['columns']['retained_bytes'], 2 ** 16)
+        self.assertGreaterEqual(stages['report']['peak_bytes'], 2 ** 20)
+
+        self.assertGreaterEqual(res['peak_bytes'], 5 * 2 ** 20)
+        self.assertIn('peak MiB', profile.format())
+
+        self.assertNotIn('peak_bytes', ValidationProfile().to_dict())
+
+    def test_validation_profile__memory_without_reset_peak__new_peaks_and_retained_memory_traced(self):
+        # Python < 3.9, where the tracemalloc peak cannot be reset
+        _tracemalloc = SimpleNamespace(**{
+            name: getattr(tracemalloc, name) for name in ['get_traced_memory', 'is_tracing', 'start', 'stop']
+        })
+
+        with mock.patch('oedtools.profiling.tracemalloc', _tracemalloc):
+            profile = ValidationProfile(memory=True)
+
+            kept = []
+            with profile.stage('read'):
+                kept.append(bytearray(2 ** 20))
+                with profile.column('LocNumber'):
+                    bytearray(4 * 2 ** 20)
+            with profile.stage('read'):
+                bytearray(2 ** 20)
+            profile.stop()
+
+        self.assertFalse(tracemalloc.is_tracing())
+
+        res = profile.to_dict()
+        stages = {s['stage']: s for s in res['stages']}
+
+        # The first read stage, and the column, raise the peak, so their
+        # peaks are known, and the second read stage's is a lower bound
+        self.assertGreaterEqual(stages['read']['peak_bytes'], 5 * 2 ** 20)
+        self.assertLess(stages['read']['peak_bytes'], 6 * 2 ** 20)
+        self.assertGreaterEqual(stages['read']['retained_bytes'], 2 ** 20)
+        self.assertLess(stages['read']['retained_bytes'], 2 ** 20 + 2 ** 16)
+        self.assertGreaterEqual(stages['columns']['peak_bytes'], 4 * 2 ** 20)
+        self.assertGreaterEqual(res['peak_bytes'], 5 * 2 ** 20)
+
+    def test_validate__memory_profile__all_stages_and_columns_have_memory(self):
+        data = [{'LocNumber': 'L{}'.format(i), 'AccNumber': 'A1', 'CountryCode': 'XX'} for i in range(100)]
+
+        profile = ValidationProfile(memory=True)
+        records = list(file_errors('loc', data, chunksize=40, profile=profile))
+        profile.stop()
+
+        self.assertEqual(records, list(file_errors('loc', data, chunksize=40)))
+
+        res = profile.to_dict()
+        for d in res['stages'] + res['columns']:
+            self.assertGreater(d['peak_bytes'], 0)
+            self.assertIn('retained_bytes', d)
+        self.assertGreaterEqual(res['peak_bytes'], max(d['peak_bytes'] for d in res['stages']))
+
+    def test_null_profile__stages_columns_and_timed_functions__nothing_recorded_and_values_passed_through(self):
+        func = lambda x: x
+        data = [[1], [2]]
+
+        with NULL_PROFILE.stage('read', rows=1) as stage:
+            stage['rows'] = 2
+        with NULL_PROFILE.column('LocNumber', rows=1) as col_profile:
+            col_profile['errors'] = 1
+
+        self.assertIs(NULL_PROFILE.timed('report', func), func)
+        self.assertIs(NULL_PROFILE.iter_stage('read', data), data)
+
+    @given(
+        num_rows=integers(min_value=1, max_value=50),
+        columnar=booleans()
+    )
+    @settings(max_examples=10, deadline=None)
+    def test_validate__profile__stages_and_columns_profiled_with_row_counts_and_errors(self, num_rows, columnar):
+        data = pd.DataFrame(data={
+            'LocNumber': ['L{}'.format(i) for i in range(num_rows)],
+            'AccNumber': ['A1'] * num_rows,
+            'CountryCode': ['XX'] * num_rows,
+            'BuildingTIV': ['100'] * num_rows,
+        }).to_dict(orient='records')
+
+        profile = ValidationProfile()
+        results, _, _ = OedValidator().validate('loc', data, columnar=columnar, profile=profile)
+        res = profile.to_dict()
+
+        stages = {s['stage']: s for s in res['stages']}
+        self.assertTrue({'read', 'normalise', 'headers', 'columns', 'aggregate'}.issubset(stages))
+        self.assertTrue(set(stages).issubset(STAGES))
+        self.assertEqual(stages['read']['rows'], num_rows)
+
+        columns = {c['header']: c for c in res['columns']}
+        self.assertEqual(set(columns), {'LocNumber', 'AccNumber', 'CountryCode', 'BuildingTIV'})
+        for c in columns.values():
+            self.assertEqual(c['rows'], num_rows)
+        self.assertEqual(stages['columns']['rows'], 4 * num_rows)
+
+        self.assertEqual(columns['CountryCode']['errors'], num_rows)
+        self.assertEqual(columns['LocNumber']['errors'], 0)
+
+    def test_file_errors__profile_and_chunks__report_stage_rows_are_records_generated(self):
+        data = pd.DataFrame(data={
+            'LocNumber': ['L{}'.format(i) for i in range(10)],
+            'AccNumber': ['A1'] * 10,
+            'CountryCode': ['XX'] * 10,
+            'BuildingTIV': ['100'] * 10,
+        }).to_dict(orient='records')
+
+        profile = ValidationProfile()
+        records = list(file_errors('loc', data, chunksize=4, profile=profile))
+        self.assertEqual(records, list(file_errors('loc', data, chunksize=4)))
+
+        stages = {s['stage']: s for s in profile.to_dict()['stages']}
+        self.assertEqual(stages['read']['calls'], 3)
+        self.assertEqual(stages['columns']['calls'], 3 * 4)
+        self.assertEqual(stages['report']['rows'], len(records))
@@ -0,0 +1,212 @@
+import io
+import os
+
+from io import StringIO
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+import pandas as pd
+
+from hypothesis import (
+    given,
+    settings,
+)
+from hypothesis.strategies import (
+    booleans,
+    integers,
+)
+
+from oedtools.progress import (
+    NULL_PROGRESS,
+    ProgressLine,
+    ValidationProgress,
+    format_progress,
+    get_progress,
+)
+from oedtools.report import (
+    file_errors,
+    report_file,
+)
+from oedtools.validate import OedValidator
+
+from .data import get_loc_data
+
+
+class TtyStringIO(StringIO):
+
+    def isatty(self):
+        return True
+
+
+class TestProgress(TestCase):
+
+    def assert_progress(self, states, num_rows, num_chunks, num_bytes=None):
+        self.assertTrue(all(not s['done'] for s in states[:-1]))
+
+        rows = [s['rows'] for s in states]
+        self.assertEqual(rows, sorted(rows))
+        self.assertEqual([s['chunk'] for s in states], sorted(s['chunk'] for s in states))
+
+        for s in states[:-1]:
+            if s['fraction'] is not None:
+                self.assertTrue(0 <= s['fraction'] <= 1)
+            if s['eta'] is not None:
+                self.assertGreaterEqual(s['eta'], 0)
+            self.assertEqual((s['bytes'] is None), (num_bytes is None))
+
+        self.assertEqual(states[-1], {
+            'file': states[-1]['file'],
+            'schema_type': 'loc',
+            'rows': num_rows,
+            'total_rows': num_rows,
+            'bytes': num_bytes,
+            'total_bytes': num_bytes,
+            'chunk': num_chunks,
+            'column': None,
+            'elapsed': states[-1]['elapsed'],
+            'rows_per_sec': states[-1]['rows_per_sec'],
+            'fraction': 1.0,
+            'eta': 0.0,
+            'done': True
+        })
+
+    def test_get_progress__no_progress_callback_or_tracker__null_tracker_new_tracker_or_tracker_returned(self):
+        self.assertIs(get_progress(None), NULL_PROGRESS)
+        self.assertIs(get_progress(False), NULL_PROGRESS)
+
+        tracker = ValidationProgress(print)
+        self.assertIs(get_progress(tracker), tracker)
+
+        tracker = get_progress(print)
+        self.assertIsInstance(tracker, ValidationProgress)
+        self.assertIs(tracker.callback, print)
+
+    def test_validation_progress__no_interval__progress_reported_on_every_update(self):
+        data = get_loc_data(10)
+        none_states, zero_states = [], []
+
+        list(file_errors('loc', data, chunksize=4, progress=ValidationProgress(none_states.append, interval=None)))
+        list(file_errors('loc', data, chunksize=4, progress=ValidationProgress(zero_states.append, interval=0)))
+
+        self.assert_progress(none_states, 10, 3)
+        self.assertEqual(len([s for s in none_states if s['column']]), 4 * 3)
+        self.assertEqual(len(none_states), len(zero_states))
+
+    @given(
+        num_rows=integers(min_value=1, max_value=30),
+        chunksize=integers(min_value=1, max_value=40)
+    )
+    @settings(max_examples=10, deadline=None)
+    def test_file_errors__data__progress_of_each_chunk_and_column_reported(self, num_rows, chunksize):
+        data = get_loc_data(num_rows)
+        states = []
+
+        records = list(file_errors('loc', data, chunksize=chunksize, progress=ValidationProgress(states.append, interval=0)))
+        self.assertEqual(records, list(file_errors('loc', data, chunksize=chunksize)))
+
+        num_chunks = -(-num_rows // chunksize)
+        self.assert_progress(states, num_rows, num_chunks)
+
+        columns = [s['column'] for s in states if s['column']]
+        self.assertEqual(len(columns), 4 * num_chunks)
+        self.assertEqual(set(columns), {'LocNumber', 'AccNumber', 'CountryCode', 'BuildingTIV'})
+
+        for s in states:
+            self.assertEqual(s['total_rows'], num_rows)
+
+    @given(
+        num_rows=integers(min_value=1, max_value=200),
+        chunksize=integers(min_value=10, max_value=100)
+    )
+    @settings(max_examples=5, deadline=None)
+    def test_report_file__file__bytes_read_and_estimated_total_rows_reported(self, num_rows, chunksize):
+        states = []
+
+        with TemporaryDirectory() as data_dir:
+            fp = os.path.join(data_dir, 'loc.csv')
+            pd.DataFrame(get_loc_data(num_rows)).to_csv(fp, index=False)
+            num_bytes = os.path.getsize(fp)
+
+            list(report_file('loc', fp, chunksize=chunksize, progress=ValidationProgress(states.append, interval=0)))
+
+        self.assert_progress(states, num_rows, -(-num_rows // chunksize), num_bytes=num_bytes)
+
+        self.assertEqual(states[-1]['file'], fp)
+        for s in states[:-1]:
+            self.assertTrue(0 < s['bytes'] <= num_bytes)
+            self.assertGreater(s['total_rows'], 0)
+
+    @given(
+        num_rows=integers(min_value=1, max_value=30),
+        columnar=booleans()
+    )
+    @settings(max_examples=10, deadline=None)
+    def test_validate__callback__progress_reported_once_on_finishing(self, num_rows, columnar):
+        states = []
+
+        OedValidator().validate('loc', get_loc_data(num_rows), columnar=columnar, progress=states.append)
+
+        # The default interval is longer than the validation, so only the
+        # finished progress is reported
+        self.assertEqual(len(states), 1)
+        self.assert_progress(states, num_rows, 1)
+
+    def test_format_progress__states__progress_line_with_eta_or_time_taken(self):
+        state = {
+            'file': 'loc.csv',
+            'schema_type': 'loc',
+            'rows': 200000,
+            'total_rows': 1000000,
+            'bytes': 30 * 2 ** 20,
+            'total_bytes': 150 * 2 ** 20,
+            'chunk': 3,
+            'column': 'BuildingTIV',
+            'elapsed': 5.0,
+            'rows_per_sec': 40000.0,
+            'fraction': 0.2,
+            'eta': 20.0,
+            'done': False
+        }
+        self.assertEqual(
+            format_progress(state),
+            '200,000/~1,000,000 rows (20.0%) | 30.0/150.0 MiB | chunk 3, BuildingTIV | 40,000 rows/s | ETA 0:00:20'
+        )
+
+        self.assertEqual(
+            format_progress({**state, **{'total_rows': None, 'fraction': None, 'eta': None, 'bytes': None, 'column': None}}),
+            '200,000 rows | chunk 3 | 40,000 rows/s | ETA --'
+        )
+
+        self.assertEqual(
+            format_progress({**state, **{'rows': 1000000, 'bytes': 150 * 2 ** 20, 'elapsed': 3725.0, 'fraction': 1.0, 'eta': 0.0, 'done': True}}),
+            '1,000,000/1,000,000 rows (100.0%) | 150.0/150.0 MiB | 40,000 rows/s | done in 1:02:05'
+        )
+
+    def test_progress_line__tty_and_log__line_overwritten_on_tty_and_written_per_update_otherwise(self):
+        data = get_loc_data(10)
+
+        for stream, tty in [(TtyStringIO(), True), (StringIO(), False)]:
+            list(file_errors('loc', data, chunksize=4, progress=ValidationProgress(ProgressLine(stream), interval=0)))
+            output = stream.getvalue()
+
+            # On a terminal a line is padded to overwrite a longer previous line
+            last_line = output.rstrip('\n').split('\r')[-1].split('\n')[-1].rstrip(' ')
+            self.assertTrue(last_line.startswith('10/10 rows (100.0%) | '))
+            self.assertTrue(last_line.endswith(' | done in 0:00:00'))
+            self.assertTrue(output.endswith('\n'))
+            if tty:
+                self.assertTrue(output.startswith('\r'))
+                self.assertEqual(output.count('\n'), 1)
+            else:
+                self.assertNotIn('\r', output)
+                self.assertGreater(output.count('\n'), 3)
+
+    def test_report_file__progress_and_output_file__report_unchanged(self):
+        data = get_loc_data(10)
+
+        with TemporaryDirectory() as out_dir:
+            out_fp = os.path.join(out_dir, 'report.txt')
+            with io.open(out_fp, 'w', encoding='utf-8') as f:
+                f.writelines(report_file('loc', data, chunksize=3, progress=ValidationProgress(lambda state: None, interval=0)))
+            with io.open(out_fp, 'r', encoding='utf-8') as f:
+                self.assertEqual(f.read(), ''.join(report_file('loc', data, chunksize=3)))
@@ -1,5 +1,8 @@
 
-from unittest import TestCase
+from unittest import (
+    mock,
+    TestCase,
+)
 
 import pytest
 
@@ -15,7 +18,13 @@ from hypothesis.strategies import (
     text,
 )
 
-from oedtools.query import get_columns
+from oedtools.query import (
+    get_columns,
+    get_index,
+    get_text_index,
+    INDEXED_FIELDS,
+    search_columns,
+)
 
 from .data import (
     ALL,
@@ -110,3 +119,88 @@ class TestQuery(TestCase):
             self.assertEqual(len(results), len(exp_results))
             for r in results:
                 self.assertIn(r, exp_results)
+
+    def test_get_index__posting_lists_partition_master_schema_by_field_value(self):
+        index = get_index()
+
+        self.assertIs(index, get_index())
+        self.assertEqual(sorted(index['schema']), sorted(MASTER_SCHEMA))
+
+        for field in INDEXED_FIELDS:
+            postings = index['postings'][field]
+            self.assertEqual(sorted(k for keys in postings.values() for k in keys), sorted(MASTER_SCHEMA))
+            for value, keys in postings.items():
+                for key in keys:
+                    exp_value = MASTER_SCHEMA[key][field]
+                    self.assertEqual(value, exp_value.lower() if isinstance(exp_value, str) and field not in ['required', 'default'] else exp_value)
+
+    def test_get_index_and_get_columns__schema_version_changed__index_and_results_rebuilt(self):
+        index = get_index()
+        results = get_columns(schema_types=['loc'], headers=['LocNumber'])
+        self.assertTrue(results)
+
+        schema = {k: v for k, v in MASTER_SCHEMA.items() if k != ('loc', 'locnumber')}
+
+        with mock.patch('oedtools.query.get_schema_version', return_value='0.0.0'), mock.patch('oedtools.query.get_schema', return_value=schema):
+            new_index = get_index()
+            self.assertIsNot(new_index, index)
+            self.assertEqual(new_index['version'], '0.0.0')
+            self.assertEqual(sorted(new_index['schema']), sorted(schema))
+            self.assertEqual(
+                [(r['entity'], r['field_name']) for r in get_columns(schema_types=['loc'], headers=['LocNumber'])],
+                [(r['entity'], r['field_name']) for r in results if r['field_name'] != 'LocNumber']
+            )
+
+        self.assertIs(get_index(), index)
+        self.assertEqual(get_columns(schema_types=['loc'], headers=['LocNumber']), results)
+
+    @given(
+        headers=lists(sampled_from([header for schema_type, header in ALL]), min_size=1, max_size=5, unique=True),
+        schema_types=lists(sampled_from(SCHEMA_TYPES_EX_MASTER), max_size=len(SCHEMA_TYPES_EX_MASTER), unique=True)
+    )
+    def test_get_columns__repeated_queries__results_sorted_and_not_shared(self, headers, schema_types):
+        results = get_columns(schema_types=schema_types, headers=headers)
+
+        self.assertEqual(
+            [(r['field_name'].lower(), r['entity'].lower()) for r in results],
+            sorted((r['field_name'].lower(), r['entity'].lower()) for r in results)
+        )
+
+        for r in results:
+            r['field_name'] = None
+
+        self.assertEqual(get_columns(schema_types=tuple(schema_types), headers=tuple(headers)), get_columns(schema_types=schema_types, headers=headers))
+        self.assertTrue(all(r['field_name'] is not None for r in get_columns(schema_types=schema_types, headers=headers)))
+
+    def test_get_text_index__built_once_and_indexes_all_description_tokens(self):
+        index = get_text_index()
+
+        self.assertIs(index, get_text_index())
+        self.assertEqual(sorted(index['doc_lengths']), sorted(MASTER_SCHEMA))
+        self.assertIn(('loc', 'loccurrency'), index['postings']['currency'])
+        self.assertIn('currency', index['trigrams']['cur'])
+
+    @given(
+        query=sampled_from(['currency', 'flood zone', 'construction code', 'deductible', 'peril codes']),
+        schema_types=lists(sampled_from(SCHEMA_TYPES_EX_MASTER), max_size=2, unique=True)
+    )
+    def test_search_columns__whole_word_queries__ranked_results_contain_query_tokens(self, query, schema_types):
+        results = search_columns(query, schema_types=schema_types)
+
+        if not schema_types:
+            self.assertTrue(results)
+        self.assertEqual([r['score'] for r in results], sorted((r['score'] for r in results), reverse=True))
+        for r in results:
+            self.assertTrue(any(token in r['desc'].lower() for token in query.split()))
+            if schema_types:
+                self.assertIn(r['entity'].lower(), schema_types)
+
+        self.assertEqual(search_columns(query, schema_types=schema_types, limit=2), results[:2])
+
+    def test_search_columns__partial_and_misspelled_tokens__similar_tokens_matched(self):
+        exact = [(r['entity'], r['field_name']) for r in search_columns('currency')]
+
+        self.assertTrue(exact)
+        self.assertEqual([(r['entity'], r['field_name']) for r in search_columns('currenc')][:len(exact)], exact)
+        self.assertEqual([(r['entity'], r['field_name']) for r in search_columns('curency')][:len(exact)], exact)
+        self.assertEqual(search_columns('qwxqwx'), [])
@@ -1,7 +1,16 @@
+import csv
+import gzip
+import io
+import json
 import os
 import re
 import string
 
+from contextlib import (
+    redirect_stderr,
+    redirect_stdout,
+)
+from io import StringIO
 from itertools import (
     chain,
     product,
@@ -30,8 +39,13 @@ from oedtools.exceptions import (
     ReportingError,
 )
 from oedtools.report import (
+    aggregate_errors,
+    file_errors,
+    header_errors,
+    REPORT_FIELDS,
     report_file,
     report_headers,
+    write_report,
 )
 from oedtools.validate import (
     OedValidator,
@@ -209,3 +223,148 @@ class TestReport(TestCase):
             else:
                 for line in report:
                     self.assertIsNotNone(re.match(r'^{}:1.*$'.format(file.name), line))
+
+    @given(
+        schema_type=sampled_from(SCHEMA_TYPES_EX_MASTER),
+        num_rows=integers(min_value=1, max_value=20),
+        chunksize=integers(min_value=1, max_value=25)
+    )
+    @settings(max_examples=10, deadline=None)
+    def test_report_file__bad_data_as_file__chunked_report_lines_same_as_unchunked_report_lines(self, schema_type, num_rows, chunksize):
+        headers = list(GROUPED_SCHEMA[schema_type])[:10]
+
+        df = pd.DataFrame(data={header: sample_column(schema_type, header, size=num_rows) for header in headers}, dtype=object)
+        df.loc[df.index[::2], headers[0]] = 'non oed value'
+
+        with NamedTemporaryFile('w') as file:
+            df.to_csv(path_or_buf=file.name, index=False, encoding='utf-8')
+
+            exp_report = sorted(report_file(schema_type, file.name, chunksize=None))
+            report = sorted(report_file(schema_type, file.name, chunksize=chunksize))
+
+        self.assertEqual(report, exp_report)
+
+    def test_report_file__progress__progress_written_to_stderr(self):
+        data = pd.DataFrame(data={header: sample_column('loc', header, size=10) for header in GROUPED_SCHEMA['loc']}).to_dict('records')
+
+        stderr = StringIO()
+        with redirect_stderr(stderr):
+            list(report_file('loc', data, chunksize=4, progress=True))
+
+        self.assertIsNotNone(re.match(r'^\r4 rows processed \(\d+ rows/s\)\r8 rows processed \(\d+ rows/s\)\r10 rows processed \(\d+ rows/s\)\n$', stderr.getvalue()))
+
+    @given(
+        schema_type=sampled_from(SCHEMA_TYPES_EX_MASTER),
+        num_rows=integers(min_value=1, max_value=10),
+        report_format=sampled_from(['text', 'jsonl', 'csv']),
+        compress=sampled_from([True, False])
+    )
+    @settings(max_examples=5, deadline=None)
+    def test_write_report__bad_data_as_file__report_file_written_in_format(self, schema_type, num_rows, report_format, compress):
+        headers = list(GROUPED_SCHEMA[schema_type])[:10] + ['non oed column']
+
+        df = pd.DataFrame(data={header: sample_column('loc', 'flexiloczzz', str_width=5, size=num_rows) if header == 'non oed column' else sample_column(schema_type, header, size=num_rows) for header in headers}, dtype=object)
+        df.loc[df.index[::2], headers[0]] = 'non oed value'
+
+        with NamedTemporaryFile('w') as file, NamedTemporaryFile('w') as report_file_:
+            df.to_csv(path_or_buf=file.name, index=False, encoding='utf-8')
+
+            records = list(file_errors(schema_type, file.name))
+            exp_lines = ''.join(report_file(schema_type, file.name))
+            num_written = write_report(file_errors(schema_type, file.name), output_fp=report_file_.name, report_format=report_format, compress=compress)
+
+            with (gzip.open(report_file_.name, 'rt', encoding='utf-8') if compress else io.open(report_file_.name, 'r', encoding='utf-8')) as f:
+                contents = f.read()
+
+        self.assertEqual(num_written, len(records))
+
+        if report_format == 'text':
+            self.assertEqual(contents, exp_lines)
+        elif report_format == 'jsonl':
+            self.assertEqual([json.loads(line) for line in contents.splitlines()], json.loads(json.dumps(records, default=str)))
+        else:
+            rows = list(csv.DictReader(io.StringIO(contents)))
+            self.assertEqual(len(rows), len(records))
+            for row, record in zip(rows, records):
+                self.assertEqual(list(row), REPORT_FIELDS)
+                self.assertEqual((int(row['row']), int(row['column_pos']), row['header'], row['code']), (record['row'], record['column_pos'], record['header'], record['code']))
+
+    def test_write_report__headers__text_report_same_as_report_headers_lines(self):
+        headers = ['locnumber', 'non oed column']
+
+        stdout = StringIO()
+        with redirect_stdout(stdout):
+            write_report(header_errors('loc', headers))
+
+        self.assertEqual(stdout.getvalue(), ''.join(report_headers('loc', headers)))
+
+    def test_write_report__invalid_report_format__oed_reporting_error_raised(self):
+        with self.assertRaises(ReportingError):
+            write_report(header_errors('loc', ['locnumber']), report_format='xml')
+
+    @given(
+        rows=lists(integers(min_value=2, max_value=50), min_size=0, max_size=30, unique=True),
+        codes=lists(sampled_from(['E351', 'E361', 'E371']), min_size=30, max_size=30)
+    )
+    def test_aggregate_errors__records__ranges_cover_records_and_are_maximal(self, rows, codes):
+        records = [
+            {'file': '', 'row': row, 'column_pos': 0, 'header': 'locnumber', 'value': row, 'code': code, 'code_desc': '', 'msg': ''}
+            for row, code in zip(sorted(rows), codes)
+        ]
+
+        runs = list(aggregate_errors(records, num_examples=2))
+
+        self.assertEqual(sum(r['count'] for r in runs), len(records))
+        self.assertEqual(
+            sorted((row, r['code']) for r in runs for row in range(r['start_row'], r['end_row'] + 1)),
+            sorted((rec['row'], rec['code']) for rec in records)
+        )
+        for r in runs:
+            self.assertEqual(r['count'], r['end_row'] - r['start_row'] + 1)
+            self.assertEqual(r['examples'], list(range(r['start_row'], r['end_row'] + 1))[:2])
+            self.assertFalse(any(
+                _r['code'] == r['code'] and _r['start_row'] == r['end_row'] + 1
+                for _r in runs
+            ))
+
+    def test_report_file__aggregate__bad_value_in_every_row__single_range_reported_across_chunks(self):
+        headers = list(GROUPED_SCHEMA['loc'])
+        df = pd.DataFrame(data={header: sample_column('loc', header, size=20) for header in headers}, dtype=object)
+        df['loccurrency'] = 'XYZ'
+
+        with NamedTemporaryFile('w') as file:
+            df.to_csv(path_or_buf=file.name, index=False, encoding='utf-8')
+
+            lines = [
+                line for line in report_file('loc', file.name, chunksize=7, aggregate=True)
+                if '"loccurrency"' in line
+            ]
+
+        self.assertEqual(len(lines), 1)
+        self.assertIsNotNone(re.match(r'^{}:2-21:\d+: 20 row\(s\) in "loccurrency": OED error: E371 .*: e.g. "XYZ"\n$'.format(file.name), lines[0]))
+
+    @given(
+        schema_type=sampled_from(SCHEMA_TYPES_EX_MASTER),
+        num_rows=integers(min_value=1, max_value=20),
+        chunksize=integers(min_value=1, max_value=25)
+    )
+    @settings(max_examples=5, deadline=None)
+    def test_file_errors__row_order__errors_in_row_order_and_same_as_column_order_errors(self, schema_type, num_rows, chunksize):
+        headers = list(GROUPED_SCHEMA[schema_type])[:10] + ['non oed column']
+
+        df = pd.DataFrame(data={header: sample_column(schema_type, headers[1], size=num_rows) if header == 'non oed column' else sample_column(schema_type, header, size=num_rows) for header in headers}, dtype=object)
+        df.loc[df.index[::2], headers[0]] = 'non oed value'
+        df.loc[df.index[1::3], headers[2]] = 'non oed value'
+
+        with NamedTemporaryFile('w') as file:
+            df.to_csv(path_or_buf=file.name, index=False, encoding='utf-8')
+
+            by_column = [(r['row'], r['column_pos'], r['code']) for r in file_errors(schema_type, file.name, chunksize=chunksize)]
+            by_row = [(r['row'], r['column_pos'], r['code']) for r in file_errors(schema_type, file.name, chunksize=chunksize, order='row')]
+
+        self.assertEqual(sorted(by_row), sorted(by_column))
+        self.assertEqual([t[0] for t in by_row], sorted(t[0] for t in by_row))
+
+    def test_file_errors__invalid_order__oed_reporting_error_raised(self):
+        with self.assertRaises(ReportingError):
+            list(file_errors('loc', [{'locnumber': 1}], order='value'))
@@ -0,0 +1,142 @@
+import string
+
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+
+from hypothesis import (
+    given,
+    settings,
+)
+from hypothesis.strategies import (
+    integers,
+    lists,
+    sampled_from,
+    text,
+)
+
+from oedtools.exceptions import (
+    DataOutOfRangeError,
+    InvalidDataTypeError,
+    NullDataInNonNullColumnError,
+    ProcessError,
+)
+from oedtools.results import ValidationResults
+from oedtools.validate import OedValidator
+
+from .data import (
+    LOC_OPTIONAL,
+    LOC_REQUIRED,
+    sample_column,
+)
+
+
+class TestValidationResults(TestCase):
+
+    def setUp(self):
+        self.validator = OedValidator()
+
+    def get_results(self):
+        data = pd.DataFrame({
+            'PortNumber': ['1', '1', None],
+            'AccNumber': ['A1', 'A1', 'A2'],
+            'BuildingTIV': ['x', '-5', '100'],
+            'LocPerilsCovered': ['WTC', 'ZZZ', 'WTC;WSS'],
+            'Foo': [1, 2, 3]
+        }).to_dict(orient='records')
+
+        return self.validator.validate('loc', data, columnar=True)
+
+    def test_validate__columnar__bad_data__errors_stored_as_arrays(self):
+        results, overall, raw_headers = self.get_results()
+
+        self.assertIsInstance(results, ValidationResults)
+        self.assertFalse(overall)
+        self.assertEqual(raw_headers, ['PortNumber', 'AccNumber', 'BuildingTIV', 'LocPerilsCovered', 'Foo'])
+
+        for arr in [results.rows, results.columns, results.codes, results.values]:
+            self.assertIsInstance(arr, np.ndarray)
+            self.assertEqual(len(arr), len(results))
+
+        data_errors = sorted(
+            (results.headers[col], row, code)
+            for row, col, code in zip(results.rows, results.columns, results.codes)
+            if row > 1
+        )
+        self.assertEqual(data_errors, [
+            ('BuildingTIV', 2, InvalidDataTypeError.code),
+            ('BuildingTIV', 3, DataOutOfRangeError.code),
+            ('LocPerilsCovered', 3, DataOutOfRangeError.code),
+            ('PortNumber', 4, NullDataInNonNullColumnError.code)
+        ])
+
+    def test_validate__columnar__filters(self):
+        results, _, _ = self.get_results()
+
+        self.assertEqual(results.by_column('buildingtiv').rows.tolist(), [2, 3])
+        self.assertEqual(results.by_code('E371').values.tolist(), [-5.0, 'ZZZ'])
+        self.assertEqual(results.by_rows(3, 4).codes.tolist(), ['E371', 'E371'])
+        self.assertEqual(len(results.filter(headers=['BuildingTIV'], codes=['E351'], rows=(2, 3))), 1)
+        self.assertEqual(len(results.by_column('NotAColumn')), 0)
+
+    def test_validate__columnar__counts(self):
+        results, _, _ = self.get_results()
+
+        self.assertEqual(sum(results.counts().values()), len(results))
+        self.assertEqual(results.counts(by='header')['BuildingTIV'], 2)
+        self.assertEqual(results.counts(by='row')[3], 2)
+
+        with self.assertRaises(ProcessError):
+            results.counts(by='value')
+
+    def test_validate__columnar__iter_errors__row_order(self):
+        results, _, _ = self.get_results()
+
+        by_column = [(row, col, err.code) for row, col, _, err in results.iter_errors()]
+        by_row = [(row, col, err.code) for row, col, _, err in results.iter_errors(order='row')]
+
+        self.assertEqual(sorted(by_row), sorted(by_column))
+        self.assertEqual(by_row, sorted(by_row, key=lambda t: (t[0], t[1])))
+        self.assertEqual([t[0] for t in by_row if t[0] > 1], [2, 3, 3, 4])
+
+        with self.assertRaises(ProcessError):
+            list(results.iter_errors(order='value'))
+
+    def test_validate__columnar__to_frame(self):
+        results, _, _ = self.get_results()
+
+        df = results.to_frame()
+
+        self.assertEqual(df.columns.tolist(), ['row', 'header', 'column_pos', 'code', 'value'])
+        self.assertEqual(len(df), len(results))
+        self.assertEqual(df[df['header'] == 'BuildingTIV']['column_pos'].unique().tolist(), [22])
+
+    @settings(max_examples=10, deadline=None)
+    @given(
+        required=lists(sampled_from(LOC_REQUIRED), min_size=1, max_size=len(LOC_REQUIRED), unique=True),
+        optional=lists(sampled_from(LOC_OPTIONAL), max_size=10, unique=True),
+        non_oed=lists(text(alphabet=string.ascii_letters, min_size=1), max_size=3, unique=True),
+        num_rows=integers(min_value=1, max_value=10)
+    )
+    def test_validate__columnar__to_dicts__same_exceptions_as_dict_array_results(self, required, optional, non_oed, num_rows):
+        non_oed = ['non oed ' + col for col in non_oed]
+        headers = required + optional + non_oed
+
+        data = pd.DataFrame(data={
+            header: sample_column('loc', 'flexiloczzz', str_width=5, size=num_rows)
+            if header in non_oed
+            else sample_column('loc', header, size=num_rows)
+            for header in headers
+        }).to_dict(orient='records')
+
+        exp_results, exp_overall, _ = self.validator.validate('loc', data)
+        results, overall, _ = self.validator.validate('loc', data, columnar=True)
+
+        self.assertEqual(overall, exp_overall)
+
+        def exceptions(res):
+            return sorted((r['header'], row_num, e.code, e.msg) for r in res for row_num, e in r['exceptions'])
+
+        self.assertEqual(exceptions(results.to_dicts()), exceptions(exp_results))
+        self.assertEqual([r['pass'] for r in results.to_dicts()], [r['pass'] for r in exp_results])
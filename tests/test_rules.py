@@ -0,0 +1,412 @@
+import ast
+import io
+import json
+import os
+import warnings
+
+from tempfile import TemporaryDirectory
+from unittest import (
+    mock,
+    skipIf,
+    TestCase,
+)
+
+import pandas as pd
+
+from hypothesis import (
+    given,
+    settings,
+)
+from hypothesis.strategies import (
+    floats,
+    integers,
+    lists,
+    none,
+    one_of,
+    sampled_from,
+    tuples,
+)
+
+from oedtools.exceptions import (
+    ConditionallyRequiredDataError,
+    DataOutOfRangeError,
+    ProcessError,
+    RowRuleError,
+)
+from oedtools.results import ValidationResults
+from oedtools.rules import (
+    check_cr_rules,
+    check_row_rules,
+    compile_cr_rules,
+    compile_row_rules,
+    get_cr_rules,
+    get_row_rules,
+    load_row_rules,
+)
+from oedtools.validate import OedValidator
+
+from .data import (
+    GROUPED_SCHEMA,
+    SCHEMA_TYPES_EX_MASTER,
+)
+
+
+class TestRules(TestCase):
+
+    def test_get_cr_rules__all_schema_types__rule_columns_are_cr_columns_of_schema_type(self):
+        for schema_type in SCHEMA_TYPES_EX_MASTER:
+            for rule in get_cr_rules(schema_type):
+                for column in rule['columns']:
+                    self.assertEqual(GROUPED_SCHEMA[schema_type][column.lower()]['required'], 'CR')
+                for column in rule['when']:
+                    self.assertIn(column.lower(), GROUPED_SCHEMA[schema_type])
+
+        self.assertIn(
+            {'columns': ['LocDedType1Building'], 'when': ['LocDed1Building', 'LocMinDed1Building', 'LocMaxDed1Building'], 'values': None},
+            get_cr_rules('loc')
+        )
+        self.assertIn(
+            {'columns': ['PortNumber', 'AccNumber', 'LocNumber'], 'when': ['RiskLevel'], 'values': ['LOC']},
+            get_cr_rules('reinsscope')
+        )
+
+    def test_get_cr_rules__invalid_schema_type__oed_process_error_raised(self):
+        with self.assertRaises(ProcessError):
+            get_cr_rules('xyz')
+
+    def test_compile_cr_rules__file_headers__rules_without_triggers_dropped_and_columns_mapped_to_headers(self):
+        rules = compile_cr_rules('loc', ['LocNumber', 'locded1building', 'LocDedType1Building'])
+
+        self.assertEqual(
+            [(r['columns'], r['when'], r['condition']) for r in rules],
+            [
+                ([('LocDedType1Building', 'LocDedType1Building')], ['locded1building'], 'locded1building is present'),
+                ([('LocPeril', None)], ['locded1building'], 'locded1building is present')
+            ]
+        )
+
+    @given(
+        rows=lists(
+            tuples(
+                one_of(none(), sampled_from(['0', '0.0', '100', '2.5', 'abc'])),
+                one_of(none(), sampled_from(['0', '50'])),
+                one_of(none(), sampled_from(['1', '2'])),
+                one_of(none(), sampled_from(['WTC', 'QQ1']))
+            ),
+            min_size=1, max_size=30
+        )
+    )
+    @settings(max_examples=50, deadline=None)
+    def test_check_cr_rules__random_data__violations_same_as_row_by_row_checks(self, rows):
+        headers = ['LocDed1Building', 'LocLimit1Building', 'LocDedType1Building', 'LocPeril']
+        df = pd.DataFrame(data=rows, columns=headers, dtype=object)
+        df = df.where(df.notnull(), None)
+
+        def present(v):
+            return v is not None and v not in ('0', '0.0')
+
+        exp = {
+            'LocDedType1Building': [i for i, r in enumerate(rows) if present(r[0]) and r[2] is None],
+            'LocLimitType1Building': [i for i, r in enumerate(rows) if present(r[1])],
+            'LocPeril': [i for i, r in enumerate(rows) if (present(r[0]) or present(r[1])) and r[3] is None]
+        }
+
+        violations = {column: idxs.tolist() for column, _, idxs, _ in check_cr_rules(compile_cr_rules('loc', headers), df)}
+
+        self.assertEqual(violations, {k: v for k, v in exp.items() if v})
+
+    def test_check_cr_rules__reinsscope_risk_levels__key_columns_required_by_risk_level(self):
+        headers = ['ReinsNumber', 'RiskLevel', 'PortNumber', 'AccNumber', 'LocNumber']
+        df = pd.DataFrame(data=[
+            ['1', 'LOC', '1', 'A1', None],
+            ['1', 'acc', '1', None, None],
+            ['1', 'SEL', None, None, None],
+            ['1', 'LOC', '1', 'A1', 'L1'],
+        ], columns=headers, dtype=object)
+        df = df.where(df.notnull(), None)
+
+        violations = sorted((column, idxs.tolist()) for column, _, idxs, _ in check_cr_rules(compile_cr_rules('reinsscope', headers), df))
+
+        self.assertEqual(violations, [('AccNumber', [1]), ('LocNumber', [0])])
+
+    @given(
+        num_rows=integers(min_value=1, max_value=20),
+        chunksize=integers(min_value=1, max_value=25)
+    )
+    @settings(max_examples=10, deadline=None)
+    def test_validate_chunks__check_cr__cr_errors_added_only_when_checked_and_same_for_any_chunksize(self, num_rows, chunksize):
+        data = [
+            {'LocNumber': str(i), 'LocDed1Building': str(i % 3), 'LocDedType1Building': None if i % 2 else '0'}
+            for i in range(num_rows)
+        ]
+        exp_rows = [i + 2 for i in range(num_rows) if i % 3 and i % 2]
+        exp_peril_rows = [i + 2 for i in range(num_rows) if i % 3]
+
+        validator = OedValidator()
+
+        results = ValidationResults.concat(validator.validate_chunks('loc', data, chunksize=chunksize))
+        self.assertEqual(len(results.by_code(ConditionallyRequiredDataError.code)), 0)
+
+        results = ValidationResults.concat(validator.validate_chunks('loc', data, chunksize=chunksize, check_cr=True))
+        cr_results = results.by_code(ConditionallyRequiredDataError.code)
+
+        self.assertEqual(cr_results.by_column('LocDedType1Building').rows.tolist(), exp_rows)
+        self.assertEqual(cr_results.by_column('LocPeril').rows.tolist(), exp_peril_rows)
+
+        peril_res = next(r for r in results.header_results if r['header'] == 'LocPeril')
+        self.assertEqual((peril_res['column_pos'], peril_res['exceptions']), (-1, []))
+
+        for row, col_idx, value, e in cr_results.iter_errors():
+            self.assertEqual(value, 'LocDed1Building is present')
+            self.assertEqual(e.code, ConditionallyRequiredDataError.code)
+            self.assertEqual(e.msg, 'Missing value in "{}" - this column is required when LocDed1Building is present'.format(results.headers[col_idx]))
+
+
+def _data_df(rows, headers):
+    df = pd.DataFrame(data=rows, columns=headers, dtype=object)
+    return df.where(df.notnull(), None)
+
+
+class TestRowRules(TestCase):
+
+    def write_rules(self, d, rules):
+        fp = os.path.join(d, 'rules.json')
+        with io.open(fp, 'w', encoding='utf-8') as f:
+            json.dump(rules, f)
+        return fp
+
+    def test_load_row_rules__default_rules__all_rules_compile_for_all_schema_columns(self):
+        rules = load_row_rules()
+
+        self.assertEqual(len(set((r['schema_type'], r['name']) for r in rules)), len(rules))
+
+        for schema_type in SCHEMA_TYPES_EX_MASTER:
+            headers = [GROUPED_SCHEMA[schema_type][col]['field_name'] for col in GROUPED_SCHEMA[schema_type]]
+            self.assertEqual(len(compile_row_rules(schema_type, headers)), len(get_row_rules(schema_type)))
+
+        self.assertIn('loc_min_ded_le_max_ded_1building', [r['name'] for r in get_row_rules('loc')])
+        self.assertIn('cond_min_ded_le_max_ded_6all', [r['name'] for r in get_row_rules('acc')])
+
+    def test_load_row_rules__foreach_templates__rules_expanded(self):
+        with TemporaryDirectory() as d:
+            fp = self.write_rules(d, [
+                {'name': 'r_{a}_{b}', 'schema_type': 'loc', 'check': 'LocDed{a} <= {b}', 'foreach': {'a': ['1Building', '2Other'], 'b': [1, 2]}},
+                {'name': 's_{a}', 'schema_type': 'ACC', 'check': 'AccDed{a} >= 0', 'when': 'present(AccDed{a})', 'foreach': [{'a': '1Building'}, {'a': '4BI'}]}
+            ])
+
+            self.assertEqual(
+                [(r['name'], r['schema_type'], r['check'], r['when']) for r in load_row_rules(fp)],
+                [
+                    ('r_1building_1', 'loc', 'LocDed1Building <= 1', None),
+                    ('r_1building_2', 'loc', 'LocDed1Building <= 2', None),
+                    ('r_2other_1', 'loc', 'LocDed2Other <= 1', None),
+                    ('r_2other_2', 'loc', 'LocDed2Other <= 2', None),
+                    ('s_1building', 'acc', 'AccDed1Building >= 0', 'present(AccDed1Building)'),
+                    ('s_4bi', 'acc', 'AccDed4BI >= 0', 'present(AccDed4BI)')
+                ]
+            )
+
+    def test_load_row_rules__invalid_rules__oed_process_error_raised(self):
+        invalid = [
+            [{'name': 'r', 'schema_type': 'loc'}],
+            [{'name': 'r', 'schema_type': 'loc', 'check': 'LocDed1Building <='}],
+            [{'name': 'r', 'schema_type': 'loc', 'check': 'present(Latitude)'}, {'name': 'R', 'schema_type': 'loc', 'check': 'present(Longitude)'}],
+        ]
+        with TemporaryDirectory() as d:
+            for rules in invalid:
+                with self.assertRaises(ProcessError):
+                    load_row_rules(self.write_rules(d, rules))
+
+            with self.assertRaises(ProcessError):
+                load_row_rules(os.path.join(d, 'nonexistent.json'))
+
+    def test_compile_row_rules__invalid_expressions__oed_process_error_raised(self):
+        invalid = [
+            'NotAColumn <= 1',
+            'LocDed1Building + 1',
+            'CountryCode < "US"',
+            'CountryCode == 1',
+            'LocDed1Building in (BuildingTIV, 1)',
+            'present(LocDed1Building + 1)',
+            'LocDed1Building ** 2 > 1',
+            'len(CountryCode) == 2',
+            'present(Latitude) <= 1',
+        ]
+        with TemporaryDirectory() as d:
+            for expr in invalid:
+                fp = self.write_rules(d, [{'name': 'r', 'schema_type': 'loc', 'check': expr}])
+                with self.assertRaises(ProcessError):
+                    compile_row_rules('loc', ['LocNumber', 'LocDed1Building', 'BuildingTIV', 'CountryCode', 'Latitude'], fp=fp)
+
+    def test_compile_row_rules__invalid_expression__expression_and_column_of_error_in_message(self):
+        with TemporaryDirectory() as d:
+            fp = self.write_rules(d, [{'name': 'r', 'schema_type': 'loc', 'check': 'LocDed1Building > 1 and len(CountryCode) == 2'}])
+            with self.assertRaisesRegex(ProcessError, r'"LocDed1Building > 1 and len\(CountryCode\) == 2" in row rule "r" \(column 25\): unsupported syntax'):
+                compile_row_rules('loc', ['LocDed1Building', 'CountryCode'], fp=fp)
+
+    @skipIf(not hasattr(ast, 'Num'), 'ast.Num is not available')
+    def test_compile_row_rules__python_3_7_constant_nodes__default_rules_compiled_and_checked(self):
+        headers = ['LocDed1Building', 'BuildingTIV', 'LocDedType1Building', 'CountryCode']
+        df = _data_df([['100', '50', None, 'US'], ['100', '50', '2', 'GB'], ['10', '50', '0', 'FR']], headers)
+
+        with TemporaryDirectory() as d:
+            fp = self.write_rules(d, [
+                {'name': 'ded_le_tiv', 'schema_type': 'loc', 'check': 'LocDed1Building <= BuildingTIV', 'when': 'coalesce(LocDedType1Building, 0) == 0'},
+                {'name': 'country', 'schema_type': 'loc', 'check': 'CountryCode in ("US", "FR")'},
+            ])
+            exp = {rule['name']: idxs.tolist() for rule, idxs in check_row_rules(compile_row_rules('loc', headers, fp=fp), df)}
+
+            # Python 3.6 and 3.7 parse constants as ast.Num and ast.Str nodes
+            with mock.patch('oedtools.rules.sys', version_info=(3, 7, 0)), warnings.catch_warnings():
+                warnings.simplefilter('ignore', DeprecationWarning)
+                failures = {rule['name']: idxs.tolist() for rule, idxs in check_row_rules(compile_row_rules('loc', headers, fp=fp), df)}
+                self.assertTrue(compile_row_rules('loc', GROUPED_SCHEMA['loc']))
+
+        self.assertEqual(exp, {'ded_le_tiv': [0], 'country': [1]})
+        self.assertEqual(failures, exp)
+
+    def test_compile_row_rules__file_headers__rules_without_columns_in_file_dropped(self):
+        rules = compile_row_rules('loc', ['LocNumber', 'latitude'])
+
+        self.assertEqual(
+            [(r['name'], r['header']) for r in rules],
+            [('lat_long_both_or_neither', 'latitude')]
+        )
+
+    @given(
+        rows=lists(
+            tuples(
+                one_of(none(), floats(min_value=0, max_value=100, allow_nan=False).map(str)),
+                one_of(none(), floats(min_value=0, max_value=100, allow_nan=False).map(str)),
+                one_of(none(), sampled_from(['0', '100', '50.5'])),
+                one_of(none(), sampled_from(['0', '1', '2'])),
+                one_of(none(), sampled_from(['1.5', '-2'])),
+                one_of(none(), sampled_from(['3', '0']))
+            ),
+            min_size=1, max_size=30
+        )
+    )
+    @settings(max_examples=50, deadline=None)
+    def test_check_row_rules__default_loc_rules__failures_same_as_row_by_row_checks(self, rows):
+        headers = ['LocMinDed1Building', 'LocMaxDed1Building', 'LocDed1Building', 'LocDedType1Building', 'Latitude', 'Longitude']
+        df = _data_df(rows, headers)
+
+        def num(v):
+            return float(v) if v is not None else None
+
+        exp = {
+            'loc_min_ded_le_max_ded_1building': [
+                i for i, r in enumerate(rows)
+                if r[0] is not None and r[1] is not None and num(r[1]) != 0 and num(r[0]) > num(r[1])
+            ],
+            'lat_long_both_or_neither': [
+                i for i, r in enumerate(rows) if (r[4] is None) != (r[5] is None)
+            ]
+        }
+
+        costs = {}
+        failures = {rule['name']: idxs.tolist() for rule, idxs in check_row_rules(compile_row_rules('loc', headers), df, costs=costs)}
+
+        self.assertEqual(failures, {k: v for k, v in exp.items() if v})
+        self.assertEqual(set(costs), {'loc_min_ded_le_max_ded_1building', 'lat_long_both_or_neither', 'loc_ded_le_tiv_1building'})
+        for name, cost in costs.items():
+            self.assertEqual(cost['rows'], len(rows))
+            self.assertEqual(cost['failures'], len(failures.get(name, [])))
+            self.assertGreaterEqual(cost['seconds'], 0)
+
+    def test_check_row_rules__expressions__three_valued_logic_and_functions(self):
+        headers = ['LocDed1Building', 'BuildingTIV', 'LocDedType1Building', 'CountryCode', 'LocCurrency']
+        df = _data_df([
+            ['100', '50', None, 'us', 'USD'],
+            ['100', '50', '2', ' GB ', 'USD'],
+            ['100', None, '0', 'US', 'GBP'],
+            ['10', '50', '0', None, None],
+            ['1e3', '10', '0', 'FR', 'EUR'],
+        ], headers)
+
+        exprs = {
+            'ded_le_tiv': ('LocDed1Building <= BuildingTIV', 'coalesce(LocDedType1Building, 0) == 0', [0, 4]),
+            'ded_le_tiv_no_coalesce': ('LocDed1Building <= BuildingTIV', 'LocDedType1Building == 0', [4]),
+            'not_in': ('not CountryCode in ("US", "GB")', None, [0, 1, 2]),
+            'currency': ('LocCurrency == "usd"', 'CountryCode == "US"', [2]),
+            'chain': ('0 < LocDed1Building - 5 * 2 < BuildingTIV / 2', None, [0, 1, 3, 4]),
+            'or_unknown': ('BuildingTIV > 20 or absent(CountryCode)', None, [4]),
+            'and_unknown': ('BuildingTIV > 20 and LocCurrency != "GBP"', None, [2, 4]),
+            'division_by_zero': ('LocDed1Building / (BuildingTIV - 50) > -20', None, [4]),
+        }
+
+        with TemporaryDirectory() as d:
+            fp = self.write_rules(d, [
+                {'name': name, 'schema_type': 'loc', 'check': check, 'when': when}
+                for name, (check, when, _) in exprs.items()
+            ])
+            rules = compile_row_rules('loc', headers, fp=fp)
+
+        failures = {rule['name']: idxs.tolist() for rule, idxs in check_row_rules(rules, df)}
+
+        self.assertEqual(failures, {name: exp for name, (_, _, exp) in exprs.items() if exp})
+
+    def test_check_row_rules__values_differing_in_last_place__values_compared_exactly(self):
+        headers = ['LocMinDed1Building', 'LocMaxDed1Building']
+        df = _data_df([['100.0', '99.99999999999999'], ['99.99999999999999', '100.0'], ['100.0', 'x']], headers)
+
+        failures = {rule['name']: idxs.tolist() for rule, idxs in check_row_rules(compile_row_rules('loc', headers), df)}
+
+        self.assertEqual(failures, {'loc_min_ded_le_max_ded_1building': [0]})
+
+    def test_validate_chunks__check_rules__row_rule_errors_added_only_when_checked(self):
+        data = [
+            {'LocNumber': '1', 'LocMinDed1Building': '10', 'LocMaxDed1Building': '5', 'Latitude': '1.0', 'Longitude': None},
+            {'LocNumber': '2', 'LocMinDed1Building': '1', 'LocMaxDed1Building': '5', 'Latitude': None, 'Longitude': None},
+            {'LocNumber': '3', 'LocMinDed1Building': '10', 'LocMaxDed1Building': '0', 'Latitude': '1.0', 'Longitude': '2.0'},
+        ]
+
+        validator = OedValidator()
+
+        results = ValidationResults.concat(validator.validate_chunks('loc', data, chunksize=2))
+        self.assertEqual(len(results.by_code(RowRuleError.code)), 0)
+
+        costs = {}
+        results = ValidationResults.concat(validator.validate_chunks('loc', data, chunksize=2, check_rules=True, rule_costs=costs))
+        rule_results = results.by_code(RowRuleError.code)
+
+        self.assertEqual(
+            [(row, results.headers[col_idx], value) for row, col_idx, value, _ in rule_results.iter_errors()],
+            [
+                (2, 'LocMinDed1Building', 'loc_min_ded_le_max_ded_1building: LocMinDed1Building <= LocMaxDed1Building or LocMaxDed1Building == 0'),
+                (2, 'Latitude', 'lat_long_both_or_neither: present(Latitude) and present(Longitude) or absent(Latitude) and absent(Longitude)')
+            ]
+        )
+        self.assertEqual(costs['lat_long_both_or_neither']['rows'], 3)
+
+    def test_validate_chunks__data_cr_and_rule_errors_in_one_column__iter_errors_in_row_order(self):
+        data = [
+            {'LocNumber': '1', 'LocDed1Building': '10', 'LocDedType1Building': None},
+            {'LocNumber': '2', 'LocDed1Building': '10', 'LocDedType1Building': '9'},
+            {'LocNumber': '3', 'LocDed1Building': None, 'LocDedType1Building': '3'},
+            {'LocNumber': '4', 'LocDed1Building': '5', 'LocDedType1Building': None},
+        ]
+        rules = [{
+            'name': 'ded_type_le_2',
+            'schema_type': 'loc',
+            'desc': 'The deductible type must not exceed 2',
+            'check': 'coalesce(LocDedType1Building, 0) <= 2'
+        }]
+
+        with TemporaryDirectory() as d:
+            results, = OedValidator().validate_chunks('loc', data, check_cr=True, check_rules=True, rules_fp=self.write_rules(d, rules))
+
+        # The CR and rule errors of the column are stored after its data
+        # errors, but are merged into row order
+        errors = [(row, e.code) for row, col_idx, _, e in results.iter_errors(order='row') if results.headers[col_idx] == 'LocDedType1Building']
+        self.assertEqual(errors, [
+            (2, ConditionallyRequiredDataError.code),
+            (3, DataOutOfRangeError.code),
+            (3, RowRuleError.code),
+            (4, DataOutOfRangeError.code),
+            (4, RowRuleError.code),
+            (5, ConditionallyRequiredDataError.code)
+        ])
+
+        rows = [row for row, _, _, _ in results.iter_errors(order='row')]
+        self.assertEqual(rows, sorted(rows))
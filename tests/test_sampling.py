@@ -0,0 +1,186 @@
+import io
+import os
+
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+import pandas as pd
+
+from hypothesis import (
+    given,
+    settings,
+)
+from hypothesis.strategies import (
+    booleans,
+    integers,
+    sampled_from,
+)
+
+from oedtools.exceptions import ProcessError
+from oedtools.integrity import (
+    duplicate_key_errors,
+    portfolio_errors,
+)
+from oedtools.report import file_errors
+from oedtools.results import ValidationResults
+from oedtools.sampling import (
+    get_sample_columns,
+    PORTFOLIO_FILE_NAMES,
+    sample_data,
+    sample_file,
+    sample_portfolio,
+)
+from oedtools.validate import OedValidator
+
+from .data import (
+    GROUPED_SCHEMA,
+    SCHEMA_TYPES_EX_MASTER,
+)
+
+
+class TestSampling(TestCase):
+
+    def test_get_sample_columns__schema_types__key_and_required_columns_or_all_columns(self):
+        for schema_type in SCHEMA_TYPES_EX_MASTER:
+            schema = GROUPED_SCHEMA[schema_type]
+            required = set(col for col, entry in schema.items() if entry['required'] == 'R')
+
+            columns = get_sample_columns(schema_type)
+            self.assertEqual(len(columns), len(set(columns)))
+            self.assertTrue(required.issubset(c.lower() for c in columns))
+            self.assertTrue(set(c.lower() for c in columns).issubset(schema))
+
+            self.assertEqual(set(c.lower() for c in get_sample_columns(schema_type, all_columns=True)), set(schema))
+
+        self.assertIn('LocDed1Building', get_sample_columns('loc', columns=['locded1building']))
+
+        with self.assertRaises(ProcessError):
+            get_sample_columns('loc', columns=['NotAColumn'])
+
+        with self.assertRaises(ProcessError):
+            get_sample_columns('xyz')
+
+    def test_sample_data__block_of_rows__keys_continue_from_start_row(self):
+        df = sample_data('loc', 5, ['LocNumber', 'AccNumber', 'CountryCode'], start=10, num_accounts=3)
+
+        self.assertEqual(df.columns.tolist(), ['LocNumber', 'AccNumber', 'CountryCode'])
+        self.assertEqual(df['LocNumber'].tolist(), ['L11', 'L12', 'L13', 'L14', 'L15'])
+        self.assertEqual(df['AccNumber'].tolist(), ['A2', 'A3', 'A1', 'A2', 'A3'])
+
+        self.assertEqual(len(sample_data('loc', 0, ['LocNumber'])), 0)
+
+    @given(
+        schema_type=sampled_from(SCHEMA_TYPES_EX_MASTER),
+        num_rows=integers(min_value=0, max_value=50),
+        chunksize=integers(min_value=1, max_value=20),
+        all_columns=booleans()
+    )
+    @settings(max_examples=10, deadline=None)
+    def test_sample_file__schema_types__valid_files_with_unique_keys(self, schema_type, num_rows, chunksize, all_columns):
+        with TemporaryDirectory() as d:
+            fp = sample_file(schema_type, os.path.join(d, 'file.csv'), num_rows, all_columns=all_columns, chunksize=chunksize)
+
+            df = pd.read_csv(fp, dtype=object)
+            self.assertEqual(len(df), num_rows)
+            self.assertEqual(df.columns.tolist(), get_sample_columns(schema_type, all_columns=all_columns))
+
+            if num_rows:
+                self.assertEqual(list(file_errors(schema_type, fp)), [])
+                if schema_type != 'reinsscope':
+                    self.assertEqual(list(duplicate_key_errors(schema_type, fp)), [])
+
+    def test_sample_file__seed__reproducible_files(self):
+        with TemporaryDirectory() as d:
+            contents = []
+            for seed in [1, 1, 2]:
+                fp = sample_file('loc', os.path.join(d, 'loc.csv'), 100, columns=['LocDed1Building'], chunksize=30, seed=seed)
+                with io.open(fp, 'r', encoding='utf-8') as f:
+                    contents.append(f.read())
+
+        self.assertEqual(contents[0], contents[1])
+        self.assertNotEqual(contents[0], contents[2])
+
+    @given(
+        num_rows=integers(min_value=1, max_value=100),
+        chunksize=integers(min_value=1, max_value=30),
+        workers=integers(min_value=2, max_value=3),
+        seed=integers(min_value=0, max_value=2 ** 32 - 1)
+    )
+    @settings(max_examples=5, deadline=None)
+    def test_sample_file__parallel_workers__same_file_as_serial_generation(self, num_rows, chunksize, workers, seed):
+        with TemporaryDirectory() as d:
+            contents = []
+            for w in [1, workers]:
+                fp = sample_file('loc', os.path.join(d, 'loc.csv'), num_rows, columns=['LocPerilsCovered'], chunksize=chunksize, seed=seed, workers=w)
+                with io.open(fp, 'r', encoding='utf-8') as f:
+                    contents.append(f.read())
+
+        self.assertEqual(contents[0], contents[1])
+
+    @given(
+        num_locations=integers(min_value=1, max_value=100),
+        num_accounts=integers(min_value=1, max_value=100),
+        num_reinsinfo=integers(min_value=0, max_value=5),
+        num_extra_reinsscope=integers(min_value=0, max_value=5)
+    )
+    @settings(max_examples=10, deadline=None)
+    def test_sample_portfolio__valid_numbers_of_rows__portfolio_with_consistent_keys(self, num_locations, num_accounts, num_reinsinfo, num_extra_reinsscope):
+        num_accounts = min(num_accounts, num_locations)
+
+        with TemporaryDirectory() as d:
+            files = sample_portfolio(
+                d,
+                num_locations,
+                num_accounts=num_accounts,
+                num_reinsinfo=num_reinsinfo,
+                num_reinsscope=num_reinsinfo + num_extra_reinsscope,
+                chunksize=30
+            )
+
+            exp_schema_types = SCHEMA_TYPES_EX_MASTER if num_reinsinfo else ['acc', 'loc']
+            self.assertEqual(sorted(files), sorted(exp_schema_types))
+            for schema_type, fp in files.items():
+                self.assertEqual(fp, os.path.join(d, PORTFOLIO_FILE_NAMES[schema_type]))
+
+            num_rows = {'acc': num_accounts, 'loc': num_locations, 'reinsinfo': num_reinsinfo, 'reinsscope': num_reinsinfo + num_extra_reinsscope}
+            for schema_type, fp in files.items():
+                self.assertEqual(len(pd.read_csv(fp, dtype=object)), num_rows[schema_type])
+
+            self.assertEqual(list(portfolio_errors(files)), [])
+
+    @given(seed=integers(min_value=0, max_value=2 ** 32 - 1))
+    @settings(max_examples=3, deadline=None)
+    def test_sample_portfolio__all_columns__no_integrity_cr_or_row_rule_errors(self, seed):
+        with TemporaryDirectory() as d:
+            files = sample_portfolio(d, 200, num_reinsinfo=3, num_reinsscope=10, all_columns=True, chunksize=70, seed=seed)
+
+            self.assertEqual(list(portfolio_errors(files)), [])
+
+            for schema_type, fp in files.items():
+                results = ValidationResults.concat(OedValidator().validate_chunks(schema_type, fp, check_cr=True, check_rules=True))
+                self.assertEqual(results.counts(), {})
+
+            scope = pd.read_csv(files['reinsscope'], dtype=object)
+            self.assertTrue(scope['LocNumber'].isnull().all())
+            self.assertTrue(scope['PolNumber'].isnull().all())
+
+    def test_sample_portfolio__seed_and_parallel_workers__reproducible_portfolios(self):
+        with TemporaryDirectory() as d:
+            contents = []
+            for i, workers in enumerate([1, 2]):
+                files = sample_portfolio(os.path.join(d, str(i)), 50, num_reinsinfo=2, chunksize=20, seed=7, workers=workers)
+                contents.append({schema_type: pd.read_csv(fp, dtype=object) for schema_type, fp in files.items()})
+
+        for schema_type, df in contents[0].items():
+            pd.testing.assert_frame_equal(df, contents[1][schema_type])
+
+    def test_sample_portfolio__invalid_numbers_of_rows__oed_process_error_raised(self):
+        with TemporaryDirectory() as d:
+            with self.assertRaises(ProcessError):
+                sample_portfolio(d, 0)
+
+            with self.assertRaises(ProcessError):
+                sample_portfolio(d, 10, num_accounts=11)
+
+            with self.assertRaises(ProcessError):
+                sample_portfolio(d, 10, num_reinsinfo=3, num_reinsscope=2)
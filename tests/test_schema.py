@@ -24,6 +24,7 @@ from hypothesis import (
     settings,
 )
 from hypothesis.strategies import (
+    integers,
     just,
     sampled_from,
     text,
@@ -598,6 +599,33 @@ class TestSchema(TestCase):
             reinsscope_schema_last_modified
         )
 
+    def test_sample_column__string_columns__samples_of_given_size_and_width(self):
+        perils = get_column_schema('loc', 'LocPerilsCovered')['column_range']
+        sample = sample_column('loc', 'LocPerilsCovered', size=1000)
+        self.assertEqual(len(sample), 1000)
+        self.assertTrue(all(isinstance(value, str) and len(value.split(';')) == 4 and set(value.split(';')).issubset(perils) for value in sample))
+
+        sample = sample_column('loc', 'CountryCode', size=1000)
+        self.assertEqual(len(sample), 1000)
+        self.assertTrue(all(type(value) is str and value in get_column_schema('loc', 'CountryCode')['column_range'] for value in sample))
+
+        for str_width in [None, 1, 5]:
+            sample = sample_column('loc', 'FlexiLocZZZ', str_width=str_width, size=1000)
+            self.assertEqual(len(sample), 1000)
+            self.assertTrue(all(type(value) is str and re.match(r'^[a-zA-Z0-9]{{{}}}$'.format(str_width or 20), value) for value in sample))
+
+    @given(
+        schema_key=sampled_from(ALL),
+        seed=integers(min_value=0, max_value=2 ** 32 - 1)
+    )
+    @settings(max_examples=20)
+    def test_sample_column__same_seed__same_sample(self, schema_key, seed):
+        schema_type, header = schema_key
+
+        sample = sample_column(schema_type, header, size=20, rng=seed)
+
+        self.assertEqual(sample_column(schema_type, header, size=20, rng=np.random.default_rng(seed)), sample)
+
     @given(
         schema_key=sampled_from(ALL)
     )
@@ -0,0 +1,252 @@
+import http.client
+import io
+import json
+import os
+import signal
+import threading
+import time
+
+from tempfile import TemporaryDirectory
+from unittest import (
+    mock,
+    TestCase,
+)
+
+import pandas as pd
+
+from hypothesis import (
+    given,
+    settings,
+)
+from hypothesis.strategies import (
+    integers,
+    sampled_from,
+)
+
+from oedtools.exceptions import (
+    ReportingError,
+)
+from oedtools.query import (
+    get_columns,
+    lookup_value,
+    search_columns,
+)
+from oedtools.report import (
+    file_errors,
+    header_errors,
+)
+from oedtools.server import (
+    get_client,
+    OedClient,
+    OedServer,
+    serve,
+    SERVER_ENV_VAR,
+    SERVER_TOKEN_ENV_VAR,
+)
+
+from .data import (
+    GROUPED_SCHEMA,
+    sample_column,
+    SCHEMA_TYPES_EX_MASTER,
+)
+
+
+class TestServer(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = OedServer(max_concurrent=2, max_queued=1)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.client = OedClient(*cls.server.address, token=cls.server.token)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.thread.join()
+
+    def test_status__server_running__status_returned(self):
+        status = self.client.status()
+
+        self.assertEqual(status['pid'], os.getpid())
+        self.assertEqual(status['address'], '{}:{}'.format(*self.server.address))
+        self.assertEqual((status['max_concurrent'], status['max_queued']), (2, 1))
+
+    def test_metrics__file_validated__server_metrics_include_file(self):
+        from oedtools.metrics import FILES_VALIDATED
+
+        num_files = FILES_VALIDATED.get(schema_type='acc')
+        list(self.client.file_errors('acc', [{'AccNumber': 'A1', 'PortNumber': 'P1'}]))
+
+        metrics = self.client.metrics()
+        self.assertIn('# TYPE oedtools_files_validated_total counter\n', metrics)
+        self.assertIn('oedtools_files_validated_total{{schema_type="acc"}} {}\n'.format(int(num_files) + 1), metrics)
+
+    def test_query_ops__same_results_as_local_functions(self):
+        self.assertEqual(
+            self.client.get_columns(schema_types=['loc'], required=['R']),
+            json.loads(json.dumps(get_columns(schema_types=['loc'], required=['R']), default=str))
+        )
+        self.assertEqual(
+            self.client.search_columns('currency', limit=5),
+            json.loads(json.dumps(search_columns('currency', limit=5), default=str))
+        )
+        self.assertEqual(self.client.lookup_value('WTC'), lookup_value('WTC'))
+
+    def test_sample_column__sample_of_given_size(self):
+        self.assertEqual(len(self.client.sample_column('loc', 'loccurrency', size=7)), 7)
+
+    def test_sample_column__seed__same_sample_as_local_sampling(self):
+        from oedtools.schema import sample_column
+
+        self.assertEqual(
+            self.client.sample_column('loc', 'locperilscovered', size=7, seed=3),
+            sample_column('loc', 'locperilscovered', size=7, rng=3)
+        )
+
+    @given(
+        schema_type=sampled_from(SCHEMA_TYPES_EX_MASTER),
+        num_rows=integers(min_value=1, max_value=10),
+        order=sampled_from(['column', 'row'])
+    )
+    @settings(max_examples=5, deadline=None)
+    def test_file_errors__bad_data_as_file__same_records_as_local_file_errors(self, schema_type, num_rows, order):
+        headers = list(GROUPED_SCHEMA[schema_type])[:10] + ['non oed column']
+
+        df = pd.DataFrame(data={header: sample_column('loc', 'flexiloczzz', str_width=5, size=num_rows) if header == 'non oed column' else sample_column(schema_type, header, size=num_rows) for header in headers}, dtype=object)
+        df.loc[df.index[::2], headers[0]] = 'non oed value'
+
+        with TemporaryDirectory() as d:
+            fp = os.path.join(d, 'file.csv')
+            df.to_csv(path_or_buf=fp, index=False, encoding='utf-8')
+
+            exp_records = json.loads(json.dumps(list(file_errors(schema_type, fp, chunksize=3, order=order)), default=str))
+            records = list(self.client.file_errors(schema_type, fp, chunksize=3, order=order))
+
+        self.assertEqual(records, exp_records)
+
+    def test_file_errors__check_cr_and_rules__same_records_as_local_file_errors(self):
+        df = pd.DataFrame(data={'LocNumber': ['1', '2'], 'LocMinDed1Building': ['10', '1'], 'LocMaxDed1Building': ['5', '5'], 'Latitude': ['1.0', None]})
+
+        with TemporaryDirectory() as d:
+            fp = os.path.join(d, 'loc.csv')
+            df.to_csv(path_or_buf=fp, index=False, encoding='utf-8')
+
+            exp_records = json.loads(json.dumps(list(file_errors('loc', fp, check_cr=True, check_rules=True)), default=str))
+            records = list(self.client.file_errors('loc', fp, check_cr=True, check_rules=True))
+
+        self.assertEqual(records, exp_records)
+        self.assertEqual(set(r['code'] for r in records).intersection(['E411', 'E421']), {'E411', 'E421'})
+
+    def test_header_errors__headers_as_list__same_records_as_local_header_errors(self):
+        headers = ['locnumber', 'non oed column']
+
+        self.assertEqual(list(self.client.header_errors('loc', headers)), list(header_errors('loc', headers)))
+
+    def test_file_errors__invalid_file__oed_reporting_error_raised(self):
+        with self.assertRaises(ReportingError):
+            list(self.client.file_errors('loc', os.path.join('non', 'existent', 'file.csv')))
+
+    def test_request_queue_full__connection_error_raised_and_request_processed_when_slots_free(self):
+        # Two requests in progress and one queued
+        threads = [threading.Thread(target=self.server.acquire) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+
+        try:
+            while self.server.status()['queued'] < 1:
+                time.sleep(0.01)
+            self.assertFalse(self.server.acquire())
+            with self.assertRaises(ConnectionError):
+                self.client.lookup_value('WTC')
+        finally:
+            for _ in range(2):
+                self.server.release()
+            for thread in threads:
+                thread.join()
+            self.server.release()
+
+        self.assertEqual(self.client.lookup_value('WTC'), lookup_value('WTC'))
+
+    def test_get_client__env_var_and_state_file__client_for_server_address(self):
+        with TemporaryDirectory() as d:
+            state_fp = os.path.join(d, 'server.json')
+
+            with mock.patch.dict(os.environ, {SERVER_ENV_VAR: ''}):
+                self.assertIsNone(get_client(state_fp=state_fp))
+
+                with io.open(state_fp, 'w', encoding='utf-8') as f:
+                    f.write(json.dumps({'address': '{}:{}'.format(*self.server.address), 'pid': os.getpid(), 'token': self.server.token}))
+
+                client = get_client(state_fp=state_fp)
+                self.assertEqual((client.host, client.port, client.token), self.server.address + (self.server.token,))
+                self.assertEqual(client.lookup_value('WTC'), lookup_value('WTC'))
+
+            with mock.patch.dict(os.environ, {SERVER_ENV_VAR: 'off'}):
+                self.assertIsNone(get_client(state_fp=state_fp))
+
+            with mock.patch.dict(os.environ, {SERVER_ENV_VAR: 'localhost:1234', SERVER_TOKEN_ENV_VAR: 'abc'}):
+                client = get_client(state_fp=state_fp)
+                self.assertEqual((client.host, client.port, client.token), ('localhost', 1234, 'abc'))
+
+    def test_requests__missing_or_invalid_token__rejected(self):
+        for token in [None, 'not the token']:
+            with self.assertRaises(ConnectionError):
+                OedClient(*self.server.address, token=token).lookup_value('WTC')
+
+        conn = http.client.HTTPConnection(*self.server.address)
+        try:
+            conn.request('POST', '/lookup', body=json.dumps({'value': 'WTC'}).encode('utf-8'))
+            resp = conn.getresponse()
+            self.assertEqual(resp.status, 401)
+            self.assertEqual(json.loads(resp.read())['error']['type'], 'ProcessError')
+        finally:
+            conn.close()
+
+    def test_requests__host_header_of_other_host__rejected(self):
+        # A DNS rebinding request, from a web page whose domain resolves to
+        # the server's address, has the domain as its Host header
+        for host, status in [('attacker.example.com', 403), ('attacker.example.com:{}'.format(self.server.address[1]), 403), ('localhost:1', 200), ('[::1]:1', 200)]:
+            conn = http.client.HTTPConnection(*self.server.address)
+            try:
+                conn.putrequest('GET', '/status', skip_host=True)
+                conn.putheader('Host', host)
+                conn.putheader('Authorization', 'Bearer {}'.format(self.server.token))
+                conn.endheaders()
+                resp = conn.getresponse()
+                resp.read()
+                self.assertEqual(resp.status, status)
+            finally:
+                conn.close()
+
+    def test_serve__state_file__token_written_and_only_readable_by_owner(self):
+        states = []
+
+        def serve_forever(server, *args, **kwargs):
+            with io.open(state_fp, 'r', encoding='utf-8') as f:
+                states.append(json.load(f))
+            self.assertEqual(os.stat(state_fp).st_mode & 0o777, 0o600)
+            self.assertEqual(states[0]['token'], server.token)
+            with mock.patch.dict(os.environ, {SERVER_ENV_VAR: '', SERVER_TOKEN_ENV_VAR: ''}):
+                self.assertEqual(get_client(state_fp=state_fp).token, server.token)
+
+        sigterm_handler = signal.getsignal(signal.SIGTERM)
+        try:
+            with TemporaryDirectory() as d:
+                state_fp = os.path.join(d, 'oedtools', 'server.json')
+                with mock.patch.object(OedServer, 'serve_forever', serve_forever):
+                    serve(state_fp=state_fp)
+                self.assertFalse(os.path.exists(state_fp))
+        finally:
+            signal.signal(signal.SIGTERM, sigterm_handler)
+
+        self.assertEqual(len(states), 1)
+
+    def test_no_server__connection_error_raised(self):
+        server = OedServer()
+        address = server.address
+        server.server_close()
+
+        with self.assertRaises(ConnectionError):
+            OedClient(*address).lookup_value('WTC')
@@ -0,0 +1,180 @@
+import io
+import os
+
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from hypothesis import (
+    given,
+    settings,
+)
+from hypothesis.strategies import (
+    booleans,
+    integers,
+)
+
+from oedtools.profiling import (
+    NULL_PROFILE,
+    ValidationProfile,
+)
+from oedtools.report import (
+    file_errors,
+    write_report,
+)
+from oedtools.tracing import (
+    SPANS,
+    TraceHook,
+    add_hook,
+    get_hooks,
+    get_profile,
+    hooks,
+    remove_hook,
+    span,
+)
+from oedtools.validate import OedValidator
+
+from .data import get_loc_data
+
+
+class RecordingHook(TraceHook):
+
+    def __init__(self):
+        self.events = []
+
+    def start(self, name, attrs):
+        self.events.append(('start', name, dict(attrs)))
+        return len(self.events)
+
+    def end(self, token, name, attrs):
+        self.events.append(('end', name, dict(attrs), token))
+
+
+def get_errors(results):
+    if isinstance(results, list):
+        return sorted((r['header'], row, e.code) for r in results for row, e in r['exceptions'])
+    return sorted(results.counts().items())
+
+
+class TestTracing(TestCase):
+
+    def assert_nested(self, events):
+        stack = []
+        for i, event in enumerate(events):
+            if event[0] == 'start':
+                stack.append((event[1], i + 1))
+            else:
+                self.assertEqual(stack.pop(), (event[1], event[3]))
+        self.assertEqual(stack, [])
+
+    def test_span__no_hooks__shared_null_span_and_null_profile_returned(self):
+        self.assertEqual(get_hooks(), [])
+
+        self.assertIs(span('validate', file='a.csv'), span('read'))
+        with span('validate') as attrs:
+            attrs['rows'] = 1
+
+        self.assertIs(get_profile(None, file='a.csv'), NULL_PROFILE)
+        profile = ValidationProfile()
+        self.assertIs(get_profile(profile), profile)
+
+    def test_hooks__added_and_removed__hooks_registered_only_in_block(self):
+        hook1, hook2 = RecordingHook(), RecordingHook()
+
+        with hooks(hook1, hook2):
+            self.assertEqual(get_hooks(), [hook1, hook2])
+            with span('validate', file='a.csv') as attrs:
+                attrs['rows'] = 2
+
+        self.assertEqual(get_hooks(), [])
+        self.assertEqual(hook1.events, hook2.events)
+        self.assertEqual(hook1.events, [
+            ('start', 'validate', {'file': 'a.csv'}),
+            ('end', 'validate', {'file': 'a.csv', 'rows': 2}, 1)
+        ])
+
+        add_hook(hook1)
+        try:
+            remove_hook(hook2)
+            self.assertEqual(get_hooks(), [hook1])
+        finally:
+            remove_hook(hook1)
+        self.assertEqual(get_hooks(), [])
+
+    def test_span__exception__error_attribute_set_and_exception_raised(self):
+        hook = RecordingHook()
+
+        with hooks(hook):
+            with self.assertRaises(ValueError):
+                with span('read', file='a.csv'):
+                    raise ValueError('bad chunk')
+
+        self.assertEqual(hook.events[-1][1], 'read')
+        self.assertIsInstance(hook.events[-1][2]['error'], ValueError)
+
+    @given(
+        num_rows=integers(min_value=1, max_value=30),
+        chunksize=integers(min_value=1, max_value=40)
+    )
+    @settings(max_examples=10, deadline=None)
+    def test_write_report__file_errors__spans_nested_with_row_and_error_attributes(self, num_rows, chunksize):
+        hook = RecordingHook()
+        data = get_loc_data(num_rows)
+
+        with TemporaryDirectory() as out_dir:
+            out_fp = os.path.join(out_dir, 'report.jsonl')
+            with hooks(hook):
+                num_records = write_report(file_errors('loc', data, chunksize=chunksize), output_fp=out_fp, report_format='jsonl')
+            with io.open(out_fp, 'r', encoding='utf-8') as f:
+                self.assertEqual(len(f.readlines()), num_records)
+
+        events = hook.events
+        self.assert_nested(events)
+        self.assertTrue(set(e[1] for e in events).issubset(SPANS))
+
+        ends = [e for e in events if e[0] == 'end']
+        self.assertEqual(ends[-1][1:3], ('write_report', {'format': 'jsonl', 'output_file': out_fp, 'records': num_records}))
+        num_errors = sum(len(res) for res in OedValidator().validate_chunks('loc', data, chunksize=chunksize))
+        self.assertEqual(ends[-2][1:3], ('validate', {'file': None, 'schema_type': 'loc', 'rows': num_rows, 'errors': num_errors}))
+
+        num_chunks = -(-num_rows // chunksize)
+        reads = [e[2] for e in ends if e[1] == 'read']
+        self.assertEqual(sum(a['rows'] for a in reads), num_rows)
+        self.assertEqual(len([a for a in reads if a['rows']]), num_chunks)
+
+        columns = [e[2] for e in ends if e[1] == 'column']
+        self.assertEqual(len(columns), 4 * num_chunks)
+        for a in columns:
+            self.assertEqual((a['file'], a['schema_type']), (None, 'loc'))
+            self.assertEqual(a['errors'], a['rows'] if a['column'] == 'CountryCode' else 0)
+        self.assertEqual(sum(a['rows'] for a in columns if a['column'] == 'LocNumber'), num_rows)
+
+        reports = [e[2] for e in ends if e[1] == 'report']
+        self.assertEqual(sum(a['rows'] for a in reports), num_records)
+
+    @given(
+        num_rows=integers(min_value=1, max_value=30),
+        columnar=booleans()
+    )
+    @settings(max_examples=10, deadline=None)
+    def test_validate__hooks_and_profile__results_and_profile_unchanged(self, num_rows, columnar):
+        hook = RecordingHook()
+        data = get_loc_data(num_rows)
+
+        expected_profile = ValidationProfile()
+        expected = OedValidator().validate('loc', data, columnar=columnar, profile=expected_profile)
+
+        profile = ValidationProfile()
+        with hooks(hook):
+            res = OedValidator().validate('loc', data, columnar=columnar, profile=profile)
+
+        self.assertEqual(get_errors(res[0]), get_errors(expected[0]))
+        num_errors = len(res[0]) if columnar else len(get_errors(res[0]))
+
+        stages = {s['stage']: (s['rows'], s['calls']) for s in profile.to_dict()['stages']}
+        expected_stages = {s['stage']: (s['rows'], s['calls']) for s in expected_profile.to_dict()['stages']}
+        self.assertEqual(stages, expected_stages)
+
+        self.assert_nested(hook.events)
+        self.assertEqual(hook.events[0][1], 'validate')
+        self.assertEqual(hook.events[-1][1:3], ('validate', {'file': None, 'schema_type': 'loc', 'rows': num_rows, 'errors': num_errors}))
+        self.assertIn('column', [e[1] for e in hook.events])
@@ -25,6 +25,9 @@ from hypothesis.strategies import (
 
 from oedtools.utils import (
     generate_token_sequence,
+    generate_token_sequences,
+    get_random_generator,
+    get_seed_sequence,
     get_value,
     is_real_number,
     is_valid_token_sequence,
@@ -159,6 +162,87 @@ class TestUtils(TestCase):
             self.assertEqual(len(res_tokens), seq_length)
         self.assertTrue(all(len(token) == token_length) for token in res_tokens)
 
+    @given(
+        num_tokens=integers(min_value=0, max_value=100),
+        size=integers(min_value=0, max_value=200),
+        seq_length=integers(min_value=0, max_value=50),
+        sep=sampled_from(string.punctuation),
+        unique=booleans()
+    )
+    def test_generate_token_sequences(self, num_tokens, size, seq_length, sep, unique):
+        tokens = ['t{}'.format(i) for i in range(num_tokens)]
+
+        seqs = generate_token_sequences(tokens, size, seq_length, sep, unique=unique)
+
+        self.assertEqual(len(seqs), size)
+        for seq in seqs:
+            res_tokens = seq.split(sep) if seq else []
+            self.assertEqual(res_tokens, sorted(res_tokens))
+            self.assertTrue(set(res_tokens).issubset(tokens))
+            if unique is True:
+                self.assertEqual(len(res_tokens), min(num_tokens, seq_length))
+                self.assertEqual(len(set(res_tokens)), len(res_tokens))
+            else:
+                self.assertEqual(len(res_tokens), seq_length if num_tokens else 0)
+
+    def test_generate_token_sequences__large_sample__tokens_and_token_sets_uniformly_distributed(self):
+        tokens = ['t{}'.format(i) for i in range(6)]
+
+        seqs = generate_token_sequences(tokens, 60000, 2)
+
+        seq_counts = Counter(seqs)
+        token_counts = Counter(t for seq in seqs for t in seq.split(';'))
+        self.assertEqual(len(seq_counts), 15)
+        self.assertTrue(all(abs(count - 4000) < 400 for count in seq_counts.values()))
+        self.assertTrue(all(abs(count - 20000) < 1000 for count in token_counts.values()))
+
+    def test_generate_token_sequences__sequence_length_close_to_number_of_tokens__no_overflow_and_all_sets_generated(self):
+        # The number of sets of each size is C(num_tokens, seq_length)
+        for num_tokens, seq_length, size, num_sets in [(100, 99, 5000, 100), (70, 69, 5000, 70), (8, 4, 20000, 70)]:
+            tokens = ['t{:03d}'.format(i) for i in range(num_tokens)]
+
+            seqs = generate_token_sequences(tokens, size, seq_length, rng=1)
+
+            self.assertEqual(len(seqs), size)
+            self.assertTrue(all(len(set(seq.split(';'))) == seq_length for seq in seqs))
+            self.assertEqual(len(set(seqs)), num_sets)
+
+    def test_get_random_generator__seeds_and_generators__reproducible_streams(self):
+        rng = np.random.default_rng(1)
+        self.assertIs(get_random_generator(rng), rng)
+
+        seed_seq = np.random.SeedSequence(1)
+        self.assertIs(get_seed_sequence(seed_seq), seed_seq)
+
+        exp = np.random.default_rng(1).integers(0, 1000, size=10).tolist()
+        self.assertEqual(get_random_generator(1).integers(0, 1000, size=10).tolist(), exp)
+        self.assertEqual(get_random_generator(np.random.SeedSequence(1)).integers(0, 1000, size=10).tolist(), exp)
+
+        np.random.seed(1)
+        samples = [get_random_generator().integers(0, 1000, size=10).tolist()]
+        np.random.seed(1)
+        samples.append(get_random_generator().integers(0, 1000, size=10).tolist())
+        self.assertEqual(samples[0], samples[1])
+
+    @given(
+        num_tokens=integers(min_value=1, max_value=30),
+        size=integers(min_value=1, max_value=100),
+        unique=booleans(),
+        seed=integers(min_value=0, max_value=2 ** 32 - 1)
+    )
+    @settings(max_examples=10)
+    def test_generate_token_sequences__same_seed__same_sequences(self, num_tokens, size, unique, seed):
+        tokens = ['t{}'.format(i) for i in range(num_tokens)]
+
+        self.assertEqual(
+            generate_token_sequences(tokens, size, unique=unique, rng=seed),
+            generate_token_sequences(tokens, size, unique=unique, rng=np.random.default_rng(seed))
+        )
+        self.assertEqual(
+            generate_token_sequence(tokens, unique=unique, rng=seed),
+            generate_token_sequence(tokens, unique=unique, rng=seed)
+        )
+
     def test_is_valid_token_sequence__with_non_string_token_sequence__returns_null(self):
         self.assertIsNone(is_valid_token_sequence([], 1))
         self.assertIsNone(is_valid_token_sequence([], True))
@@ -41,6 +41,7 @@ from oedtools.exceptions import (
     NullDataInNonNullColumnError,
     ProcessError,
 )
+from oedtools.results import ValidationResults
 from oedtools.validate import OedValidator
 
 from .data import (
@@ -1972,3 +1973,64 @@ class TestValidate(TestCase):
                 self.assertIsInstance(exceptions[0], MissingRequiredColumnError)
             elif header in required + optional:
                 self.assertEqual(exceptions, [])
+
+    @settings(max_examples=10, deadline=None)
+    @given(
+        required=lists(sampled_from(LOC_REQUIRED), min_size=1, max_size=len(LOC_REQUIRED), unique=True),
+        optional=lists(sampled_from(LOC_OPTIONAL), max_size=10, unique=True),
+        num_rows=integers(min_value=1, max_value=20),
+        chunksize=integers(min_value=1, max_value=25)
+    )
+    def test_validate_chunks__loc__as_file__chunk_results_combine_to_whole_file_results(self, required, optional, num_rows, chunksize):
+        headers = required + optional
+
+        df = pd.DataFrame(data={header: sample_column('loc', header, size=num_rows) for header in headers}, dtype=object)
+        df.loc[df.index[::3], headers[0]] = None
+
+        with NamedTemporaryFile('w') as loc_file:
+            df.to_csv(path_or_buf=loc_file.name, index=False, encoding='utf-8')
+
+            exp_results, exp_overall, _ = self.validator.validate('loc', loc_file.name, columnar=True)
+
+            chunk_results = list(self.validator.validate_chunks('loc', loc_file.name, chunksize=chunksize))
+
+        self.assertEqual(len(chunk_results), -(-num_rows // chunksize))
+        self.assertEqual([r.num_rows for r in chunk_results[:-1]], [chunksize] * (len(chunk_results) - 1))
+
+        for r in chunk_results[1:]:
+            self.assertFalse(any(r.rows == 1))
+
+        results = ValidationResults.concat(chunk_results)
+
+        self.assertEqual(results.num_rows, num_rows)
+        self.assertEqual(results.overall_pass, exp_overall)
+        self.assertEqual(
+            sorted(zip(results.rows.tolist(), results.columns.tolist(), results.codes.tolist())),
+            sorted(zip(exp_results.rows.tolist(), exp_results.columns.tolist(), exp_results.codes.tolist()))
+        )
+
+    @given(
+        schema_type=sampled_from(SCHEMA_TYPES),
+        file=text(min_size=1, alphabet=string.ascii_letters + string.digits + '-.')
+    )
+    def test_validate_chunks__invalid_file__oed_validation_process_error_raised(self, schema_type, file):
+        with self.assertRaises(ProcessError):
+            list(self.validator.validate_chunks(schema_type, file))
+
+    @given(
+        chunksize=one_of(none(), integers(min_value=1, max_value=5)),
+        as_file=booleans()
+    )
+    @settings(max_examples=10, deadline=None)
+    def test_read_data__columns__only_given_columns_read_case_insensitively(self, chunksize, as_file):
+        df = pd.DataFrame(data={'LocNumber': ['1', '2', '3'], 'AccNumber': ['A', None, 'C'], 'BuildingTIV': ['1.0', '2.0', '3.0']})
+
+        with NamedTemporaryFile('w') as loc_file:
+            df.to_csv(path_or_buf=loc_file.name, index=False, encoding='utf-8')
+            chunks = list(self.validator.read_data('loc', loc_file.name if as_file else df.to_dict('records'), chunksize=chunksize, columns=['locnumber', 'ACCNUMBER']))
+
+        data = pd.concat(chunks)
+
+        self.assertEqual(data.columns.tolist(), ['LocNumber', 'AccNumber'])
+        self.assertEqual(data.index.tolist(), [0, 1, 2])
+        self.assertEqual(data['AccNumber'].tolist(), ['A', None, 'C'])
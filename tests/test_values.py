@@ -26,7 +26,9 @@ from oedtools.values import (
     get_column_range_by_value_group,
     get_column_sampling_method,
     get_column_validation_method,
+    get_values_index,
     get_values_profile,
+    lookup_value,
     SCHEMA_DIR,
 )
 
@@ -390,3 +392,29 @@ class TestValues(TestCase):
                 axis=1
             ).dropna().unique().tolist() or None
             self.assertEqual(expected[0] if expected else None, get_column_validation_method(col))
+
+    def test_get_values_index__every_discrete_value_indexed_by_value_and_by_column(self):
+        index = get_values_index()
+
+        self.assertIs(index, get_values_index())
+
+        for group, group_dict in get_values_profile().items():
+            for key, v in group_dict.items():
+                if not v['id'] or ':' in v['id']:
+                    continue
+                self.assertIn((group, key), [(e['group'], e['key']) for e in lookup_value(v['id'])])
+                for col in v['columns']:
+                    self.assertIn((group, key), [(e['group'], e['key']) for e in lookup_value(v['id'].lower(), header=col.upper())])
+
+    def test_lookup_value__codes_and_ranges(self):
+        self.assertEqual(
+            [(e['group'], e['key']) for e in lookup_value('5', header='LocDedCode1Building')],
+            [('deductible codes', 'cea homeowners')]
+        )
+        self.assertEqual(
+            [(e['group'], e['key']) for e in lookup_value(5405, header='constructioncode')],
+            [('construction codes', 'bridges')]
+        )
+        self.assertIn(('construction codes', 'bridges'), [(e['group'], e['key']) for e in lookup_value(' 5405 ')])
+        self.assertEqual(lookup_value('AFN', header='LocDedCode1Building'), [])
+        self.assertEqual(lookup_value('not an oed value'), [])